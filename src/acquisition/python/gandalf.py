@@ -13,7 +13,8 @@ import time
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from scp import SCPClient
+
+from gandalf_orchestrator import DEFAULT_PARALLEL_HOSTS, HostProgress, receive_archive, run_acquisitions
 
 
 parser = argparse.ArgumentParser()
@@ -57,6 +58,13 @@ parser.add_argument(
     const=True,
     default=False,
 )
+parser.add_argument(
+    "-P",
+    "--Parallel",
+    help="Number of remote hosts to acquire concurrently (default {})".format(DEFAULT_PARALLEL_HOSTS),
+    type=int,
+    default=DEFAULT_PARALLEL_HOSTS,
+)
 
 args = parser.parse_args()
 encryption_method = args.EncryptionMethod
@@ -65,6 +73,7 @@ output_dir = args.OutputDirectory
 mem = args.Memory
 access_times = args.AccessTimes
 files = args.CollectFiles
+parallel_hosts = args.Parallel
 
 system_artefacts = {
     # macOS artifacts
@@ -267,6 +276,36 @@ def generate_cipher():
     return cipher
 
 
+def build_acquisition_script(
+    encryption_method,
+    system_artefacts,
+    output_directory,
+    memory,
+    access_times,
+    collect_files,
+    encryption_object,
+    gandalf_directory,
+    gandalf_host,
+    stream_archive=False,
+):
+    with open("shire/collect_artefacts-py") as collect_artefacts:
+        script = collect_artefacts.read()
+    if stream_archive:  # archive on stdout; everything else printed moves to stderr
+        script += "\n\narchive_stream = os.fdopen(os.dup(1), \"wb\")\nos.dup2(2, 1)\n"
+    return script + '\n\nacquire_artefacts(\n    "{}",\n    {},\n    "{}",\n    "{}",\n    "{}",\n    "{}",\n    "{}",\n    "{}",\n    "{}",\n{})\n'.format(
+        encryption_method,
+        system_artefacts,
+        output_directory,
+        memory,
+        access_times,
+        collect_files,
+        encryption_object,
+        gandalf_directory,
+        gandalf_host,
+        "    archive_stream=archive_stream,\n" if stream_archive else "",
+    )
+
+
 def configure_acquisition(
     encryption_method,
     system_artefacts,
@@ -278,10 +317,9 @@ def configure_acquisition(
     gandalf_directory,
     gandalf_host,
 ):
-    shutil.copy2("shire/collect_artefacts-py", "tools/acquire_artefacts.py")
-    with open("tools/acquire_artefacts.py", "a") as acquire_artefacts:
+    with open("tools/acquire_artefacts.py", "w") as acquire_artefacts:
         acquire_artefacts.write(
-            '\n\nacquire_artefacts(\n    "{}",\n    {},\n    "{}",\n    "{}",\n    "{}",\n    "{}",\n    "{}",\n    "{}",\n    "{}",\n)\n'.format(
+            build_acquisition_script(
                 encryption_method,
                 system_artefacts,
                 output_directory,
@@ -296,6 +334,72 @@ def configure_acquisition(
     os.chmod("tools/acquire_artefacts.py", 0o755)
 
 
+def run_remote_command(ssh, command):
+    _, stdout, stderr = ssh.exec_command(command)
+    status = stdout.channel.recv_exit_status()
+    if status != 0:
+        raise RuntimeError(
+            "'{}' exited with {}: {}".format(command, status, stderr.read().decode(errors="replace").strip())
+        )
+
+
+def acquire_remote_host(host, connection, script, archive_destination, report):
+    """
+    Acquire one remote host over its own SSH connection.
+
+    The acquisition script is streamed to `python3 -` over the SSH channel
+    and writes the archive to its stdout, which is copied straight into
+    archive_destination; the archive is never staged on the remote host or
+    locally. The script's progress arrives on stderr and is drained into
+    <host>.gandalf.log at the same time. A non-zero exit status fails the
+    host. The remote /tmp/gandalf/ is removed whether or not the
+    acquisition succeeds.
+    """
+    ssh_ip, ssh_user, ssh_pswd = connection
+    if encryption_method.title() in ("Key", "Password"):
+        archive = "{}.zip.enc".format(host)
+    else:
+        archive = "{}.zip".format(host)
+    partial = os.path.join(archive_destination, archive + ".part")
+    ssh = paramiko.client.SSHClient()
+    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())  # initiating connection
+    report("connecting", ssh_ip)
+    ssh.connect(ssh_ip, username=ssh_user, password=ssh_pswd, timeout=30)
+    try:
+        run_remote_command(ssh, "mkdir -p {}".format(gandalf_directory))  # making gandalf directories
+        if memory == "True":  # sending memory dump tools
+            sftp = ssh.open_sftp()
+            for tool in ("avml-main.zip", "osxpmem.app.zip"):
+                report("sending tools", tool)
+                sftp.put(os.path.join("tools", "memory", tool), "/tmp/gandalf/{}".format(tool))
+            sftp.close()
+        report("acquiring")
+        acquire_in, acquire_out, acquire_err = ssh.exec_command("python3 -")  # executing gandalf acquisition script
+        acquire_in.write(script)
+        acquire_in.channel.shutdown_write()
+        log_path = os.path.join(archive_destination, "{}.gandalf.log".format(host))
+        try:
+            with open(log_path, "wb") as acquisition_log:
+                received = receive_archive(acquire_out, acquire_err, partial, acquisition_log, report)
+            status = acquire_out.channel.recv_exit_status()
+            if status != 0:
+                raise RuntimeError("acquisition exited with {} (see {})".format(status, log_path))
+            if not received:
+                raise RuntimeError("archive could not be collected (see {})".format(log_path))
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        os.replace(partial, os.path.join(archive_destination, archive))
+        return archive
+    finally:
+        try:
+            run_remote_command(ssh, "rm -rf /tmp/gandalf/")  # deleting gandalf
+        except Exception:
+            pass
+        ssh.close()
+
+
 def main():
     subprocess.Popen(["clear"])
     time.sleep(2)
@@ -443,20 +547,32 @@ def main():
                 pass
         else:
             pass
-        ssh = paramiko.client.SSHClient()
         with open(os.path.join("lists", "hosts.list")) as host_list:
             for each_host in host_list:
-                if not each_host.startswith("#"):
+                if not each_host.startswith("#") and each_host.strip():
                     hostlist.append(each_host.strip())
                 else:
                     pass
-        for host in hostlist:
-            print("    \033[1;30mConnecting to '{}'...\033[1;m".format(host))
-            ssh_ip = input("     \033[1;30mIP address:\033[1;m ")
-            ssh_user = input("     \033[1;30m  Username:\033[1;m ")
-            ssh_pswd = getpass.getpass("     \033[1;30m  Password:\033[1;m ")
-            gandalf_host = os.path.join(gandalf_directory, host)
-            configure_acquisition(
+        connections = {}
+        ssh_user, ssh_pswd = "", ""
+        for host in hostlist:  # credentials are gathered up front so hosts can run unattended
+            print("    \033[1;30mConnection details for '{}'...\033[1;m".format(host))
+            ssh_ip = input("     \033[1;30mIP address [{}]:\033[1;m ".format(host)) or host
+            previous_user = " [{}]".format(ssh_user) if ssh_user else ""
+            ssh_user = input("     \033[1;30m  Username{}:\033[1;m ".format(previous_user)) or ssh_user
+            previous_pswd = " [previous]" if ssh_pswd else ""
+            ssh_pswd = getpass.getpass("     \033[1;30m  Password{}:\033[1;m ".format(previous_pswd)) or ssh_pswd
+            connections[host] = (ssh_ip, ssh_user, ssh_pswd)
+        archive_destination = output_dir[0] if output_dir != False else "."
+        os.makedirs(archive_destination, exist_ok=True)
+        print(
+            "\n    \033[1;30mAcquiring {} host(s), {} at a time...\033[1;m\n".format(
+                len(hostlist), min(parallel_hosts, len(hostlist))
+            )
+        )
+
+        def acquire(host, report):
+            script = build_acquisition_script(
                 encryption_method,
                 system_artefacts,
                 output_directory,
@@ -465,87 +581,19 @@ def main():
                 collect_files,
                 encryption_object,
                 gandalf_directory,
-                gandalf_host,
+                os.path.join(gandalf_directory, host),
+                stream_archive=True,
             )
-            print()
-            try:
-                ssh.set_missing_host_key_policy(
-                    paramiko.AutoAddPolicy()
-                )  # initiating connection
-                ssh.connect(ssh_ip, username=ssh_user, password=ssh_pswd)
-                sshin, sshout, ssherr = ssh.exec_command(
-                    "mkdir -p {}".format(gandalf_directory)
-                )  # making gandalf directories
-                scp = SCPClient(ssh.get_transport())
-                if memory:  # sending memory dump tools
-                    scp.put(
-                        os.path.join("tools", "memory", "avml-main.zip"),
-                        "/tmp/gandalf/",
-                    )
-                    scp.put(
-                        os.path.join("tools", "memory", "osxpmem.app.zip"),
-                        "/tmp/gandalf/",
-                    )
-                else:
-                    pass
-                scp.put(
-                    os.path.join("tools", "acquire_artefacts.py"),
-                    "/tmp/gandalf/acquire_artefacts.py",
-                )  # sending gandalf acquisition script
-                acquire_in, acquire_out, acquire_err = ssh.exec_command(
-                    "python3 /tmp/gandalf/acquire_artefacts.py"
-                )  # executing gandalf acquisition script
-                exec_script = acquire_out.read().decode()
-                print(exec_script)
-                _, list_out, list_err = ssh.exec_command(
-                    "ls /tmp/gandalf/gandalf/acquisitions/"
-                )  # listing acquisition archive directory
-                dir_listing = str(list_out.read())
-                if (
-                    "{}.zip.enc".format(gandalf_host.split("/")[-1]) in dir_listing
-                ):  # checking for encrypted archive
-                    scp.get(
-                        "/tmp/gandalf/gandalf/acquisitions/{}.zip.enc".format(
-                            gandalf_host.split("/")[-1]
-                        ),
-                        ".",
-                    )
-                    print(
-                        "     \033[1;30mEncrypted archive collected for '{}'\033[1;m".format(
-                            gandalf_host.split("/")[-1]
-                        )
-                    )
-                elif (
-                    "{}.zip".format(gandalf_host.split("/")[-1]) in dir_listing
-                ):  # checking for unencrypted archive
-                    scp.get(
-                        "/tmp/gandalf/gandalf/acquisitions/{}.zip".format(
-                            gandalf_host.split("/")[-1]
-                        ),
-                        ".",
-                    )
-                    print(
-                        "     \033[1;30mArchive collected for '{}'\033[1;m".format(
-                            gandalf_host.split("/")[-1]
-                        )
-                    )
-                else:
-                    print(
-                        "     \033[1;30mArchive could not be collected, please try again for '{}'\033[1;m\n".format(
-                            gandalf_host.split("/")[-1]
-                        )
-                    )
-                _, rm_out, rm_err = ssh.exec_command(
-                    "rm -rf /tmp/gandalf/"
-                )  # deleting gandalf
-                ssh.close()
-            except paramiko.ssh_exception.NoValidConnectionsError:
-                print(
-                    "      \033[1;31mSSH connection to '{}' could not be established.\033[1;m\n".format(
-                        host
-                    )
-                )
-            print()
+            return acquire_remote_host(host, connections[host], script, archive_destination, report)
+
+        results = run_acquisitions(hostlist, acquire, parallel_hosts, HostProgress(hostlist))
+        failed = [host for host in hostlist if results[host]["status"] != "done"]
+        if failed:
+            print("\n      \033[1;31mAcquisition failed for:\033[1;m")
+            for host in failed:
+                print("       - {} ({})".format(host, results[host]["detail"]))
+        hostlist = [host for host in hostlist if host not in failed]
+        print()
     endtime = time.time()
     diffmins = "{} minutes".format(str(round(((endtime - starttime) - 4) / 60)))
     diffsecs = "{} seconds".format(str(round(((endtime - starttime) - 4) % 60)))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3 -tt
+"""
+Concurrent multi-host acquisition for gandalf.py
+
+Runs one acquisition per host on a bounded thread pool. Each host moves
+through its own stages (connecting, sending tools, acquiring, collecting)
+independently of the others; an exception in one host is recorded against
+that host and never stops the sweep. Progress is shown as a table redrawn
+in place on a terminal, or as one line per stage change otherwise (e.g.
+when output is redirected to a log).
+
+A remote host's archive arrives on the stdout of its acquisition script
+while the script's progress arrives on stderr; receive_archive copies the
+one into a local file and drains the other concurrently, so neither side
+blocks on a full pipe.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, TextIO
+
+DEFAULT_PARALLEL_HOSTS = 8
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+
+QUEUED = "queued"
+DONE = "done"
+FAILED = "failed"
+
+
+class HostProgress:
+    """Live progress table for a set of hosts, safe to update from worker threads."""
+
+    def __init__(self, hosts: List[str], stream: Optional[TextIO] = None, interactive: Optional[bool] = None):
+        self.stream = stream or sys.stdout
+        self.interactive = self.stream.isatty() if interactive is None else interactive
+        self.hosts = list(hosts)
+        self.stages: Dict[str, str] = {host: QUEUED for host in self.hosts}
+        self.details: Dict[str, str] = {host: "" for host in self.hosts}
+        self.started: Dict[str, float] = {}
+        self.finished: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._drawn = 0
+        self._width = max([len(host) for host in self.hosts] + [4])
+
+    def update(self, host: str, stage: str, detail: str = ""):
+        """Move host to stage (detail is free text, e.g. bytes transferred)."""
+        with self._lock:
+            changed = stage != self.stages[host]
+            self.stages[host] = stage
+            self.details[host] = detail
+            if stage not in (QUEUED, DONE, FAILED):
+                self.started.setdefault(host, time.time())
+            elif stage in (DONE, FAILED):
+                self.finished[host] = time.time()
+            if self.interactive:
+                self._draw()
+            elif changed:
+                self.stream.write("      {}\n".format(self._row(host).rstrip()))
+                self.stream.flush()
+
+    def _row(self, host: str) -> str:
+        elapsed = ""
+        if host in self.started:
+            elapsed = "{:>5}s".format(int(self.finished.get(host, time.time()) - self.started[host]))
+        return "{:<{}}  {:<16} {:>6}  {}".format(host, self._width, self.stages[host], elapsed, self.details[host])
+
+    def _draw(self):
+        lines = ["      {:<{}}  {:<16} {:>6}  {}".format("host", self._width, "stage", "time", "")]
+        lines += ["      " + self._row(host) for host in self.hosts]
+        done = sum(1 for stage in self.stages.values() if stage in (DONE, FAILED))
+        lines.append("      {}/{} hosts finished".format(done, len(self.hosts)))
+        if self._drawn:
+            self.stream.write("\033[{}F".format(self._drawn))
+        self.stream.write("".join("\033[2K{}\n".format(line) for line in lines))
+        self.stream.flush()
+        self._drawn = len(lines)
+
+    def summary(self) -> Dict[str, List[str]]:
+        """Hosts grouped by final stage."""
+        with self._lock:
+            grouped: Dict[str, List[str]] = {}
+            for host in self.hosts:
+                grouped.setdefault(self.stages[host], []).append(host)
+            return grouped
+
+
+def format_bytes(size):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            return "{:.1f}{}".format(size, unit) if unit != "B" else "{}B".format(size)
+        size /= 1024
+
+
+def receive_archive(
+    archive_source,
+    progress_source,
+    archive_path: str,
+    log_file,
+    report: Callable[[str, str], None],
+    chunk_size: int = ARCHIVE_CHUNK_SIZE,
+) -> int:
+    """
+    Copy a remote archive into archive_path while draining the remote progress.
+
+    Args:
+        archive_source: Remote stdout, read in chunks of bytes
+        progress_source: Remote stderr, read a line at a time and written to log_file
+        archive_path: Local file the archive is written to
+        log_file: Binary file receiving the remote progress
+        report: report(stage, detail), as passed to acquire by run_acquisitions
+
+    Returns:
+        Bytes of archive received
+    """
+
+    def drain():
+        for line in iter(progress_source.readline, ""):
+            if not line:  # b"" from a binary stream
+                break
+            text = line.decode(errors="replace") if isinstance(line, bytes) else line
+            log_file.write(text.encode(errors="replace"))
+            if text.strip():
+                report("acquiring", text.strip()[-60:])
+
+    drainer = threading.Thread(target=drain, daemon=True)
+    drainer.start()
+    received = 0
+    try:
+        with open(archive_path, "wb") as archive:
+            for chunk in iter(lambda: archive_source.read(chunk_size), b""):
+                archive.write(chunk)
+                received += len(chunk)
+                report("collecting", format_bytes(received))
+    finally:
+        drainer.join()
+    return received
+
+
+def run_acquisitions(
+    hosts: List[str],
+    acquire: Callable[[str, Callable[[str, str], None]], Optional[str]],
+    max_workers: int = DEFAULT_PARALLEL_HOSTS,
+    progress: Optional[HostProgress] = None,
+) -> Dict[str, dict]:
+    """
+    Acquire every host concurrently, at most max_workers at a time.
+
+    Args:
+        hosts: Host names, in display order
+        acquire: Called as acquire(host, report) on a worker thread, where
+            report(stage, detail) updates the host's progress; returns a
+            detail for the final row (e.g. the collected archive name)
+        max_workers: Hosts acquired at once
+        progress: Progress table (a new one on stdout if not provided)
+
+    Returns:
+        Per host: {"status": "done"|"failed", "detail": str, "seconds": float}
+    """
+    progress = progress or HostProgress(hosts)
+    results: Dict[str, dict] = {}
+
+    def run(host: str):
+        started = time.time()
+
+        def report(stage: str, detail: str = ""):
+            progress.update(host, stage, detail)
+
+        try:
+            detail = acquire(host, report) or ""
+            status = DONE
+        except Exception as error:  # one host failing must not stop the sweep
+            detail = "{}: {}".format(type(error).__name__, error)
+            status = FAILED
+        progress.update(host, status, detail)
+        results[host] = {"status": status, "detail": detail, "seconds": time.time() - started}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for host in hosts:
+            progress.update(host, QUEUED)
+        list(executor.map(run, hosts))
+    return results
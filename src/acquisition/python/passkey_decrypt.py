@@ -6,10 +6,14 @@ import random
 import subprocess
 import sys
 import time
+from pathlib import Path
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.crypto import CryptoManager, is_segmented_stream  # noqa: E402
+
 
 quotes = [
     "     Not come the days of the King.\n     May they be blessed.\n",
@@ -94,8 +98,7 @@ def generate_passkey():
         iterations=480000,
     ) 
     key = base64.urlsafe_b64encode(kdf.derive(password))
-    cipher = Fernet(key)
-    return cipher
+    return key
 
 
 def main():
@@ -128,12 +131,16 @@ def main():
         print("    {} is not of file 'type', please try again.\n\n".format(encrypted_archive))
         sys.exit()
     else:
-        cipher = generate_passkey()
-        with open(encrypted_archive, "rb") as enc_archive:
-            encrypted_content = enc_archive.read()
-        decrypted_content = cipher.decrypt(encrypted_content)
-        with open("{}.dec.zip".format(encrypted_archive[0:-8]), "wb") as dec_archive:
-            dec_archive.write(decrypted_content)
+        key = generate_passkey()
+        decrypted_archive = "{}.dec.zip".format(encrypted_archive[0:-8])
+        if is_segmented_stream(encrypted_archive):  # streamed segment by segment
+            CryptoManager().decrypt_file(encrypted_archive, decrypted_archive, key=key)
+        else:  # whole-file Fernet token
+            with open(encrypted_archive, "rb") as enc_archive:
+                encrypted_content = enc_archive.read()
+            decrypted_content = Fernet(key).decrypt(encrypted_content)
+            with open(decrypted_archive, "wb") as dec_archive:
+                dec_archive.write(decrypted_content)
         print("\n    Successfully decrypted \033[1;30m{}\033[1;m\n                        to \033[1;32m{}.dec.zip\033[1;m\n\n".format(encrypted_archive, encrypted_archive[0:-8]))
 
 
@@ -0,0 +1 @@
+"""Performance benchmarks for Elrond hot paths."""
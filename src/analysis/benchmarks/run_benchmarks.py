@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Elrond Benchmark Runner
+
+Times elrond's hot functions in isolation against deterministic synthetic
+artefacts and records wall time, throughput and peak RSS to JSON so releases
+can be compared for regressions.
+
+Each benchmark runs in a forked child process so its peak RSS is not
+polluted by earlier benchmarks or by input generation.
+
+Usage:
+    python3 benchmarks/run_benchmarks.py --scale small -o results.json
+    python3 benchmarks/run_benchmarks.py --only keywords,mitre_scan_record
+    python3 benchmarks/run_benchmarks.py --baseline previous.json --threshold 0.2
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import platform as stdlib_platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_ROOT = os.path.dirname(os.path.abspath(__file__))
+ELROND_ROOT = os.path.dirname(BENCH_ROOT)
+if ELROND_ROOT not in sys.path:
+    sys.path.insert(0, ELROND_ROOT)
+
+from benchmarks import generators  # noqa: E402
+from benchmarks.stubs import ElasticStub, install_dns_stub  # noqa: E402
+
+# Multipliers applied to each benchmark's base input size
+SCALES = {"small": 1, "medium": 10, "large": 100}
+
+IMG = "bench.E01::/mnt/elrond_mount00::windows"
+IMG_NAME = "bench.E01"
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 2)
+    return round(peak / 1024, 2)
+
+
+def _case_dir(work_dir):
+    output_directory = os.path.join(work_dir, "case") + "/"
+    os.makedirs(os.path.join(output_directory, IMG_NAME, "analysis"), exist_ok=True)
+    return output_directory
+
+
+def _tree_bytes(paths):
+    return sum(os.path.getsize(p) for p in paths)
+
+
+# ---------------------------------------------------------------------------
+# Benchmark definitions: each setup function generates inputs and returns
+# (run_callable, records, input_bytes)
+# ---------------------------------------------------------------------------
+
+
+def setup_keywords(work_dir, scale):
+    from rivendell.analysis.keywords import search_keywords
+
+    corpus = os.path.join(work_dir, "keywords")
+    files, lines = 20 * scale, 200
+    keyword_file = generators.generate_keyword_corpus(corpus, files, lines)
+    targets = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(corpus)
+        for name in names
+        if name != "keywords.txt"
+    )
+    output_directory = _case_dir(work_dir)
+
+    def run():
+        search_keywords("", output_directory, IMG, [keyword_file], targets, "'bench'", "'bench'", "")
+
+    return run, files * lines, _tree_bytes(targets)
+
+
+def setup_compare_iocs(work_dir, scale):
+    from rivendell.analysis.iocs import compare_iocs
+
+    corpus = os.path.join(work_dir, "iocs")
+    files, lines = 5 * scale, 100
+    watchlist = generators.generate_ioc_corpus(corpus, files, lines)
+    targets = sorted(
+        os.path.join(corpus, name) for name in os.listdir(corpus) if name.startswith("log")
+    )
+    output_directory = _case_dir(work_dir)
+    stub_dir = install_dns_stub(os.path.join(work_dir, "stubbin"))
+
+    def run():
+        os.environ["PATH"] = stub_dir + os.pathsep + os.environ.get("PATH", "")
+        compare_iocs(output_directory, "", IMG, "extracting iocs", "'bench'", targets, 0, 0, watchlist)
+
+    return run, files * lines, _tree_bytes(targets)
+
+
+def setup_mitre_scan_record(work_dir, scale):
+    from rivendell.post.mitre.patterns import MitrePatternMatcher
+
+    records = 2000 * scale
+    path = generators.generate_evtx_jsonl(os.path.join(work_dir, "Security.jsonl"), records)
+
+    def run():
+        matcher = MitrePatternMatcher()
+        with open(path) as events:
+            for line in events:
+                matcher.scan_record(json.loads(line))
+
+    return run, records, os.path.getsize(path)
+
+
+def setup_plists(work_dir, scale):
+    from rivendell.process.mac import process_plist
+
+    files = 50 * scale
+    paths = generators.generate_plist_tree(os.path.join(work_dir, "plists"), files)
+    output_directory = _case_dir(work_dir)
+
+    def run():
+        for path in paths:
+            process_plist("", "'bench'", output_directory, IMG, "/", "processing", path)
+
+    return run, files, _tree_bytes(paths)
+
+
+def setup_extract_metadata(work_dir, scale):
+    from rivendell.meta import extract_metadata
+
+    output_directory = _case_dir(work_dir)
+    # Only files under <img>/files/ get entropy and exiftool, so that is where the inputs go
+    imgloc = os.path.join(output_directory, IMG_NAME)
+    binaries = os.path.join(imgloc, "files", "binaries")
+    files = 50 * scale
+    generators.generate_keyword_corpus(binaries, files, 100)
+    paths = [os.path.join(root, name) for root, _, names in os.walk(binaries) for name in names]
+
+    def run():
+        extract_metadata("", output_directory, IMG_NAME, imgloc, "metadata", hashlib.sha256(), False)
+
+    return run, len(paths), _tree_bytes(paths)
+
+
+def setup_elastic_ingest(work_dir, scale):
+    from rivendell.post.elastic.ingest import ingest_elastic_data_remote
+
+    output_directory = _case_dir(work_dir)
+    cooked = os.path.join(output_directory, IMG_NAME, "artefacts", "cooked")
+    os.makedirs(os.path.join(cooked, "evt"), exist_ok=True)
+    records = 2000 * scale
+    evtx = generators.generate_evtx_jsonl(os.path.join(cooked, "evt", "Security.json"), records)
+    mft = generators.generate_mft_json(os.path.join(cooked, "journal_mft.json"), records)
+    timeline = generators.generate_csv_timeline(os.path.join(cooked, "timeline.csv"), records)
+
+    def run():
+        with ElasticStub() as stub:
+            ingest_elastic_data_remote(
+                "", output_directory, "benchcase", "elastic", {"/mnt/elrond_mount00": IMG},
+                stub.host, stub.port, None, None, stub.host, stub.port,
+            )
+
+    return run, records * 3, _tree_bytes([evtx, mft, timeline])
+
+
+def setup_super_timeline(work_dir, scale):
+    from rivendell.process.supertimeline import build_super_timeline
+
+    cooked = os.path.join(work_dir, "cooked")
+    os.makedirs(os.path.join(cooked, "evt"), exist_ok=True)
+    records = 2000 * scale
+    evtx = generators.generate_evtx_jsonl(os.path.join(cooked, "evt", "Security.json"), records)
+    mft = generators.generate_mft_json(os.path.join(cooked, "journal_mft.json"), records)
+
+    def run():
+        build_super_timeline(cooked, os.path.join(work_dir, "timeline"), IMG_NAME)
+
+    return run, records * 5, _tree_bytes([evtx, mft])
+
+
+BENCHMARKS = {
+    "keywords": setup_keywords,
+    "compare_iocs": setup_compare_iocs,
+    "mitre_scan_record": setup_mitre_scan_record,
+    "plists": setup_plists,
+    "extract_metadata": setup_extract_metadata,
+    "elastic_ingest": setup_elastic_ingest,
+    "super_timeline": setup_super_timeline,
+}
+
+
+def _measure(name, scale, work_dir, queue):
+    # Imports and input generation happen here, inside the child, so the parent
+    # stays lean and each benchmark's peak RSS reflects only its own work
+    run, records, input_bytes = BENCHMARKS[name](work_dir, SCALES[scale])
+    rss_before = _peak_rss_mb()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+    queue.put(
+        {
+            "seconds": elapsed,
+            "records": records,
+            "input_bytes": input_bytes,
+            "rss_before_mb": rss_before,
+            "peak_rss_mb": _peak_rss_mb(),
+        }
+    )
+
+
+def run_benchmark(name, scale, work_root):
+    """Generate inputs for one benchmark, time it in a child process and return its result."""
+    work_dir = tempfile.mkdtemp(prefix="{}_".format(name), dir=work_root)
+    try:
+        if "fork" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("fork")
+            queue = ctx.Queue()
+            child = ctx.Process(target=_measure, args=(name, scale, work_dir, queue))
+            child.start()
+            child.join()
+            if child.exitcode != 0:
+                raise RuntimeError("benchmark process exited with code {}".format(child.exitcode))
+        else:
+            queue = multiprocessing.Queue()
+            _measure(name, scale, work_dir, queue)
+        measured = queue.get()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    records, input_bytes = measured["records"], measured["input_bytes"]
+    seconds = measured["seconds"]
+    return {
+        "seconds": round(seconds, 4),
+        "records": records,
+        "input_mb": round(input_bytes / (1024 * 1024), 3),
+        "records_per_sec": round(records / seconds, 1) if seconds else None,
+        "mb_per_sec": round(input_bytes / (1024 * 1024) / seconds, 3) if seconds else None,
+        "peak_rss_mb": measured["peak_rss_mb"],
+        "rss_before_mb": measured["rss_before_mb"],
+    }
+
+
+def compare_results(results, baseline, threshold):
+    """Return a list of human-readable regressions against a baseline results file."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for metric in ("seconds", "peak_rss_mb"):
+            before, after = previous.get(metric), current.get(metric)
+            if before and after and after > before * (1 + threshold):
+                regressions.append(
+                    "{}: {} {} -> {} (+{:.0%})".format(name, metric, before, after, after / before - 1)
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark elrond hot paths against synthetic artefacts")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Input size preset")
+    parser.add_argument("--only", help="Comma-separated benchmarks to run (default: all)")
+    parser.add_argument("-o", "--output", help="Write results JSON to this path")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed slowdown/RSS growth before flagging (default 0.2)"
+    )
+    parser.add_argument("--work-dir", help="Directory for generated inputs (default: system temp)")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error("unknown benchmark(s): {}".format(", ".join(unknown)))
+
+    results = {}
+    for name in names:
+        print("  -> running {} ({})...".format(name, args.scale), flush=True)
+        try:
+            results[name] = run_benchmark(name, args.scale, args.work_dir)
+        except Exception as e:
+            print("     ERROR: {} failed: {}".format(name, e), flush=True)
+            continue
+        r = results[name]
+        print(
+            "     {:.3f}s  {} records/s  {} MB/s  peak RSS {} MB".format(
+                r["seconds"], r["records_per_sec"], r["mb_per_sec"], r["peak_rss_mb"]
+            ),
+            flush=True,
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "scale": args.scale,
+            "python": stdlib_platform.python_version(),
+            "platform": stdlib_platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump(report, out, indent=2)
+        print("  -> results written to {}".format(args.output))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(results, json.load(f), args.threshold)
+        if regressions:
+            print("  -> REGRESSIONS detected:")
+            for regression in regressions:
+                print("     {}".format(regression))
+            return 1
+        print("  -> no regressions against {}".format(args.baseline))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
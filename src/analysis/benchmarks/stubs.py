@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Local Service Stubs
+
+Stand-ins for external services so benchmarks measure elrond's own code
+rather than network or DNS latency.
+"""
+
+import json
+import os
+import stat
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _ElasticStubHandler(BaseHTTPRequestHandler):
+    def _reply(self, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _consume(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def do_PUT(self):
+        self._consume()
+        self._reply({"acknowledged": True})
+
+    def do_POST(self):
+        body = self._consume()
+        if self.path.endswith("/_bulk"):
+            # Bulk bodies alternate action and document lines
+            documents = body.count(b"\n") // 2
+            with self.server.lock:
+                self.server.documents += documents
+                self.server.bulk_requests += 1
+            self._reply({"took": 0, "errors": False, "items": []})
+        else:
+            self._reply({"acknowledged": True})
+
+    def do_GET(self):
+        self._reply({"status": "green"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ElasticStub:
+    """
+    Minimal Elasticsearch/Kibana stand-in that accepts index, settings and _bulk calls.
+
+    Usage:
+        with ElasticStub() as stub:
+            ingest(..., "127.0.0.1", stub.port, ...)
+            print(stub.documents)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.server = ThreadingHTTPServer((host, port), _ElasticStubHandler)
+        self.server.lock = threading.Lock()
+        self.server.documents = 0
+        self.server.bulk_requests = 0
+        self.host = host
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def documents(self) -> int:
+        return self.server.documents
+
+    @property
+    def bulk_requests(self) -> int:
+        return self.server.bulk_requests
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def install_dns_stub(directory: str) -> str:
+    """
+    Create a `host` executable that answers immediately with no address.
+
+    Prepend the returned directory to PATH so IOC resolution checks do not
+    perform real DNS lookups during benchmarks.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "host")
+    with open(path, "w") as stub:
+        stub.write("#!/bin/sh\necho \"Host $3 not found: 3(NXDOMAIN)\"\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return directory
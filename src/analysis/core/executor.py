@@ -172,6 +172,34 @@ class CommandExecutor:
             self.logger.debug(f"Tool {tool_name} failed: {e}")
             return False
 
+    def execute_worker(self, tool_name: str, *args, timeout: int = DEFAULT_COMMAND_TIMEOUT):
+        """
+        Run a request on a persistent tool worker instead of spawning the tool.
+
+        Args:
+            tool_name: Worker name (exiftool or entropy)
+            *args: Worker arguments, e.g. a file path
+            timeout: Request timeout in seconds
+
+        Returns:
+            Worker result (exiftool stdout bytes or density string)
+        """
+        from rivendell.workers import get_worker_pool
+
+        self.logger.debug(f"Worker request: {tool_name} {' '.join(map(str, args))}")
+        return get_worker_pool().request(tool_name, *args, timeout=timeout)
+
+    def worker_stats(self) -> dict:
+        """
+        Get per-tool worker latency statistics.
+
+        Returns:
+            Dictionary of tool name to request count, errors, workers and p50/p95/max latency
+        """
+        from rivendell.workers import get_worker_pool
+
+        return get_worker_pool().stats()
+
     def check_tool_available(self, tool_name: str) -> bool:
         """
         Check if a tool is available without executing it.
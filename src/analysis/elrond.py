@@ -2,15 +2,27 @@
 import argparse
 import hashlib
 import os
+import sys
 
 # Set TERM environment variable to prevent warnings from subprocess commands
 if 'TERM' not in os.environ:
     os.environ['TERM'] = 'xterm'
 
 from rivendell.main import main
-from rivendell.core.identify import process_deferred_memory, load_memory_profiles
-from rivendell.mount import unmount_images, cleanup_stale_mounts
-from rivendell.post.clean import archive_artefacts
+from rivendell.checkpoint import complete_phase, phase_complete
+from rivendell.lazy import lazy_callable
+from rivendell.profiling import enable_cprofile, start_phase, write_profile_report
+from rivendell.workers import shutdown_workers
+
+process_deferred_memory = lazy_callable("rivendell.core.identify", "process_deferred_memory")
+load_memory_profiles = lazy_callable("rivendell.core.identify", "load_memory_profiles")
+unmount_images = lazy_callable("rivendell.mount", "unmount_images")
+cleanup_stale_mounts = lazy_callable("rivendell.mount", "cleanup_stale_mounts")
+archive_artefacts = lazy_callable("rivendell.post.clean", "archive_artefacts")
+find_mordor_datasets = lazy_callable("rivendell.core.mordor", "find_mordor_datasets")
+ingest_mordor_datasets = lazy_callable("rivendell.core.mordor", "ingest_mordor_datasets")
+mordor_dataset_name = lazy_callable("rivendell.core.mordor", "dataset_name")
+build_artefact_store = lazy_callable("rivendell.artefact_store", "build_artefact_store")
 
 
 parser = argparse.ArgumentParser()
@@ -174,6 +186,20 @@ parser.add_argument(
     const=True,
     default=False,
 )
+parser.add_argument(
+    "--profile",
+    help="Capture cProfile output for each phase into <case>/profiles/; phase, handler and tool timings are always written to rivendell_profile.json",
+    action="store_const",
+    const=True,
+    default=False,
+)
+parser.add_argument(
+    "--resume",
+    help="Resume an interrupted case in an existing output directory; artefacts and phases recorded as complete in rivendell_checkpoints.db are skipped",
+    action="store_const",
+    const=True,
+    default=False,
+)
 parser.add_argument(
     "--Splunk",
     help="Output data and index into local Splunk instance",
@@ -190,7 +216,7 @@ parser.add_argument(
 )
 parser.add_argument(
     "--Timeline",
-    help="Create Timeline of disk image using plaso; WARNING: This can take a VERY long time!",
+    help="Create super-timeline of disk image from processed artefacts (falls back to plaso when none exist); WARNING: The plaso fallback can take a VERY long time!",
     action="store_const",
     const=True,
     default=False,
@@ -264,6 +290,8 @@ exhaustive = args.eXhaustive
 threathunt = args.ThreatHunt
 mordor = args.Mordor  # Input type flag for Mordor datasets
 archive = args.Ziparchive
+profile = args.profile
+resume = args.resume
 
 d = directory[0]
 case = case[0]
@@ -480,8 +508,13 @@ if __name__ == "__main__":
     if mordor:
         # Mordor input type: Treat like Gandalf (pre-collected artefacts)
         # Mordor datasets are pre-collected attack simulation data from OTRF
+        # Zipped/tarred OTRF datasets are streamed in place (see below); anything else
+        # follows the Gandalf path
         gandalf = True  # Mordor datasets behave like Gandalf-collected artefacts
 
+    if profile:
+        enable_cprofile()
+
     # Process mode is always enabled - it's the core analysis functionality
     process = True
 
@@ -520,6 +553,16 @@ if __name__ == "__main__":
         sources = directory  # Single source
         destination = None  # Will default to "./" in main()
 
+    # OTRF (Mordor) archives are read in place: in the processing phase their events stream
+    # from each .zip/.tar.gz through MITRE enrichment into the cooked output (and Elastic),
+    # with nothing mounted or extracted. Each dataset is then a host for the later phases.
+    mordor_sources = [source for source in sources if mordor and find_mordor_datasets(source)]
+    if mordor_sources:
+        output_directory = os.path.join(destination, "") if destination else "./"
+        mordor_output_directory = output_directory
+        # Events already went to Elastic as they streamed (see ElasticBulkSink.from_environment)
+        mordor_streamed_to_elastic = elastic and bool(os.environ.get("ELASTICSEARCH_HOST"))
+
     # Phased multi-image processing:
     # Phase 1: Mount all images (mount img1, mount img2, mount img3)
     # Phase 2: Collect from all images (collect img1, collect img2, collect img3)
@@ -537,9 +580,14 @@ if __name__ == "__main__":
     # =========================================================================
     # PHASE 1: Mount all images
     # =========================================================================
+    start_phase("identification")
     print("\n  -> \033[1;36mCommencing Identification Phase...\033[1;m\n  ----------------------------------------")
 
     for idx, source in enumerate(sources):
+        if source in mordor_sources:
+            print(f"\n  [{idx + 1}/{len(sources)}] {source} holds Mordor datasets (streamed during processing)")
+            continue
+
         print(f"\n  [{idx + 1}/{len(sources)}] Mounting: {source}\n")
 
         # Create directory array for this source
@@ -600,6 +648,7 @@ if __name__ == "__main__":
             asciitext,
             skip_unmount=(idx > 0),  # Don't unmount after first image
             phase="mount",
+            resume=resume,
         )
 
         # Store the mounted image data for later phases
@@ -617,16 +666,22 @@ if __name__ == "__main__":
             print(f"  -> Mounted: {len(imgs)} image(s) from {source}")
 
     print("\n  ----------------------------------------\n  -> Completed Identification Phase.\n")
+    start_phase("collection")
     print("\n  -> \033[1;36mCommencing Collection Phase...\033[1;m\n  ----------------------------------------")
 
     for idx, source in enumerate(sources):
+        if source in mordor_sources:
+            continue
         if source not in mounted_data:
             print(f"\n  [{idx + 1}/{len(sources)}] Skipping {source} (not mounted)")
             continue
 
-        print(f"\n  [{idx + 1}/{len(sources)}] Collecting from: {source}\n")
-
         data = mounted_data[source]
+        if resume and phase_complete(data["output_directory"], "collection", source):
+            print(f"\n  [{idx + 1}/{len(sources)}] Skipping {source} (collection already complete)")
+            continue
+
+        print(f"\n  [{idx + 1}/{len(sources)}] Collecting from: {source}\n")
 
         # Call main with phase="collect" to collect artefacts
         result = main(
@@ -682,19 +737,46 @@ if __name__ == "__main__":
             allimgs, imgs, output_directory, partitions = result
             mounted_data[source]["allimgs"] = allimgs
             mounted_data[source]["imgs"] = imgs
+            complete_phase(output_directory, "collection", source)
             print(f"  -> Collection complete for {source}")
 
     print("\n  ----------------------------------------\n  -> Completed Collection Phase.\n")
+    start_phase("processing")
     print("\n  -> \033[1;36mCommencing Processing Phase...\033[1;m\n  ----------------------------------------")
 
     for idx, source in enumerate(sources):
+        if source in mordor_sources:
+            if resume and phase_complete(mordor_output_directory, "processing", source):
+                print(f"\n  [{idx + 1}/{len(sources)}] Skipping {source} (processing already complete)")
+            else:
+                print(f"\n  [{idx + 1}/{len(sources)}] Streaming Mordor datasets from: {source}\n")
+                ingest_mordor_datasets(verbosity, mordor_output_directory, case, source, elastic=elastic)
+                complete_phase(mordor_output_directory, "processing", source)
+            datasets = {
+                archive: mordor_dataset_name(archive) + "::mordor" for archive in find_mordor_datasets(source)
+            }
+            mounted_data[source] = {
+                "allimgs": datasets,
+                "imgs": dict(datasets),
+                "output_directory": mordor_output_directory,
+                "partitions": [],
+                "source_directory": [source, destination] if destination else [source],
+                "source_sha256": None,
+                "source_flags": [],
+                "mordor": True,
+            }
+            print(f"  -> Processing complete for {source}")
+            continue
         if source not in mounted_data:
             print(f"\n  [{idx + 1}/{len(sources)}] Skipping {source} (not mounted)")
             continue
 
-        print(f"\n  [{idx + 1}/{len(sources)}] Processing: {source}\n")
-
         data = mounted_data[source]
+        if resume and phase_complete(data["output_directory"], "processing", source):
+            print(f"\n  [{idx + 1}/{len(sources)}] Skipping {source} (processing already complete)")
+            continue
+
+        print(f"\n  [{idx + 1}/{len(sources)}] Processing: {source}\n")
 
         # Call main with phase="process" to process artefacts
         # This also handles analysis, MITRE tagging, Splunk, Elastic, cleanup, etc.
@@ -748,6 +830,7 @@ if __name__ == "__main__":
                 mounted_imgs=data,
             )
             print(f"[DEBUG-ELROND] main() returned successfully for process phase", flush=True)
+            complete_phase(data["output_directory"], "processing", source)
         except Exception as e:
             import traceback
             import sys
@@ -785,6 +868,7 @@ if __name__ == "__main__":
     print("\n  ----------------------------------------\n  -> Completed Processing Phase.\n")
 
     # ========== PHASE 4: ANALYSE ALL IMAGES ==========
+    start_phase("analysis")
     print("\n  -> \033[1;36mCommencing Analysis Phase...\033[1;m\n  ----------------------------------------", flush=True)
 
     for idx, source in enumerate(sources):
@@ -792,9 +876,19 @@ if __name__ == "__main__":
             print(f"  -> [{idx + 1}/{len(sources)}] Skipping {source} (not mounted)", flush=True)
             continue
 
-        print(f"  -> [{idx + 1}/{len(sources)}] Analysing: {source}", flush=True)
-
         data = mounted_data[source]
+        if resume and phase_complete(data["output_directory"], "analysis", source):
+            print(f"  -> [{idx + 1}/{len(sources)}] Skipping {source} (analysis already complete)", flush=True)
+            continue
+
+        if data.get("mordor"):
+            # Nothing mounted to search; load the streamed events into the artefact store
+            build_artefact_store(verbosity, data["output_directory"], data["imgs"])
+            complete_phase(data["output_directory"], "analysis", source)
+            print(f"  -> Analysis complete for {source}", flush=True)
+            continue
+
+        print(f"  -> [{idx + 1}/{len(sources)}] Analysing: {source}", flush=True)
 
         # Call main with phase="analyse" to run keywords, analysis, timeline, metadata, YARA
         try:
@@ -845,6 +939,7 @@ if __name__ == "__main__":
                 phase="analyse",
                 mounted_imgs=data,
             )
+            complete_phase(data["output_directory"], "analysis", source)
             print(f"  -> Analysis complete for {source}", flush=True)
         except Exception as e:
             import traceback
@@ -866,6 +961,7 @@ if __name__ == "__main__":
             siem_tools.append("Navigator")
         siem_phase_name = " & ".join(siem_tools) if siem_tools else "SIEM"
 
+        start_phase("indexing")
         print(f"\n  -> \033[1;36mCommencing {siem_phase_name} Phase...\033[1;m\n  ----------------------------------------")
 
         for idx, source in enumerate(sources):
@@ -886,7 +982,7 @@ if __name__ == "__main__":
                 collect,
                 vss,
                 delete,
-                elastic,
+                elastic and not (data.get("mordor") and mordor_streamed_to_elastic),
                 gandalf,
                 collectfiles,
                 extractiocs,
@@ -932,6 +1028,7 @@ if __name__ == "__main__":
 
     # ========== PHASE 6: ARCHIVE (if requested) ==========
     if archive and mounted_data:
+        start_phase("archive")
         # Get output directory from first mounted image
         first_source = next(iter(mounted_data))
         output_directory = mounted_data[first_source]["output_directory"]
@@ -939,6 +1036,13 @@ if __name__ == "__main__":
 
         archive_artefacts(verbosity, output_directory)
 
+    # Timing report sits next to rivendell_audit.log in the case directory
+    if mounted_data:
+        first_source = next(iter(mounted_data))
+        profile_report = write_profile_report(mounted_data[first_source]["output_directory"])
+        print("  -> Phase timings written to {}".format(profile_report))
+    shutdown_workers()
+
     print("\n" + "=" * 60)
     print("  ALL PHASES COMPLETE")
     print("=" * 60 + "\n")
@@ -19,6 +19,7 @@ import logging
 
 from common.time_utils import get_iso_timestamp
 from build.defaults import DEFAULT_TEMP_DIR
+from rivendell.post.mitre.knowledge_base import get_knowledge_base
 
 
 class MitreAttackUpdater:
@@ -463,15 +464,14 @@ class MitreAttackUpdater:
             Parsed ATT&CK data
         """
         try:
-            parsed_file = self.cache_dir / f"{domain}-attack-parsed.json"
+            # Shared, pickle-cached knowledge base: parsed once per bundle version, once per process
+            knowledge_base = get_knowledge_base(str(self.cache_dir), domain)
 
-            if not parsed_file.exists():
+            if not knowledge_base:
                 self.logger.warning(f"No cached data found for {domain}")
                 return None
 
-            with open(parsed_file, "r") as f:
-                data = json.load(f)
-
+            data = knowledge_base.data
             self.logger.info(f"Loaded cached {domain} ATT&CK data (version: {data.get('version')})")
             return data
 
@@ -509,18 +509,11 @@ class MitreAttackUpdater:
         Returns:
             List of techniques
         """
-        if not self.data:
-            self.data = self.load_cached_data(domain)
-
-        if not self.data:
+        knowledge_base = get_knowledge_base(str(self.cache_dir), domain)
+        if not knowledge_base:
             return []
 
-        techniques = []
-        for tech_id, tech_data in self.data.get("techniques", {}).items():
-            if tactic in tech_data.get("tactics", []):
-                techniques.append(tech_data)
-
-        return techniques
+        return knowledge_base.techniques_for_tactic(tactic)
 
     def get_all_tactics(self, domain: str = "enterprise") -> Dict[str, dict]:
         """Get all tactics."""
@@ -7,9 +7,16 @@ Author: Rivendell DF Acceleration Suite
 Version: 2.1.0
 """
 
-from .indexer import ForensicDataIndexer
-from .query_engine import ForensicQueryEngine
-from .models import QueryResult, SourceDocument
+import importlib
+
+# Resolved on first access (PEP 562) so importing one submodule, e.g.
+# rivendell.ai.query_engine, does not pull in the indexer's langchain stack
+_EXPORTS = {
+    "ForensicDataIndexer": ".indexer",
+    "ForensicQueryEngine": ".query_engine",
+    "QueryResult": ".models",
+    "SourceDocument": ".models",
+}
 
 __all__ = [
     "ForensicDataIndexer",
@@ -17,3 +24,11 @@ __all__ = [
     "QueryResult",
     "SourceDocument",
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
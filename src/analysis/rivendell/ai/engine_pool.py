@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Query Engine Pool
+
+Keeps ForensicQueryEngine instances for the most recently used cases so that
+only the first question for a case pays for opening its vector store. The
+embedding model and LLM are shared between engines (see query_engine), so an
+engine holds little more than its Chroma collection and retrieval cache, and
+the least recently used one is dropped once the pool is full. Dropped
+engines are not closed, as a request may still be using one; they are freed
+once the last reference to them goes.
+
+Engines can be warmed in the background, e.g. when a case has just been
+indexed, and an engine whose vector store has been written since it was
+opened is reloaded on its next use.
+
+Author: Rivendell DF Acceleration Suite
+Version: 2.1.0
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .query_engine import ForensicQueryEngine
+
+ENGINE_POOL_SIZE = int(os.getenv("RIVENDELL_AI_ENGINES", "8"))
+WARM_WORKERS = 1  # background loads run one at a time behind interactive ones
+
+logger = logging.getLogger(__name__)
+
+
+def _store_stamp(vector_store_dir: str) -> float:
+    """Latest modification time of the vector store (Chroma rewrites its files on every add)."""
+    try:
+        return max(
+            [os.path.getmtime(vector_store_dir)]
+            + [entry.stat().st_mtime for entry in os.scandir(vector_store_dir)]
+        )
+    except OSError:
+        return 0.0
+
+
+class QueryEnginePool:
+    """LRU pool of per-case query engines sharing one embedding model and LLM."""
+
+    def __init__(self, config: Optional[Dict] = None, max_engines: int = ENGINE_POOL_SIZE):
+        """
+        Args:
+            config: Engine configuration (see ForensicQueryEngine)
+            max_engines: Engines kept open; the least recently used is dropped beyond this
+        """
+        self.config = config or {}
+        self.max_engines = max(1, max_engines)
+        self._engines: "OrderedDict[str, Tuple[ForensicQueryEngine, str, float]]" = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._warmer = ThreadPoolExecutor(max_workers=WARM_WORKERS, thread_name_prefix="ai-warm")
+
+    def get(self, case_id: str, vector_store_dir: str) -> ForensicQueryEngine:
+        """
+        Engine for case_id, opened on first use; concurrent callers share one load.
+
+        Args:
+            case_id: Case identifier
+            vector_store_dir: Directory containing the case's vector database
+
+        Returns:
+            ForensicQueryEngine instance
+        """
+        stamp = _store_stamp(vector_store_dir)
+        with self._lock:
+            cached = self._engines.get(case_id)
+            if cached and cached[1] == vector_store_dir and cached[2] >= stamp:
+                self._engines.move_to_end(case_id)
+                return cached[0]
+            loading = self._loading.get(case_id)
+            if loading is None:
+                loading = self._loading[case_id] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return loading.result()
+
+        try:
+            engine = ForensicQueryEngine(case_id, vector_store_dir, self.config)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[case_id]
+            loading.set_exception(e)
+            raise
+        with self._lock:
+            del self._loading[case_id]
+            # Stamped after opening, which may itself write to the store
+            self._engines[case_id] = (engine, vector_store_dir, _store_stamp(vector_store_dir))
+            self._engines.move_to_end(case_id)
+            while len(self._engines) > self.max_engines:
+                evicted, _ = self._engines.popitem(last=False)
+                logger.info(f"Dropped query engine for case {evicted} from the pool")
+        loading.set_result(engine)
+        logger.info(f"Loaded query engine for case {case_id}")
+        return engine
+
+    def warm(self, case_id: str, vector_store_dir: str) -> Future:
+        """Open (or reopen, if re-indexed) the engine for case_id in the background."""
+
+        def load():
+            try:
+                return self.get(case_id, vector_store_dir)
+            except Exception as e:
+                logger.warning(f"Could not warm query engine for case {case_id}: {e}")
+                raise
+
+        return self._warmer.submit(load)
+
+    def discard(self, case_id: str) -> bool:
+        """Drop the engine for case_id; returns whether one was open."""
+        with self._lock:
+            return self._engines.pop(case_id, None) is not None
+
+    def cases(self) -> List[str]:
+        """Cases with an open engine, least recently used first."""
+        with self._lock:
+            return list(self._engines)
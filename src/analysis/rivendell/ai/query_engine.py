@@ -4,6 +4,9 @@ Forensic Query Engine
 
 AI-powered natural language query engine for forensic data analysis.
 
+Engines share one embedding model and LLM per configuration; query
+embeddings and retrieval results are cached by normalised question.
+
 Author: Rivendell DF Acceleration Suite
 Version: 2.1.0
 """
@@ -11,8 +14,10 @@ Version: 2.1.0
 import os
 import json
 import logging
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable
 from pathlib import Path
 
 try:
@@ -30,6 +35,69 @@ except ImportError:
 
 from .models import QueryResult, SourceDocument, InvestigationSuggestion, CaseSummary
 
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+QUERY_EMBEDDING_CACHE = 1024  # query embeddings kept, shared by every case
+RETRIEVAL_CACHE = 128  # retrieval results kept per case
+
+# Embedding models and LLMs are loaded once per configuration and shared by
+# every case's engine; only the vector store is per case
+_shared_models: Dict[tuple, Any] = {}
+_shared_models_lock = threading.Lock()
+
+
+def normalise_question(question: str) -> str:
+    """Question as a cache key: lower case, single spaces, no trailing punctuation."""
+    return " ".join(question.lower().split()).rstrip("?!. ")
+
+
+def _shared_model(key: tuple, factory: Callable[[], Any]):
+    with _shared_models_lock:
+        if key not in _shared_models:
+            _shared_models[key] = factory()
+        return _shared_models[key]
+
+
+class CachedQueryEmbeddings:
+    """
+    Embeddings wrapper that keeps query embeddings by normalised question.
+
+    Documents are embedded as before; repeated questions (including the fixed
+    ones behind suggestions and summaries) are embedded once, whichever case
+    asks them.
+    """
+
+    def __init__(self, embeddings, size: int = QUERY_EMBEDDING_CACHE):
+        self.embeddings = embeddings
+        self.size = size
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalise_question(text)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        vector = self.embeddings.embed_query(text)
+        with self._lock:
+            self._cache[key] = vector
+            if len(self._cache) > self.size:
+                self._cache.popitem(last=False)
+        return vector
+
+
+def shared_embeddings(model_name: str = DEFAULT_EMBEDDING_MODEL, device: str = "cpu") -> CachedQueryEmbeddings:
+    """The process-wide embedding model for model_name on device."""
+    return _shared_model(
+        ("embeddings", model_name, device),
+        lambda: CachedQueryEmbeddings(
+            HuggingFaceEmbeddings(model_name=model_name, model_kwargs={"device": device})
+        ),
+    )
+
 
 class ForensicQueryEngine:
     """
@@ -114,12 +182,9 @@ Suggestions:"""
         self.config = config or {}
         self.logger = logging.getLogger(__name__)
 
-        # Initialize embedding model
-        embedding_model = self.config.get(
-            "embedding_model", "sentence-transformers/all-MiniLM-L6-v2"
-        )
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=embedding_model, model_kwargs={"device": self.config.get("device", "cpu")}
+        # Shared embedding model (loaded by the first engine to need it)
+        self.embeddings = shared_embeddings(
+            self.config.get("embedding_model", DEFAULT_EMBEDDING_MODEL), self.config.get("device", "cpu")
         )
 
         # Load vector store
@@ -129,13 +194,17 @@ Suggestions:"""
             persist_directory=vector_store_dir,
         )
 
-        # Initialize LLM
-        self.llm = self._initialize_llm()
+        # Shared LLM for this configuration
+        self.llm = _shared_model(
+            ("llm", json.dumps(self.config, sort_keys=True, default=str)), self._initialize_llm
+        )
 
         # Create retrieval chain
         self.retriever = self.vectorstore.as_retriever(
             search_type="similarity", search_kwargs={"k": self.config.get("top_k", 10)}
         )
+        self._retrievals: "OrderedDict[str, list]" = OrderedDict()
+        self._retrievals_lock = threading.Lock()
 
         self.logger.info(f"Initialized query engine for case {case_id}")
 
@@ -178,6 +247,28 @@ Suggestions:"""
         else:
             raise ValueError(f"Unknown LLM type: {llm_type}. Use 'llamacpp' or 'ollama'")
 
+    def retrieve(self, question: str) -> list:
+        """
+        Documents relevant to question, kept by normalised question.
+
+        Args:
+            question: Natural language question
+
+        Returns:
+            Retrieved documents (most relevant first)
+        """
+        key = normalise_question(question)
+        with self._retrievals_lock:
+            if key in self._retrievals:
+                self._retrievals.move_to_end(key)
+                return self._retrievals[key]
+        docs = self.retriever.get_relevant_documents(question)
+        with self._retrievals_lock:
+            self._retrievals[key] = docs
+            if len(self._retrievals) > RETRIEVAL_CACHE:
+                self._retrievals.popitem(last=False)
+        return docs
+
     def query(self, question: str) -> QueryResult:
         """
         Query forensic data using natural language.
@@ -197,7 +288,7 @@ Suggestions:"""
             )
 
             # Retrieve relevant documents
-            docs = self.retriever.get_relevant_documents(question)
+            docs = self.retrieve(question)
 
             # Build context from documents
             context = "\n\n".join([doc.page_content for doc in docs[:10]])
@@ -396,9 +487,7 @@ MITRE ATT&CK Techniques:
                 "case_id": self.case_id,
                 "document_count": count,
                 "llm_type": self.config.get("llm_type", "ollama"),
-                "embedding_model": self.config.get(
-                    "embedding_model", "sentence-transformers/all-MiniLM-L6-v2"
-                ),
+                "embedding_model": self.config.get("embedding_model", DEFAULT_EMBEDDING_MODEL),
                 "vector_store_dir": self.vector_store_dir,
             }
 
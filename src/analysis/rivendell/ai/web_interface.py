@@ -25,6 +25,7 @@ try:
 except ImportError:
     FASTAPI_AVAILABLE = False
 
+from .engine_pool import QueryEnginePool
 from .query_engine import ForensicQueryEngine
 from .models import QueryResult
 
@@ -41,19 +42,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store active query engines
-query_engines: Dict[str, ForensicQueryEngine] = {}
-
 # Configuration
 config = {
     "base_dir": os.getenv("RIVENDELL_DATA_DIR", "/opt/rivendell/data"),
     "llm_type": os.getenv("RIVENDELL_LLM_TYPE", "ollama"),
     "model_name": os.getenv("RIVENDELL_MODEL_NAME", "llama3"),
+    "preload_cases": int(os.getenv("RIVENDELL_AI_PRELOAD", "2")),
 }
 
+# Query engines for recently used cases (one shared embedding model and LLM)
+engine_pool = QueryEnginePool(config={"llm_type": config["llm_type"], "model_name": config["model_name"]})
+
 logger = logging.getLogger(__name__)
 
 
+def vector_store_dir(case_id: str) -> str:
+    """Vector database directory for a case; case_id must name a directory directly under base_dir."""
+    base_dir = os.path.normpath(config["base_dir"])
+    case_dir = os.path.normpath(os.path.join(base_dir, case_id))
+    if os.path.dirname(case_dir) != base_dir or os.path.basename(case_dir) in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail=f"Invalid case id {case_id!r}")
+    return os.path.join(case_dir, "vector_db")
+
+
 def get_query_engine(case_id: str) -> ForensicQueryEngine:
     """
     Get or create query engine for a case.
@@ -64,20 +75,26 @@ def get_query_engine(case_id: str) -> ForensicQueryEngine:
     Returns:
         ForensicQueryEngine instance
     """
-    if case_id not in query_engines:
-        try:
-            engine = ForensicQueryEngine.load(
-                case_id=case_id,
-                base_dir=config["base_dir"],
-                config={"llm_type": config["llm_type"], "model_name": config["model_name"]},
-            )
-            query_engines[case_id] = engine
-            logger.info(f"Loaded query engine for case {case_id}")
-        except Exception as e:
-            logger.error(f"Failed to load query engine for case {case_id}: {e}")
-            raise HTTPException(status_code=404, detail=f"Case {case_id} not found or not indexed")
+    store = vector_store_dir(case_id)
+    try:
+        if not os.path.exists(store):
+            raise FileNotFoundError(f"Vector store not found for case {case_id} at {store}")
+        return engine_pool.get(case_id, store)
+    except Exception as e:
+        logger.error(f"Failed to load query engine for case {case_id}: {e}")
+        raise HTTPException(status_code=404, detail=f"Case {case_id} not found or not indexed")
+
 
-    return query_engines[case_id]
+@app.on_event("startup")
+async def preload_engines():
+    """Warm engines for the most recently indexed cases in the background."""
+    base_dir = config["base_dir"]
+    if not config["preload_cases"] or not os.path.isdir(base_dir):
+        return
+    indexed = [case_id for case_id in os.listdir(base_dir) if os.path.isdir(vector_store_dir(case_id))]
+    indexed.sort(key=lambda case_id: os.path.getmtime(vector_store_dir(case_id)), reverse=True)
+    for case_id in indexed[: config["preload_cases"]]:
+        engine_pool.warm(case_id, vector_store_dir(case_id))
 
 
 @app.get("/")
@@ -92,6 +109,7 @@ async def list_cases():
     try:
         base_dir = config["base_dir"]
         cases = []
+        loaded = set(engine_pool.cases())
 
         if os.path.exists(base_dir):
             for case_dir in os.listdir(base_dir):
@@ -99,7 +117,14 @@ async def list_cases():
                 vector_db_path = os.path.join(case_path, "vector_db")
 
                 if os.path.isdir(case_path) and os.path.exists(vector_db_path):
-                    cases.append({"case_id": case_dir, "path": case_path, "indexed": True})
+                    cases.append(
+                        {
+                            "case_id": case_dir,
+                            "path": case_path,
+                            "indexed": True,
+                            "loaded": case_dir in loaded,
+                        }
+                    )
 
         return {"cases": cases}
 
@@ -108,6 +133,19 @@ async def list_cases():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/ai/cases/{case_id}/warm")
+async def warm_case(case_id: str):
+    """
+    Open a case's query engine in the background, e.g. once it has been (re-)indexed,
+    so the first question does not wait for the vector store to load.
+    """
+    store = vector_store_dir(case_id)
+    if not os.path.exists(store):
+        raise HTTPException(status_code=404, detail=f"Case {case_id} not found or not indexed")
+    engine_pool.warm(case_id, store)
+    return {"case_id": case_id, "status": "warming"}
+
+
 @app.get("/ai/cases/{case_id}/info")
 async def get_case_info(case_id: str):
     """Get case information."""
@@ -7,7 +7,10 @@ import time
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
-from rivendell.analysis.iocs import compare_iocs
+from rivendell.analysis.iocs import IOCS_HEADER, compare_iocs
+from rivendell.inventory import get_inventory
+from rivendell.process.extractions.strings import is_memory_artefact
+from rivendell.utils import iter_json_records
 
 
 def _analyse_artemis_mft_from_status_log(ar, f, stage, vssimage, anysd, verbosity, output_directory, analyse_mft_json_func):
@@ -78,27 +81,12 @@ def analyse_artefacts(
         records_processed = 0
 
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-                # Handle both JSON array and JSONL formats
-                content = f.read().strip()
-                if content.startswith('['):
-                    records = json.loads(content)
-                else:
-                    # JSONL format
-                    records = []
-                    for line in content.split('\n'):
-                        if line.strip():
-                            try:
-                                records.append(json.loads(line))
-                            except:
-                                pass
-
-            print(" -> {} -> processing {} MFT records...".format(
-                datetime.now().isoformat().replace("T", " "),
-                len(records)
+            print(" -> {} -> processing MFT records...".format(
+                datetime.now().isoformat().replace("T", " ")
             ))
 
-            for record in records:
+            # JSON lines (merged Artemis output) or a JSON array, one record at a time
+            for record in iter_json_records(filepath):
                 records_processed += 1
                 if not isinstance(record, dict):
                     continue
@@ -455,218 +443,216 @@ def analyse_artefacts(
                         datetime.now().isoformat().replace("T", " "), mnt
                     ), flush=True
                 )
-            for root, _, files in os.walk(mnt):
+            for root, _, files in get_inventory(mnt).walk(
+                larger_than=0, smaller_than=10000000, types=("file",)
+            ):  # 10MB
                 for f in files:
                     try:
                         if (
-                            os.stat(os.path.join(root, f)).st_size > 0
-                            and os.stat(os.path.join(root, f)).st_size < 10000000
-                        ):  # 10MB
+                            os.path.join(root, f) != "/mnt/elrond_mount/hiberfil.sys"
+                            and os.path.join(root, f)
+                            != "/mnt/elrond_mount/pagefile.sys"
+                            and os.path.join(root, f)
+                            != "/mnt/elrond_mount1/hiberfil.sys"
+                            and os.path.join(root, f)
+                            != "/mnt/elrond_mount1/pagefile.sys"
+                            and os.path.join(root, f)
+                            != "/mnt/elrond_mount2/hiberfil.sys"
+                            and os.path.join(root, f)
+                            != "/mnt/elrond_mount2/pagefile.sys"
+                            and os.path.join(root, f)
+                            != "/mnt/elrond_mount3/hiberfil.sys"
+                            and os.path.join(root, f)
+                            != "/mnt/elrond_mount3/pagefile.sys"
+                            and os.path.join(root, f)
+                            != "/mnt/elrond_mount4/hiberfil.sys"
+                            and os.path.join(root, f)
+                            != "/mnt/elrond_mount4/pagefile.sys"
+                            and os.path.join(root, f)
+                            != "/mnt/elrond_mount5/hiberfil.sys"
+                            and os.path.join(root, f)
+                            != "/mnt/elrond_mount5/pagefile.sys"
+                        ) and (
+                            "." in f
+                            and (
+                                f.endswith(".cab")
+                                or f.endswith(".elf")
+                                or f.endswith(".doc")
+                                or f.endswith(".xls")
+                                or f.endswith(".ppt")
+                                or f.endswith(".pdf")
+                                or f.endswith(".odt")
+                                or f.endswith(".odp")
+                                or f.endswith(".ott")
+                                or f.endswith(".zip")
+                                or f.endswith(".rar")
+                                or f.endswith(".7z")
+                                or f.endswith(".chm")
+                                or f.endswith(".docx")
+                                or f.endswith(".xlsx")
+                                or f.endswith(".pptx")
+                                or f.endswith(".com")
+                                or f.endswith(".dll")
+                                or f.endswith(".exe")
+                                or f.endswith(".sys")
+                                or f.endswith(".gif")
+                                or f.endswith(".jpg")
+                                or f.endswith(".jpeg")
+                                or f.endswith(".png")
+                            )
+                        ):
+                            try:
+                                with open(os.path.join(root, f), "rb") as magic_file:
+                                    file_hdr = magic_file.read()
+                            except:
+                                file_hdr = "0000000000"
                             if (
-                                os.path.join(root, f) != "/mnt/elrond_mount/hiberfil.sys"
-                                and os.path.join(root, f)
-                                != "/mnt/elrond_mount/pagefile.sys"
-                                and os.path.join(root, f)
-                                != "/mnt/elrond_mount1/hiberfil.sys"
-                                and os.path.join(root, f)
-                                != "/mnt/elrond_mount1/pagefile.sys"
-                                and os.path.join(root, f)
-                                != "/mnt/elrond_mount2/hiberfil.sys"
-                                and os.path.join(root, f)
-                                != "/mnt/elrond_mount2/pagefile.sys"
-                                and os.path.join(root, f)
-                                != "/mnt/elrond_mount3/hiberfil.sys"
-                                and os.path.join(root, f)
-                                != "/mnt/elrond_mount3/pagefile.sys"
-                                and os.path.join(root, f)
-                                != "/mnt/elrond_mount4/hiberfil.sys"
-                                and os.path.join(root, f)
-                                != "/mnt/elrond_mount4/pagefile.sys"
-                                and os.path.join(root, f)
-                                != "/mnt/elrond_mount5/hiberfil.sys"
-                                and os.path.join(root, f)
-                                != "/mnt/elrond_mount5/pagefile.sys"
-                            ) and (
-                                "." in f
+                                file_hdr != "0000000000"
+                                and str(file_hdr)[2:10] != "'"
                                 and (
-                                    f.endswith(".cab")
-                                    or f.endswith(".elf")
-                                    or f.endswith(".doc")
-                                    or f.endswith(".xls")
-                                    or f.endswith(".ppt")
-                                    or f.endswith(".pdf")
-                                    or f.endswith(".odt")
-                                    or f.endswith(".odp")
-                                    or f.endswith(".ott")
-                                    or f.endswith(".zip")
-                                    or f.endswith(".rar")
-                                    or f.endswith(".7z")
-                                    or f.endswith(".chm")
-                                    or f.endswith(".docx")
-                                    or f.endswith(".xlsx")
-                                    or f.endswith(".pptx")
-                                    or f.endswith(".com")
-                                    or f.endswith(".dll")
-                                    or f.endswith(".exe")
-                                    or f.endswith(".sys")
-                                    or f.endswith(".gif")
-                                    or f.endswith(".jpg")
-                                    or f.endswith(".jpeg")
-                                    or f.endswith(".png")
-                                )
-                            ):
-                                try:
-                                    with open(os.path.join(root, f), "rb") as magic_file:
-                                        file_hdr = magic_file.read()
-                                except:
-                                    file_hdr = "0000000000"
-                                if (
-                                    file_hdr != "0000000000"
-                                    and str(file_hdr)[2:10] != "'"
-                                    and (
+                                    (
+                                        f.endswith(".cab")
+                                        and str(file_hdr)[2:10] != "\\x4d\\x53"
+                                        and str(file_hdr)[2:10] != "MSCF\\x00"
+                                    )
+                                    or (
+                                        f.endswith(".elf")
+                                        and str(file_hdr)[2:10] != "\\x7f\\x45"
+                                        and str(file_hdr)[2:10] != "\\x7fELF\\"
+                                    )
+                                    or (
                                         (
-                                            f.endswith(".cab")
-                                            and str(file_hdr)[2:10] != "\\x4d\\x53"
-                                            and str(file_hdr)[2:10] != "MSCF\\x00"
-                                        )
-                                        or (
-                                            f.endswith(".elf")
-                                            and str(file_hdr)[2:10] != "\\x7f\\x45"
-                                            and str(file_hdr)[2:10] != "\\x7fELF\\"
-                                        )
-                                        or (
-                                            (
-                                                f.endswith(".com")
-                                                or f.endswith(".dll")
-                                                or f.endswith(".exe")
-                                                or f.endswith(".sys")
-                                            )
-                                            and (
-                                                str(file_hdr)[2:10] != "\\x4d\\x5a"
-                                                and str(file_hdr)[2:10] != "MZ\\x90\\x"
-                                                and str(file_hdr)[2:10] != "MZ\\x00\\x"
-                                                and str(file_hdr)[2:10] != "MZx\\x00\\"
-                                                and str(file_hdr)[2:10] != "MZ\\x9f\\x"
-                                                and str(file_hdr)[2:10] != "\\x00\\x02"
-                                                and str(file_hdr)[2:10] != "\\x02\\x00"
-                                                and str(file_hdr)[2:9] != "DCH\\x01"
-                                                and str(file_hdr)[2:9] != "DCD\\x01"
-                                                and str(file_hdr)[2:9] != "DCN\\x01"
-                                                and str(file_hdr)[2:9] != "DCN\\x01"
-                                            )
+                                            f.endswith(".com")
+                                            or f.endswith(".dll")
+                                            or f.endswith(".exe")
+                                            or f.endswith(".sys")
                                         )
-                                        or (
-                                            (
-                                                f.endswith(".docx")
-                                                or f.endswith(".xlsx")
-                                                or f.endswith(".pptx")
-                                            )
-                                            and str(file_hdr)[2:10] != "\\x50\\x4b"
-                                            and str(file_hdr)[2:10] != "PK\\x03\\x"
-                                        )
-                                        or (
-                                            (
-                                                f.endswith(".doc")
-                                                or f.endswith(".xls")
-                                                or f.endswith(".ppt")
-                                            )
-                                            and (str(file_hdr)[2:10] != "\\x50\\x4b")
-                                            and str(file_hdr)[2:10] != "\\xd0\\xcf"
-                                        )
-                                        or (
-                                            (
-                                                f.endswith(".odt")
-                                                or f.endswith(".odp")
-                                                or f.endswith(".ott")
-                                            )
-                                            and str(file_hdr)[2:10] != "\\x50\\x4b"
-                                            and str(file_hdr)[2:10] != "PK\\x03\\x"
+                                        and (
+                                            str(file_hdr)[2:10] != "\\x4d\\x5a"
+                                            and str(file_hdr)[2:10] != "MZ\\x90\\x"
+                                            and str(file_hdr)[2:10] != "MZ\\x00\\x"
+                                            and str(file_hdr)[2:10] != "MZx\\x00\\"
+                                            and str(file_hdr)[2:10] != "MZ\\x9f\\x"
+                                            and str(file_hdr)[2:10] != "\\x00\\x02"
+                                            and str(file_hdr)[2:10] != "\\x02\\x00"
+                                            and str(file_hdr)[2:9] != "DCH\\x01"
+                                            and str(file_hdr)[2:9] != "DCD\\x01"
+                                            and str(file_hdr)[2:9] != "DCN\\x01"
+                                            and str(file_hdr)[2:9] != "DCN\\x01"
                                         )
-                                        or (
-                                            f.endswith(".pdf")
-                                            and (
-                                                str(file_hdr)[2:9] != "%PDF-1."
-                                                and str(file_hdr)[2:10] != "\\x25\\x50"
-                                            )
+                                    )
+                                    or (
+                                        (
+                                            f.endswith(".docx")
+                                            or f.endswith(".xlsx")
+                                            or f.endswith(".pptx")
                                         )
-                                        or (
-                                            f.endswith(".7z")
-                                            and (
-                                                str(file_hdr)[2:10] != "7z\\xbc\\x"
-                                                and str(file_hdr)[2:10] != "\\x37\\x7a"
-                                            )
+                                        and str(file_hdr)[2:10] != "\\x50\\x4b"
+                                        and str(file_hdr)[2:10] != "PK\\x03\\x"
+                                    )
+                                    or (
+                                        (
+                                            f.endswith(".doc")
+                                            or f.endswith(".xls")
+                                            or f.endswith(".ppt")
                                         )
-                                        or (
-                                            (f.endswith(".jar") or f.endswith(".zip"))
-                                            and str(file_hdr)[2:10] != "\\x50\\x4b"
-                                            and str(file_hdr)[2:10] != "PK\\x03\\x"
-                                            and str(file_hdr)[2:9] != "PK\\x03"
+                                        and (str(file_hdr)[2:10] != "\\x50\\x4b")
+                                        and str(file_hdr)[2:10] != "\\xd0\\xcf"
+                                    )
+                                    or (
+                                        (
+                                            f.endswith(".odt")
+                                            or f.endswith(".odp")
+                                            or f.endswith(".ott")
                                         )
-                                        or (
-                                            f.endswith(".rar")
-                                            and (
-                                                str(file_hdr)[2:10] != "Rar!\\x1a"
-                                                and str(file_hdr)[2:10] != "\\x52\\x61"
-                                            )
+                                        and str(file_hdr)[2:10] != "\\x50\\x4b"
+                                        and str(file_hdr)[2:10] != "PK\\x03\\x"
+                                    )
+                                    or (
+                                        f.endswith(".pdf")
+                                        and (
+                                            str(file_hdr)[2:9] != "%PDF-1."
+                                            and str(file_hdr)[2:10] != "\\x25\\x50"
                                         )
-                                        or (
-                                            (f.endswith(".jpg") or f.endswith(".jpeg"))
-                                            and (str(file_hdr)[2:10] != "\\xff\\xd8")
-                                            and str(file_hdr)[2:10] != "GIF89a\\x"
-                                            and str(file_hdr)[2:9] != "DCH\\x01"
+                                    )
+                                    or (
+                                        f.endswith(".7z")
+                                        and (
+                                            str(file_hdr)[2:10] != "7z\\xbc\\x"
+                                            and str(file_hdr)[2:10] != "\\x37\\x7a"
                                         )
-                                        or (
-                                            f.endswith(".gif")
-                                            and (
-                                                str(file_hdr)[2:8] != "GIF89a"
-                                                and str(file_hdr)[2:8] != "GIF87a"
-                                                and str(file_hdr)[2:10] != "\\x47\\x49"
-                                            )
+                                    )
+                                    or (
+                                        (f.endswith(".jar") or f.endswith(".zip"))
+                                        and str(file_hdr)[2:10] != "\\x50\\x4b"
+                                        and str(file_hdr)[2:10] != "PK\\x03\\x"
+                                        and str(file_hdr)[2:9] != "PK\\x03"
+                                    )
+                                    or (
+                                        f.endswith(".rar")
+                                        and (
+                                            str(file_hdr)[2:10] != "Rar!\\x1a"
+                                            and str(file_hdr)[2:10] != "\\x52\\x61"
                                         )
-                                        or (
-                                            f.endswith(".png")
-                                            and (
-                                                str(file_hdr)[2:10] != "\\x89\\x50"
-                                                and str(file_hdr)[2:10] != "\\x89PNG\\"
-                                                and str(file_hdr)[2:10] != "\\xff\\xd8"
-                                            )
+                                    )
+                                    or (
+                                        (f.endswith(".jpg") or f.endswith(".jpeg"))
+                                        and (str(file_hdr)[2:10] != "\\xff\\xd8")
+                                        and str(file_hdr)[2:10] != "GIF89a\\x"
+                                        and str(file_hdr)[2:9] != "DCH\\x01"
+                                    )
+                                    or (
+                                        f.endswith(".gif")
+                                        and (
+                                            str(file_hdr)[2:8] != "GIF89a"
+                                            and str(file_hdr)[2:8] != "GIF87a"
+                                            and str(file_hdr)[2:10] != "\\x47\\x49"
                                         )
-                                        or (
-                                            f.endswith(".chm")
-                                            and (
-                                                str(file_hdr)[2:10] != "ITSF\\x03"
-                                                and str(file_hdr)[2:10] != "\\x49\\x54"
-                                            )
+                                    )
+                                    or (
+                                        f.endswith(".png")
+                                        and (
+                                            str(file_hdr)[2:10] != "\\x89\\x50"
+                                            and str(file_hdr)[2:10] != "\\x89PNG\\"
+                                            and str(file_hdr)[2:10] != "\\xff\\xd8"
                                         )
                                     )
-                                ):
-                                    with open(anysd + "/analysis.csv", "a") as analysisfile:
-                                        analysisfile.write(
-                                            "{},{},{},File-signature (magic-byte) Discrepency,'{}'\n".format(
-                                                datetime.now().isoformat(),
-                                                vssimage.replace("'", ""),
-                                                f,
-                                                str(file_hdr)[2:10],
-                                            )
+                                    or (
+                                        f.endswith(".chm")
+                                        and (
+                                            str(file_hdr)[2:10] != "ITSF\\x03"
+                                            and str(file_hdr)[2:10] != "\\x49\\x54"
                                         )
-                                    (
-                                        entry,
-                                        prnt,
-                                    ) = "{},{},{},file-signature (magic-byte) discrepency of '{}' for '{}'\n".format(
-                                        datetime.now().isoformat(),
-                                        vssimage,
-                                        stage,
-                                        str(file_hdr)[2:10],
-                                        f,
-                                    ), " -> {} -> identified file-signature (magic-byte) discrepency of '{}' from '{}' for {}".format(
-                                        datetime.now().isoformat().replace("T", " "),
-                                        str(file_hdr)[2:10],
-                                        f,
-                                        vssimage,
                                     )
-                                    write_audit_log_entry(
-                                        verbosity, output_directory, entry, prnt
+                                )
+                            ):
+                                with open(anysd + "/analysis.csv", "a") as analysisfile:
+                                    analysisfile.write(
+                                        "{},{},{},File-signature (magic-byte) Discrepency,'{}'\n".format(
+                                            datetime.now().isoformat(),
+                                            vssimage.replace("'", ""),
+                                            f,
+                                            str(file_hdr)[2:10],
+                                        )
                                     )
+                                (
+                                    entry,
+                                    prnt,
+                                ) = "{},{},{},file-signature (magic-byte) discrepency of '{}' for '{}'\n".format(
+                                    datetime.now().isoformat(),
+                                    vssimage,
+                                    stage,
+                                    str(file_hdr)[2:10],
+                                    f,
+                                ), " -> {} -> identified file-signature (magic-byte) discrepency of '{}' from '{}' for {}".format(
+                                    datetime.now().isoformat().replace("T", " "),
+                                    str(file_hdr)[2:10],
+                                    f,
+                                    vssimage,
+                                )
+                                write_audit_log_entry(
+                                    verbosity, output_directory, entry, prnt
+                                )
                     except:
                         pass
         # Analyze MFT data for Extended Attributes, Alternate Data Streams, and Timestomping
@@ -751,16 +737,14 @@ def analyse_artefacts(
                     datetime.now().isoformat().replace("T", " "), mnt
                 ), flush=True
             )
-        for root, _, files in os.walk(mnt):
+        for root, _, files in get_inventory(mnt).walk(
+            larger_than=0, smaller_than=10000000, types=("file",)
+        ):  # 10MB
             for f in files:
                 try:
-                    if (
-                        os.stat(os.path.join(root, f)).st_size > 0
-                        and os.stat(os.path.join(root, f)).st_size < 10000000
-                    ):  # 10MB
-                        with open(os.path.join(root, f), "r") as filetest:
-                            filetest.readline()
-                            iocfilelist.append(os.path.join(root, f))
+                    with open(os.path.join(root, f), "r") as filetest:
+                        filetest.readline()
+                        iocfilelist.append(os.path.join(root, f))
                 except:
                     pass
         if os.path.exists(
@@ -770,6 +754,8 @@ def analyse_artefacts(
                 os.path.join(output_directory, img_name, "artefacts")
             ):
                 for f in files:
+                    if is_memory_artefact(f):  # scanned once by search_memory_strings
+                        continue
                     try:
                         if (
                             os.stat(os.path.join(root, f)).st_size > 0
@@ -791,9 +777,7 @@ def analyse_artefacts(
                 output_directory + img_name + "/analysis/iocs.csv",
                 "w",
             ) as ioccsv:
-                ioccsv.write(
-                    "CreationTime,LastAccessTime,LastWriteTime,Filename,ioc,indicator_type,line_number,resolvable,watchlist_match\n"
-                )
+                ioccsv.write(IOCS_HEADER)
         # Get watchlist file path if provided (iocsfile is a list from argparse)
         watchlist_file = iocsfile[0] if iocsfile else None
         compare_iocs(
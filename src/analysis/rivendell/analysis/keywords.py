@@ -5,8 +5,92 @@ import time
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.inventory import get_inventory
+from rivendell.lazy import lazy_callable
+from rivendell.process.extractions.strings import is_memory_artefact
 from rivendell.utils import safe_input
 
+search_memory_strings = lazy_callable("rivendell.analysis.memory_strings", "search_memory_strings")
+
+KEYWORD_MATCHES_HEADER = "CreationTime,LastAccessTime,LastWriteTime,keyword,Filename,line_number,line_entry\n"
+
+
+def write_keyword_match(
+    output_directory,
+    verbosity,
+    img,
+    vssimage,
+    keywords_target_file,
+    eachkeyword,
+    location,
+    eachline,
+    encoding_choice,
+    vsstext,
+    unit="line",
+):
+    (
+        entry,
+        prnt,
+    ) = "{},{},keyword identified,{} ({} {}) found in {}\n".format(
+        datetime.now().isoformat(),
+        vssimage,
+        eachkeyword.strip(),
+        unit,
+        location,
+        keywords_target_file.split("/")[-1],
+    ), " -> {} -> identified keyword '{}' {} {} in '{}' from {}{}".format(
+        datetime.now().isoformat().replace("T", " "),
+        eachkeyword.strip(),
+        "on line" if unit == "line" else "at " + unit,
+        location,
+        keywords_target_file.split("/")[-1],
+        vssimage,
+        vsstext,
+    )
+    write_audit_log_entry(verbosity, output_directory, entry, prnt)
+    keyword_match_entry = "{},{},{},{},{},{},{}\n".format(
+        str(
+            datetime.fromtimestamp(
+                os.path.getctime(keywords_target_file.split(": ")[0])
+            )
+        ),
+        str(
+            datetime.fromtimestamp(
+                os.path.getatime(keywords_target_file.split(": ")[0])
+            )
+        ),
+        str(
+            datetime.fromtimestamp(
+                os.path.getmtime(keywords_target_file.split(": ")[0])
+            )
+        ),
+        eachkeyword.strip(),
+        keywords_target_file.replace(",", "%2C"),
+        str(location),
+        eachline.strip().replace(",", "%2C").replace("\n", "\\n"),
+    )
+    kw_match_entry = (
+        str(keyword_match_entry.split())[2:-2]
+        .replace("', '", " ")
+        .replace("\\x", "\\\\x")
+        .replace("\\\\\\", "\\\\")
+    )
+    if len(keyword_match_entry.split(",")[-1]) > 200:
+        kw_match_entry = (
+            ",".join(keyword_match_entry.split(",")[0:-1])
+            + ","
+            + keyword_match_entry.split(",")[-1][0:200]
+            + "<>TRUNCATED<>\n"
+        )
+    else:
+        kw_match_entry = kw_match_entry + "\n"
+    with open(
+        output_directory + img.split("::")[0] + "/analysis/keyword_matches.csv",
+        "a",
+        encoding=encoding_choice,
+    ) as keyword_matches_results_file:
+        keyword_matches_results_file.write(kw_match_entry)
+
 
 def write_keywords(
     output_directory,
@@ -22,69 +106,40 @@ def write_keywords(
     keyword_line_number = 1
     for eachline in keyword_search_file:
         if eachkeyword.lower().strip() in eachline.lower().strip():
-            (
-                entry,
-                prnt,
-            ) = "{},{},keyword identified,{} (line {}) found in {}\n".format(
-                datetime.now().isoformat(),
+            write_keyword_match(
+                output_directory,
+                verbosity,
+                img,
                 vssimage,
-                eachkeyword.strip(),
-                keyword_line_number,
-                keywords_target_file.split("/")[-1],
-            ), " -> {} -> identified keyword '{}' on line {} in '{}' from {}{}".format(
-                datetime.now().isoformat().replace("T", " "),
-                eachkeyword.strip(),
+                keywords_target_file,
+                eachkeyword,
                 keyword_line_number,
-                keywords_target_file.split("/")[-1],
-                vssimage,
+                eachline,
+                encoding_choice,
                 vsstext,
             )
-            write_audit_log_entry(verbosity, output_directory, entry, prnt)
-            keyword_match_entry = "{},{},{},{},{},{},{}\n".format(
-                str(
-                    datetime.fromtimestamp(
-                        os.path.getctime(keywords_target_file.split(": ")[0])
-                    )
-                ),
-                str(
-                    datetime.fromtimestamp(
-                        os.path.getatime(keywords_target_file.split(": ")[0])
-                    )
-                ),
-                str(
-                    datetime.fromtimestamp(
-                        os.path.getmtime(keywords_target_file.split(": ")[0])
-                    )
-                ),
-                eachkeyword.strip(),
-                keywords_target_file.replace(",", "%2C"),
-                str(keyword_line_number),
-                eachline.strip().replace(",", "%2C").replace("\n", "\\n"),
-            )
-            kw_match_entry = (
-                str(keyword_match_entry.split())[2:-2]
-                .replace("', '", " ")
-                .replace("\\x", "\\\\x")
-                .replace("\\\\\\", "\\\\")
-            )
-            if len(keyword_match_entry.split(",")[-1]) > 200:
-                kw_match_entry = (
-                    ",".join(keyword_match_entry.split(",")[0:-1])
-                    + ","
-                    + keyword_match_entry.split(",")[-1][0:200]
-                    + "<>TRUNCATED<>\n"
-                )
-            else:
-                kw_match_entry = kw_match_entry + "\n"
-            with open(
-                output_directory + img.split("::")[0] + "/analysis/keyword_matches.csv",
-                "a",
-                encoding=encoding_choice,
-            ) as keyword_matches_results_file:
-                keyword_matches_results_file.write(kw_match_entry)
         keyword_line_number += 1
 
 
+def search_memory_keywords(
+    verbosity,
+    output_directory,
+    img,
+    keywords,
+    memory_files,
+    vssimage,
+    vsstext,
+):
+    """
+    Match every keyword against the strings of each memory artefact in a
+    single pass; the byte offset of the string takes the place of the line
+    number in keyword_matches.csv.
+    """
+    search_memory_strings(
+        verbosity, output_directory, img, memory_files, vssimage, vsstext, keywords=keywords
+    )
+
+
 def search_keywords(
     verbosity,
     output_directory,
@@ -101,9 +156,7 @@ def search_keywords(
             output_directory + img.split("::")[0] + "/analysis/keyword_matches.csv",
             "a",
         ) as keyword_matches_results_file:
-            keyword_matches_results_file.write(
-                "CreationTime,LastAccessTime,LastWriteTime,keyword,Filename,line_number,line_entry\n"
-            )
+            keyword_matches_results_file.write(KEYWORD_MATCHES_HEADER)
     with open(keywords[0], "r") as keywords_source_file:
         for eachkeyword in keywords_source_file:
             for keywords_target_file in keywords_target_list:
@@ -141,61 +194,36 @@ def search_keywords(
                         )
 
 
-def build_keyword_list(mnt):
+def build_keyword_list(mnt, refresh=False):
     keywords_target_list = []
-    for keyword_search_root, _, keyword_search_file in os.walk(mnt):
-        for keyword_search_file in keyword_search_file:
-            try:
-                if (
-                    os.stat(
-                        os.path.join(keyword_search_root, keyword_search_file)
-                    ).st_size
-                    > 0
-                    and os.stat(
-                        os.path.join(keyword_search_root, keyword_search_file)
-                    ).st_size
-                    < 100000000
-                    and not os.path.islink(
-                        os.path.join(keyword_search_root, keyword_search_file)
-                    )  # 100MB
-                ):
-                    with open(
-                        os.path.join(keyword_search_root, keyword_search_file), "r"
-                    ) as filetest:
-                        filetest.readline()
-                        keywords_target_list.append(
-                            os.path.join(keyword_search_root, keyword_search_file)
-                        )
-            except:
-                pass
-            try:
-                if (
-                    os.stat(
-                        os.path.join(keyword_search_root, keyword_search_file)
-                    ).st_size
-                    > 0
-                    and os.stat(
-                        os.path.join(keyword_search_root, keyword_search_file)
-                    ).st_size
-                    < 100000000
-                    and not os.path.islink(
-                        os.path.join(keyword_search_root, keyword_search_file)
-                    )  # 100MB
-                ):
-                    with open(
-                        os.path.join(keyword_search_root, keyword_search_file),
-                        "r",
-                        encoding="ISO-8859-1",
-                    ) as filetest:
-                        filetest.readline()
-                        keywords_target_list.append(
-                            os.path.join(keyword_search_root, keyword_search_file)
-                        )
-            except:
-                pass
+    for keyword_search_path, _ in get_inventory(mnt, refresh=refresh).files(
+        larger_than=0, smaller_than=100000000
+    ):  # 100MB
+        if is_memory_artefact(keyword_search_path):  # searched by search_memory_strings
+            continue
+        try:
+            with open(keyword_search_path, "r") as filetest:
+                filetest.readline()
+                keywords_target_list.append(keyword_search_path)
+        except:
+            pass
+        try:
+            with open(keyword_search_path, "r", encoding="ISO-8859-1") as filetest:
+                filetest.readline()
+                keywords_target_list.append(keyword_search_path)
+        except:
+            pass
     return keywords_target_list
 
 
+def build_memory_list(mnt, refresh=False):
+    return [
+        memory_path
+        for memory_path, _ in get_inventory(mnt, refresh=refresh).files(larger_than=0)
+        if is_memory_artefact(memory_path)
+    ]
+
+
 def prepare_keywords(verbosity, output_directory, auto, imgs, flags, keywords, stage):
     # Check if we're in the mounting/metadata phase (when filesystem is still mounted)
     # Stage can be "mounting" or "metadata" at this point
@@ -256,6 +284,15 @@ def prepare_keywords(verbosity, output_directory, auto, imgs, flags, keywords, s
                     vssimage,
                     vsstext,
                 )
+                search_memory_keywords(
+                    verbosity,
+                    output_directory,
+                    img,
+                    keywords,
+                    build_memory_list(mnt),
+                    vssimage,
+                    vsstext,
+                )
                 print("  -> Completed Keyword Searching Phase for {}".format(vssimage))
                 entry, prnt = "{},{},{},completed\n".format(
                     datetime.now().isoformat(),
@@ -277,7 +314,7 @@ def prepare_keywords(verbosity, output_directory, auto, imgs, flags, keywords, s
                 os.path.join(output_directory, each.split("::")[0], "artefacts")
             ):
                 mnt = os.path.join(output_directory, each.split("::")[0], "artefacts")
-                keywords_target_list = build_keyword_list(mnt)
+                keywords_target_list = build_keyword_list(mnt, refresh=True)
                 search_keywords(
                     verbosity,
                     output_directory,
@@ -288,11 +325,12 @@ def prepare_keywords(verbosity, output_directory, auto, imgs, flags, keywords, s
                     "collected/processed artefacts",
                     vsstext,
                 )
+                # Collected memory artefacts are searched by analyse_memory_strings, in the same pass as IOCs
             if os.path.exists(
                 os.path.join(output_directory, each.split("::")[0], "files")
             ):  # for office documents and archives - extract and then build keyword search list
                 mnt = os.path.join(output_directory, each.split("::")[0], "files")
-                keywords_target_list = build_keyword_list(mnt)
+                keywords_target_list = build_keyword_list(mnt, refresh=True)
                 search_keywords(
                     verbosity,
                     output_directory,
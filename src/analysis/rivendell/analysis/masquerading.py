@@ -18,6 +18,8 @@ import re
 import hashlib
 from datetime import datetime
 
+from rivendell.inventory import get_inventory
+
 # Unicode Right-to-Left Override characters
 RLO_CHARACTERS = [
     '\u202E',  # RIGHT-TO-LEFT OVERRIDE
@@ -303,7 +305,7 @@ def detect_masquerading(mnt, output_directory, verbosity, img, vssimage):
     file_count = 0
 
     # Walk the mounted filesystem
-    for root, dirs, files in os.walk(mnt):
+    for root, dirs, files in get_inventory(mnt).walk():
         for filename in files:
             file_count += 1
             full_path = os.path.join(root, filename)
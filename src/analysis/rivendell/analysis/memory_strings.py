@@ -0,0 +1,120 @@
+#!/usr/bin/env python3 -tt
+"""
+Memory Artefact Strings Analysis
+
+pagefile.sys, swapfile.sys and hiberfil.sys are scanned for strings once
+(see rivendell/process/extractions/strings.py) and each string is handed to
+every enabled extractor - keyword matching and IOC extraction - as it is
+found. Matches are appended to keyword_matches.csv and iocs.csv as they are
+made, with the string's byte offset in place of a line number, so neither a
+strings listing nor the matches are held on disk or in memory.
+"""
+
+import os
+
+from rivendell.analysis.iocs import IOCS_HEADER, line_iocs, load_ioc_watchlist, record_line_iocs
+from rivendell.analysis.keywords import KEYWORD_MATCHES_HEADER, build_memory_list, write_keyword_match
+from rivendell.process.extractions.strings import iter_strings
+
+
+def _ensure_header(path, header):
+    if not os.path.exists(path):
+        with open(path, "w") as csv_file:
+            csv_file.write(header)
+
+
+def search_memory_strings(
+    verbosity,
+    output_directory,
+    img,
+    memory_files,
+    vssimage,
+    vsstext,
+    keywords=None,
+    extract_iocs=False,
+    watchlist_file=None,
+    stage="analysing",
+):
+    """
+    Match keywords and extract IOCs from the strings of each memory artefact in a single pass.
+
+    Args:
+        memory_files: Memory artefacts to scan
+        keywords: [keywords file] as given to --Keywords, or None
+        extract_iocs: Extract IOCs to iocs.csv
+        watchlist_file: IOC watchlist (see load_ioc_watchlist)
+    """
+    keyword_list = []
+    if keywords:
+        with open(keywords[0], "r") as keywords_source_file:
+            keyword_list = [
+                (eachkeyword, eachkeyword.lower().strip())
+                for eachkeyword in keywords_source_file
+                if eachkeyword.strip()
+            ]
+    if not memory_files or not (keyword_list or extract_iocs):
+        return
+    analysis_directory = output_directory + img.split("::")[0] + "/analysis/"
+    os.makedirs(analysis_directory, exist_ok=True)
+    if keyword_list:
+        _ensure_header(analysis_directory + "keyword_matches.csv", KEYWORD_MATCHES_HEADER)
+    if extract_iocs:
+        _ensure_header(analysis_directory + "iocs.csv", IOCS_HEADER)
+        watchlist = load_ioc_watchlist(watchlist_file)
+    for memory_file in memory_files:
+        ioc_before = ""
+        for offset, _, text in iter_strings(memory_file):
+            if keyword_list:
+                lowered = text.lower()
+                for eachkeyword, needle in keyword_list:
+                    if needle in lowered:
+                        write_keyword_match(
+                            output_directory,
+                            verbosity,
+                            img,
+                            vssimage,
+                            memory_file,
+                            eachkeyword,
+                            offset,
+                            text,
+                            "UTF-8",
+                            vsstext,
+                            unit="offset",
+                        )
+            if extract_iocs:
+                indicators = line_iocs(text)
+                if indicators:
+                    ioc_before = record_line_iocs(
+                        output_directory,
+                        verbosity,
+                        img,
+                        stage,
+                        memory_file,
+                        offset,
+                        indicators,
+                        watchlist,
+                        ioc_before,
+                    )
+
+
+def analyse_memory_strings(verbosity, output_directory, imgs, keywords, extractiocs, iocsfile):
+    """Scan the collected memory artefacts of each image once for keywords and IOCs."""
+    for img in imgs.values():
+        img_name = img.split("::")[0]
+        artefacts = os.path.join(output_directory, img_name, "artefacts")
+        if not os.path.exists(artefacts):
+            continue
+        memory_files = build_memory_list(artefacts, refresh=True)
+        if memory_files:
+            print("     Searching strings of memory artefacts for '{}'...".format(img_name))
+            search_memory_strings(
+                verbosity,
+                output_directory,
+                img,
+                memory_files,
+                "'" + img_name + "'",
+                "",
+                keywords=keywords,
+                extract_iocs=extractiocs,
+                watchlist_file=iocsfile[0] if iocsfile else None,
+            )
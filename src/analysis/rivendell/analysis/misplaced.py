@@ -12,6 +12,8 @@ import os
 import csv
 from datetime import datetime
 
+from rivendell.inventory import get_inventory
+
 # Windows system binaries and their expected locations
 # Format: binary_name -> list of expected paths (case-insensitive)
 WINDOWS_SYSTEM_BINARIES = {
@@ -141,7 +143,7 @@ def detect_misplaced_binaries(mnt, output_directory, verbosity, img, vssimage):
     print(f"\n       \033[1;33mScanning for misplaced system binaries in {vssimage}...\033[1;m")
 
     # Walk the mounted filesystem
-    for root, dirs, files in os.walk(mnt):
+    for root, dirs, files in get_inventory(mnt).walk():
         for filename in files:
             filename_lower = filename.lower()
 
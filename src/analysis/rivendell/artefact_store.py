@@ -0,0 +1,475 @@
+#!/usr/bin/env python3 -tt
+"""
+Artefact Store
+
+Queryable copy of a case's cooked artefacts for deployments without
+Splunk or Elastic. Cooked JSON and CSV files are loaded into a SQLite
+database (rivendell_artefacts.db, next to rivendell_audit.log). There is
+one table per artefact type, e.g. registry/SYSTEM or evt/Security, with
+typed columns:
+
+    id, host, source, ts (ISO 8601), ts_epoch, technique, data (JSON record)
+
+ts_epoch, host and technique are indexed. When SQLite has FTS5, every
+table also gets a full-text index over its records. Loading is
+incremental: cooked files whose size and mtime are unchanged since the
+last load are skipped, and changed files are reloaded. Row counts, hosts
+and time ranges are kept per cooked file, so listing artefacts does not
+scan their tables.
+"""
+
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+import urllib.parse
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from rivendell.audit import write_audit_log_entry
+from rivendell.post.elastic.ingest import normalize_timestamp
+from rivendell.utils import iter_json_records
+
+ARTEFACT_DB = "rivendell_artefacts.db"
+INSERT_BATCH = 5000
+MAX_PAGE_SIZE = 10000
+GROUP_BY_COLUMNS = {"host": "host", "technique": "technique", "source": "source"}
+GROUP_BY_TIME = {"day": "%Y-%m-%d", "hour": "%Y-%m-%d %H:00", "month": "%Y-%m"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artefacts (
+    artefact TEXT PRIMARY KEY,
+    table_name TEXT NOT NULL UNIQUE,
+    fts INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    artefact TEXT NOT NULL,
+    host TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    rows INTEGER NOT NULL,
+    indexed_at TEXT NOT NULL,
+    first_seen TEXT,
+    last_seen TEXT
+);
+"""
+
+_FIELD_NAME = re.compile(r"^[A-Za-z0-9_@.\- ]+$")
+_VSS_DIRECTORY = re.compile(r"^vss\d+$")
+# Digit strings read as epoch seconds (9-10 digits) or milliseconds (12-13 digits),
+# so dates such as "20240101" are not
+_EPOCH_TEXT = re.compile(r"^(\d{9,10}|\d{12,13})$")
+
+
+def parse_timestamp(value: Any) -> Tuple[Optional[str], Optional[float]]:
+    """Parse an artefact timestamp (ISO 8601, 'YYYY-MM-DD HH:MM:SS' or epoch s/ms) to (iso, epoch), treating naive times as UTC."""
+    if value in (None, ""):
+        return None, None
+    if isinstance(value, (int, float)) or (isinstance(value, str) and _EPOCH_TEXT.match(value.strip())):
+        number = float(value)
+        if number > 1e11:  # milliseconds
+            number /= 1000
+        try:
+            parsed = datetime.fromtimestamp(number, tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return None, None
+    else:
+        text = str(value).strip().replace("Z", "+00:00")
+        # fromisoformat only takes up to microseconds
+        text = re.sub(r"(\.\d{6})\d+", r"\1", text)
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return None, None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat(), parsed.timestamp()
+
+
+def record_technique(record: Dict[str, Any]) -> Optional[str]:
+    """The primary ATT&CK technique MITRE enrichment tagged the record with, if any."""
+    technique = record.get("mitre_technique_id") or record.get("technique_id")
+    if not technique and isinstance(record.get("mitre_techniques"), list) and record["mitre_techniques"]:
+        first = record["mitre_techniques"][0]
+        technique = first.get("technique_id") if isinstance(first, dict) else first
+    return str(technique) if technique else None
+
+
+def artefact_name(cooked_dir: str, path: str) -> str:
+    """Artefact type of a cooked file: its path below cooked/ (without any vssN/ prefix) minus the extension."""
+    parts = os.path.relpath(path, cooked_dir).split(os.sep)
+    if len(parts) > 1 and _VSS_DIRECTORY.match(parts[0]):
+        parts = parts[1:]
+    return os.path.splitext("/".join(parts))[0]
+
+
+def _iter_cooked_records(path: str) -> Iterator[Dict[str, Any]]:
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8", errors="replace") as csv_file:
+            for row in csv.DictReader(csv_file):
+                yield row
+    else:
+        for record in iter_json_records(path):
+            if isinstance(record, dict):
+                yield record
+
+
+class ArtefactStore:
+    """SQLite store of cooked artefacts for one case."""
+
+    def __init__(self, db_path: str, read_only: bool = False):
+        """
+        Args:
+            db_path: Path of the database, created if missing (unless read_only)
+            read_only: Open an existing store for querying only, without schema or WAL writes
+        """
+        self.db_path = db_path
+        if read_only:
+            self._conn = sqlite3.connect(
+                "file:{}?mode=ro".format(urllib.parse.quote(os.path.abspath(db_path))),
+                uri=True,
+                check_same_thread=False,
+            )
+        else:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if not read_only:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(sources)")}
+            if "first_seen" not in columns:
+                # Store from before per-file time ranges: reload every file on the next load
+                self._conn.executescript(
+                    "ALTER TABLE sources ADD COLUMN first_seen TEXT;"
+                    "ALTER TABLE sources ADD COLUMN last_seen TEXT;"
+                    "UPDATE sources SET size = -1;"
+                )
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_case(cls, output_directory: str, read_only: bool = False) -> "ArtefactStore":
+        return cls(os.path.join(output_directory, ARTEFACT_DB), read_only)
+
+    def close(self):
+        self._conn.close()
+
+    # -- loading -----------------------------------------------------------
+
+    def _table(self, artefact: str) -> Tuple[str, bool]:
+        """Table for an artefact type, created (with its indexes and full-text index) on first use."""
+        row = self._conn.execute(
+            "SELECT table_name, fts FROM artefacts WHERE artefact = ?", (artefact,)
+        ).fetchone()
+        if row:
+            return row["table_name"], bool(row["fts"])
+        base = "a_" + re.sub(r"[^0-9a-zA-Z]+", "_", artefact).strip("_").lower()
+        table = base
+        suffix = 1
+        while self._conn.execute("SELECT 1 FROM artefacts WHERE table_name = ?", (table,)).fetchone():
+            suffix += 1
+            table = "{}_{}".format(base, suffix)
+        self._conn.executescript(
+            """
+            CREATE TABLE "{0}" (
+                id INTEGER PRIMARY KEY,
+                host TEXT NOT NULL,
+                source TEXT NOT NULL,
+                ts TEXT,
+                ts_epoch REAL,
+                technique TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX "{0}_ts" ON "{0}" (ts_epoch);
+            CREATE INDEX "{0}_host" ON "{0}" (host, ts_epoch);
+            CREATE INDEX "{0}_technique" ON "{0}" (technique, ts_epoch);
+            CREATE INDEX "{0}_source" ON "{0}" (source);
+            """.format(table)
+        )
+        try:
+            self._conn.execute(
+                'CREATE VIRTUAL TABLE "{0}_fts" USING fts5(data, content="{0}", content_rowid="id")'.format(table)
+            )
+            fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: search falls back to LIKE
+            fts = False
+        self._conn.execute("INSERT INTO artefacts VALUES (?, ?, ?)", (artefact, table, int(fts)))
+        return table, fts
+
+    def load_file(self, path: str, artefact: str, host: str) -> int:
+        """Load one cooked file, replacing rows from an earlier version of it. Returns rows loaded, or -1 if unchanged."""
+        info = os.stat(path)
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size, mtime FROM sources WHERE path = ?", (path,)
+            ).fetchone()
+            if previous and previous["size"] == info.st_size and previous["mtime"] == info.st_mtime:
+                return -1
+            table, fts = self._table(artefact)
+            if previous:
+                if fts:
+                    # external-content index: remove this file's entries before its rows go
+                    self._conn.execute(
+                        'INSERT INTO "{0}_fts"("{0}_fts", rowid, data) '
+                        "SELECT 'delete', id, data FROM \"{0}\" WHERE source = ?".format(table),
+                        (path,),
+                    )
+                self._conn.execute('DELETE FROM "{}" WHERE source = ?'.format(table), (path,))
+            first_id = self._conn.execute('SELECT COALESCE(MAX(id), 0) FROM "{}"'.format(table)).fetchone()[0]
+
+            rows, batch = 0, []
+            first, last = None, None
+            for record in _iter_cooked_records(path):
+                normalize_timestamp(record)
+                ts, ts_epoch = parse_timestamp(record.get("@timestamp"))
+                if ts_epoch is not None:
+                    if first is None or ts_epoch < first[0]:
+                        first = (ts_epoch, ts)
+                    if last is None or ts_epoch > last[0]:
+                        last = (ts_epoch, ts)
+                batch.append(
+                    (host, path, ts, ts_epoch, record_technique(record), json.dumps(record, default=str))
+                )
+                if len(batch) >= INSERT_BATCH:
+                    self._insert(table, batch)
+                    rows += len(batch)
+                    batch = []
+            if batch:
+                self._insert(table, batch)
+                rows += len(batch)
+
+            if fts:
+                self._conn.execute(
+                    'INSERT INTO "{0}_fts"(rowid, data) SELECT id, data FROM "{0}" WHERE id > ?'.format(table),
+                    (first_id,),
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    artefact,
+                    host,
+                    info.st_size,
+                    info.st_mtime,
+                    rows,
+                    datetime.now().isoformat(),
+                    first and first[1],
+                    last and last[1],
+                ),
+            )
+            self._conn.commit()
+            return rows
+
+    def _insert(self, table: str, batch: List[tuple]):
+        self._conn.executemany(
+            'INSERT INTO "{}" (host, source, ts, ts_epoch, technique, data) VALUES (?, ?, ?, ?, ?, ?)'.format(table),
+            batch,
+        )
+
+    def load_cooked(self, cooked_dir: str, host: str) -> Tuple[int, int]:
+        """Load every cooked JSON/CSV file below cooked_dir; returns (files loaded, rows loaded)."""
+        files, rows = 0, 0
+        for root, _, names in os.walk(cooked_dir):
+            for name in sorted(names):
+                if not name.endswith((".json", ".jsonl", ".csv")) or name.startswith("."):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    loaded = self.load_file(path, artefact_name(cooked_dir, path), host)
+                except (OSError, ValueError, sqlite3.Error) as error:
+                    print("       Warning: Could not load {} into the artefact store: {}".format(name, str(error)[:50]))
+                    continue
+                if loaded >= 0:
+                    files += 1
+                    rows += loaded
+        return files, rows
+
+    # -- querying ----------------------------------------------------------
+
+    def list_artefacts(self) -> List[Dict[str, Any]]:
+        """Artefact types with their row counts, hosts and time range."""
+        with self._lock:
+            return self._list_artefacts()
+
+    def _list_artefacts(self) -> List[Dict[str, Any]]:
+        # Summed from the per-file stats in sources rather than scanning each table
+        hosts: Dict[str, List[str]] = {}
+        for row in self._conn.execute("SELECT DISTINCT artefact, host FROM sources ORDER BY host"):
+            hosts.setdefault(row["artefact"], []).append(row["host"])
+        return [
+            {
+                "artefact": row["artefact"],
+                "rows": row["rows"],
+                "hosts": hosts.get(row["artefact"], []),
+                "first_seen": row["first_seen"],
+                "last_seen": row["last_seen"],
+            }
+            for row in self._conn.execute(
+                "SELECT artefacts.artefact, COALESCE(SUM(sources.rows), 0) AS rows, "
+                "MIN(sources.first_seen) AS first_seen, MAX(sources.last_seen) AS last_seen "
+                "FROM artefacts LEFT JOIN sources ON sources.artefact = artefacts.artefact "
+                "GROUP BY artefacts.artefact ORDER BY artefacts.artefact"
+            )
+        ]
+
+    def _resolve(self, artefact: str) -> Tuple[str, bool]:
+        row = self._conn.execute(
+            "SELECT table_name, fts FROM artefacts WHERE artefact = ?", (artefact,)
+        ).fetchone()
+        if not row:
+            raise KeyError(artefact)
+        return row["table_name"], bool(row["fts"])
+
+    def _where(
+        self,
+        table: str,
+        fts: bool,
+        host: Optional[str] = None,
+        technique: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        search: Optional[str] = None,
+        fields: Optional[Dict[str, str]] = None,
+    ) -> Tuple[str, List[Any]]:
+        clauses, parameters = [], []
+        if host:
+            clauses.append("host = ?")
+            parameters.append(host)
+        if technique:
+            clauses.append("technique = ?")
+            parameters.append(technique)
+        for bound, operator in ((start, ">="), (end, "<=")):
+            if bound:
+                _, epoch = parse_timestamp(bound)
+                if epoch is None:
+                    raise ValueError("invalid timestamp: {}".format(bound))
+                clauses.append("ts_epoch {} ?".format(operator))
+                parameters.append(epoch)
+        for field, value in (fields or {}).items():
+            if not _FIELD_NAME.match(field):
+                raise ValueError("invalid field name: {}".format(field))
+            # Compared as text, so "4624" matches a number as well as a string
+            clauses.append(
+                "(CASE json_type(data, ?) WHEN 'true' THEN 'true' WHEN 'false' THEN 'false' "
+                "ELSE CAST(json_extract(data, ?) AS TEXT) END) = ?"
+            )
+            parameters.extend(['$."{}"'.format(field), '$."{}"'.format(field), value])
+        if search:
+            if fts:
+                clauses.append('id IN (SELECT rowid FROM "{}_fts" WHERE "{}_fts" MATCH ?)'.format(table, table))
+                # quote each term so user input is not parsed as FTS5 syntax
+                parameters.append(" ".join('"{}"'.format(term.replace('"', '""')) for term in search.split()))
+            else:
+                clauses.append("data LIKE ?")
+                parameters.append("%{}%".format(search))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", parameters
+
+    def query(
+        self,
+        artefact: str,
+        limit: int = 100,
+        cursor: Optional[int] = None,
+        offset: int = 0,
+        order: str = "time",
+        **filters,
+    ) -> Dict[str, Any]:
+        """
+        One page of records matching the filters (host, technique, start, end,
+        search, fields). Ordered by time ("time"/"-time") or load order ("id");
+        pass the returned next_cursor back as cursor for id-ordered paging,
+        which stays fast at any depth.
+        """
+        with self._lock:
+            return self._query(artefact, limit, cursor, offset, order, **filters)
+
+    def _query(self, artefact, limit, cursor, offset, order, **filters) -> Dict[str, Any]:
+        table, fts = self._resolve(artefact)
+        where, parameters = self._where(table, fts, **filters)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        if order == "id" and cursor is not None:
+            where += (" AND " if where else " WHERE ") + "id > ?"
+            parameters.append(cursor)
+            offset = 0
+        order_by = {"time": "ts_epoch, id", "-time": "ts_epoch DESC, id DESC", "id": "id"}.get(order)
+        if order_by is None:
+            raise ValueError("invalid order: {}".format(order))
+        rows = self._conn.execute(
+            'SELECT id, host, source, ts, technique, data FROM "{}"{} ORDER BY {} LIMIT ? OFFSET ?'.format(
+                table, where, order_by
+            ),
+            parameters + [limit + 1, offset],
+        ).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "artefact": artefact,
+            "records": [
+                {
+                    "id": row["id"],
+                    "host": row["host"],
+                    "source": row["source"],
+                    "timestamp": row["ts"],
+                    "technique": row["technique"],
+                    "data": json.loads(row["data"]),
+                }
+                for row in rows
+            ],
+            "has_more": more,
+            "next_cursor": rows[-1]["id"] if more and order == "id" else None,
+            "next_offset": offset + limit if more and order != "id" else None,
+        }
+
+    def count(self, artefact: str, **filters) -> int:
+        with self._lock:
+            table, fts = self._resolve(artefact)
+            where, parameters = self._where(table, fts, **filters)
+            return self._conn.execute('SELECT COUNT(*) FROM "{}"{}'.format(table, where), parameters).fetchone()[0]
+
+    def aggregate(self, artefact: str, group_by: str, limit: int = 100, **filters) -> List[Dict[str, Any]]:
+        """Counts per host, technique, source, day/hour/month, or any record field, largest first."""
+        with self._lock:
+            return self._aggregate(artefact, group_by, limit, **filters)
+
+    def _aggregate(self, artefact, group_by, limit, **filters) -> List[Dict[str, Any]]:
+        table, fts = self._resolve(artefact)
+        where, parameters = self._where(table, fts, **filters)
+        if group_by in GROUP_BY_COLUMNS:
+            key = GROUP_BY_COLUMNS[group_by]
+        elif group_by in GROUP_BY_TIME:
+            key = "strftime('{}', ts_epoch, 'unixepoch')".format(GROUP_BY_TIME[group_by])
+        elif _FIELD_NAME.match(group_by):
+            key = "json_extract(data, ?)"
+            parameters = ['$."{}"'.format(group_by)] + parameters
+        else:
+            raise ValueError("invalid group_by: {}".format(group_by))
+        order_by = "value" if group_by in GROUP_BY_TIME else "count DESC"
+        rows = self._conn.execute(
+            'SELECT {} AS value, COUNT(*) AS count FROM "{}"{} GROUP BY value ORDER BY {} LIMIT ?'.format(
+                key, table, where, order_by
+            ),
+            parameters + [max(1, min(limit, MAX_PAGE_SIZE))],
+        ).fetchall()
+        return [{"value": row["value"], "count": row["count"]} for row in rows]
+
+
+def build_artefact_store(verbosity, output_directory, imgs):
+    """Load (or incrementally refresh) the case's artefact store from each image's cooked output."""
+    store = ArtefactStore.for_case(output_directory)
+    try:
+        for img in imgs.values():
+            img_name = img.split("::")[0]
+            cooked_dir = os.path.join(output_directory, img_name, "artefacts", "cooked")
+            if not os.path.isdir(cooked_dir):
+                continue
+            files, rows = store.load_cooked(cooked_dir, img_name)
+            entry, prnt = "{},{},artefact store,{} files ({} records)\n".format(
+                datetime.now().isoformat(), img_name, files, rows
+            ), " -> {} -> loaded {} cooked files ({} records) for '{}' into the artefact store".format(
+                datetime.now().isoformat().replace("T", " "), files, rows, img_name
+            )
+            write_audit_log_entry(verbosity, output_directory, entry, prnt)
+    finally:
+        store.close()
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3 -tt
+"""
+Checkpoint Manifest
+
+Durable record of completed work so an interrupted case can be resumed
+instead of rerun. The manifest is a SQLite database next to
+rivendell_audit.log with two kinds of entry:
+
+- artefact checkpoints: one row per (phase, artefact, handler) with the
+  input fingerprint, handler version and a digest of the files the handler
+  wrote. An entry is only trusted when all three still match, so a
+  half-written JSON from a crashed run is re-created rather than kept.
+- phase checkpoints: one row per (phase, source) once a whole elrond phase
+  has finished for a source image.
+
+Output files are discovered with an audit hook on open/rename while a
+handler runs, so handlers need no changes beyond the decorator. Files
+written by subprocesses are not seen by the hook; instead, path arguments
+of the handler's subprocesses that did not exist when the subprocess was
+started and exist once the handler returns are recorded as its outputs.
+A handler is marked complete when it wrote at least one output, ran a
+subprocess and returned cleanly, or reported its outputs through
+defer_completion() (for work finishing on other threads).
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import re
+import shlex
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+CHECKPOINT_DB = "rivendell_checkpoints.db"
+FINGERPRINT_BLOCK = 1024 * 1024  # bytes hashed from each end of large inputs
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_TRUNC
+_REDIRECTION = re.compile(r"^\d*>>?")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    phase TEXT NOT NULL,
+    artefact TEXT NOT NULL,
+    handler TEXT NOT NULL,
+    handler_version TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    output_digest TEXT,
+    status TEXT NOT NULL,
+    started_at TEXT,
+    completed_at TEXT,
+    PRIMARY KEY (phase, artefact, handler)
+);
+CREATE TABLE IF NOT EXISTS outputs (
+    phase TEXT NOT NULL,
+    artefact TEXT NOT NULL,
+    handler TEXT NOT NULL,
+    path TEXT NOT NULL,
+    owned INTEGER NOT NULL,
+    PRIMARY KEY (phase, artefact, handler, path)
+);
+CREATE TABLE IF NOT EXISTS phases (
+    phase TEXT NOT NULL,
+    source TEXT NOT NULL,
+    completed_at TEXT NOT NULL,
+    PRIMARY KEY (phase, source)
+);
+"""
+
+
+def fingerprint_file(path: str) -> str:
+    """
+    Fingerprint an input artefact by size plus the first and last megabyte.
+
+    Collected artefacts are copies that do not change in place, so this is
+    enough to detect a different input without re-reading multi-GB files.
+    """
+    if not path or not os.path.isfile(path):
+        return ""
+    digest = hashlib.sha256()
+    size = os.path.getsize(path)
+    digest.update(str(size).encode())
+    with open(path, "rb") as artefact:
+        digest.update(artefact.read(FINGERPRINT_BLOCK))
+        if size > 2 * FINGERPRINT_BLOCK:
+            artefact.seek(-FINGERPRINT_BLOCK, os.SEEK_END)
+        digest.update(artefact.read(FINGERPRINT_BLOCK))
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def handler_version(func) -> str:
+    """
+    Version a handler by its source so editing it invalidates its checkpoints.
+
+    Computed on the handler's first call rather than at import, since
+    reading back the source of every decorated handler dominates startup.
+    """
+    try:
+        source = inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        source = func.__code__.co_code
+    return hashlib.sha1(source).hexdigest()[:12]
+
+
+def outputs_digest(paths: List[str]) -> Optional[str]:
+    """Digest of path, size and mtime for each output; None if any output is missing."""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        digest.update("{}|{}|{}\n".format(path, stat.st_size, stat.st_mtime_ns).encode())
+    return digest.hexdigest()
+
+
+class CheckpointManifest:
+    """SQLite-backed checkpoint manifest for one case directory."""
+
+    def __init__(self, output_directory: str):
+        self.case_directory = output_directory.rstrip("/")
+        self.path = os.path.join(self.case_directory, CHECKPOINT_DB)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def _outputs(self, key: tuple, owned_only: bool = False) -> List[str]:
+        query = "SELECT path FROM outputs WHERE phase=? AND artefact=? AND handler=?"
+        if owned_only:
+            query += " AND owned=1"
+        return [row[0] for row in self._conn.execute(query, key)]
+
+    def is_complete(self, key: tuple, version: str, input_hash: str) -> bool:
+        """True if the artefact was completed by this handler version from the same input and its outputs are intact."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT handler_version, input_hash, output_digest, status FROM checkpoints "
+                "WHERE phase=? AND artefact=? AND handler=?",
+                key,
+            ).fetchone()
+            if row is None or row[3] != "complete" or row[0] != version or row[1] != input_hash:
+                return False
+            return outputs_digest(self._outputs(key, owned_only=True)) == row[2]
+
+    def begin(self, key: tuple, version: str, input_hash: str):
+        """Start (or restart) an artefact, discarding files left by an earlier incomplete attempt."""
+        with self._lock:
+            for path in self._outputs(key, owned_only=True):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._conn.execute("DELETE FROM outputs WHERE phase=? AND artefact=? AND handler=?", key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints "
+                "(phase, artefact, handler, handler_version, input_hash, output_digest, status, started_at, completed_at) "
+                "VALUES (?, ?, ?, ?, ?, NULL, 'running', ?, NULL)",
+                key + (version, input_hash, datetime.now().isoformat()),
+            )
+            self._conn.commit()
+
+    def record_output(self, key: tuple, path: str, owned: bool):
+        with self._lock:
+            # An appended file stays shared even if this handler later truncates it
+            self._conn.execute(
+                "INSERT INTO outputs (phase, artefact, handler, path, owned) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (phase, artefact, handler, path) DO UPDATE SET owned = owned AND excluded.owned",
+                key + (path, int(owned)),
+            )
+            self._conn.commit()
+
+    def complete(self, key: tuple, allow_empty: bool = False) -> bool:
+        """
+        Mark an artefact complete. Without owned outputs to verify on resume it
+        is discarded instead, unless allow_empty (its work ran in a subprocess
+        that finished before the handler returned).
+        """
+        with self._lock:
+            outputs = self._outputs(key, owned_only=True)
+            if not outputs and not allow_empty:
+                self._discard(key)
+                return False
+            digest = outputs_digest(outputs)
+            self._conn.execute(
+                "UPDATE checkpoints SET status='complete', output_digest=?, completed_at=? "
+                "WHERE phase=? AND artefact=? AND handler=?",
+                (digest, datetime.now().isoformat()) + key,
+            )
+            self._conn.commit()
+        return True
+
+    def _discard(self, key: tuple):
+        self._conn.execute("DELETE FROM checkpoints WHERE phase=? AND artefact=? AND handler=?", key)
+        self._conn.execute("DELETE FROM outputs WHERE phase=? AND artefact=? AND handler=?", key)
+        self._conn.commit()
+
+    def discard(self, key: tuple):
+        """Forget an artefact (keeping its files), so it is processed again on resume."""
+        with self._lock:
+            self._discard(key)
+
+    def fail(self, key: tuple):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE checkpoints SET status='failed' WHERE phase=? AND artefact=? AND handler=?", key
+            )
+            self._conn.commit()
+
+    def phase_complete(self, phase: str, source: str) -> bool:
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "SELECT 1 FROM phases WHERE phase=? AND source=?", (phase, source)
+                ).fetchone()
+                is not None
+            )
+
+    def complete_phase(self, phase: str, source: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO phases (phase, source, completed_at) VALUES (?, ?, ?)",
+                (phase, source, datetime.now().isoformat()),
+            )
+            self._conn.commit()
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM checkpoints GROUP BY status"))
+            counts["phases"] = self._conn.execute("SELECT COUNT(*) FROM phases").fetchone()[0]
+        return counts
+
+    def close(self):
+        self._conn.close()
+
+
+_manifests: Dict[str, CheckpointManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(output_directory: str) -> CheckpointManifest:
+    """Get the manifest for a case directory, opening it on first use."""
+    case_directory = output_directory.rstrip("/")
+    with _manifests_lock:
+        if case_directory not in _manifests:
+            _manifests[case_directory] = CheckpointManifest(case_directory)
+        return _manifests[case_directory]
+
+
+def has_checkpoints(output_directory: str) -> bool:
+    return os.path.exists(os.path.join(output_directory.rstrip("/"), CHECKPOINT_DB))
+
+
+# ---------------------------------------------------------------------------
+# Output capture: while a checkpointed handler runs, files it opens for
+# writing (or renames into place) under its image's artefacts directory are
+# recorded against its checkpoint
+# ---------------------------------------------------------------------------
+
+_scope = threading.local()
+_hook_installed = False
+
+
+class _Capture:
+    """Outputs recorded for the handler running on this thread, and any work it deferred."""
+
+    def __init__(self, manifest: CheckpointManifest, key: tuple, prefix: str):
+        self.manifest = manifest
+        self.key = key
+        self.prefix = prefix
+        self.seen = set()
+        self.spawned = False  # ran a subprocess
+        self.spawned_outputs = set()  # its path arguments under prefix that did not exist yet
+        self.lock = threading.Lock()
+        self.pending = 0  # deferred jobs not yet finished
+        self.failed = False
+        self.returned = False
+        self.result = None
+
+    def record(self, path: str, owned: bool):
+        if not path.startswith(self.prefix) or (path, owned) in self.seen:
+            return
+        self.seen.add((path, owned))
+        self.manifest.record_output(self.key, path, owned)
+
+    def record_spawn(self, args, cwd):
+        """Note a subprocess and the not-yet-existing paths under prefix among its arguments."""
+        self.spawned = True
+        if isinstance(args, (str, bytes)):
+            try:
+                args = shlex.split(os.fsdecode(args))
+            except ValueError:
+                args = os.fsdecode(args).split()
+        for arg in args:
+            try:
+                arg = os.fsdecode(arg)
+            except TypeError:
+                continue
+            # Plain paths, --output=/path, and shell redirections such as >/path or 2>>/path
+            value = _REDIRECTION.sub("", arg.split("=", 1)[-1])
+            path = os.path.abspath(os.path.join(os.fsdecode(cwd or os.getcwd()), value))
+            if path.startswith(self.prefix) and not os.path.exists(path):
+                self.spawned_outputs.add(path)
+
+    def finish(self):
+        """Settle the checkpoint once the handler has returned and its deferred jobs are done."""
+        if self.failed:
+            self.manifest.fail(self.key)
+        elif self.result is not None:
+            # A skipped handler returns None, which callers of a handler with a result cannot use
+            self.manifest.discard(self.key)
+        else:
+            for path in self.spawned_outputs:
+                if os.path.isfile(path):
+                    self.record(path, True)
+            self.manifest.complete(self.key, allow_empty=self.spawned)
+
+
+def _audit_hook(event, args):
+    if event not in ("open", "os.rename", "os.replace", "subprocess.Popen"):
+        return
+    current = getattr(_scope, "current", None)
+    if current is None:
+        return
+    if event == "subprocess.Popen":
+        _scope.current = None
+        try:
+            current.record_spawn(args[1], args[2])
+        finally:
+            _scope.current = current
+        return
+    if event == "open":
+        path, mode, flags = args
+        if mode:
+            writing = any(c in mode for c in "wax+")
+            owned = "a" not in mode
+        else:
+            writing = bool(flags & _WRITE_FLAGS)
+            owned = not flags & os.O_APPEND
+    else:
+        path, writing, owned = args[1], True, True
+    if not writing or not isinstance(path, str):
+        return
+    _scope.current = None  # the manifest's own sqlite I/O must not re-enter
+    try:
+        current.record(os.path.abspath(path), owned)
+    finally:
+        _scope.current = current
+
+
+def _install_hook():
+    global _hook_installed
+    if not _hook_installed:
+        sys.addaudithook(_audit_hook)
+        _hook_installed = True
+
+
+def defer_completion() -> Optional[Callable[[bool, List[str]], None]]:
+    """
+    For a handler that queues work finishing after it returns (e.g. an
+    Artemis batch): returns a callback to call once with (success, outputs)
+    when the queued job finishes, or None outside a checkpointed handler.
+
+    The handler's checkpoint is only settled once it has returned and every
+    deferred job has reported, so a run that stops before the queued work
+    has run leaves the artefact to be processed again on resume.
+    """
+    capture = getattr(_scope, "current", None)
+    if capture is None:
+        return None
+    with capture.lock:
+        capture.pending += 1
+
+    def done(success: bool, outputs: List[str]):
+        for path in outputs:
+            capture.record(os.path.abspath(path), True)
+        with capture.lock:
+            capture.pending -= 1
+            capture.failed = capture.failed or not success
+            settle = capture.returned and capture.pending == 0
+        if settle:
+            capture.finish()
+
+    return done
+
+
+def checkpoint_handler(func):
+    """
+    Skip a process_* handler whose artefact already has a valid checkpoint;
+    otherwise run it while recording its outputs and mark it complete on return.
+
+    The handler must take `output_directory`, `img` and `artefact` arguments;
+    handlers without an artefact are returned unchanged. Only a handler that
+    returns None is marked complete, since a skip returns None, and only if it
+    wrote outputs or ran a subprocess, since a pure-Python handler without
+    outputs leaves nothing to verify on resume.
+    """
+    signature = inspect.signature(func)
+    if not {"output_directory", "img", "artefact"} <= set(signature.parameters):
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind_partial(*args, **kwargs).arguments
+        output_directory, img, artefact = bound["output_directory"], bound["img"], bound["artefact"]
+        if not isinstance(artefact, str) or getattr(_scope, "current", None) is not None:
+            return func(*args, **kwargs)
+        manifest = get_manifest(output_directory)
+        version = handler_version(func)
+        key = ("processing", artefact, func.__name__)
+        input_hash = fingerprint_file(artefact)
+        if manifest.is_complete(key, version, input_hash):
+            print(
+                " -> {} -> skipping '{}', already processed (checkpoint)".format(
+                    datetime.now().isoformat().replace("T", " "), artefact.split("/")[-1]
+                )
+            )
+            return None
+        manifest.begin(key, version, input_hash)
+        prefix = os.path.abspath(os.path.join(output_directory, img.split("::")[0], "artefacts")) + os.sep
+        _install_hook()
+        capture = _scope.current = _Capture(manifest, key, prefix)
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            _scope.current = None
+            manifest.fail(key)
+            raise
+        _scope.current = None
+        with capture.lock:
+            capture.returned, capture.result = True, result
+            settle = capture.pending == 0
+        if settle:
+            capture.finish()
+        return result
+
+    return wrapper
+
+
+def phase_complete(output_directory: str, phase: str, source: str) -> bool:
+    return has_checkpoints(output_directory) and get_manifest(output_directory).phase_complete(phase, source)
+
+
+def complete_phase(output_directory: str, phase: str, source: str):
+    get_manifest(output_directory).complete_phase(phase, source)
@@ -88,6 +88,10 @@ class CloudTrailAnalyzer:
     # Discovery service patterns
     DISCOVERY_SERVICES = ["ec2", "s3", "iam", "lambda", "ecs"]
 
+    # CloudTrail S3 exports wrap events as {"Records": [...]}
+    RECORDS_KEY = "Records"
+    REPORT_PREFIX = "cloudtrail"
+
     def __init__(self, session: Optional[Any] = None):
         """
         Initialize CloudTrail analyzer.
@@ -200,51 +204,91 @@ class CloudTrailAnalyzer:
 
         for event in logs:
             # Update statistics
-            findings["statistics"]["unique_users"].add(event.get("username", "N/A"))
-            findings["statistics"]["unique_ips"].add(event.get("source_ip", "N/A"))
-            findings["statistics"]["event_counts"][event.get("event_name", "N/A")] += 1
-
-            service = event.get("event_source", "").split(".")[0]
-            findings["statistics"]["service_counts"][service] += 1
+            for kind, name, value in self._record_statistics(event):
+                if kind == "unique":
+                    findings["statistics"][name].add(value)
+                else:
+                    findings["statistics"][name][value] += 1
 
             # Analyze event
-            event_name = event.get("event_name")
+            for category, finding in self._record_findings(event):
+                findings[category].append(finding)
+
+        # Convert sets to lists for JSON serialization
+        findings["statistics"]["unique_users"] = list(findings["statistics"]["unique_users"])
+        findings["statistics"]["unique_ips"] = list(findings["statistics"]["unique_ips"])
+        findings["statistics"]["event_counts"] = dict(findings["statistics"]["event_counts"])
+        findings["statistics"]["service_counts"] = dict(findings["statistics"]["service_counts"])
+
+        return findings
+
+    def _normalize_record(self, record: Dict) -> Dict[str, Any]:
+        """Map a raw CloudTrail record (S3 export) onto the acquired event format."""
+        if "eventName" not in record:
+            return record
+        identity = record.get("userIdentity") or {}
+        return {
+            "event_time": record.get("eventTime"),
+            "event_name": record.get("eventName"),
+            "event_source": record.get("eventSource", ""),
+            "username": identity.get("userName") or identity.get("arn"),
+            "access_key_id": identity.get("accessKeyId"),
+            "event_id": record.get("eventID"),
+            "resources": record.get("resources", []),
+            "user_agent": record.get("userAgent"),
+            "source_ip": record.get("sourceIPAddress", ""),
+            "request_parameters": record.get("requestParameters") or {},
+            "response_elements": record.get("responseElements") or {},
+            "error_code": record.get("errorCode"),
+            "error_message": record.get("errorMessage"),
+        }
+
+    def _record_statistics(self, event: Dict) -> List[tuple]:
+        """Statistics updates for one event: ("unique", name, value) or ("count", name, key)."""
+        return [
+            ("unique", "unique_users", event.get("username", "N/A")),
+            ("unique", "unique_ips", event.get("source_ip", "N/A")),
+            ("count", "event_counts", event.get("event_name", "N/A")),
+            ("count", "service_counts", event.get("event_source", "").split(".")[0]),
+        ]
 
-            # Check for suspicious events
-            if event_name in self.SUSPICIOUS_EVENTS:
-                findings["suspicious_events"].append(
+    def _record_findings(self, event: Dict) -> List[tuple]:
+        """(category, finding) pairs for one event."""
+        findings = []
+        event_name = event.get("event_name")
+
+        # Check for suspicious events
+        if event_name in self.SUSPICIOUS_EVENTS:
+            findings.append(
+                (
+                    "suspicious_events",
                     {
                         "event": event,
                         "attck_techniques": self.SUSPICIOUS_EVENTS[event_name],
                         "severity": self._get_event_severity(event_name),
-                    }
+                    },
                 )
+            )
 
-            # Check for unusual source IPs
-            if self._is_unusual_source(event):
-                findings["unusual_sources"].append(event)
-
-            # Check for privilege escalation
-            if self._is_privilege_escalation(event):
-                findings["privilege_escalations"].append(event)
+        # Check for unusual source IPs
+        if self._is_unusual_source(event):
+            findings.append(("unusual_sources", event))
 
-            # Check for credential access
-            if self._is_credential_access(event):
-                findings["credential_access"].append(event)
+        # Check for privilege escalation
+        if self._is_privilege_escalation(event):
+            findings.append(("privilege_escalations", event))
 
-            # Check for discovery activity
-            if self._is_discovery_activity(event):
-                findings["discovery_activity"].append(event)
+        # Check for credential access
+        if self._is_credential_access(event):
+            findings.append(("credential_access", event))
 
-            # Check for failed attempts
-            if event.get("error_code"):
-                findings["failed_attempts"].append(event)
+        # Check for discovery activity
+        if self._is_discovery_activity(event):
+            findings.append(("discovery_activity", event))
 
-        # Convert sets to lists for JSON serialization
-        findings["statistics"]["unique_users"] = list(findings["statistics"]["unique_users"])
-        findings["statistics"]["unique_ips"] = list(findings["statistics"]["unique_ips"])
-        findings["statistics"]["event_counts"] = dict(findings["statistics"]["event_counts"])
-        findings["statistics"]["service_counts"] = dict(findings["statistics"]["service_counts"])
+        # Check for failed attempts
+        if event.get("error_code"):
+            findings.append(("failed_attempts", event))
 
         return findings
 
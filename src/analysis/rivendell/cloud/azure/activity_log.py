@@ -60,6 +60,10 @@ class ActivityLogAnalyzer:
         "Microsoft.Storage/storageAccounts/delete": ["T1485"],
     }
 
+    # Diagnostic-settings exports to storage wrap entries as {"records": [...]}
+    RECORDS_KEY = "records"
+    REPORT_PREFIX = "activity_log"
+
     def __init__(self, credential: Any, subscription_id: str):
         """
         Initialize Activity Log analyzer.
@@ -162,40 +166,65 @@ class ActivityLogAnalyzer:
 
         for log in logs:
             # Update statistics
-            findings["statistics"]["unique_callers"].add(log.get("caller", "N/A"))
-            findings["statistics"]["operation_counts"][log.get("operation_name", "N/A")] += 1
-            findings["statistics"]["resource_types"][log.get("resource_type", "N/A")] += 1
+            for kind, name, value in self._record_statistics(log):
+                if kind == "unique":
+                    findings["statistics"][name].add(value)
+                else:
+                    findings["statistics"][name][value] += 1
+
+            for category, finding in self._record_findings(log):
+                findings[category].append(finding)
+
+        # Convert sets to lists
+        findings["statistics"]["unique_callers"] = list(findings["statistics"]["unique_callers"])
+        findings["statistics"]["operation_counts"] = dict(
+            findings["statistics"]["operation_counts"]
+        )
+        findings["statistics"]["resource_types"] = dict(findings["statistics"]["resource_types"])
 
-            operation_name = log.get("operation_name", "")
+        return findings
+
+    def _normalize_record(self, record: Dict) -> Dict[str, Any]:
+        """Records are analyzed in the acquired format."""
+        return record
 
-            # Check for suspicious operations
-            if operation_name in self.SUSPICIOUS_OPERATIONS:
-                findings["suspicious_operations"].append(
+    def _record_statistics(self, log: Dict) -> List[tuple]:
+        """Statistics updates for one entry: ("unique", name, value) or ("count", name, key)."""
+        return [
+            ("unique", "unique_callers", log.get("caller", "N/A")),
+            ("count", "operation_counts", log.get("operation_name", "N/A")),
+            ("count", "resource_types", log.get("resource_type", "N/A")),
+        ]
+
+    def _record_findings(self, log: Dict) -> List[tuple]:
+        """(category, finding) pairs for one entry."""
+        findings = []
+        operation_name = log.get("operation_name", "")
+
+        # Check for suspicious operations
+        if operation_name in self.SUSPICIOUS_OPERATIONS:
+            findings.append(
+                (
+                    "suspicious_operations",
                     {
                         "log": log,
                         "attck_techniques": self.SUSPICIOUS_OPERATIONS[operation_name],
                         "severity": self._get_operation_severity(operation_name),
-                    }
+                    },
                 )
+            )
 
-            # Check for role changes
-            if "roleAssignment" in operation_name or "roleDefinition" in operation_name:
-                findings["role_changes"].append(log)
-
-            # Check for resource deletions
-            if log.get("operation_name", "").endswith("/delete"):
-                findings["resource_deletions"].append(log)
+        # Check for role changes
+        if "roleAssignment" in operation_name or "roleDefinition" in operation_name:
+            findings.append(("role_changes", log))
 
-            # Check for failed operations
-            if log.get("status") == "Failed":
-                findings["failed_operations"].append(log)
+        # Check for resource deletions
+        if log.get("operation_name", "").endswith("/delete"):
+            findings.append(("resource_deletions", log))
 
-        # Convert sets to lists
-        findings["statistics"]["unique_callers"] = list(findings["statistics"]["unique_callers"])
-        findings["statistics"]["operation_counts"] = dict(
-            findings["statistics"]["operation_counts"]
-        )
-        findings["statistics"]["resource_types"] = dict(findings["statistics"]["resource_types"])
+        # Check for failed operations
+        if log.get("status") == "Failed":
+            findings.append(("failed_operations", log))
 
         return findings
 
@@ -19,6 +19,13 @@ from .aws import AWSForensics, CloudTrailAnalyzer, S3Forensics
 from .azure import AzureForensics, ActivityLogAnalyzer
 from .gcp import GCPForensics, CloudLoggingAnalyzer
 from .base import CloudForensicsException
+from .streaming import LOG_EXTENSIONS, analyze_log_directory, write_streaming_report
+
+STREAMING_ANALYZERS = {
+    "aws": CloudTrailAnalyzer,
+    "azure": ActivityLogAnalyzer,
+    "gcp": CloudLoggingAnalyzer,
+}
 
 
 def load_credentials(provider: str, cred_file: Optional[str] = None) -> dict:
@@ -207,6 +214,17 @@ def acquire_logs_command(args):
 
 def analyze_logs_command(args):
     """Analyze cloud audit logs."""
+    if os.path.isdir(args.log_file) or args.log_file.lower().endswith(LOG_EXTENSIONS):
+        if args.output:
+            output_dir = args.output
+            os.makedirs(output_dir, exist_ok=True)
+        else:
+            # Next to the logs: the directory itself, or the file's directory
+            output_dir = args.log_file.rstrip("/")
+            if not os.path.isdir(output_dir):
+                output_dir = os.path.dirname(output_dir) or "."
+        return analyze_logs_streaming_impl(args.provider, args.log_file, output_dir, args.workers)
+
     credentials = load_credentials(args.provider, args.credentials)
     output_dir = args.output or os.path.dirname(args.log_file)
 
@@ -265,6 +283,36 @@ def analyze_logs_command_impl(
         return 1
 
 
+def analyze_logs_streaming_impl(
+    provider: str, log_path: str, output_dir: str, workers: Optional[int] = None
+) -> int:
+    """Stream an export, or a directory of (optionally gzipped) exports through a process pool."""
+    try:
+        analyzer_class = STREAMING_ANALYZERS[provider]
+        summary = analyze_log_directory(analyzer_class, log_path, output_dir, workers)
+        report_file = os.path.join(output_dir, f"{analyzer_class.REPORT_PREFIX}_analysis.json")
+        write_streaming_report(summary, report_file)
+
+        print(f"\nLog analysis complete:")
+        print(f"  Files analyzed: {summary['files_analyzed']}")
+        print(f"  Total events: {summary['statistics']['total_events']}")
+        for category, count in sorted(summary["finding_counts"].items()):
+            print(f"  {category.replace('_', ' ').capitalize()}: {count}")
+        print(f"  Findings saved to: {summary['findings_file']}")
+        print(f"  Report saved to: {report_file}")
+
+        if summary["mitre_mapping"]:
+            print(f"\n  MITRE ATT&CK Techniques Detected:")
+            for technique, count in sorted(summary["mitre_mapping"].items()):
+                print(f"    - {technique}: {count} events")
+
+        return 0
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -283,6 +331,9 @@ Examples:
 
   # Analyze existing logs
   %(prog)s aws analyze-logs --log-file cloudtrail_logs.json
+
+  # Analyze a directory of gzipped CloudTrail exports across 8 processes
+  %(prog)s aws analyze-logs --log-file ./AWSLogs --workers 8 --output ./logs
         """,
     )
 
@@ -321,9 +372,17 @@ Examples:
 
     # Analyze logs command
     analyze_parser = subparsers.add_parser("analyze-logs", help="Analyze audit logs")
-    analyze_parser.add_argument("--log-file", "-f", required=True, help="Log file to analyze")
+    analyze_parser.add_argument(
+        "--log-file",
+        "-f",
+        required=True,
+        help="Log file to analyze, or a directory of exports; JSON/JSONL (optionally gzipped) is streamed",
+    )
     analyze_parser.add_argument("--credentials", "-c", help="Credentials file path")
     analyze_parser.add_argument("--output", "-o", help="Output directory")
+    analyze_parser.add_argument(
+        "--workers", type=int, help="Worker processes for directories (default: CPU count)"
+    )
 
     args = parser.parse_args()
 
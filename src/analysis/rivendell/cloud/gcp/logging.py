@@ -58,6 +58,10 @@ class CloudLoggingAnalyzer:
         "google.storage.v1.Buckets.Delete": ["T1485"],
     }
 
+    # Exports are JSON arrays or JSON lines of log entries
+    RECORDS_KEY = None
+    REPORT_PREFIX = "cloud_logging"
+
     def __init__(self, project_id: str):
         """
         Initialize Cloud Logging analyzer.
@@ -189,51 +193,76 @@ class CloudLoggingAnalyzer:
         }
 
         for log in logs:
-            proto_payload = log.get("proto_payload", {})
-            if not proto_payload:
-                continue
+            # Update statistics
+            for kind, name, value in self._record_statistics(log):
+                if kind == "unique":
+                    findings["statistics"][name].add(value)
+                else:
+                    findings["statistics"][name][value] += 1
 
-            method_name = proto_payload.get("method_name", "")
-            service_name = proto_payload.get("service_name", "")
-            caller_ip = proto_payload.get("caller_ip", "N/A")
+            for category, finding in self._record_findings(log):
+                findings[category].append(finding)
 
-            # Update statistics
-            findings["statistics"]["unique_callers"].add(caller_ip)
-            findings["statistics"]["method_counts"][method_name] += 1
-            findings["statistics"]["service_counts"][service_name] += 1
+        # Convert sets to lists
+        findings["statistics"]["unique_callers"] = list(findings["statistics"]["unique_callers"])
+        findings["statistics"]["method_counts"] = dict(findings["statistics"]["method_counts"])
+        findings["statistics"]["service_counts"] = dict(findings["statistics"]["service_counts"])
+
+        return findings
+
+    def _normalize_record(self, record: Dict) -> Dict[str, Any]:
+        """Records are analyzed in the acquired format."""
+        return record
+
+    def _record_statistics(self, log: Dict) -> List[tuple]:
+        """Statistics updates for one entry: ("unique", name, value) or ("count", name, key)."""
+        proto_payload = log.get("proto_payload", {})
+        if not proto_payload:
+            return []
+        return [
+            ("unique", "unique_callers", proto_payload.get("caller_ip", "N/A")),
+            ("count", "method_counts", proto_payload.get("method_name", "")),
+            ("count", "service_counts", proto_payload.get("service_name", "")),
+        ]
 
-            # Check for suspicious methods
-            if method_name in self.SUSPICIOUS_METHODS:
-                findings["suspicious_methods"].append(
+    def _record_findings(self, log: Dict) -> List[tuple]:
+        """(category, finding) pairs for one entry."""
+        proto_payload = log.get("proto_payload", {})
+        if not proto_payload:
+            return []
+        findings = []
+        method_name = proto_payload.get("method_name", "")
+
+        # Check for suspicious methods
+        if method_name in self.SUSPICIOUS_METHODS:
+            findings.append(
+                (
+                    "suspicious_methods",
                     {
                         "log": log,
                         "attck_techniques": self.SUSPICIOUS_METHODS[method_name],
                         "severity": self._get_method_severity(method_name),
-                    }
+                    },
                 )
+            )
 
-            # Check for IAM changes
-            if (
-                "iam" in method_name.lower()
-                and "Set" in method_name
-                or "Create" in method_name
-                or "Update" in method_name
-            ):
-                findings["iam_changes"].append(log)
-
-            # Check for resource deletions
-            if "Delete" in method_name:
-                findings["resource_deletions"].append(log)
-
-            # Check for failed requests
-            status = proto_payload.get("status", {})
-            if status and status.get("code") != 0:
-                findings["failed_requests"].append(log)
-
-        # Convert sets to lists
-        findings["statistics"]["unique_callers"] = list(findings["statistics"]["unique_callers"])
-        findings["statistics"]["method_counts"] = dict(findings["statistics"]["method_counts"])
-        findings["statistics"]["service_counts"] = dict(findings["statistics"]["service_counts"])
+        # Check for IAM changes
+        if (
+            "iam" in method_name.lower()
+            and "Set" in method_name
+            or "Create" in method_name
+            or "Update" in method_name
+        ):
+            findings.append(("iam_changes", log))
+
+        # Check for resource deletions
+        if "Delete" in method_name:
+            findings.append(("resource_deletions", log))
+
+        # Check for failed requests
+        status = proto_payload.get("status", {})
+        if status and status.get("code") != 0:
+            findings.append(("failed_requests", log))
 
         return findings
 
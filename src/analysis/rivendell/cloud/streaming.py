@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Streaming Cloud Log Analysis
+
+Analyze directories of CloudTrail, Azure Activity and GCP Cloud Logging
+exports (JSON, JSONL, plain or gzipped) without loading them into memory.
+
+Files are spread across a process pool. Each worker streams its file's
+records through the analyzer's per-record rules and writes findings to its
+own JSONL spill file as they are found. It returns only compact aggregates:
+counters, HyperLogLog sketches for the unique-value statistics, and
+finding/technique counts. The parent merges the partial aggregates and
+concatenates the spill files, so memory stays flat however many files
+there are.
+
+Author: Rivendell DF Acceleration Suite
+Version: 2.1.0
+"""
+
+import hashlib
+import json
+import math
+import os
+import shutil
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..utils import iter_json_records
+
+LOG_EXTENSIONS = (".json", ".jsonl", ".json.gz", ".jsonl.gz", ".gz")
+
+
+class HyperLogLog:
+    """
+    Fixed-size cardinality sketch for unique users/IPs/callers.
+
+    2**precision one-byte registers (16 KiB at the default precision of
+    14) with a standard error of about 0.8%; small cardinalities fall back
+    to linear counting, so they are effectively exact.
+    """
+
+    def __init__(self, precision: int = 14, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.size)
+
+    def add(self, value: Any):
+        hashed = int.from_bytes(hashlib.sha1(str(value).encode()).digest()[:8], "big")
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size * self.size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+
+def iter_log_files(path: str) -> Iterator[str]:
+    """Yield log files under path (or path itself), in a stable order."""
+    if os.path.isfile(path):
+        yield path
+        return
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(LOG_EXTENSIONS):
+                yield os.path.join(root, name)
+
+
+def iter_log_records(log_file: str, records_key: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream records from one export, unwrapping {"Records": [...]}-style containers."""
+    for record in iter_json_records(log_file, records_key=records_key):
+        if records_key and isinstance(record.get(records_key), list):
+            for item in record[records_key]:
+                if isinstance(item, dict):
+                    yield item
+        else:
+            yield record
+
+
+def _analyze_file(analyzer_class, log_file: str, spill_file: str) -> Dict[str, Any]:
+    """Worker: stream one file through the analyzer's rules, spilling findings to JSONL."""
+    # The per-record rules only use class attributes; __init__ needs SDK clients
+    analyzer = analyzer_class.__new__(analyzer_class)
+    total = 0
+    counts: Dict[str, Counter] = {}
+    uniques: Dict[str, HyperLogLog] = {}
+    finding_counts: Counter = Counter()
+    technique_counts: Counter = Counter()
+    with open(spill_file, "w") as spill:
+        for record in iter_log_records(log_file, analyzer.RECORDS_KEY):
+            record = analyzer._normalize_record(record)
+            total += 1
+            for kind, name, value in analyzer._record_statistics(record):
+                if kind == "unique":
+                    uniques.setdefault(name, HyperLogLog()).add(value)
+                else:
+                    counts.setdefault(name, Counter())[value] += 1
+            for category, finding in analyzer._record_findings(record):
+                finding_counts[category] += 1
+                try:
+                    mapped = analyzer.map_to_mitre({category: [finding]})
+                except (KeyError, TypeError):
+                    # map_to_mitre expects acquired-format fields; fall back to the rule's techniques
+                    mapped = {technique: [finding] for technique in finding.get("attck_techniques", [])}
+                for technique, events in mapped.items():
+                    technique_counts[technique] += len(events)
+                spill.write(
+                    json.dumps(
+                        {"category": category, "source_file": log_file, "finding": finding},
+                        default=str,
+                    )
+                    + "\n"
+                )
+    return {
+        "total_events": total,
+        "counts": counts,
+        "uniques": {name: bytes(sketch.registers) for name, sketch in uniques.items()},
+        "finding_counts": finding_counts,
+        "technique_counts": technique_counts,
+    }
+
+
+def analyze_log_directory(
+    analyzer_class, log_path: str, output_dir: str, workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Analyze every log file under log_path with bounded memory.
+
+    Args:
+        analyzer_class: CloudTrailAnalyzer, ActivityLogAnalyzer or CloudLoggingAnalyzer
+        log_path: Log file or directory of exports
+        output_dir: Directory for the findings JSONL
+        workers: Worker processes (default: CPU count)
+
+    Returns:
+        Summary with merged statistics, finding and technique counts and the
+        path of the findings JSONL
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = analyzer_class.REPORT_PREFIX
+    partial_dir = os.path.join(output_dir, "." + prefix + "_partial")
+    os.makedirs(partial_dir, exist_ok=True)
+    log_files = list(iter_log_files(log_path))
+    spill_files = [
+        os.path.join(partial_dir, "{:06d}.jsonl".format(index)) for index in range(len(log_files))
+    ]
+
+    total = 0
+    counts: Dict[str, Counter] = {}
+    uniques: Dict[str, HyperLogLog] = {}
+    finding_counts: Counter = Counter()
+    technique_counts: Counter = Counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(
+            _analyze_file, [analyzer_class] * len(log_files), log_files, spill_files
+        ):
+            total += partial["total_events"]
+            for name, counter in partial["counts"].items():
+                counts.setdefault(name, Counter()).update(counter)
+            for name, registers in partial["uniques"].items():
+                sketch = HyperLogLog(registers=registers)
+                if name in uniques:
+                    uniques[name].merge(sketch)
+                else:
+                    uniques[name] = sketch
+            finding_counts.update(partial["finding_counts"])
+            technique_counts.update(partial["technique_counts"])
+
+    findings_file = os.path.join(output_dir, prefix + "_findings.jsonl")
+    with open(findings_file, "w") as findings:
+        for spill_file in spill_files:
+            with open(spill_file) as spill:
+                shutil.copyfileobj(spill, findings)
+    shutil.rmtree(partial_dir)
+
+    statistics: Dict[str, Any] = {"total_events": total}
+    statistics.update({name: sketch.count() for name, sketch in uniques.items()})
+    statistics.update({name: dict(counter) for name, counter in counts.items()})
+    return {
+        "files_analyzed": len(log_files),
+        "statistics": statistics,
+        "finding_counts": dict(finding_counts),
+        "mitre_mapping": dict(technique_counts),
+        "findings_file": findings_file,
+    }
+
+
+def write_streaming_report(summary: Dict[str, Any], output_file: str):
+    """Write the merged summary; individual findings stay in the findings JSONL."""
+    report = {"report_generated": datetime.now().isoformat()}
+    report.update(summary)
+    with open(output_file, "w") as f:
+        json.dump(report, f, indent=2, default=str)
@@ -6,6 +6,7 @@ from datetime import datetime
 from zipfile import ZipFile
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.inventory import get_inventory
 from rivendell.utils import safe_input
 from rivendell.collect.files.carve import carve_files
 from rivendell.collect.files.compare import compare_include_exclude
@@ -49,9 +50,9 @@ def select_files(
             or "M" in file_selection
             or "V" in file_selection
         ):
-            for collected_file_root, _, collected_files in os.walk(
+            for collected_file_root, _, collected_files in get_inventory(
                 mnt
-            ):  # processing file selection
+            ).walk():  # processing file selection
                 for collected_file in collected_files:
                     collect_files(
                         output_directory,
@@ -66,18 +67,7 @@ def select_files(
                         file_selection,
                     )
             if "L" in file_selection or "A" in file_selection:
-                link_files = subprocess.Popen(
-                    [
-                        "sudo",
-                        "find",
-                        mnt,
-                        "-type",
-                        "l",
-                    ],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                ).communicate()
-                for lnk_path in str(link_files)[3:-9].split("\\n"):
+                for lnk_path, _ in get_inventory(mnt).files(types=("link", "dirlink")):
                     if collect_files:
                         try:
                             os.stat(
@@ -6,12 +6,15 @@ from datetime import datetime
 
 from rivendell.analysis.analysis import analyse_artefacts
 from rivendell.analysis.keywords import prepare_keywords
+from rivendell.analysis.memory_strings import analyse_memory_strings
 from rivendell.audit import write_audit_log_entry
 from rivendell.collect.collect import collect_artefacts
 from rivendell.core.identify import process_deferred_memory, load_memory_profiles
 # Reorganise functionality removed - redundant
 from rivendell.process.select import select_pre_process_artefacts
+from rivendell.process.supertimeline import create_cooked_timeline
 from rivendell.process.timeline import create_plaso_timeline
+from rivendell.profiling import span
 from rivendell.utils import safe_input, safe_listdir, safe_iterdir
 
 
@@ -137,19 +140,27 @@ def collect_process_keyword_analysis_timeline(
                 "\n\n  -> \033[1;36mCommencing Keyword Searching phase for proccessed artefacts...\033[1;m\n  ----------------------------------------"
             )
             time.sleep(1)
-            prepare_keywords(
-                verbosity,
-                output_directory,
-                auto,
-                imgs,
-                flags,
-                keywords,
-                "keyword searching",
-            )
+            with span("stage", "keyword searching"):
+                prepare_keywords(
+                    verbosity,
+                    output_directory,
+                    auto,
+                    imgs,
+                    flags,
+                    keywords,
+                    "keyword searching",
+                )
             print(
                 "  ----------------------------------------\n  -> Completed Keyword Searching phase for proccessed artefacts.\n"
             )
             time.sleep(1)
+    # Memory artefacts are scanned for strings once, for keywords and IOCs together
+    memory_keywords = keywords if keywords and os.path.exists(keywords[0]) else None
+    if memory_keywords or extractiocs:
+        with span("stage", "memory strings"):
+            analyse_memory_strings(
+                verbosity, output_directory, imgs, memory_keywords, extractiocs, iocsfile
+            )
     if analysis or extractiocs:
         alysdirs = []
         analysis_errors = []  # Track any errors during analysis
@@ -185,17 +196,18 @@ def collect_process_keyword_analysis_timeline(
 
                     print(f" -> {datetime.now().isoformat().replace('T', ' ')} -> analysing artefacts for {vssimage}...", flush=True)
 
-                    analyse_artefacts(
-                        verbosity,
-                        output_directory,
-                        img,
-                        mnt,
-                        analysis,
-                        magicbytes,
-                        extractiocs,
-                        iocsfile,
-                        vssimage,
-                    )
+                    with span("stage", "analysis"):
+                        analyse_artefacts(
+                            verbosity,
+                            output_directory,
+                            img,
+                            mnt,
+                            analysis,
+                            magicbytes,
+                            extractiocs,
+                            iocsfile,
+                            vssimage,
+                        )
 
                     print(f" -> {datetime.now().isoformat().replace('T', ' ')} -> completed analysis for {vssimage}", flush=True)
                 except Exception as e:
@@ -246,9 +258,14 @@ def collect_process_keyword_analysis_timeline(
                     )
                 )
                 if timelineexist != "Y":
-                    create_plaso_timeline(
-                        verbosity, output_directory, stage, img, d, timelineimage
-                    )
+                    # Build from cooked artefacts; only re-parse the image with plaso if there are none
+                    with span("stage", "timeline"):
+                        if not create_cooked_timeline(
+                            verbosity, output_directory, stage, img
+                        ):
+                            create_plaso_timeline(
+                                verbosity, output_directory, stage, img, d, timelineimage
+                            )
                 else:
 
                     def doTimelineFile(timelinepath):
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3 -tt
+"""
+Mordor Dataset Ingestion
+
+Streams OTRF Security Datasets (Mordor) straight out of their .zip and
+.tar.gz archives. Events are decoded incrementally from each JSON member,
+mapped to the cooked event schema (SystemTime, EventID, Channel, Provider,
+Computer, Message plus the flattened event fields), MITRE-enriched and
+handed to a list of sinks in one pass. Nothing is extracted to disk; the
+only files written are the sinks' own output.
+"""
+
+import base64
+import io
+import json
+import os
+import ssl
+import tarfile
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from zipfile import ZipFile
+
+from rivendell.audit import write_audit_log_entry
+from rivendell.post.elastic.ingest import normalize_timestamp, send_bulk_to_elastic
+from rivendell.utils import iter_json_stream
+
+MORDOR_ARCHIVES = (".zip", ".tar.gz", ".tgz")
+EVENT_MEMBERS = (".json", ".jsonl", ".log")
+ELASTIC_BATCH_SIZE = 1000
+
+# Cooked field -> source fields tried in order (OTRF exports come from NXLog, Winlogbeat and Logstash)
+COOKED_FIELDS = {
+    "SystemTime": ("@timestamp", "TimeCreated", "EventTime", "timestamp"),
+    "EventID": ("EventID", "event_id"),
+    "Channel": ("Channel", "channel", "log_name"),
+    "Provider": ("SourceName", "ProviderName", "Provider", "provider_name"),
+    "Computer": ("Hostname", "Computer", "computer_name", "host"),
+    "Message": ("Message", "message"),
+}
+# Nested objects whose members are promoted to top-level fields
+NESTED_FIELDS = ("winlog", "event_data", "EventData", "user_data", "UserData")
+
+
+def dataset_name(archive: str) -> str:
+    """Dataset name for an archive, e.g. 'psh_mimikatz_logonpasswords' for psh_mimikatz_logonpasswords.zip."""
+    name = os.path.basename(archive)
+    for suffix in MORDOR_ARCHIVES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def find_mordor_datasets(path: str) -> List[str]:
+    """Mordor archives at path (a single archive or a directory searched recursively)."""
+    if os.path.isfile(path):
+        return [path] if path.endswith(MORDOR_ARCHIVES) else []
+    archives = []
+    for root, _, files in os.walk(path):
+        for name in files:
+            if name.endswith(MORDOR_ARCHIVES):
+                archives.append(os.path.join(root, name))
+    return sorted(archives)
+
+
+def iter_archive_members(archive: str) -> Iterator[Tuple[str, io.BufferedIOBase]]:
+    """Yield (member name, binary stream) for each event member, decompressing on the fly."""
+    if archive.endswith(".zip"):
+        with ZipFile(archive) as dataset:
+            for member in dataset.infolist():
+                if not member.is_dir() and member.filename.endswith(EVENT_MEMBERS):
+                    with dataset.open(member) as stream:
+                        yield member.filename, stream
+    else:
+        # Members are iterated in archive order, so decompression runs forward through the file
+        with tarfile.open(archive, "r:*") as dataset:
+            for member in dataset:
+                if member.isfile() and member.name.endswith(EVENT_MEMBERS):
+                    stream = dataset.extractfile(member)
+                    if stream is not None:
+                        yield member.name, stream
+
+
+def iter_mordor_events(archive: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (member name, raw event) for every JSON event in a Mordor archive."""
+    for member, stream in iter_archive_members(archive):
+        text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace")
+        for event in iter_json_stream(text):
+            yield member, event
+
+
+def to_cooked_event(event: Dict[str, Any], dataset: str, member: str) -> Dict[str, Any]:
+    """Map a raw OTRF event to the cooked event schema."""
+    cooked: Dict[str, Any] = {}
+    nested = []
+    for key, value in event.items():
+        if key in NESTED_FIELDS and isinstance(value, dict):
+            nested.append(value)
+        elif isinstance(value, (dict, list)):
+            cooked[key] = json.dumps(value, default=str)
+        else:
+            cooked[key] = value
+    while nested:
+        for key, value in nested.pop().items():
+            if key in NESTED_FIELDS and isinstance(value, dict):
+                nested.append(value)
+            elif key not in cooked:
+                cooked[key] = json.dumps(value, default=str) if isinstance(value, (dict, list)) else value
+
+    for field, candidates in COOKED_FIELDS.items():
+        for candidate in candidates:
+            value = cooked.get(candidate)
+            if value not in (None, ""):
+                cooked[field] = value
+                break
+    if "EventID" in cooked:
+        cooked["EventID"] = str(cooked["EventID"])
+    cooked["logtype"] = "evt"
+    cooked["mordor_dataset"] = dataset
+    cooked["mordor_file"] = member
+    return cooked
+
+
+class CookedJsonWriter:
+    """Sink writing cooked events as JSON lines (the dataset's cooked evt artefact)."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._file = open(path, "w")
+
+    def __call__(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, default=str) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class ElasticBulkSink:
+    """Sink indexing cooked events into Elasticsearch through the bulk API in fixed-size batches."""
+
+    def __init__(self, case, host, elastic_url, auth_header=None, ssl_context=None, batch_size=ELASTIC_BATCH_SIZE):
+        self.case = case
+        self.host = host
+        self.elastic_url = elastic_url
+        self.auth_header = auth_header
+        self.ssl_context = ssl_context
+        self.batch_size = batch_size
+        self.failed_batches = 0
+        self._bulk: List[str] = []
+        self._action = json.dumps({"index": {"_index": case.lower()}})
+
+    @classmethod
+    def from_environment(cls, case, host):
+        """Sink for the remote Elasticsearch configured by ELASTICSEARCH_HOST, or None if unset."""
+        elastic_host = os.environ.get("ELASTICSEARCH_HOST", "")
+        if not elastic_host:
+            return None
+        elastic_port = os.environ.get("ELASTICSEARCH_PORT", "9200")
+        elastic_user = os.environ.get("ELASTIC_USERNAME", "elastic")
+        elastic_pswd = os.environ.get("ELASTIC_PASSWORD", "")
+        auth_header = None
+        if elastic_user and elastic_pswd:
+            credentials = "{}:{}".format(elastic_user, elastic_pswd).encode("utf-8")
+            auth_header = "Basic {}".format(base64.b64encode(credentials).decode("utf-8"))
+        ssl_context = ssl.create_default_context()
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+        return cls(case, host, "http://{}:{}".format(elastic_host, elastic_port), auth_header, ssl_context)
+
+    def __call__(self, record: Dict[str, Any]):
+        document = dict(record, hostname=self.host, artefact="evt")
+        normalize_timestamp(document)
+        self._bulk.append(self._action)
+        self._bulk.append(json.dumps(document, default=str))
+        if len(self._bulk) >= self.batch_size * 2:
+            self.flush()
+
+    def flush(self):
+        if self._bulk:
+            if not send_bulk_to_elastic(self._bulk, self.elastic_url, self.auth_header, self.ssl_context, self.case):
+                self.failed_batches += 1
+            self._bulk = []
+
+    def close(self):
+        self.flush()
+
+
+def stream_mordor_dataset(
+    archive: str,
+    sinks: Iterable[Callable[[Dict[str, Any]], None]],
+    enrichment=None,
+    techniques_file=None,
+) -> Dict[str, Any]:
+    """
+    Stream one Mordor archive through enrichment into sinks.
+
+    Args:
+        archive: Path to the dataset .zip/.tar.gz
+        sinks: Callables receiving each cooked, enriched event
+        enrichment: MitreEnrichment instance (events are not enriched if None)
+        techniques_file: Open text file receiving each newly seen technique ID
+
+    Returns:
+        Statistics: events, members and technique counts
+    """
+    dataset = dataset_name(archive)
+    sinks = list(sinks)
+    techniques: Counter = Counter()
+    members = set()
+    events = 0
+    for member, event in iter_mordor_events(archive):
+        record = to_cooked_event(event, dataset, member)
+        if enrichment is not None:
+            record = enrichment.enrich_json_record(record, "evt")
+            found = {record.get("mitre_technique_id")}
+            # Full ATT&CK enrichment lists mitre_technique_id, the fallback technique_id
+            found.update(
+                t.get("mitre_technique_id") or t.get("technique_id") for t in record.get("mitre_techniques", [])
+            )
+            for technique in sorted(t for t in found if t):
+                if techniques_file is not None and technique not in techniques:
+                    techniques_file.write(technique + "\n")
+                techniques[technique] += 1
+        for sink in sinks:
+            sink(record)
+        members.add(member)
+        events += 1
+    return {"dataset": dataset, "events": events, "members": sorted(members), "techniques": dict(techniques)}
+
+
+def ingest_mordor_datasets(verbosity, output_directory, case, source, elastic=False, enrich=True):
+    """
+    Stream every Mordor archive under source into the case.
+
+    Each dataset is treated as a host: its cooked events are written to
+    <dataset>/artefacts/cooked/evt/<dataset>.json, its techniques to
+    <dataset>/artefacts/mitre_techniques.txt, and with elastic (and
+    ELASTICSEARCH_HOST set) events are bulk-indexed as they stream.
+
+    Returns:
+        Statistics per dataset
+    """
+    if enrich:
+        from rivendell.post.mitre.enrichment import TECHNIQUES_FILE, MitreEnrichment
+
+        enrichment = MitreEnrichment()
+    else:
+        enrichment = None
+    results = []
+    for archive in find_mordor_datasets(source):
+        dataset = dataset_name(archive)
+        artefacts_dir = os.path.join(output_directory, dataset, "artefacts")
+        sinks = [CookedJsonWriter(os.path.join(artefacts_dir, "cooked", "evt", dataset + ".json"))]
+        if elastic:
+            elastic_sink = ElasticBulkSink.from_environment(case, dataset)
+            if elastic_sink is not None:
+                sinks.append(elastic_sink)
+        entry, prnt = "{},{},streaming,{}\n".format(
+            datetime.now().isoformat(), dataset, os.path.basename(archive)
+        ), " -> {} -> streaming Mordor dataset '{}'".format(
+            datetime.now().isoformat().replace("T", " "), dataset
+        )
+        write_audit_log_entry(verbosity, output_directory, entry, prnt)
+        techniques_file = open(os.path.join(artefacts_dir, TECHNIQUES_FILE), "w") if enrich else None
+        try:
+            stats = stream_mordor_dataset(archive, sinks, enrichment, techniques_file)
+        finally:
+            for sink in sinks:
+                sink.close()
+            if techniques_file is not None:
+                techniques_file.close()
+        entry, prnt = "{},{},streamed,{} events ({} techniques)\n".format(
+            datetime.now().isoformat(), dataset, stats["events"], len(stats["techniques"])
+        ), " -> {} -> streamed {} events from '{}' ({} techniques)".format(
+            datetime.now().isoformat().replace("T", " "), stats["events"], dataset, len(stats["techniques"])
+        )
+        write_audit_log_entry(verbosity, output_directory, entry, prnt)
+        results.append(stats)
+    return results
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3 -tt
+"""
+File Inventory
+
+One walk of a mounted image, shared by every stage that needs its file
+list. Walking a FUSE mount (and stat-ing each file) is slow, and file
+collection, keyword searching, magic-byte and IOC analysis, masquerading
+and misplaced-binary detection each used to walk it again.
+
+The walk uses parallel directory workers. Each entry is lstat-ed once,
+and path, size, timestamps, mode and type go into a SQLite table.
+Inventories are cached per mount for the rest of the run. Entries come
+back grouped by directory, like os.walk.
+"""
+
+import atexit
+import hashlib
+import itertools
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+WALK_WORKERS = 8  # directory listings over FUSE are latency-bound, not CPU-bound
+INSERT_BATCH = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    root TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL,
+    atime REAL,
+    ctime REAL,
+    mode INTEGER NOT NULL,
+    type TEXT NOT NULL
+);
+"""
+
+
+def _scan_directory(directory: str) -> Tuple[List[tuple], List[str]]:
+    """List one directory: rows for its non-directory entries and the subdirectories to descend into."""
+    rows, subdirectories = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                        continue
+                    info = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if stat.S_ISREG(info.st_mode):
+                    kind = "file"
+                elif stat.S_ISLNK(info.st_mode):
+                    # like os.walk, links to directories are not listed as files
+                    kind = "dirlink" if entry.is_dir() else "link"
+                else:
+                    kind = "other"
+                rows.append(
+                    (
+                        directory,
+                        entry.name,
+                        info.st_size,
+                        info.st_mtime,
+                        info.st_atime,
+                        info.st_ctime,
+                        info.st_mode,
+                        kind,
+                    )
+                )
+    except OSError:
+        pass
+    return rows, subdirectories
+
+
+class FileInventory:
+    """SQLite-backed inventory of every file below a mount point."""
+
+    def __init__(self, mnt: str, db_path: str):
+        self.mnt = mnt
+        self.db_path = db_path
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.executescript(_SCHEMA)
+
+    def build(self, workers: int = WALK_WORKERS) -> int:
+        """Walk the mount with `workers` parallel directory listings; returns the number of entries."""
+        total = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {pool.submit(_scan_directory, self.mnt)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rows, subdirectories = future.result()
+                    for start in range(0, len(rows), INSERT_BATCH):
+                        self._conn.executemany(
+                            "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            rows[start : start + INSERT_BATCH],
+                        )
+                    total += len(rows)
+                    pending.update(pool.submit(_scan_directory, each) for each in subdirectories)
+        self._conn.commit()
+        return total
+
+    def _select(self, columns: str, larger_than, smaller_than, types):
+        query = "SELECT {} FROM files WHERE type IN ({})".format(columns, ", ".join("?" * len(types)))
+        parameters = list(types)
+        if larger_than is not None:
+            query += " AND size > ?"
+            parameters.append(larger_than)
+        if smaller_than is not None:
+            query += " AND size < ?"
+            parameters.append(smaller_than)
+        # each directory's rows were inserted together, so rowid order keeps them grouped
+        return self._conn.execute(query + " ORDER BY rowid", parameters)
+
+    def walk(
+        self,
+        larger_than: Optional[int] = None,
+        smaller_than: Optional[int] = None,
+        types: Tuple[str, ...] = ("file", "link", "other"),
+    ) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """
+        Yield (root, [], filenames) for each directory with matching files, in
+        place of os.walk. By default every entry os.walk lists as a file is
+        included; sizes are exclusive bounds on the lstat size.
+        """
+        rows = self._select("root, name", larger_than, smaller_than, types)
+        for root, group in itertools.groupby(rows, key=itemgetter(0)):
+            yield root, [], [name for _, name in group]
+
+    def files(
+        self,
+        larger_than: Optional[int] = None,
+        smaller_than: Optional[int] = None,
+        types: Tuple[str, ...] = ("file",),
+    ) -> Iterator[Tuple[str, int]]:
+        """Yield (path, size) for regular files (or the given types), optionally bounded by size."""
+        for root, name, size in self._select("root, name, size", larger_than, smaller_than, types):
+            yield os.path.join(root, name), size
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+_inventories: Dict[tuple, FileInventory] = {}
+_inventories_lock = threading.Lock()
+
+
+def get_inventory(mnt: str, refresh: bool = False) -> FileInventory:
+    """
+    Get the inventory for a mount point, walking it on first use.
+
+    Inventories are keyed by path and device, so a different filesystem
+    mounted at the same path gets a new walk. Paths are reported under
+    `mnt` exactly as given, as os.walk would. The databases live in the
+    temp directory rather than the case directory, so they are never
+    hashed, collected or archived as case output.
+    """
+    try:
+        key = (mnt, os.stat(mnt).st_dev)
+    except OSError:
+        key = (mnt, None)
+    with _inventories_lock:
+        inventory = _inventories.get(key)
+        if inventory is not None and not refresh:
+            return inventory
+        if inventory is not None:
+            inventory.close()
+        directory = os.path.join(tempfile.gettempdir(), "rivendell_inventory")
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha1("{}|{}".format(os.path.abspath(mnt), os.getpid()).encode()).hexdigest()
+        inventory = FileInventory(mnt, os.path.join(directory, "inventory_{}.db".format(digest[:12])))
+        inventory.build()
+        _inventories[key] = inventory
+        return inventory
+
+
+def _remove_inventories():
+    for inventory in _inventories.values():
+        inventory.close()
+        try:
+            os.remove(inventory.db_path)
+        except OSError:
+            pass
+
+
+atexit.register(_remove_inventories)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3 -tt
+"""
+Deferred Imports
+
+elrond runs every phase as a fresh `python3 elrond.py` process, and only a
+few of the process_*, post and MITRE modules are needed by any one phase.
+Dispatch tables and entry points bind their callables through
+lazy_callable() so that a module is imported the first time one of its
+functions is called rather than when the table is built. lazy_module()
+wraps importlib's LazyLoader for modules that are used as a namespace.
+"""
+
+import importlib
+import importlib.util
+import sys
+from typing import Any, Callable
+
+
+def lazy_callable(module: str, name: str) -> Callable[..., Any]:
+    """
+    Callable standing in for module.name, importing the module on first call.
+
+    The real function is resolved once and cached; later calls go straight
+    to it.
+    """
+    target = None
+
+    def call(*args, **kwargs):
+        nonlocal target
+        if target is None:
+            target = getattr(importlib.import_module(module), name)
+        return target(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    call.__module__ = module
+    call.__doc__ = "Deferred {}.{}".format(module, name)
+    return call
+
+
+def lazy_module(name: str):
+    """
+    Module object for name whose body only runs on first attribute access.
+
+    Returns the already-imported module if there is one.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ImportError("No module named '{}'".format(name), name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
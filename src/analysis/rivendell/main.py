@@ -9,13 +9,29 @@ import time
 from collections import OrderedDict
 from datetime import datetime
 
-from rivendell.core.core import collect_process_keyword_analysis_timeline
 from rivendell.audit import write_audit_log_entry
-from rivendell.core.gandalf import assess_gandalf
-from rivendell.core.identify import identify_memory_image
-from rivendell.meta import extract_metadata
-from rivendell.mount import mount_images
-from rivendell.mount import unmount_images
+from rivendell.checkpoint import has_checkpoints
+from rivendell.lazy import lazy_callable
+from rivendell.utils import safe_input, is_noninteractive, safe_print
+
+# Phase entry points are imported on first call so each per-phase
+# `elrond.py` process only loads the modules that phase runs.
+collect_process_keyword_analysis_timeline = lazy_callable(
+    "rivendell.core.core", "collect_process_keyword_analysis_timeline"
+)
+build_artefact_store = lazy_callable("rivendell.artefact_store", "build_artefact_store")
+assess_gandalf = lazy_callable("rivendell.core.gandalf", "assess_gandalf")
+identify_memory_image = lazy_callable("rivendell.core.identify", "identify_memory_image")
+extract_metadata = lazy_callable("rivendell.meta", "extract_metadata")
+mount_images = lazy_callable("rivendell.mount", "mount_images")
+unmount_images = lazy_callable("rivendell.mount", "unmount_images")
+archive_artefacts = lazy_callable("rivendell.post.clean", "archive_artefacts")
+delete_artefacts = lazy_callable("rivendell.post.clean", "delete_artefacts")
+cleanup_small_files_and_empty_dirs = lazy_callable("rivendell.post.clean", "cleanup_small_files_and_empty_dirs")
+configure_elastic_stack = lazy_callable("rivendell.post.elastic.config", "configure_elastic_stack")
+configure_navigator = lazy_callable("rivendell.post.mitre.nav_config", "configure_navigator")
+configure_splunk_stack = lazy_callable("rivendell.post.splunk.config", "configure_splunk_stack")
+run_yara_signatures = lazy_callable("rivendell.post.yara", "run_yara_signatures")
 
 
 def is_memory_image(filename, imgformat, filepath=None):
@@ -60,16 +76,6 @@ def is_memory_image(filename, imgformat, filepath=None):
     return False
 
 
-from rivendell.post.clean import archive_artefacts
-from rivendell.post.clean import delete_artefacts
-from rivendell.post.clean import cleanup_small_files_and_empty_dirs
-from rivendell.post.elastic.config import configure_elastic_stack
-from rivendell.post.mitre.nav_config import configure_navigator
-from rivendell.post.splunk.config import configure_splunk_stack
-from rivendell.post.yara import run_yara_signatures
-from rivendell.utils import safe_input, is_noninteractive, safe_print
-
-
 def main(
     directory,
     case,
@@ -116,6 +122,7 @@ def main(
     skip_unmount=False,  # Skip unmounting previous images (for multi-image phased processing)
     phase=None,  # Phase control: "mount", "collect", "process", or None for full pipeline
     mounted_imgs=None,  # Pre-populated imgs dict from mount phase (for collect/process phases)
+    resume=False,  # Reuse existing image output directories from an interrupted run
 ):
     partitions = []
     hashing_enabled = hashall or hashcollected
@@ -463,6 +470,17 @@ def main(
                                         )
                                     )
                                     sys.exit()
+                            elif resume and has_checkpoints(output_directory):
+                                # Interrupted run: completed work is skipped via the checkpoint manifest
+                                foundimgs.append(
+                                    os.path.join(root, f)
+                                    + "||"
+                                    + root
+                                    + "||"
+                                    + f
+                                    + "||"
+                                    + imgformat
+                                )
                             else:
                                 print(
                                     "\n    '{}' already exists in '{}'\n     Please remove it before trying again.\n\n\n".format(
@@ -1070,6 +1088,10 @@ def main(
         # Clean up small files (<10 bytes) and empty directories after processing
         cleanup_small_files_and_empty_dirs(output_directory)
 
+        # Load cooked artefacts into the queryable artefact store (only new or changed files on re-runs)
+        if process:
+            build_artefact_store(verbosity, output_directory, imgs)
+
         # PHASE CONTROL: If analyse-only phase, return after analysis (before indexing)
         if phase == "analyse":
             print("  -> Analyse phase complete.")
@@ -6,6 +6,7 @@ import subprocess
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.profiling import tool_span
 
 # Try to import volatility plugins - they may not be installed
 try:
@@ -52,24 +53,25 @@ def use_plugins(
             vol_cmd = "/usr/local/bin/vol.py"
             if not os.path.exists(vol_cmd):
                 vol_cmd = "vol"  # Fallback to 'vol' command
-            plugoutlist = (
-                str(
-                    subprocess.Popen(
-                        [
-                            vol_cmd,
-                            "-f",
-                            artefact + memext,
-                            "-r",  # Specify renderer
-                            "json",  # Use JSON output format for easier parsing
-                            plugin,
-                        ],
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                    ).communicate()[0]
-                )[2:-1]
-                .replace("\\\\n", "\\\\ n")
-                .split("\\n")
-            )
+            with tool_span("volatility " + plugin, artefact + memext):
+                plugoutlist = (
+                    str(
+                        subprocess.Popen(
+                            [
+                                vol_cmd,
+                                "-f",
+                                artefact + memext,
+                                "-r",  # Specify renderer
+                                "json",  # Use JSON output format for easier parsing
+                                plugin,
+                            ],
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE,
+                        ).communicate()[0]
+                    )[2:-1]
+                    .replace("\\\\n", "\\\\ n")
+                    .split("\\n")
+                )
             if "Windows" in profile or profile.startswith("Win"):
                 jsonlist = windows_vol3(
                     output_directory,
@@ -6,6 +6,7 @@ import time
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.profiling import tool_span
 from rivendell.utils import safe_input
 
 
@@ -30,24 +31,25 @@ def run_clamscan(verbosity, output_directory, loc, img, collectfiles):
         os.mkdir(output_directory + img.split("::")[0] + "/analysis")
     if not os.path.exists(output_directory + img.split("::")[0] + "/analysis/ClamAV"):
         os.mkdir(output_directory + img.split("::")[0] + "/analysis/ClamAV")
-    clam_results = subprocess.Popen(
-        [
-            "clamscan",
-            "-raio",
-            "--gen-json",
-            "--leave-temps",
-            "--tempdir={}/analysis/ClamAV".format(
-                os.path.join(output_directory, img.split("::")[0])
-            ),
-            "--no-summary",
-            "--log={}/analysis/ClamAVScan.log".format(
-                os.path.join(output_directory, img.split("::")[0])
-            ),
-            clam_dir,
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    ).communicate()[0]
+    with tool_span("clamscan", clam_dir):
+        clam_results = subprocess.Popen(
+            [
+                "clamscan",
+                "-raio",
+                "--gen-json",
+                "--leave-temps",
+                "--tempdir={}/analysis/ClamAV".format(
+                    os.path.join(output_directory, img.split("::")[0])
+                ),
+                "--no-summary",
+                "--log={}/analysis/ClamAVScan.log".format(
+                    os.path.join(output_directory, img.split("::")[0])
+                ),
+                clam_dir,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        ).communicate()[0]
     with open(
         "{}/analysis/ClamAVScan.log".format(
             os.path.join(output_directory, img.split("::")[0])
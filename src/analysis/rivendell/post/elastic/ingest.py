@@ -13,9 +13,9 @@ import urllib.error
 import ssl
 import base64
 from datetime import datetime
-from io import StringIO
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.utils import iter_json_records
 
 
 def normalize_timestamp(record):
@@ -245,10 +245,10 @@ def convert_json_to_ndjson(output_directory, case, img, root_dir):
                 os.path.join(atftroot, atftfile)
             ) > 0 and atftfile.endswith(".json"):
                 try:
-                    with open(os.path.join(atftroot, atftfile)) as read_json:
-                        json_content = read_json.read()
-                    in_json = StringIO(json_content)
-                    results = [json.dumps(record) for record in json.load(in_json)]
+                    results = (
+                        json.dumps(record)
+                        for record in iter_json_records(os.path.join(atftroot, atftfile))
+                    )
                     with open(
                         os.path.join(atftroot, atftfile)[0:-5] + ".ndjson", "w"
                     ) as write_json:
@@ -561,8 +561,6 @@ def ingest_elastic_data_remote(
 
     # Batch size for bulk ingestion (number of records per batch)
     BATCH_SIZE = 1000
-    # Large file threshold (50MB) - files larger than this use streaming
-    LARGE_FILE_THRESHOLD = 50 * 1024 * 1024
 
     imgs_to_ingest = []
     for _, img in allimgs.items():
@@ -678,135 +676,26 @@ def ingest_elastic_data_remote(
 
         for filepath in files_to_ingest:
             filename = os.path.basename(filepath)
-            file_size = os.path.getsize(filepath)
 
             try:
                 bulk_data = []
                 records_processed = 0
 
                 if filepath.endswith('.json'):
-                    # Check if file is large - use streaming for large files
-                    if file_size > LARGE_FILE_THRESHOLD:
-                        # Stream large JSON files line by line
-                        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-                            # Try to detect if it's a JSON array by peeking
-                            first_char = f.read(1)
-                            f.seek(0)
-
-                            if first_char == '[':
-                                # JSON array - use ijson-style streaming (manual parsing)
-                                # Read in chunks and extract objects
-                                buffer = ""
-                                depth = 0
-                                in_string = False
-                                escape_next = False
-                                obj_start = -1
-
-                                for chunk in iter(lambda: f.read(8192), ''):
-                                    for i, char in enumerate(chunk):
-                                        if escape_next:
-                                            escape_next = False
-                                            continue
-                                        if char == '\\' and in_string:
-                                            escape_next = True
-                                            continue
-                                        if char == '"' and not escape_next:
-                                            in_string = not in_string
-                                            continue
-                                        if in_string:
-                                            continue
-
-                                        if char == '{':
-                                            if depth == 0:
-                                                obj_start = len(buffer) + i
-                                            depth += 1
-                                        elif char == '}':
-                                            depth -= 1
-                                            if depth == 0 and obj_start >= 0:
-                                                # Extract object
-                                                obj_str = buffer[obj_start:] + chunk[:i+1]
-                                                try:
-                                                    record = json.loads(obj_str)
-                                                    record['hostname'] = img_name
-                                                    record['artefact'] = filename
-                                                    normalize_timestamp(record)
-                                                    bulk_data.append(json.dumps({"index": {"_index": case.lower()}}))
-                                                    bulk_data.append(json.dumps(record))
-                                                    records_processed += 1
-
-                                                    # Send batch when full
-                                                    if len(bulk_data) >= BATCH_SIZE * 2:
-                                                        send_bulk_to_elastic(bulk_data, elastic_url, auth_header, ssl_context, case)
-                                                        bulk_data = []
-                                                except:
-                                                    pass
-                                                obj_start = -1
-                                                buffer = ""
-                                                continue
-
-                                    buffer += chunk
-                                    # Trim buffer if no object in progress
-                                    if obj_start == -1:
-                                        buffer = ""
-                            else:
-                                # JSON lines format - read line by line
-                                for line in f:
-                                    if line.strip():
-                                        try:
-                                            record = json.loads(line)
-                                            record['hostname'] = img_name
-                                            record['artefact'] = filename
-                                            normalize_timestamp(record)
-                                            bulk_data.append(json.dumps({"index": {"_index": case.lower()}}))
-                                            bulk_data.append(json.dumps(record))
-                                            records_processed += 1
-
-                                            # Send batch when full
-                                            if len(bulk_data) >= BATCH_SIZE * 2:
-                                                send_bulk_to_elastic(bulk_data, elastic_url, auth_header, ssl_context, case)
-                                                bulk_data = []
-                                        except:
-                                            pass
-                    else:
-                        # Small files - load entirely
-                        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-                            try:
-                                content = f.read()
-                                # Handle JSON lines format
-                                if '\n' in content and not content.strip().startswith('['):
-                                    for line in content.strip().split('\n'):
-                                        if line.strip():
-                                            try:
-                                                record = json.loads(line)
-                                                record['hostname'] = img_name
-                                                record['artefact'] = filename
-                                                normalize_timestamp(record)
-                                                bulk_data.append(json.dumps({"index": {"_index": case.lower()}}))
-                                                bulk_data.append(json.dumps(record))
-                                                records_processed += 1
-                                            except:
-                                                pass
-                                else:
-                                    # Regular JSON array
-                                    records = json.loads(content)
-                                    if isinstance(records, list):
-                                        for record in records:
-                                            if isinstance(record, dict):
-                                                record['hostname'] = img_name
-                                                record['artefact'] = filename
-                                                normalize_timestamp(record)
-                                                bulk_data.append(json.dumps({"index": {"_index": case.lower()}}))
-                                                bulk_data.append(json.dumps(record))
-                                                records_processed += 1
-                                    elif isinstance(records, dict):
-                                        records['hostname'] = img_name
-                                        records['artefact'] = filename
-                                        normalize_timestamp(records)
-                                        bulk_data.append(json.dumps({"index": {"_index": case.lower()}}))
-                                        bulk_data.append(json.dumps(records))
-                                        records_processed += 1
-                            except json.JSONDecodeError:
-                                pass
+                    # JSON arrays, JSON lines (e.g. merged journal_mft.json) and
+                    # single objects are all decoded one record at a time
+                    for record in iter_json_records(filepath):
+                        record['hostname'] = img_name
+                        record['artefact'] = filename
+                        normalize_timestamp(record)
+                        bulk_data.append(json.dumps({"index": {"_index": case.lower()}}))
+                        bulk_data.append(json.dumps(record))
+                        records_processed += 1
+
+                        # Send batch when full
+                        if len(bulk_data) >= BATCH_SIZE * 2:
+                            send_bulk_to_elastic(bulk_data, elastic_url, auth_header, ssl_context, case)
+                            bulk_data = []
 
                 elif filepath.endswith('.csv'):
                     with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
@@ -1498,6 +1498,13 @@ ATTACK_TECHNIQUES: Dict[str, Dict] = {
 }
 
 
+# Tactic name (lower case) -> technique IDs, built once at import
+_TECHNIQUES_BY_TACTIC: Dict[str, List[str]] = {}
+for _tech_id, _data in ATTACK_TECHNIQUES.items():
+    for _tactic in _data.get("tactics", []):
+        _TECHNIQUES_BY_TACTIC.setdefault(_tactic.lower(), []).append(_tech_id)
+
+
 def get_technique_data(technique_id: str) -> Optional[Dict]:
     """
     Get full metadata for a MITRE ATT&CK technique.
@@ -1526,15 +1533,10 @@ def get_techniques_for_tactic(tactic: str) -> List[Dict]:
     Returns:
         List of technique data dictionaries
     """
-    tactic_lower = tactic.lower()
-    results = []
-
-    for tech_id, data in ATTACK_TECHNIQUES.items():
-        tactics = [t.lower() for t in data.get("tactics", [])]
-        if tactic_lower in tactics:
-            results.append({"technique_id": tech_id, **data})
-
-    return results
+    return [
+        {"technique_id": tech_id, **ATTACK_TECHNIQUES[tech_id]}
+        for tech_id in _TECHNIQUES_BY_TACTIC.get(tactic.lower(), [])
+    ]
 
 
 def enrich_technique(technique_id: str) -> Dict:
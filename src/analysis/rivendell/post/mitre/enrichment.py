@@ -16,14 +16,20 @@ Version: 3.0.0
 import json
 import os
 import logging
-import gc
+import weakref
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Set, TextIO
 from datetime import datetime
 
-# Techniques file name - written incrementally during enrichment
+from rivendell.utils import iter_json_records
+
+# Techniques file name - written once per directory, deduplicated
 TECHNIQUES_FILE = "mitre_techniques.txt"
 
+# Characters carried between chunks when scanning files that are not JSON
+TEXT_OVERLAP = 4096
+
 # Import the content-based pattern matcher
 try:
     from rivendell.post.mitre.patterns import get_pattern_matcher, scan_json_record
@@ -37,19 +43,24 @@ except ImportError:
         get_pattern_matcher = None
         scan_json_record = None
 
-# Import the comprehensive ATT&CK data
+# Import the comprehensive ATT&CK data (the static table is only executed
+# when the first technique is enriched)
 try:
-    from rivendell.post.mitre.attack_data import get_technique_data, enrich_technique, ATTACK_TECHNIQUES
+    from rivendell.lazy import lazy_module
+    attack_data = lazy_module("rivendell.post.mitre.attack_data")
     ATTACK_DATA_AVAILABLE = True
 except ImportError:
     try:
-        from .attack_data import get_technique_data, enrich_technique, ATTACK_TECHNIQUES
+        from . import attack_data
         ATTACK_DATA_AVAILABLE = True
     except ImportError:
         ATTACK_DATA_AVAILABLE = False
-        get_technique_data = None
-        enrich_technique = None
-        ATTACK_TECHNIQUES = {}
+        attack_data = None
+
+try:
+    from rivendell.post.mitre.knowledge_base import get_knowledge_base
+except ImportError:
+    from .knowledge_base import get_knowledge_base
 
 # Try to import the MITRE modules (legacy)
 try:
@@ -236,6 +247,22 @@ class MitreEnrichment:
         ],
     }
 
+    # Fields scanned per artefact type (a field is scanned if its name contains
+    # one of these); types not listed have every field scanned. Keeps the
+    # high-volume artefacts from running every pattern over timestamps,
+    # sizes and flags.
+    ARTEFACT_FIELDS = {
+        "mft": ("name", "path", "directory", "attribute", "ads"),
+        "usnjrnl": ("name", "path", "reason", "attribute"),
+        "eventlogs": ("data", "event", "message", "channel", "provider", "command", "process", "image", "service", "task", "script"),
+        "srum": ("app", "path", "name", "user", "interface"),
+        "prefetch": ("name", "path", "volume", "file"),
+        "shimcache": ("path", "name", "entry"),
+        "amcache": ("path", "name", "publisher", "program", "command"),
+        "browser_history": ("url", "title", "path", "file", "host"),
+        "browser_download": ("url", "path", "file", "referrer", "host"),
+    }
+
     # Technique to threat groups mapping (commonly observed)
     TECHNIQUE_GROUPS = {
         "T1059": ["APT28", "APT29", "Lazarus Group", "FIN7", "Wizard Spider"],
@@ -268,64 +295,29 @@ class MitreEnrichment:
     def __init__(self, cache_dir: Optional[str] = None):
         """Initialize MITRE enrichment."""
         self.logger = logging.getLogger(__name__)
+        self._enrichment_cache = {}
         self.updater = None
         self.mapper = None
         self.attck_data = None
         self.groups_by_technique = {}
 
-        # Try to load ATT&CK data if modules are available
+        # Shared ATT&CK knowledge base: loaded once per process with prebuilt relationship indexes
+        try:
+            knowledge_base = get_knowledge_base(cache_dir)
+        except Exception as e:
+            knowledge_base = None
+            self.logger.warning(f"Could not load ATT&CK data: {e}")
+        if knowledge_base:
+            self.attck_data = knowledge_base.data
+            self.groups_by_technique = knowledge_base.groups_by_technique
+
         if MITRE_AVAILABLE:
             try:
                 self.updater = MitreAttackUpdater(cache_dir)
                 self.mapper = TechniqueMapper(self.updater)
-                self.attck_data = self.updater.load_cached_data()
-                if self.attck_data:
-                    self._build_groups_by_technique()
             except Exception as e:
                 self.logger.warning(f"Could not load ATT&CK data: {e}")
 
-    def _build_groups_by_technique(self):
-        """Build mapping of technique IDs to threat groups from relationships."""
-        if not self.attck_data:
-            return
-
-        relationships = self.attck_data.get("relationships", [])
-        groups = self.attck_data.get("groups", {})
-        techniques = self.attck_data.get("techniques", {})
-
-        # Build STIX ID to technique ID mapping
-        stix_to_tech = {}
-        for tech_id, tech_data in techniques.items():
-            stix_id = tech_data.get("stix_id")
-            if stix_id:
-                stix_to_tech[stix_id] = tech_id
-
-        # Build STIX ID to group name mapping
-        stix_to_group = {}
-        for group_id, group_data in groups.items():
-            stix_id = group_data.get("stix_id")
-            if stix_id:
-                stix_to_group[stix_id] = group_data.get("name", group_id)
-
-        # Parse relationships to find group->technique "uses" relationships
-        for rel in relationships:
-            if rel.get("type") == "uses":
-                source = rel.get("source")
-                target = rel.get("target")
-
-                # Check if source is a group and target is a technique
-                if source in stix_to_group and target in stix_to_tech:
-                    tech_id = stix_to_tech[target]
-                    group_name = stix_to_group[source]
-
-                    if tech_id not in self.groups_by_technique:
-                        self.groups_by_technique[tech_id] = []
-
-                    if group_name not in self.groups_by_technique[tech_id]:
-                        self.groups_by_technique[tech_id].append(group_name)
-
-        self.logger.info(f"Built groups mapping for {len(self.groups_by_technique)} techniques")
-
     def get_groups_for_technique(self, technique_id: str) -> List[str]:
         """Get threat groups known to use a technique."""
         # First try dynamic data from ATT&CK
@@ -351,7 +343,58 @@ class MitreEnrichment:
 
         return enriched
 
-    def enrich_json_record(self, record: Dict, artefact_type: str) -> Dict:
+    def record_techniques(self, record: Dict, artefact_type: Optional[str]) -> Set[str]:
+        """
+        Technique IDs for a record: the artefact type's base techniques plus
+        content matches in the fields that artefact type is scanned on.
+        """
+        artefact_type = (artefact_type or "").lower().replace(" ", "_")
+        techniques = set(self._base_technique_ids(artefact_type))
+        if PATTERNS_AVAILABLE and scan_json_record:
+            fields = self.ARTEFACT_FIELDS.get(artefact_type)
+            if fields:
+                record = {
+                    name: value for name, value in record.items()
+                    if any(fragment in name.lower() for fragment in fields)
+                }
+            techniques.update(scan_json_record(record))
+        return techniques
+
+    def _base_technique_ids(self, artefact_type: str) -> List[str]:
+        return [tech["technique_id"] for tech in self.ARTEFACT_TECHNIQUES.get(artefact_type, [])]
+
+    def _enrichment_fields(self, technique_ids: tuple, artefact_type: str) -> Dict:
+        """MITRE fields for a set of techniques, built once per distinct set."""
+        key = (technique_ids, artefact_type)
+        fields = self._enrichment_cache.get(key)
+        if fields is not None:
+            return fields
+        fields = {}
+        if ATTACK_DATA_AVAILABLE:
+            # Full metadata for the primary technique (first in sorted order)
+            primary_data = attack_data.enrich_technique(technique_ids[0])
+            for name in (
+                "mitre_technique_id", "mitre_technique_name", "mitre_tactics", "mitre_description",
+                "mitre_groups", "mitre_software", "mitre_procedure_examples",
+            ):
+                fields[name] = primary_data[name]
+            if len(technique_ids) > 1:
+                fields["mitre_techniques"] = [attack_data.enrich_technique(tid) for tid in technique_ids]
+        else:
+            # Fallback to basic enrichment without full ATT&CK data
+            base_techniques = self.get_techniques_for_artefact(artefact_type)
+            if base_techniques:
+                primary = base_techniques[0]
+                fields["mitre_technique_id"] = primary["technique_id"]
+                fields["mitre_technique_name"] = primary["technique_name"]
+                fields["mitre_tactics"] = primary["tactics"]
+                fields["mitre_groups"] = primary.get("groups", [])
+                if len(base_techniques) > 1:
+                    fields["mitre_techniques"] = base_techniques
+        self._enrichment_cache[key] = fields
+        return fields
+
+    def enrich_json_record(self, record: Dict, artefact_type: str, techniques: Optional[Set[str]] = None) -> Dict:
         """
         Add MITRE ATT&CK metadata to a JSON record.
 
@@ -365,59 +408,77 @@ class MitreEnrichment:
         Args:
             record: The JSON record to enrich
             artefact_type: Type of artefact (e.g., 'prefetch', 'browser_history')
+            techniques: Technique IDs already found for the record (scanned if not given)
 
         Returns:
             Enriched record with full MITRE metadata
         """
-        all_technique_ids = set()
+        if techniques is None:
+            techniques = self.record_techniques(record, artefact_type)
+        if techniques:
+            record.update(self._enrichment_fields(tuple(sorted(techniques)), artefact_type))
+        return record
 
-        # 1. Get base techniques from artefact type
-        base_techniques = self.get_techniques_for_artefact(artefact_type)
-        for tech in base_techniques:
-            all_technique_ids.add(tech["technique_id"])
+    def enrich_json_file(self, filepath: str, artefact_type: Optional[str] = None) -> Set[str]:
+        """
+        Enrich a JSON artefact file in one pass and return its technique IDs.
 
-        # 2. Use content-based pattern matching for additional techniques
-        if PATTERNS_AVAILABLE and scan_json_record:
-            content_techniques = scan_json_record(record)
-            all_technique_ids.update(content_techniques)
-
-        if not all_technique_ids:
-            return record
-
-        # 3. Build full enrichment data for all techniques
-        if ATTACK_DATA_AVAILABLE and enrich_technique:
-            # Get full metadata for primary technique (first from base or content)
-            technique_ids = sorted(all_technique_ids)
-            primary_id = technique_ids[0]
-            primary_data = enrich_technique(primary_id)
-
-            # Add primary technique fields
-            record["mitre_technique_id"] = primary_data["mitre_technique_id"]
-            record["mitre_technique_name"] = primary_data["mitre_technique_name"]
-            record["mitre_tactics"] = primary_data["mitre_tactics"]
-            record["mitre_description"] = primary_data["mitre_description"]
-            record["mitre_groups"] = primary_data["mitre_groups"]
-            record["mitre_software"] = primary_data["mitre_software"]
-            record["mitre_procedure_examples"] = primary_data["mitre_procedure_examples"]
-
-            # Add all techniques if more than one
-            if len(technique_ids) > 1:
-                record["mitre_techniques"] = [
-                    enrich_technique(tid) for tid in technique_ids
-                ]
-        else:
-            # Fallback to basic enrichment without full ATT&CK data
-            if base_techniques:
-                primary = base_techniques[0]
-                record["mitre_technique_id"] = primary["technique_id"]
-                record["mitre_technique_name"] = primary["technique_name"]
-                record["mitre_tactics"] = primary["tactics"]
-                record["mitre_groups"] = primary.get("groups", [])
+        Records are decoded incrementally (JSON array, JSON lines or a single
+        object), scanned and enriched one at a time, and written to a sibling
+        file that replaces the original once the whole file has decoded. The
+        layout is kept: arrays are written one record per line, JSON lines
+        stay JSON lines. Files that do not (wholly) decode are left untouched
+        and scanned as text, so techniques past a corrupt record still count.
 
-                if len(base_techniques) > 1:
-                    record["mitre_techniques"] = base_techniques
+        Args:
+            filepath: Path to JSON file
+            artefact_type: Type of artefact (auto-detected if not provided)
 
-        return record
+        Returns:
+            Set of technique IDs found in the file
+        """
+        if os.path.getsize(filepath) == 0:
+            return set()
+        if not artefact_type:
+            artefact_type = self._detect_artefact_type(filepath)
+        techniques = set()
+        layout = _json_layout(filepath) if artefact_type else None
+        partial = filepath + ".enriching"
+        writer = None
+        try:
+            with (open(partial, "w", encoding="utf-8") if layout else _NullOutput()) as output:
+                writer = _RecordWriter(output, layout, filepath.endswith(".jsonl"))
+                for record in iter_json_records(filepath, strict=True):
+                    record_techniques = self.record_techniques(record, artefact_type)
+                    techniques.update(record_techniques)
+                    if layout:
+                        self.enrich_json_record(record, artefact_type, record_techniques)
+                    writer.write(record)
+                writer.close()
+        except ValueError:
+            # Not (wholly) JSON: keep what was found and scan the text itself,
+            # which covers the records after the one that failed
+            techniques.update(self._scan_text(filepath))
+            layout = None
+        finally:
+            if layout and writer is not None and writer.count:
+                os.replace(partial, filepath)
+            elif os.path.exists(partial):
+                os.remove(partial)
+        return techniques
+
+    def _scan_text(self, filepath: str) -> Set[str]:
+        techniques = set()
+        if not PATTERNS_AVAILABLE:
+            return techniques
+        matcher = get_pattern_matcher()
+        tail = ""
+        with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), ""):
+                # Carry a short tail over so matches straddling chunks are kept
+                techniques.update(matcher.match_content(tail + chunk))
+                tail = chunk[-TEXT_OVERLAP:]
+        return techniques
 
     def enrich_json_file_streaming(self, filepath: str, techniques_file: TextIO, artefact_type: Optional[str] = None) -> bool:
         """
@@ -426,8 +487,8 @@ class MitreEnrichment:
         Uses content-based pattern matching to identify techniques from the actual
         artefact content, ensuring consistent results independent of SIEM platform.
 
-        Writes discovered techniques directly to the techniques file to avoid
-        keeping them in memory. Processes files line-by-line for large files.
+        See enrich_json_file. Techniques are appended to techniques_file only
+        if they are not already recorded in it.
 
         Args:
             filepath: Path to JSON file
@@ -438,142 +499,14 @@ class MitreEnrichment:
             True if successful, False otherwise
         """
         try:
-            # Check file size - skip empty files
-            file_size = os.path.getsize(filepath)
-            if file_size == 0:
-                return True
-
-            # Auto-detect artefact type from filename if not provided
-            if not artefact_type:
-                artefact_type = self._detect_artefact_type(filepath)
-
-            # Get base techniques for this artefact type
-            base_techniques = set()
-            if artefact_type:
-                for tech in self.get_techniques_for_artefact(artefact_type):
-                    tech_id = tech.get("technique_id")
-                    if tech_id:
-                        base_techniques.add(tech_id)
-
-            # For large files (>10MB), use streaming content scanning
-            if file_size > 10 * 1024 * 1024:  # > 10MB
-                # Write base techniques
-                for tech_id in base_techniques:
-                    techniques_file.write(f"{tech_id}\n")
-
-                # Stream through file to find patterns without loading all into memory
-                if PATTERNS_AVAILABLE:
-                    try:
-                        with open(filepath, 'r') as f:
-                            # Read in chunks and scan for patterns
-                            chunk_size = 1024 * 1024  # 1MB chunks
-                            while True:
-                                chunk = f.read(chunk_size)
-                                if not chunk:
-                                    break
-                                chunk_techniques = get_pattern_matcher().match_content(chunk)
-                                for tech_id in chunk_techniques:
-                                    techniques_file.write(f"{tech_id}\n")
-                    except Exception as e:
-                        self.logger.warning(f"Error streaming large file {filepath}: {e}")
-
-                techniques_file.flush()
-                return self._enrich_large_file(filepath, artefact_type)
-
-            # For smaller files, use content-based pattern matching
-            with open(filepath, 'r') as f:
-                content = f.read().strip()
-
-            if not content:
-                return True
-
-            # Parse JSON
-            try:
-                data = json.loads(content)
-            except json.JSONDecodeError:
-                # Try to scan raw content even if JSON is invalid
-                if PATTERNS_AVAILABLE:
-                    content_techniques = get_pattern_matcher().match_content(content)
-                    for tech_id in content_techniques:
-                        techniques_file.write(f"{tech_id}\n")
-                    techniques_file.flush()
-                return True
-
-            del content
-            gc.collect()
-
-            if isinstance(data, list) and len(data) == 0:
-                return True
-
-            # Collect all techniques from content-based scanning
-            all_techniques = set(base_techniques)
-
-            # Use content-based pattern matching if available
-            if PATTERNS_AVAILABLE:
-                if isinstance(data, list):
-                    # Scan ALL records for comprehensive technique detection
-                    # This is critical for consistent Navigator results
-                    for record in data:
-                        if isinstance(record, dict):
-                            record_techniques = scan_json_record(record)
-                            all_techniques.update(record_techniques)
-                elif isinstance(data, dict):
-                    record_techniques = scan_json_record(data)
-                    all_techniques.update(record_techniques)
-
-            # Write all discovered techniques to file
-            for tech_id in all_techniques:
-                techniques_file.write(f"{tech_id}\n")
-            techniques_file.flush()
-
-            # Enrich records with MITRE metadata (using artefact type for primary technique)
-            if artefact_type:
-                if isinstance(data, list):
-                    enriched = []
-                    for record in data:
-                        if isinstance(record, dict):
-                            enriched.append(self.enrich_json_record(record, artefact_type))
-                    del data
-                    gc.collect()
-                else:
-                    enriched = self.enrich_json_record(data, artefact_type)
-                    del data
-                    gc.collect()
-
-                # Write back
-                with open(filepath, 'w') as f:
-                    json.dump(enriched, f, indent=2)
-
-                del enriched
-                gc.collect()
-
-            return True
-
-        except json.JSONDecodeError:
-            return True  # Skip invalid JSON
+            techniques = self.enrich_json_file(filepath, artefact_type)
         except MemoryError:
-            self.logger.warning(f"Memory error processing {filepath}, techniques still recorded")
-            gc.collect()
-            return True  # Techniques were already written
+            self.logger.warning(f"Memory error processing {filepath}")
+            return True
         except Exception as e:
             self.logger.error(f"Error enriching {filepath}: {e}")
             return False
-
-    def _enrich_large_file(self, filepath: str, artefact_type: str) -> bool:
-        """
-        Enrich a large JSON file - for large files, skip JSON modification
-        to avoid memory issues. Techniques are already recorded to the
-        techniques file before this method is called.
-
-        For very large files (like MFT, USNJrnl, event logs), we skip
-        in-place enrichment to avoid memory/performance issues. The
-        Navigator layer will still work because techniques were already
-        written to the techniques file.
-        """
-        # For large files, just skip the JSON modification
-        # The techniques have already been recorded to the techniques file
-        # in enrich_json_file_streaming() before this method is called
-        self.logger.info(f"Skipping in-place enrichment for large file: {filepath}")
+        write_new_techniques(techniques_file, techniques)
         return True
 
     def _detect_artefact_type(self, filepath: str) -> Optional[str]:
@@ -641,27 +574,14 @@ class MitreEnrichment:
                 if filename.endswith('.json'):
                     filepath = os.path.join(root, filename)
                     try:
-                        with open(filepath, 'r') as f:
-                            data = json.load(f)
-
-                        # Handle arrays
-                        if isinstance(data, list):
-                            for record in data:
-                                if isinstance(record, dict):
-                                    tech_id = record.get("mitre_technique_id")
-                                    if tech_id:
-                                        techniques.add(tech_id)
-
-                                    # Also check for multiple techniques
-                                    multi_techs = record.get("mitre_techniques", [])
-                                    for tech in multi_techs:
-                                        if isinstance(tech, dict):
-                                            techniques.add(tech.get("technique_id"))
-                        elif isinstance(data, dict):
-                            tech_id = data.get("mitre_technique_id")
-                            if tech_id:
-                                techniques.add(tech_id)
-                    except:
+                        for record in iter_json_records(filepath):
+                            techniques.add(record.get("mitre_technique_id"))
+
+                            # Also check for multiple techniques
+                            for tech in record.get("mitre_techniques", []):
+                                if isinstance(tech, dict):
+                                    techniques.add(tech.get("mitre_technique_id") or tech.get("technique_id"))
+                    except Exception:
                         pass
 
         # Remove None if present
@@ -670,27 +590,122 @@ class MitreEnrichment:
         return techniques
 
 
-def enrich_artefacts_directory(directory: str) -> Dict:
+class _RecordWriter:
+    """Writes enriched records back in the layout they were read in."""
+
+    def __init__(self, output: TextIO, layout: Optional[str], lines: bool = False):
+        self.output = output
+        self.layout = "lines" if layout == "object" and lines else layout
+        self.count = 0
+        self._held = None
+
+    def write(self, record: Dict):
+        if self.layout == "array":
+            self.output.write(("[\n" if not self.count else ",\n") + json.dumps(record))
+        elif self.layout == "object" and not self.count:
+            self._held = record  # a single object is written back as one
+        else:
+            if self._held is not None:
+                # A second top-level object: the file is JSON lines
+                self.layout = "lines"
+                self.output.write(json.dumps(self._held) + "\n")
+                self._held = None
+            self.output.write(json.dumps(record) + "\n")
+        self.count += 1
+
+    def close(self):
+        if self.layout == "array":
+            self.output.write("\n]\n" if self.count else "[]\n")
+        elif self._held is not None:
+            json.dump(self._held, self.output, indent=2)
+
+
+class _NullOutput:
+    """Stands in for the enriched file when records are only scanned."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, text: str):
+        pass
+
+
+def _json_layout(filepath: str) -> Optional[str]:
+    """"array" or "object" from the first character; None if not rewritable."""
+    with open(filepath, "rb") as f:
+        head = f.read(4096)
+    if head[:2] == b"\x1f\x8b":
+        return None  # compressed output is scanned, not rewritten
+    head = head.lstrip()
+    if head[:1] == b"[":
+        return "array"
+    if head[:1] == b"{":
+        return "object"
+    return None
+
+
+# Techniques already in each open techniques file
+_written_techniques = weakref.WeakKeyDictionary()
+
+
+def write_new_techniques(techniques_file: TextIO, techniques: Set[str]):
+    """Append the techniques not already recorded in techniques_file."""
+    written = _written_techniques.get(techniques_file)
+    if written is None:
+        written = set()
+        techniques_file.flush()
+        try:
+            with open(techniques_file.name, "r") as f:
+                written.update(line.strip() for line in f if line.strip())
+        except (OSError, TypeError):
+            pass  # not a file on disk
+        _written_techniques[techniques_file] = written
+    for tech_id in sorted(techniques - written):
+        techniques_file.write(f"{tech_id}\n")
+    written.update(techniques)
+    techniques_file.flush()
+
+
+# Per-process enrichment used by the directory pool's workers
+_worker_enrichment: Optional[MitreEnrichment] = None
+
+
+def _enrich_file(filepath: str):
+    """(filepath, technique IDs or None on failure) for one file of a directory."""
+    global _worker_enrichment
+    if _worker_enrichment is None:
+        _worker_enrichment = MitreEnrichment()
+    try:
+        return filepath, _worker_enrichment.enrich_json_file(filepath)
+    except MemoryError:
+        _worker_enrichment.logger.warning(f"Memory error processing {filepath}")
+        return filepath, set()
+    except Exception as e:
+        _worker_enrichment.logger.error(f"Error enriching {filepath}: {e}")
+        return filepath, None
+
+
+def enrich_artefacts_directory(directory: str, workers: Optional[int] = None) -> Dict:
     """
     Enrich all JSON artefact files in a directory with MITRE metadata.
 
-    This function is memory-optimized:
-    - Writes techniques to a file as they're discovered (no memory accumulation)
-    - Uses streaming for large files (>10MB) to avoid loading into memory
-    - Processes ALL files regardless of size
-    - Uses gc.collect() to free memory between files
-
-    The techniques file (mitre_techniques.txt) is created in the parent directory
-    of the cooked folder and can be used to construct the Navigator layer.
+    Files are enriched in one streaming pass each (see
+    MitreEnrichment.enrich_json_file), spread across a process pool. Each
+    worker returns its file's technique IDs; they are merged in memory and
+    the techniques file (mitre_techniques.txt) is written once, sorted and
+    without duplicates, in the parent directory of the cooked folder, where
+    it is used to construct the Navigator layer.
 
     Args:
         directory: Path to directory containing JSON files
+        workers: Worker processes (default: CPU count; 1 enriches in-process)
 
     Returns:
         Statistics dictionary
     """
-    enrichment = MitreEnrichment()
-
     stats = {
         "total_files": 0,
         "enriched_files": 0,
@@ -715,47 +730,40 @@ def enrich_artefacts_directory(directory: str) -> Dict:
     techniques_filepath = os.path.join(parent_dir, TECHNIQUES_FILE)
     stats["techniques_file"] = techniques_filepath
 
-    # Open techniques file for writing (append mode in case of retries)
-    with open(techniques_filepath, 'w') as techniques_file:
-        # Process all JSON files
-        for filepath in json_files:
-            filename = os.path.basename(filepath)
+    techniques = set()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or total_json_files <= 1:
+        results = map(_enrich_file, json_files)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_enrich_file, json_files)
+    try:
+        for filepath, file_techniques in results:
             stats["total_files"] += 1
-
-            # Use streaming method that writes techniques directly to file
-            if enrichment.enrich_json_file_streaming(filepath, techniques_file):
-                stats["enriched_files"] += 1
-            else:
+            if file_techniques is None:
                 stats["failed_files"] += 1
+            else:
+                stats["enriched_files"] += 1
+                techniques.update(file_techniques)
 
             # Progress reporting every 100 files or at milestones
             processed = stats["total_files"]
             if processed % 100 == 0 or processed == total_json_files:
                 pct = int((processed / total_json_files) * 100) if total_json_files > 0 else 100
                 print(f" -> {datetime.now().isoformat().replace('T', ' ')} -> MITRE tagging progress: {processed}/{total_json_files} files ({pct}%)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
-            # Periodic garbage collection every 50 files
-            if stats["total_files"] % 50 == 0:
-                gc.collect()
-
-    # Read techniques file to get unique count
     try:
-        with open(techniques_filepath, 'r') as f:
-            techniques = set(line.strip() for line in f if line.strip())
-        stats["technique_count"] = len(techniques)
-        stats["techniques_found"] = techniques
-
-        # Rewrite file with unique techniques only
         with open(techniques_filepath, 'w') as f:
             for tech_id in sorted(techniques):
                 f.write(f"{tech_id}\n")
     except Exception as e:
-        logging.getLogger(__name__).error(f"Error reading techniques file: {e}")
-        stats["technique_count"] = 0
-        stats["techniques_found"] = set()
-
-    # Final garbage collection
-    gc.collect()
+        logging.getLogger(__name__).error(f"Error writing techniques file: {e}")
+    stats["technique_count"] = len(techniques)
+    stats["techniques_found"] = techniques
 
     return stats
 
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+MITRE ATT&CK Knowledge Base
+
+One process-wide copy of the parsed ATT&CK data with prebuilt lookup
+indexes (technique, tactic, group and software relationships), shared by
+MitreAttackUpdater, TechniqueMapper and MitreEnrichment.
+
+The parsed STIX JSON written by MitreAttackUpdater
+(<domain>-attack-parsed.json) is read once and the finished knowledge
+base cached next to it (<domain>-attack-kb.marshal), keyed by the bundle
+version/modified date and the parsed file's size and mtime. Later
+processes load the indexes instead of re-parsing and re-indexing, and
+every caller in a process gets the same instance from
+get_knowledge_base().
+
+The cache directory may be shared (/tmp), so the cache holds plain data
+only (marshal, never pickle) and is only read when it is owned by the
+current user and writable by no one else.
+
+Author: Rivendell DF Acceleration Suite
+Version: 1.0.0
+"""
+
+import json
+import logging
+import marshal
+import os
+import stat
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_DIR = "/tmp/rivendell/data/mitre"
+KB_FORMAT = 2
+
+_instances: Dict[tuple, "AttackKnowledgeBase"] = {}
+_lock = threading.Lock()
+logger = logging.getLogger(__name__)
+
+
+class AttackKnowledgeBase:
+    """
+    Parsed ATT&CK data plus indexes.
+
+    Attributes:
+        data: The parsed data as produced by MitreAttackUpdater.parse_stix_data
+            (shared - treat as read-only)
+        techniques_by_tactic: tactic name (lower case) -> technique IDs
+        groups_by_technique / software_by_technique: technique ID -> names
+        techniques_by_group / techniques_by_software: ATT&CK ID -> technique IDs
+        mitigations_by_technique: technique ID -> mitigation IDs
+    """
+
+    def __init__(self, data: dict, version_key: str = ""):
+        self.data = data
+        self.version_key = version_key
+        self.techniques: Dict[str, dict] = data.get("techniques", {})
+        self.tactics: Dict[str, dict] = data.get("tactics", {})
+        self.groups: Dict[str, dict] = data.get("groups", {})
+        self.software: Dict[str, dict] = data.get("software", {})
+        self.mitigations: Dict[str, dict] = data.get("mitigations", {})
+
+        self.techniques_by_tactic: Dict[str, List[str]] = {}
+        self.groups_by_technique: Dict[str, List[str]] = {}
+        self.software_by_technique: Dict[str, List[str]] = {}
+        self.techniques_by_group: Dict[str, List[str]] = {}
+        self.techniques_by_software: Dict[str, List[str]] = {}
+        self.mitigations_by_technique: Dict[str, List[str]] = {}
+        self._build_indexes()
+
+    _INDEXES = (
+        "techniques_by_tactic",
+        "groups_by_technique",
+        "software_by_technique",
+        "techniques_by_group",
+        "techniques_by_software",
+        "mitigations_by_technique",
+    )
+
+    def to_cache(self) -> dict:
+        """Plain data (dicts, lists and strings) for the on-disk cache."""
+        return {
+            "version_key": self.version_key,
+            "data": self.data,
+            "indexes": {name: getattr(self, name) for name in self._INDEXES},
+        }
+
+    @classmethod
+    def from_cache(cls, cached: dict) -> "AttackKnowledgeBase":
+        """Rebuild from to_cache() output without re-indexing."""
+        kb = cls.__new__(cls)
+        kb.data = cached["data"]
+        kb.version_key = cached["version_key"]
+        for kind in ("techniques", "tactics", "groups", "software", "mitigations"):
+            setattr(kb, kind, kb.data.get(kind, {}))
+        for name in cls._INDEXES:
+            setattr(kb, name, cached["indexes"][name])
+        return kb
+
+    def _build_indexes(self):
+        for technique_id, technique in self.techniques.items():
+            for tactic in technique.get("tactics", []):
+                self.techniques_by_tactic.setdefault(tactic.lower(), []).append(technique_id)
+
+        # Resolve relationship endpoints (STIX IDs) to ATT&CK IDs
+        stix_to_id = {}
+        for kind in ("techniques", "groups", "software", "mitigations"):
+            for object_id, obj in getattr(self, kind).items():
+                if obj.get("stix_id"):
+                    stix_to_id[obj["stix_id"]] = (kind, object_id)
+
+        for relationship in self.data.get("relationships", []):
+            source = stix_to_id.get(relationship.get("source"))
+            target = stix_to_id.get(relationship.get("target"))
+            if not source or not target or target[0] != "techniques":
+                continue
+            kind, source_id = source
+            technique_id = target[1]
+            if relationship.get("type") == "uses" and kind == "groups":
+                _append_unique(self.groups_by_technique, technique_id, self.groups[source_id].get("name", source_id))
+                _append_unique(self.techniques_by_group, source_id, technique_id)
+            elif relationship.get("type") == "uses" and kind == "software":
+                _append_unique(self.software_by_technique, technique_id, self.software[source_id].get("name", source_id))
+                _append_unique(self.techniques_by_software, source_id, technique_id)
+            elif relationship.get("type") == "mitigates" and kind == "mitigations":
+                _append_unique(self.mitigations_by_technique, technique_id, source_id)
+
+    def technique(self, technique_id: str) -> Optional[dict]:
+        return self.techniques.get(technique_id)
+
+    def techniques_for_tactic(self, tactic: str) -> List[dict]:
+        """Techniques in a tactic, by tactic name (e.g. "Execution"), case-insensitive."""
+        return [self.techniques[t] for t in self.techniques_by_tactic.get(tactic.lower(), [])]
+
+    def groups_for_technique(self, technique_id: str) -> List[str]:
+        return self.groups_by_technique.get(technique_id, [])
+
+    def software_for_technique(self, technique_id: str) -> List[str]:
+        return self.software_by_technique.get(technique_id, [])
+
+
+def _append_unique(index: Dict[str, List[str]], key: str, value: str):
+    values = index.setdefault(key, [])
+    if value not in values:
+        values.append(value)
+
+
+def _version_key(cache_dir: Path, domain: str) -> Optional[str]:
+    """Cache key for the parsed bundle on disk, or None if there is no parsed data."""
+    parsed_file = cache_dir / f"{domain}-attack-parsed.json"
+    try:
+        stat = parsed_file.stat()
+    except OSError:
+        return None
+    version = modified = ""
+    try:
+        with open(cache_dir / "version.json", "r") as f:
+            info = json.load(f)
+        version, modified = info.get("version") or "", info.get("modified") or ""
+    except (OSError, ValueError):
+        pass
+    return f"{KB_FORMAT}:{version}:{modified}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _read_cache(cache_file: Path, version_key: str) -> Optional[AttackKnowledgeBase]:
+    """The cached knowledge base, if it is ours, private and for this bundle version."""
+    try:
+        with open(cache_file, "rb") as f:
+            info = os.fstat(f.fileno())
+            if info.st_uid != os.geteuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+                logger.warning(f"Ignoring ATT&CK knowledge base cache not private to this user: {cache_file}")
+                return None
+            cached = marshal.load(f)
+        if isinstance(cached, dict) and cached.get("version_key") == version_key:
+            return AttackKnowledgeBase.from_cache(cached)
+    except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError):
+        pass
+    return None
+
+
+def load_knowledge_base(cache_dir: Optional[str] = None, domain: str = "enterprise") -> Optional[AttackKnowledgeBase]:
+    """
+    Load the knowledge base from its cache, rebuilding the cache from the parsed JSON when stale.
+
+    Returns None if the domain has never been downloaded (no parsed data).
+    """
+    cache_path = Path(cache_dir or DEFAULT_CACHE_DIR)
+    version_key = _version_key(cache_path, domain)
+    if version_key is None:
+        return None
+
+    cache_file = cache_path / f"{domain}-attack-kb.marshal"
+    kb = _read_cache(cache_file, version_key)
+    if kb is not None:
+        return kb
+
+    with open(cache_path / f"{domain}-attack-parsed.json", "r") as f:
+        kb = AttackKnowledgeBase(json.load(f), version_key)
+    try:
+        # Written to a private temporary name and renamed, so concurrent workers never read a partial cache
+        temporary = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_EXCL, 0o600)
+        with os.fdopen(descriptor, "wb") as f:
+            marshal.dump(kb.to_cache(), f)
+        os.replace(temporary, cache_file)
+    except OSError as e:
+        logger.warning(f"Could not write ATT&CK knowledge base cache: {e}")
+    logger.info(f"Built ATT&CK knowledge base for {domain} ({len(kb.techniques)} techniques)")
+    return kb
+
+
+def get_knowledge_base(cache_dir: Optional[str] = None, domain: str = "enterprise") -> Optional[AttackKnowledgeBase]:
+    """
+    Process-wide shared knowledge base for a cache directory and domain.
+
+    The instance is reloaded only when the bundle on disk changes (e.g.
+    after MitreAttackUpdater.update_local_cache).
+    """
+    key = (str(Path(cache_dir or DEFAULT_CACHE_DIR)), domain)
+    version_key = _version_key(Path(key[0]), domain)
+    kb = _instances.get(key)
+    if kb is not None and kb.version_key == version_key:
+        return kb
+    with _lock:
+        kb = _instances.get(key)
+        if kb is None or kb.version_key != version_key:
+            kb = load_knowledge_base(cache_dir, domain)
+            if kb is None:
+                _instances.pop(key, None)
+            else:
+                _instances[key] = kb
+    return kb
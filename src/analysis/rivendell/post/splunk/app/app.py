@@ -5,13 +5,16 @@ import subprocess
 
 from rivendell.post.splunk.app.nav import create_nav_menu
 from rivendell.post.splunk.app.transforms import create_transforms
-from rivendell.post.splunk.app.views.cyberchef import create_cyberchef
 from rivendell.post.splunk.app.views.views import create_htmls
 from rivendell.post.splunk.app.views.views import create_static_pages
 from rivendell.post.splunk.app.views.views import create_xmls
 from rivendell.post.splunk.app.lookups.mitre_csv_generator import generate_embedded_mitre_csv
+from rivendell.lazy import lazy_callable
 import csv
 
+# The CyberChef page is 3,000 lines of inline HTML, only loaded once the app build reaches it
+create_cyberchef = lazy_callable("rivendell.post.splunk.app.views.cyberchef", "create_cyberchef")
+
 
 def build_app_elrond(case, postpath):
     try:
@@ -439,6 +442,11 @@ label.control-label {
                         propsreports
                     )
                 )
+                propsconf.write(
+                    "[elrondTimeline]\nDATETIME_CONFIG = \nINDEXED_EXTRACTIONS = json\nKV_MODE = none\nLINE_BREAKER = ([\\r\\n]+)\nMAX_DAYS_AGO = 999999\nMAX_DAYS_HENCE = 999999\nNO_BINARY_CHECK = true\n{}\nSHOULD_LINEMERGE = false\nTIMESTAMP_FIELDS = LastWriteTime\nTIME_FORMAT = %Y-%m-%dT%H:%M:%S.%6N\nTZ = UTC\ncategory = Custom\ndescription = elrond super-timeline events (JSON lines)\ndisabled = false\npulldown_type = true\n\n".format(
+                        propsreports
+                    )
+                )
                 propsconf.write(
                     "[json_noTime]\nDATETIME_CONFIG = CURRENT\nINDEXED_EXTRACTIONS = json\nKV_MODE = none\nLINE_BREAKER = ([\\r\\n]+)\nMAX_DAYS_AGO = 999999\nMAX_DAYS_HENCE = 999999\nNO_BINARY_CHECK = true\n{}\nTIMESTAMP_FIELDS = LastWriteTime\nTIME_FORMAT = %a %b %e %H:%M:%S %Y\ncategory = Custom\ndescription = JavaScript Object Notation format. For more information, visit http://json.org/\ndisabled = false\npulldown_type = true\n\n".format(
                         propsreports
@@ -361,6 +361,11 @@ def configure_splunk_stack(verbosity, output_directory, case, stage, allimgs):
                         propsreports
                     )
                 )
+                propsconf.write(
+                    "[elrondTimeline]\nDATETIME_CONFIG = \nINDEXED_EXTRACTIONS = json\nKV_MODE = none\nLINE_BREAKER = ([\\r\\n]+)\nMAX_DAYS_AGO = 999999\nMAX_DAYS_HENCE = 999999\nNO_BINARY_CHECK = true\n{}\nSHOULD_LINEMERGE = false\nTIMESTAMP_FIELDS = LastWriteTime\nTIME_FORMAT = %Y-%m-%dT%H:%M:%S.%6N\nTZ = UTC\ncategory = Custom\ndescription = elrond super-timeline events (JSON lines)\ndisabled = false\npulldown_type = true\n\n".format(
+                        propsreports
+                    )
+                )
                 propsconf.write(
                     "[json_noTime]\nDATETIME_CONFIG = CURRENT\nINDEXED_EXTRACTIONS = json\nKV_MODE = none\nLINE_BREAKER = ([\\r\\n]+)\nMAX_DAYS_AGO = 999999\nMAX_DAYS_HENCE = 999999\nNO_BINARY_CHECK = true\n{}\nTIMESTAMP_FIELDS = LastWriteTime\nTIME_FORMAT = %a %b %e %H:%M:%S %Y\ncategory = Custom\ndescription = JavaScript Object Notation format. For more information, visit http://json.org/\ndisabled = false\npulldown_type = true\n\n".format(
                         propsreports
@@ -514,6 +519,17 @@ def configure_splunk_stack(verbosity, output_directory, case, stage, allimgs):
                     "index = {}\n\n".format(cooked_path, img_name, case)
                 )
 
+                # Add super-timeline chunks
+                if os.path.isdir(output_directory + img_name + "/artefacts/timeline"):
+                    inputs_entries.append(
+                        "[monitor://{}/artefacts/timeline/chunk_*.jsonl]\n"
+                        "disabled = false\n"
+                        "crcSalt = <SOURCE>\n"
+                        "host = {}\n"
+                        "sourcetype = elrondTimeline\n"
+                        "index = {}\n\n".format(base_path, img_name, case)
+                    )
+
                 # Add audit log file
                 inputs_entries.append(
                     "[monitor://{}/rivendell_audit.log]\n"
@@ -252,6 +252,18 @@ def ingest_splunk_data(
                                         case,
                                     )
                                 )
+                timelinedir = os.path.realpath(
+                    output_directory + img.split("::")[0] + "/artefacts/timeline"
+                )
+                if os.path.isdir(timelinedir):
+                    # super-timeline chunks (see process/supertimeline.py)
+                    inputsconf.write(
+                        "[monitor://{}/chunk_*.jsonl]\ndisabled = false\ncrcSalt = <SOURCE>\nhost = {}\nsourcetype = elrondTimeline\nindex = {}\n\n".format(
+                            timelinedir,
+                            str(img.split("::")[0]),
+                            case,
+                        )
+                    )
                 for timeroot, _, timefiles in os.walk(
                     os.path.realpath(
                         output_directory + img.split("::")[0] + "/artefacts/"
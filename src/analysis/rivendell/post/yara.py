@@ -1,54 +1,292 @@
 #!/usr/bin/env python3 -tt
+"""
+YARA scanning.
+
+All rule files are compiled into one ruleset (one namespace per rule file)
+and cached under YARA_CACHE_DIR, keyed by a hash of the rule files, so a
+rule directory is only compiled once. Compiled rules are code for the YARA
+VM, so the cache is per user and is only used while it and its files are
+owned by the current user and writable by no one else. Each target file
+is then hashed and scanned against the whole ruleset by a pool of
+workers: files up to READ_ONCE_SIZE are read once and scanned from
+memory, larger ones are hashed as a stream and mapped by YARA. Files
+whose content has already been scanned reuse the earlier result. Matches
+are streamed to analysis/yara.csv as they are found.
+
+yara-python is used when installed; otherwise the ruleset is compiled with
+yarac and scanned with `yara -C --scan-list`.
+"""
+import hashlib
+import json
 import os
-import re
+import stat
 import subprocess
-import time
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.inventory import get_inventory
+from rivendell.profiling import tool_span
 from rivendell.utils import safe_input
 
+try:
+    import yara
+except ImportError:
+    yara = None
+
+YARA_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "rivendell", "yara"
+)
+MAX_SCAN_SIZE = 256 * 1024 * 1024  # larger files (pagefile, hiberfil, VM disks) are not scanned
+READ_ONCE_SIZE = 16 * 1024 * 1024  # larger files are hashed and scanned from disk rather than held in memory
+SCAN_WORKERS = os.cpu_count() or 1
+SCAN_TIMEOUT = 60
+
+_rulesets = {}  # ruleset digest -> (rules, namespaces), compiled at most once per run
+_scanned = {}  # (ruleset digest, content digest) -> matches, so identical files are scanned once
+_run_cache_dir = None  # private directory used instead of an untrusted YARA_CACHE_DIR
 
-def validate_yara(verbosity, output_directory, img, yara_file, binary_dir):
-    """Validate YARA rule file syntax before scanning."""
+
+def validate_yara(yara_file):
+    """Return the syntax error for a YARA rule file, or None if it compiles."""
+    if yara is not None:
+        try:
+            yara.compile(filepath=yara_file)
+        except yara.Error as error:
+            return str(error)
+        return None
     # Validate syntax by scanning /dev/null - validates rules without actual scanning
     result = subprocess.run(
         ["yara", yara_file, "/dev/null"],
         capture_output=True,
         encoding="UTF-8",
     )
-
     if result.returncode != 0 and "error" in result.stderr.lower():
-        error_msg = result.stderr if result.stderr else result.stdout
-        print(f"    '{yara_file.split('/')[-1]}' error: {error_msg}")
-        print("    Skipping this YARA file due to syntax errors.")
-        return
+        return result.stderr if result.stderr else result.stdout
+    return None
 
-    invoke_yara(verbosity, output_directory, img, yara_file, binary_dir)
 
+def _ruleset_digest(yara_files):
+    digest = hashlib.sha256(str(getattr(yara, "__version__", "cli")).encode())
+    for yara_file in sorted(yara_files):
+        digest.update(yara_file.encode() + b"\0")
+        with open(yara_file, "rb") as rule_file:
+            digest.update(hashlib.sha256(rule_file.read()).digest())
+    return digest.hexdigest()
 
-def invoke_yara(verbosity, output_directory, img, yara_file, binary_dir):
-    """Run YARA rules against target directory and save results."""
-    img_name = img.split("::")[0]
-    yara_rule_name = yara_file.split("/")[-1]
 
-    print(f"      Invoking '{yara_rule_name}' against '{img_name}', please stand by...")
+def _private(path):
+    """Whether path is owned by the current user and writable by no one else."""
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return info.st_uid == os.geteuid() and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
 
-    # Run YARA scan
-    scan_dir = "/" + binary_dir.strip("/")
-    result = subprocess.run(
-        ["yara", "-r", "-s", "-w", yara_file, scan_dir],
-        capture_output=True,
-        text=True,
+
+def _cache_dir():
+    """YARA_CACHE_DIR, or a fresh private directory for this run when it is not private to this user."""
+    global _run_cache_dir
+    os.makedirs(YARA_CACHE_DIR, mode=0o700, exist_ok=True)
+    if _private(YARA_CACHE_DIR):
+        return YARA_CACHE_DIR
+    if _run_cache_dir is None:
+        print("      Ignoring YARA cache not private to this user: {}".format(YARA_CACHE_DIR))
+        _run_cache_dir = tempfile.mkdtemp(prefix="rivendell-yara-")
+    return _run_cache_dir
+
+
+def compile_ruleset(yara_files):
+    """
+    Compile every valid rule file into one ruleset, reusing a cached
+    compiled ruleset when the rule files are unchanged.
+
+    Returns (digest, rules, namespaces) where namespaces maps each namespace
+    to its rule file; rules is a yara.Rules object, or the path of the
+    compiled file when using the CLI.
+    """
+    digest = _ruleset_digest(yara_files)
+    if digest in _rulesets:
+        return (digest,) + _rulesets[digest]
+    cache_dir = _cache_dir()
+    compiled_path = os.path.join(cache_dir, digest + ".yarc")
+    namespaces_path = os.path.join(cache_dir, digest + ".json")
+    if _private(compiled_path) and _private(namespaces_path):
+        with open(namespaces_path) as namespaces_file:
+            namespaces = json.load(namespaces_file)
+        rules = yara.load(compiled_path) if yara is not None else compiled_path
+        print("      Loaded compiled ruleset for {} YARA rule files from cache.".format(len(namespaces)))
+    else:
+        namespaces = {}
+        for yara_file in sorted(yara_files):
+            error = validate_yara(yara_file)
+            if error:
+                print(f"    '{yara_file.split('/')[-1]}' error: {error}")
+                print("    Skipping this YARA file due to syntax errors.")
+                continue
+            namespaces["ns{}".format(len(namespaces))] = yara_file
+        if not namespaces:
+            return digest, None, {}
+        print("      Compiling {} YARA rule files into a single ruleset...".format(len(namespaces)))
+        # Written under temporary names and renamed, replacing any cached file that was not private
+        partial = "{}.{}.tmp".format(compiled_path, os.getpid())
+        if yara is not None:
+            rules = yara.compile(filepaths=namespaces)
+            rules.save(partial)
+        else:
+            subprocess.run(
+                ["yarac", "-w"]
+                + ["{}:{}".format(namespace, path) for namespace, path in namespaces.items()]
+                + [partial],
+                capture_output=True,
+                check=True,
+            )
+            rules = compiled_path
+        os.chmod(partial, 0o600)
+        os.replace(partial, compiled_path)
+        partial = "{}.{}.tmp".format(namespaces_path, os.getpid())
+        with os.fdopen(os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as namespaces_file:
+            json.dump(namespaces, namespaces_file)
+        os.replace(partial, namespaces_path)
+    _rulesets[digest] = (rules, namespaces)
+    return digest, rules, namespaces
+
+
+def _escape(matched_data):
+    """Render matched bytes the way `yara -s` prints them."""
+    return "".join(
+        chr(byte) if 32 <= byte < 127 and byte != 92 else "\\x{:02x}".format(byte)
+        for byte in matched_data
     )
 
-    # Parse results - YARA output format: "rule_name file_path"
-    # With -s flag, also shows: "offset:$string_name:matched_data"
-    yara_output = result.stdout.strip()
 
-    if not yara_output:
-        print(f"       No evidence found based on '{yara_rule_name}'.")
-        return
+def _python_matches(rules, path, data=None):
+    """Scan a file's data, or the file itself when data is None, with yara-python; returns [(namespace, rule, [(offset, name, data)])]."""
+    if data is not None:
+        found = rules.match(data=data, timeout=SCAN_TIMEOUT)
+    else:
+        found = rules.match(filepath=path, timeout=SCAN_TIMEOUT)
+    results = []
+    for match in found:
+        strings = []
+        for string in match.strings:
+            if hasattr(string, "instances"):  # yara-python >= 4.3
+                for instance in string.instances:
+                    strings.append(
+                        (instance.offset, string.identifier, _escape(instance.matched_data))
+                    )
+            else:
+                offset, identifier, matched_data = string
+                strings.append((offset, identifier, _escape(matched_data)))
+        results.append((match.namespace, match.rule, strings))
+    return results
+
+
+def _scan_python(digest, rules, path):
+    data = None
+    try:
+        if os.path.getsize(path) <= READ_ONCE_SIZE:
+            with open(path, "rb") as target:
+                data = target.read()
+            key = (digest, hashlib.sha256(data).digest())
+        else:
+            key = (digest, _content_digest(path))
+    except OSError:
+        return path, []
+    if key not in _scanned:
+        try:
+            _scanned[key] = _python_matches(rules, path, data)
+        except yara.Error:
+            _scanned[key] = []
+    return path, _scanned[key]
+
+
+def _scan_targets_python(digest, rules, targets):
+    """Scan targets across a thread pool (yara-python releases the GIL while matching)."""
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        pending = set()
+        for path in targets:
+            pending.add(pool.submit(_scan_python, digest, rules, path))
+            if len(pending) >= SCAN_WORKERS * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+
+
+def _content_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as target:
+        for block in iter(lambda: target.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def _scan_targets_cli(digest, compiled_path, targets):
+    """Scan unique targets in one multi-threaded `yara -C` run, then answer duplicates from its results."""
+    unique, pending, duplicates = {}, set(), []
+    for path in targets:
+        try:
+            key = (digest, _content_digest(path))
+        except OSError:
+            continue
+        if key in _scanned or key in pending:
+            duplicates.append((path, key))
+        else:
+            unique[path] = key
+            pending.add(key)
+    if unique:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as scan_list:
+            scan_list.write("\n".join(unique) + "\n")
+        matches = {path: [] for path in unique}
+        scan = subprocess.Popen(
+            ["yara", "-C", "-e", "-s", "-w", "-p", str(SCAN_WORKERS), "--scan-list"]
+            + [compiled_path, scan_list.name],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+        )
+        current = None
+        # Output format: "namespace:rule file_path", then "offset:$string_name: matched_data" with -s
+        for line in scan.stdout:
+            line = line.rstrip("\n")
+            if line.startswith("0x") and ":" in line and current is not None:
+                offset, name, matched_data = (line.split(":", 2) + [""])[:3]
+                current[2].append((int(offset, 16), name, matched_data.lstrip()))
+            elif " " in line:
+                qualified, path = line.split(" ", 1)
+                namespace, rule = qualified.split(":", 1) if ":" in qualified else ("", qualified)
+                current = (namespace, rule, [])
+                matches.setdefault(path, []).append(current)
+        scan.wait()
+        os.remove(scan_list.name)
+        for path, key in unique.items():
+            _scanned[key] = matches.get(path, [])
+            yield path, _scanned[key]
+    for path, key in duplicates:
+        yield path, _scanned.get(key, [])
+
+
+def scan_with_ruleset(verbosity, output_directory, img, yara_files, scan_dir, refresh=False):
+    """Scan every regular file below scan_dir once against the combined ruleset, streaming matches to yara.csv."""
+    img_name = img.split("::")[0]
+    digest, rules, namespaces = compile_ruleset(yara_files)
+    if rules is None:
+        print("       No valid YARA rule files to scan with.")
+        return 0
+
+    print(
+        f"      Invoking {len(namespaces)} YARA rule files against '{img_name}', please stand by..."
+    )
+    targets = (
+        path
+        for path, _ in get_inventory(scan_dir, refresh=refresh).files(
+            larger_than=0, smaller_than=MAX_SCAN_SIZE + 1
+        )
+    )
 
     # Create analysis directory if needed
     analysis_dir = os.path.join(output_directory, img_name, "analysis")
@@ -61,57 +299,45 @@ def invoke_yara(verbosity, output_directory, img, yara_file, binary_dir):
         with open(csv_path, "w") as f:
             f.write("yara_rule,yara_file,file,path,offset,signature_name,matched_data\n")
 
-    matches_found = 0
-    current_rule = None
-    current_file = None
-
-    for line in yara_output.split("\n"):
-        line = line.strip()
-        if not line:
-            continue
-
-        # Check if this is a rule match line (rule_name file_path)
-        # or a string match line (offset:$name:data)
-        if line.startswith("0x") and ":" in line:
-            # This is a string match line
-            if current_rule and current_file:
-                parts = line.split(":", 2)
-                if len(parts) >= 3:
-                    offset = parts[0]
-                    sig_name = parts[1].lstrip("$")
-                    matched_data = parts[2] if len(parts) > 2 else ""
-
-                    # Write to CSV
-                    file_name = current_file.split("/")[-1]
-                    file_path = "/".join(current_file.split("/")[:-1])
-
-                    with open(csv_path, "a") as f:
-                        # Escape commas in matched data
-                        matched_data_escaped = matched_data.replace(",", "%2C").replace("\n", "\\n")
-                        f.write(f"{current_rule},{yara_file},{file_name},{file_path},{offset},{sig_name},{matched_data_escaped}\n")
+    if yara is not None:
+        results = _scan_targets_python(digest, rules, targets)
+    else:
+        results = _scan_targets_cli(digest, rules, targets)
 
+    matches_found = 0
+    with tool_span("yara", scan_dir), open(csv_path, "a") as f:
+        for target, matches in results:
+            file_name = target.split("/")[-1]
+            file_path = "/".join(target.split("/")[:-1])
+            for namespace, rule, strings in matches:
+                yara_file = namespaces.get(namespace, "")
+                for offset, sig_name, matched_data in strings or [("", "", "")]:
+                    # Escape commas in matched data
+                    matched_data_escaped = matched_data.replace(",", "%2C").replace("\n", "\\n")
+                    offset = hex(offset) if isinstance(offset, int) else offset
+                    f.write(
+                        f"{rule},{yara_file},{file_name},{file_path},{offset},{sig_name.lstrip('$')},{matched_data_escaped}\n"
+                    )
                     matches_found += 1
 
                     # Log the match
-                    entry = f"{datetime.now().isoformat()},{img_name},yara,rule '{current_rule}' (${sig_name}) matched in '{file_name}'\n"
-                    prnt = f" -> {datetime.now().isoformat().replace('T', ' ')} -> YARA rule '{current_rule}' matched in '{file_name}'"
+                    signature = f" ({sig_name})" if sig_name else ""
+                    entry = f"{datetime.now().isoformat()},{img_name},yara,rule '{rule}'{signature} matched in '{file_name}'\n"
+                    prnt = f" -> {datetime.now().isoformat().replace('T', ' ')} -> YARA rule '{rule}' matched in '{file_name}'"
                     write_audit_log_entry(verbosity, output_directory, entry, prnt)
-        else:
-            # This is a rule match line
-            parts = line.split(" ", 1)
-            if len(parts) >= 2:
-                current_rule = parts[0]
-                current_file = parts[1]
 
     if matches_found > 0:
         print(f"       Found {matches_found} YARA matches.")
     else:
-        print(f"       No string matches found for '{yara_rule_name}'.")
+        print(f"       No evidence found based on {len(namespaces)} YARA rule files.")
+    return matches_found
 
 
 def run_yara_signatures(
     verbosity, output_directory, img, loc, collectfiles, yara_files
 ):
+    if not yara_files:
+        return
     if collectfiles:
         all_or_collected = safe_input("      Run Yara signatures against all files or just those collected for '{}'?\n      [A]ll  [C]ollected\t[A]ll ".format(
                 img.split("::")[0]
@@ -123,5 +349,8 @@ def run_yara_signatures(
         binary_dir = output_directory + img.split("::")[0] + "/files"
     else:
         binary_dir = loc
-    for yara_file in yara_files:
-        validate_yara(verbosity, output_directory, img, yara_file, binary_dir)
+    scan_dir = "/" + binary_dir.strip("/")
+    # collected files are case output, so they are re-inventoried rather than cached
+    scan_with_ruleset(
+        verbosity, output_directory, img, yara_files, scan_dir, refresh=all_or_collected != "A"
+    )
@@ -6,6 +6,8 @@ import sqlite3
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.checkpoint import checkpoint_handler
+from rivendell.profiling import profile_handler
 
 # Track which browser directories have been processed to avoid duplicates
 _processed_browser_dirs = set()
@@ -27,6 +29,8 @@ BROWSER_MITRE_MAPPING = {
 }
 
 
+@checkpoint_handler
+@profile_handler
 def process_browser_index(
     verbosity, vssimage, output_directory, img, vss_path_insert, stage, artefact
 ):
@@ -197,6 +201,8 @@ def process_browser_index(
                     pass
 
 
+@checkpoint_handler
+@profile_handler
 def process_browser(
     verbosity, vssimage, output_directory, img, vss_path_insert, stage, artefact
 ):
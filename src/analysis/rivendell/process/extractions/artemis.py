@@ -12,13 +12,21 @@ Supported artifacts:
 See: https://github.com/puffyCid/artemis
 """
 
+import glob
 import json
 import os
+import shutil
 import subprocess
+import tempfile
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List, NamedTuple, Tuple
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.checkpoint import defer_completion
+from rivendell.profiling import tool_span
+from rivendell.utils import iter_json_records
 
 ARTEMIS_PATH = "/usr/local/bin/artemis"
 
@@ -646,6 +654,214 @@ def artemis_available() -> bool:
     return os.path.exists(ARTEMIS_PATH)
 
 
+def _is_json_lines(path: str) -> bool:
+    """True if path starts with a complete JSON object on its first line."""
+    with open(path, "rb") as f:
+        if f.read(4096).lstrip()[:1] != b"{":
+            return False  # arrays are never read a line at a time
+        f.seek(0)
+        first_line = f.readline()
+        while first_line and not first_line.strip():
+            first_line = f.readline()
+    try:
+        return isinstance(json.loads(first_line), dict)
+    except ValueError:
+        return False
+
+
+def _append_bytes(source_path: str, output) -> None:
+    """Append a file's bytes to output, in the kernel where it supports it."""
+    output.flush()
+    with open(source_path, "rb") as source:
+        size = os.fstat(source.fileno()).st_size
+        copied = 0
+        try:
+            while copied < size:
+                count = os.copy_file_range(source.fileno(), output.fileno(), size - copied)
+                if not count:
+                    break
+                copied += count
+        except (AttributeError, OSError):
+            pass  # no copy_file_range here (or across these filesystems)
+        if copied < size:
+            source.seek(copied)
+            shutil.copyfileobj(source, output, 1024 * 1024)
+        if size:
+            source.seek(size - 1)
+            if source.read(1) != b"\n":
+                output.write(b"\n")
+
+
+def merge_json_outputs(json_files: List[str], merged_path: str) -> None:
+    """
+    Merge Artemis JSON outputs into one JSON lines file, then remove them.
+
+    Outputs already in JSON lines form are appended byte for byte; JSON
+    arrays and pretty-printed objects are decoded one record at a time and
+    written one record per line. Nothing is held in memory beyond a single
+    record, so multi-GB MFT output merges in constant memory. Outputs that
+    stop decoding part way contribute the records before that point.
+    """
+    partial = merged_path + ".partial"
+    with open(partial, "wb") as output:
+        for json_file in sorted(json_files):
+            try:
+                if _is_json_lines(json_file):
+                    _append_bytes(json_file, output)
+                    continue
+                for record in iter_json_records(json_file):
+                    output.write(json.dumps(record).encode("utf-8") + b"\n")
+            except OSError:
+                continue
+    os.replace(partial, merged_path)
+    for json_file in json_files:
+        os.remove(json_file)
+
+
+# Artifact-specific argument names (artemis has different param names per artifact)
+# Mapping: artifact -> (file_arg, dir_arg); in a TOML collection the same
+# options are written as alt_file, alt_dir and alt_path
+ARTIFACT_ARGS = {
+    "prefetch": (None, "--alt-dir"),           # only supports --alt-dir
+    "eventlogs": ("--alt-file", "--alt-dir"),  # supports both
+    "mft": ("--alt-file", None),               # only --alt-file
+    "shimcache": ("--alt-file", None),         # only --alt-file
+    "usnjrnl": ("--alt-path", None),           # uses --alt-path not --alt-file
+    "amcache": ("--alt-file", None),           # only --alt-file
+    "registry": ("--alt-file", None),          # only --alt-file
+    "jumplists": ("--alt-file", None),         # only --alt-file
+    "wmipersist": (None, "--alt-dir"),         # only --alt-dir
+    "userassist": ("--alt-file", None),        # only --alt-file
+    "shellbags": ("--alt-file", None),         # only --alt-file
+    "bits": ("--alt-file", None),              # only --alt-file
+    "srum": ("--alt-file", None),              # only --alt-file
+    "search": ("--alt-file", None),            # only --alt-file
+    "tasks": ("--alt-file", None),             # only --alt-file
+    "services": ("--alt-file", None),          # only --alt-file
+    "shortcuts": ("--alt-file", None),         # only --alt-file
+    "recyclebin": ("--alt-file", None),        # only --alt-file
+    "outlook": ("--alt-file", None),           # only --alt-file
+}
+
+PROGRESS_INTERVAL = 30  # seconds between "still processing" messages
+BATCH_WORKERS = min(4, os.cpu_count() or 1)
+COLLECTION_NAME = "elrond_collection"
+
+
+def _artifact_option(artifact: str, alt_file: Optional[str], alt_dir: Optional[str]) -> List[str]:
+    """The [argument, path] pointing artemis at the artefact, if any."""
+    file_arg, dir_arg = ARTIFACT_ARGS.get(artifact, ("--alt-file", "--alt-dir"))
+    if alt_file and file_arg:
+        return [file_arg, alt_file]
+    if alt_dir and dir_arg:
+        return [dir_arg, alt_dir]
+    return []
+
+
+def _wait(process: subprocess.Popen, display_name: str) -> Tuple[bytes, bytes]:
+    """Wait for artemis to exit, reporting long-running parses every PROGRESS_INTERVAL."""
+    elapsed = 0
+    while True:
+        try:
+            return process.communicate(timeout=PROGRESS_INTERVAL)
+        except subprocess.TimeoutExpired:
+            elapsed += PROGRESS_INTERVAL
+            print(f" -> still processing {display_name}... ({elapsed}s elapsed)", flush=True)
+
+
+def _failure(stdout_data: bytes, stderr_data: bytes) -> str:
+    stderr_text = stderr_data.decode('utf-8', errors='replace') if stderr_data else ''
+    stdout_text = stdout_data.decode('utf-8', errors='replace') if stdout_data else ''
+    return f"{stderr_text} {stdout_text}"[:500]
+
+
+def _place_outputs(
+    json_files: List[str], output_dir: str, artifact: str, output_filename: Optional[str]
+) -> List[str]:
+    """Move or merge artemis output files into output_dir; returns the files placed."""
+    # For MFT, merge all JSON files into a single JSON lines file
+    if artifact == "mft" and len(json_files) > 1:
+        dest = os.path.join(output_dir, "journal_mft.json")
+        merge_json_outputs(json_files, dest)
+        return [dest]
+    if len(json_files) == 1:
+        # Single output file - rename appropriately
+        if artifact == "mft":
+            # Always use journal_mft.json for MFT
+            dest = os.path.join(output_dir, "journal_mft.json")
+        elif output_filename:
+            # Use provided output filename
+            dest = os.path.join(output_dir, f"{output_filename}.json")
+        else:
+            # Keep original name
+            dest = os.path.join(output_dir, os.path.basename(json_files[0]))
+        shutil.move(json_files[0], dest)
+        return [dest]
+    if len(json_files) > 1 and output_filename:
+        # Multiple files but we have a desired output name - merge them
+        dest = os.path.join(output_dir, f"{output_filename}.json")
+        merge_json_outputs(json_files, dest)
+        return [dest]
+    # Multiple files and no specific output name - move with original names
+    placed = []
+    for json_file in json_files:
+        dest = os.path.join(output_dir, os.path.basename(json_file))
+        shutil.move(json_file, dest)
+        placed.append(dest)
+    return placed
+
+
+def _run_artemis(
+    artifact: str,
+    output_dir: str,
+    alt_file: Optional[str] = None,
+    alt_dir: Optional[str] = None,
+    output_filename: Optional[str] = None,
+) -> Tuple[bool, str, List[str]]:
+    """run_artemis, also returning the output files placed in output_dir."""
+    if not artemis_available():
+        return False, f"Artemis not found at {ARTEMIS_PATH}", []
+
+    # Artemis writes to a 'local_collector' subdirectory of --output-dir; each
+    # run gets its own so that concurrent runs never pick up each other's files
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix=".artemis-", dir=output_dir)
+    except OSError as e:
+        return False, str(e), []
+
+    # Build command using CLI acquire mode
+    # NOTE: --format and --output-dir must come BEFORE the artifact subcommand
+    cmd = [
+        ARTEMIS_PATH,
+        "acquire",
+        "--format", "JSON",
+        "--output-dir", staging_dir,
+        artifact,
+    ] + _artifact_option(artifact, alt_file, alt_dir)
+
+    try:
+        with tool_span("artemis " + artifact, alt_file or alt_dir or ""):
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+            # Use proper display name for artifacts
+            stdout_data, stderr_data = _wait(process, "$MFT" if artifact == "mft" else artifact)
+
+        if process.returncode != 0:
+            return False, _failure(stdout_data, stderr_data), []
+
+        json_files = sorted(glob.glob(os.path.join(staging_dir, "local_collector", "*.json")))
+        return True, "", _place_outputs(json_files, output_dir, artifact, output_filename)
+
+    except Exception as e:
+        return False, str(e), []
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
 def run_artemis(
     artifact: str,
     output_dir: str,
@@ -667,161 +883,248 @@ def run_artemis(
     Returns:
         Tuple of (success: bool, error_message: str)
     """
-    if not artemis_available():
-        return False, f"Artemis not found at {ARTEMIS_PATH}"
+    success, error, _ = _run_artemis(artifact, output_dir, alt_file, alt_dir, output_filename)
+    return success, error
 
-    # Build command using CLI acquire mode
-    # NOTE: --format and --output-dir must come BEFORE the artifact subcommand
-    cmd = [
-        ARTEMIS_PATH,
-        "acquire",
-        "--format", "JSON",
-        "--output-dir", output_dir,
-        artifact,
-    ]
 
-    # Artifact-specific argument names (artemis has different param names per artifact)
-    # Mapping: artifact -> (file_arg, dir_arg)
-    artifact_args = {
-        "prefetch": (None, "--alt-dir"),           # only supports --alt-dir
-        "eventlogs": ("--alt-file", "--alt-dir"),  # supports both
-        "mft": ("--alt-file", None),               # only --alt-file
-        "shimcache": ("--alt-file", None),         # only --alt-file
-        "usnjrnl": ("--alt-path", None),           # uses --alt-path not --alt-file
-        "amcache": ("--alt-file", None),           # only --alt-file
-        "registry": ("--alt-file", None),          # only --alt-file
-        "jumplists": ("--alt-file", None),         # only --alt-file
-        "wmipersist": (None, "--alt-dir"),         # only --alt-dir
-        "userassist": ("--alt-file", None),        # only --alt-file
-        "shellbags": ("--alt-file", None),         # only --alt-file
-        "bits": ("--alt-file", None),              # only --alt-file
-        "srum": ("--alt-file", None),              # only --alt-file
-        "search": ("--alt-file", None),            # only --alt-file
-        "tasks": ("--alt-file", None),             # only --alt-file
-        "services": ("--alt-file", None),          # only --alt-file
-        "shortcuts": ("--alt-file", None),         # only --alt-file
-        "recyclebin": ("--alt-file", None),        # only --alt-file
-        "outlook": ("--alt-file", None),           # only --alt-file
-    }
+class ArtemisJob(NamedTuple):
+    """One artefact extraction, as requested by extract_with_artemis."""
 
-    file_arg, dir_arg = artifact_args.get(artifact, ("--alt-file", "--alt-dir"))
+    verbosity: str
+    vssimage: str
+    output_directory: str
+    stage: str
+    artifact: str
+    cooked_dir: str
+    alt_file: Optional[str]
+    alt_dir: Optional[str]
+    output_name: Optional[str]
+    # Called with (success, outputs) when a queued job finishes (see checkpoint.defer_completion)
+    on_done: Tuple[Callable[[bool, List[str]], None], ...] = ()
 
-    # Add alt_file or alt_dir if specified (these go after the artifact subcommand)
-    if alt_file and file_arg:
-        cmd.extend([file_arg, alt_file])
-    elif alt_dir and dir_arg:
-        cmd.extend([dir_arg, alt_dir])
 
+def build_collection(jobs: List[ArtemisJob], directory: str, name: str = COLLECTION_NAME) -> str:
+    """
+    TOML collection running every job's artefact in a single artemis process.
+
+    Each artefact type may appear once; output goes to directory/name with a
+    status.log naming the file(s) written for each artefact.
+    """
+    lines = [
+        "[output]",
+        "name = {}".format(json.dumps(name)),
+        "directory = {}".format(json.dumps(directory)),
+        'format = "json"',
+        "compress = false",
+        'endpoint_id = "elrond"',
+        "collection_id = 1",
+        'output = "local"',
+        "",
+    ]
+    for job in jobs:
+        lines += ["[[artifacts]]", "artifact_name = {}".format(json.dumps(job.artifact))]
+        option = _artifact_option(job.artifact, job.alt_file, job.alt_dir)
+        if option:
+            lines += [
+                "[artifacts.{}]".format(job.artifact),
+                "{} = {}".format(option[0][2:].replace("-", "_"), json.dumps(option[1])),
+            ]
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _read_status_log(collection_dir: str) -> Dict[str, List[str]]:
+    """Output files per artefact from a collection's status.log ("artifact:file" lines)."""
+    outputs = {}
+    try:
+        with open(os.path.join(collection_dir, "status.log"), encoding="utf-8", errors="replace") as status_log:
+            for line in status_log:
+                if ":" not in line:
+                    continue
+                artifact, filename = line.strip().split(":", 1)
+                path = os.path.join(collection_dir, os.path.basename(filename.strip().strip('"')))
+                if os.path.isfile(path):
+                    outputs.setdefault(artifact.strip().lower(), []).append(path)
+    except OSError:
+        pass
+    return outputs
+
+
+def _run_collection(jobs: List[ArtemisJob]) -> List[Tuple[ArtemisJob, Optional[List[str]]]]:
+    """
+    Run jobs (one per artefact type) as one TOML collection.
+
+    Returns each job with the output files placed for it, or None where the
+    collection produced nothing for it and it should be run on its own.
+    """
+    staging_dir = tempfile.mkdtemp(
+        prefix=".artemis-", dir=os.path.commonpath([job.cooked_dir for job in jobs])
+    )
     try:
-        import sys
-        import threading
-        import time as time_module
-
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+        toml_path = os.path.join(staging_dir, COLLECTION_NAME + ".toml")
+        with open(toml_path, "w") as toml_file:
+            toml_file.write(build_collection(jobs, staging_dir))
+        with tool_span("artemis collection", ",".join(job.artifact for job in jobs)):
+            process = subprocess.Popen(
+                [ARTEMIS_PATH, "-t", toml_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            _wait(process, ", ".join(job.artifact for job in jobs))
+        if process.returncode != 0:
+            return [(job, None) for job in jobs]
+        outputs = _read_status_log(os.path.join(staging_dir, COLLECTION_NAME))
+        placed = []
+        for job in jobs:
+            json_files = sorted(outputs.get(job.artifact, []))
+            placed.append(
+                (job, _place_outputs(json_files, job.cooked_dir, job.artifact, job.output_name) if json_files else None)
+            )
+        return placed
+    except Exception:
+        return [(job, None) for job in jobs]
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def _run_job(job: ArtemisJob) -> Tuple[bool, str, List[str]]:
+    return _run_artemis(
+        artifact=job.artifact,
+        output_dir=job.cooked_dir,
+        alt_file=job.alt_file,
+        alt_dir=job.alt_dir,
+        output_filename=job.output_name,
+    )
+
+
+def _finish_job(job: ArtemisJob, success: bool, error: str, outputs: List[str]) -> bool:
+    """Report a failed job, or run MITRE enrichment over a finished job's output."""
+    success = _enrich_job(job, success, error, outputs)
+    for on_done in job.on_done:
+        on_done(success, outputs)
+    return success
+
+
+def _enrich_job(job: ArtemisJob, success: bool, error: str, outputs: List[str]) -> bool:
+    if not success:
+        error_msg = error.replace('\n', ' ').replace(',', ';').replace("'", "")[:200]
+        # Always print errors regardless of verbosity
+        print(
+            " -> {} -> WARNING: artemis {} failed for {}: {}".format(
+                datetime.now().isoformat().replace('T', ' '),
+                job.artifact,
+                job.vssimage,
+                error_msg[:100]
+            )
         )
+        return False
 
-        # Progress indicator for long-running operations
-        stop_progress = threading.Event()
-        def show_progress():
-            start_time = time_module.time()
-            # Use proper display name for artifacts
-            display_name = "$MFT" if artifact == "mft" else artifact
-            while not stop_progress.is_set():
-                elapsed = int(time_module.time() - start_time)
-                if elapsed > 0 and elapsed % 30 == 0:  # Every 30 seconds
-                    print(f" -> still processing {display_name}... ({elapsed}s elapsed)", flush=True)
-                stop_progress.wait(1)
+    # Fast MITRE enrichment - scan this job's JSON output for artifact-specific patterns
+    for json_file in outputs:
+        if not json_file.endswith(".json"):
+            continue
+        try:
+            enrich_with_mitre(json_file, job.artifact)
+        except Exception as e:
+            print(f"    WARNING: MITRE enrichment failed for {os.path.basename(json_file)}: {e}", flush=True)
+            traceback.print_exc()
+    return True
 
-        progress_thread = threading.Thread(target=show_progress, daemon=True)
-        progress_thread.start()
 
-        stdout_data, stderr_data = process.communicate()
-        stop_progress.set()
-        progress_thread.join(timeout=1)
+def _collapse_directory_jobs(jobs: List[ArtemisJob]) -> List[ArtemisJob]:
+    """
+    Jobs for single files of directory-only artefacts (prefetch) become one
+    job per directory, since artemis parses the whole directory anyway.
+    """
+    collapsed = {}
+    for job in jobs:
+        file_arg, dir_arg = ARTIFACT_ARGS.get(job.artifact, ("--alt-file", "--alt-dir"))
+        if job.alt_file and not file_arg and dir_arg:
+            alt_dir = os.path.dirname(job.alt_file)
+            job = job._replace(alt_file=None, alt_dir=alt_dir, output_name=os.path.basename(alt_dir))
+        key = (job.artifact, job.cooked_dir, job.alt_file, job.alt_dir)
+        if key in collapsed:
+            # Callers of the dropped job hear about the one that runs
+            collapsed[key] = collapsed[key]._replace(on_done=collapsed[key].on_done + job.on_done)
+        else:
+            collapsed[key] = job
+    return list(collapsed.values())
+
+
+class ArtemisBatch:
+    """
+    Artemis extractions queued while an image is processed, run together.
 
-        if process.returncode != 0:
-            stderr_text = stderr_data.decode('utf-8', errors='replace') if stderr_data else ''
-            stdout_text = stdout_data.decode('utf-8', errors='replace') if stdout_data else ''
-            return False, f"{stderr_text} {stdout_text}"[:500]
-
-        # Artemis outputs to a 'local_collector' subdirectory - move files up
-        import shutil
-        import glob
-        local_collector_dir = os.path.join(output_dir, "local_collector")
-        if os.path.exists(local_collector_dir):
-            json_files = glob.glob(os.path.join(local_collector_dir, "*.json"))
-
-            # For MFT, merge all JSON files into a single file
-            if artifact == "mft" and len(json_files) > 1:
-                merged_data = []
-                for jf in json_files:
-                    try:
-                        with open(jf, 'r') as f:
-                            data = json.load(f)
-                            if isinstance(data, list):
-                                merged_data.extend(data)
-                            else:
-                                merged_data.append(data)
-                    except:
-                        pass
-                # Write merged file - always use journal_mft.json for MFT
-                merged_path = os.path.join(output_dir, "journal_mft.json")
-                with open(merged_path, 'w') as f:
-                    json.dump(merged_data, f)
-                # Clean up individual files
-                for jf in json_files:
-                    os.remove(jf)
-            elif len(json_files) == 1:
-                # Single output file - rename appropriately
-                if artifact == "mft":
-                    # Always use journal_mft.json for MFT
-                    dest = os.path.join(output_dir, "journal_mft.json")
-                elif output_filename:
-                    # Use provided output filename
-                    dest = os.path.join(output_dir, f"{output_filename}.json")
-                else:
-                    # Keep original name
-                    dest = os.path.join(output_dir, os.path.basename(json_files[0]))
-                shutil.move(json_files[0], dest)
-            elif len(json_files) > 1 and output_filename:
-                # Multiple files but we have a desired output name - merge them
-                merged_data = []
-                for jf in json_files:
-                    try:
-                        with open(jf, 'r') as f:
-                            data = json.load(f)
-                            if isinstance(data, list):
-                                merged_data.extend(data)
+    The first job for each artefact type goes into a single TOML collection,
+    so one artemis process parses them all; further jobs of the same type
+    (e.g. one per .evtx file) and any the collection did not produce output
+    for run as separate artemis processes on a bounded thread pool. Each
+    job's output is placed and enriched as soon as its run completes.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or BATCH_WORKERS
+        self.jobs: List[ArtemisJob] = []
+
+    def add(self, job: ArtemisJob):
+        self.jobs.append(job)
+
+    def run(self) -> Dict[str, int]:
+        """Run the queued jobs; returns counts of jobs, artemis launches and failures."""
+        jobs, self.jobs = _collapse_directory_jobs(self.jobs), []
+        collected, separate, types = [], [], set()
+        for job in jobs:
+            (separate if job.artifact in types else collected).append(job)
+            types.add(job.artifact)
+        if len(collected) < 2:
+            separate, collected = collected + separate, []
+        stats = {"jobs": len(jobs), "launches": 0, "failed": 0}
+        if not jobs:
+            return stats
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = {}
+
+            def submit(function, argument):
+                pending[pool.submit(function, argument)] = argument
+                stats["launches"] += 1
+
+            if collected:
+                submit(_run_collection, collected)
+            for job in separate:
+                submit(_run_job, job)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    argument = pending.pop(future)
+                    if isinstance(argument, list):
+                        for job, outputs in future.result():
+                            if outputs is None:
+                                submit(_run_job, job)  # nothing from the collection; run on its own
                             else:
-                                merged_data.append(data)
-                    except:
-                        pass
-                # Write merged file with desired name
-                merged_path = os.path.join(output_dir, f"{output_filename}.json")
-                with open(merged_path, 'w') as f:
-                    json.dump(merged_data, f)
-                # Clean up individual files
-                for jf in json_files:
-                    os.remove(jf)
-            else:
-                # Multiple files and no specific output name - move with original names
-                for f in glob.glob(os.path.join(local_collector_dir, "*.json")):
-                    dest = os.path.join(output_dir, os.path.basename(f))
-                    shutil.move(f, dest)
-
-            # Remove local_collector directory
-            try:
-                shutil.rmtree(local_collector_dir)
-            except:
-                pass
+                                _finish_job(job, True, "", outputs)
+                    elif not _finish_job(argument, *future.result()):
+                        stats["failed"] += 1
+        return stats
 
-        return True, ""
 
-    except Exception as e:
-        return False, str(e)
+# Batch that extract_with_artemis queues into, while one is open
+_active_batch: Optional[ArtemisBatch] = None
+
+
+def begin_batch(max_workers: Optional[int] = None) -> ArtemisBatch:
+    """Queue extract_with_artemis calls until end_batch() instead of running each at once."""
+    global _active_batch
+    if _active_batch is None:
+        _active_batch = ArtemisBatch(max_workers)
+    return _active_batch
+
+
+def end_batch(run: bool = True) -> Dict[str, int]:
+    """Close the open batch and (unless run is False) run its jobs."""
+    global _active_batch
+    batch, _active_batch = _active_batch, None
+    if batch is None or not run:
+        return {}
+    return batch.run()
 
 
 def extract_with_artemis(
@@ -853,8 +1156,11 @@ def extract_with_artemis(
         output_subdir: Subdirectory name for output (e.g., "prefetch", "evt")
         fixed_output_name: Override output filename (without .json extension)
 
+    While a batch is open (see begin_batch) the extraction is queued and
+    runs when the batch ends.
+
     Returns:
-        True if successful, False otherwise
+        True if successful (or queued), False otherwise
     """
     if not artemis_available():
         entry, prnt = "{},{},{},'{}' (skipped - artemis not found)\n".format(
@@ -916,58 +1222,24 @@ def extract_with_artemis(
     else:
         output_name = None
 
-    # Run Artemis
-    success, error = run_artemis(
+    job = ArtemisJob(
+        verbosity=verbosity,
+        vssimage=vssimage,
+        output_directory=output_directory,
+        stage=stage,
         artifact=artifact_type,
-        output_dir=cooked_dir,
+        cooked_dir=cooked_dir,
         alt_file=artifact_file,
         alt_dir=artifact_dir,
-        output_filename=output_name,
+        output_name=output_name,
     )
-
-    if not success:
-        error_msg = error.replace('\n', ' ').replace(',', ';').replace("'", "")[:200]
-        # Always print errors regardless of verbosity
-        print(
-            " -> {} -> WARNING: artemis {} failed for {}: {}".format(
-                datetime.now().isoformat().replace('T', ' '),
-                artifact_type,
-                vssimage,
-                error_msg[:100]
-            )
-        )
-        return False
-
-    # Fast MITRE enrichment - scan JSON files for artifact-specific patterns
-    import glob
-    import traceback
-    print(f"    [DEBUG] About to enrich MITRE for artifact_type='{artifact_type}'", flush=True)
-    print(f"    [DEBUG] Local variables: {list(locals().keys())}", flush=True)
-    try:
-        for json_file in glob.glob(os.path.join(cooked_dir, "*.json")):
-            print(f"    [DEBUG] Enriching file: {os.path.basename(json_file)}", flush=True)
-            print(f"    [DEBUG] About to call enrich_with_mitre with json_file={json_file}, artifact_type={artifact_type}", flush=True)
-            try:
-                result = enrich_with_mitre(json_file, artifact_type)
-                print(f"    [DEBUG] enrich_with_mitre returned: {result}", flush=True)
-            except Exception as inner_e:
-                print(f"    [DEBUG] *** Exception during enrich_with_mitre call: {type(inner_e).__name__}: {inner_e}", flush=True)
-                print(f"    [DEBUG] *** Full traceback:", flush=True)
-                traceback.print_exc()
-                print(f"    [DEBUG] *** Locals at error: {locals()}", flush=True)
-                raise
-        print(f"    [DEBUG] MITRE enrichment completed successfully", flush=True)
-    except NameError as e:
-        print(f"    [DEBUG] *** NameError caught in extract_with_artemis(): {e}", flush=True)
-        print(f"    [DEBUG] *** Full traceback:", flush=True)
-        traceback.print_exc()
-        print(f"    [DEBUG] *** artifact_type={artifact_type}, cooked_dir={cooked_dir}", flush=True)
-    except Exception as e:
-        print(f"    [DEBUG] *** Exception caught in extract_with_artemis(): {e}", flush=True)
-        traceback.print_exc()
-
-    print(f"    [DEBUG] extract_with_artemis() about to return True", flush=True)
-    return True
+    if _active_batch is not None:
+        # Run with the rest of the image's artefacts when the batch ends; the
+        # calling handler's checkpoint waits for this job's outputs
+        on_done = defer_completion()
+        _active_batch.add(job._replace(on_done=(on_done,) if on_done else ()))
+        return True
+    return _finish_job(job, *_run_job(job))
 
 
 # Convenience functions for specific artifact types
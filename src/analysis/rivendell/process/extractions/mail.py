@@ -1,89 +1,319 @@
+#!/usr/bin/env python3 -tt
+"""
+Mailbox Extraction
+
+Streams messages out of Apple Mail .emlx files, .eml files, mbox files and
+readpst output, and writes one JSON line per message with its routing
+headers, body, links and attachment hashes.
+
+Each message is fed to an incremental byte-level MIME parser
+(email.parser.BytesFeedParser) block by block, so no mailbox or message is
+ever read as a whole string and multipart boundaries are handled by the
+parser rather than by regex. Sources are spread across a process pool in
+batches, and large mbox files are split into byte ranges at message
+boundaries; each batch streams to its own spill file and the parent
+concatenates them in order. A message that cannot be read is recorded with
+its error and extraction carries on. Attachments are hashed in place and
+only written out when an attachments directory is given.
+"""
+
+import hashlib
 import json
+import os
 import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from email.header import decode_header, make_header
+from email.parser import BytesFeedParser
+from typing import Iterator, List, Optional, Tuple
 
+READ_BLOCK = 64 * 1024
+BATCH_FILES = 500  # single-message files (.emlx, .eml, readpst -S) per task
+MBOX_RANGE_BYTES = 256 * 1024 * 1024  # mbox files are split into ranges of about this size
 
-def extract_email_artefacts(eachmesg, jsondict, mailjsonlist, ThreadNo, allLinks):
-    try:
-        ContentTypePattern = re.compile(
-            r"Content\-Type\:\ (?P<ContentType>[^\;]+)\;",
-            re.IGNORECASE,
-        )
-        ContentType = re.findall(ContentTypePattern, eachmesg)[0]
-        jsondict["ContentType"] = ContentType
-    except:
-        pass
+_LINK = re.compile(r"[A-Za-z]+://[^\s\"'<>]+")
+_TAG = re.compile(r"<[^>]+>")
+_IP = re.compile(
+    r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|[A-Fa-f\d]+(?::[A-Fa-f\d]+){7}"
+)
+_UNSAFE = re.compile(r"[^\w.\-]+")
+_FROM_LINE = re.compile(rb"From \S.* \d{4}\r?\n?$")  # "From sender asctime-date"
+_QUOTED_FROM = re.compile(rb">+From ")  # mboxrd-escaped body line
+_BLANK = (b"\n", b"\r\n")
+
+
+def is_mbox(path: str) -> bool:
+    """mbox files: readpst -r writes one named "mbox" per folder."""
+    name = os.path.basename(path)
+    return os.path.isfile(path) and (name == "mbox" or name.endswith(".mbox"))
+
+
+def is_message_file(path: str) -> bool:
+    """Files holding a single message (readpst -S names them by number)."""
+    name = os.path.basename(path)
+    return name.endswith((".emlx", ".eml")) or name.isdigit()
+
+
+def iter_mail_sources(directory: str) -> Iterator[str]:
+    """Mail sources under directory, in a stable order."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if is_mbox(path) or is_message_file(path):
+                yield path
+
+
+def _feed_file(source, parser: BytesFeedParser, remaining: Optional[int] = None):
+    while remaining is None or remaining > 0:
+        block = source.read(READ_BLOCK if remaining is None else min(READ_BLOCK, remaining))
+        if not block:
+            break
+        parser.feed(block)
+        if remaining is not None:
+            remaining -= len(block)
+
+
+def mbox_ranges(path: str, range_bytes: int = MBOX_RANGE_BYTES) -> List[Tuple[int, Optional[int]]]:
+    """
+    Split an mbox file into (start, end) byte ranges that each begin at a message.
+
+    Boundaries are found by seeking to every range_bytes and reading forward
+    to the next "From " line that follows a blank line; the last range ends
+    at None (end of file).
+    """
+    size = os.path.getsize(path)
+    starts = [0]
+    with open(path, "rb") as source:
+        for target in range(range_bytes, size, range_bytes):
+            if target <= starts[-1]:
+                continue
+            source.seek(target)
+            source.readline()  # rest of the line the seek landed in
+            previous_blank = False
+            while True:
+                position = source.tell()
+                line = source.readline()
+                if not line:
+                    break
+                if previous_blank and _FROM_LINE.match(line):
+                    starts.append(position)
+                    break
+                previous_blank = line in _BLANK
+    return list(zip(starts, starts[1:] + [None]))
+
+
+def iter_messages(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (message number, email.message.Message) for each message in path.
+
+    .emlx files start with the message's byte count and end with an Apple
+    property list, which is not fed to the parser. mbox files are split on
+    "From sender date" lines that follow a blank line, ">From " quoting is
+    undone (mboxrd), and start/end limit them to a range from mbox_ranges;
+    message numbers count from the start of the range.
+    """
+    with open(path, "rb") as source:
+        if is_mbox(path):
+            source.seek(start)
+            parser, previous_blank, number, position = None, True, 0, start
+            for line in source:
+                if end is not None and position >= end:
+                    break
+                position += len(line)
+                if previous_blank and _FROM_LINE.match(line):
+                    if parser is not None:
+                        yield number, parser.close()
+                    parser, number = BytesFeedParser(), number + 1
+                elif parser is not None:
+                    parser.feed(line[1:] if _QUOTED_FROM.match(line) else line)
+                previous_blank = line in _BLANK
+            if parser is not None:
+                yield number, parser.close()
+            return
+        parser, remaining = BytesFeedParser(), None
+        if path.endswith(".emlx"):
+            first = source.readline()
+            if first.strip().isdigit():
+                remaining = int(first.strip())
+            else:
+                parser.feed(first)
+        _feed_file(source, parser, remaining)
+        yield 1, parser.close()
+
+
+def _decoded(value) -> str:
+    """RFC 2047 encoded-words decoded, folding whitespace collapsed."""
+    if value is None:
+        return ""
     try:
-        CharsetPattern = re.compile(r"charset\=(?P<Charset>[^\\]+)\\n", re.IGNORECASE)
-        Charset = re.findall(CharsetPattern, eachmesg)[0]
-        jsondict["Charset"] = Charset
-    except:
-        pass
+        value = str(make_header(decode_header(str(value))))
+    except Exception:  # malformed encoded-words are kept as they are
+        value = str(value)
+    return " ".join(value.split())
+
+
+def _header(message, name: str) -> str:
+    return _decoded(message.get(name))
+
+
+def _text(part) -> str:
+    payload = part.get_payload(decode=True) or b""
     try:
-        ContentTransferEncodingPattern = re.compile(
-            r"Content\-Transfer\-Encoding\:\ (?P<ContentTransferEncoding>[^\\]+)\\n",
-            re.IGNORECASE,
-        )
-        ContentTransferEncoding = re.findall(ContentTransferEncodingPattern, eachmesg)[
-            0
-        ]
-        jsondict["ContentTransferEncoding"] = ContentTransferEncoding
-    except:
-        pass
-    MessageContent = re.findall(
-        r"\\n[^\\]+\\n[^\\]+\\n\'\,\ \'(?P<MessageContent>[\S\s]+)",
-        eachmesg,
-    )[0]
-    links = re.findall(r"([A-Za-z]+\:\/\/[^\"\ ]+)", MessageContent[4:-14])
-    MessageBody = re.sub(
-        r"\<[^\>]+\>[^\\]+",
-        r"",
-        re.sub(
-            r"[\"\']\,\ [\"\']",
-            r"",
-            re.sub(
-                r"\<\S[^\>]+\>",
-                r"",
-                re.sub(
-                    r"\\n\d+\,\ [A-Z]\,\ ",
-                    r"\\n ",
-                    re.sub(
-                        r"\\n\\n",
-                        r"\\n",
-                        re.sub(
-                            r"\\n\\n\\n",
-                            r"",
-                            MessageContent[4:-14]
-                            .replace("', '", "")
-                            .replace("\\n\\n", "\\n")
-                            .replace("\\n\\n", "\\n")
-                            .replace("\\t", "")
-                            .replace("\\n ", "\\n"),
-                        ),
-                    ),
-                ),
-            )
-            .replace("\\n\\n\\n", "")
-            .replace("\\n\\n", "")
-            .replace("\\n ", "")
-            .strip("\\n"),
-        ),
-    )
-    for eachlink in links:
-        allLinks.append(
-            eachlink.replace("\\n", "")
-            .replace("\\t", "")
-            .strip(",")
-            .strip("'")
-            .strip("\\")
-            .strip(".")
-            .strip("")
-            .strip("=")
-        )
-    Links = list(set(allLinks))
-    jsondict["Links"], jsondict["MessageBody"] = (
-        Links,
-        MessageBody,
+        return payload.decode(part.get_content_charset() or "utf-8", errors="replace")
+    except LookupError:  # unknown charset name
+        return payload.decode("utf-8", errors="replace")
+
+
+def message_record(message, attachments_dir: Optional[str] = None) -> dict:
+    """Headers, body, links and attachments of a parsed message."""
+    record = {
+        "From": _header(message, "From"),
+        "To": _header(message, "To"),
+        "Cc": _header(message, "Cc"),
+        "Subject": _header(message, "Subject"),
+        "LastWriteTime": _header(message, "Date"),
+        "MessageID": _header(message, "Message-ID"),
+        "MIMEVersion": _header(message, "MIME-Version"),
+        "ReturnPath": _header(message, "Return-Path"),
+        "ContentType": message.get_content_type(),
+        "Charset": message.get_content_charset() or "",
+        "ContentTransferEncoding": _header(message, "Content-Transfer-Encoding"),
+    }
+    received = [" ".join(str(each).split()) for each in message.get_all("Received", [])]
+    received_from = next((each[5:] for each in received if each.lower().startswith("from ")), "")
+    received_by = next((each[3:] for each in received if each.lower().startswith("by ")), "")
+    record["ReceivedFrom"] = received_from.split(";")[0].strip()
+    record["ReceivedFromIP"] = next(iter(_IP.findall(received_from)), "")
+    record["ReceivedBy"] = received_by.split(";")[0].split(" ")[0]
+    record["ReceivedTime"] = received[0].rsplit(";", 1)[-1].strip() if received and ";" in received[0] else ""
+
+    plain, html, attachments = [], [], []
+    for part in message.walk():
+        if part.is_multipart():
+            continue
+        filename = part.get_filename()
+        if filename or part.get_content_disposition() == "attachment":
+            payload = part.get_payload(decode=True) or b""
+            sha256 = hashlib.sha256(payload).hexdigest()
+            attachment = {
+                "Filename": _decoded(filename),
+                "ContentType": part.get_content_type(),
+                "Size": len(payload),
+                "SHA256": sha256,
+            }
+            if attachments_dir:
+                stored = os.path.join(
+                    attachments_dir, sha256 + "_" + _UNSAFE.sub("_", attachment["Filename"])[:100]
+                )
+                if not os.path.exists(stored):
+                    with open(stored, "wb") as output:
+                        output.write(payload)
+                attachment["Path"] = stored
+            attachments.append(attachment)
+        elif part.get_content_type() == "text/plain":
+            plain.append(_text(part))
+        elif part.get_content_type() == "text/html":
+            html.append(_text(part))
+    body = "\n".join(plain) if plain else _TAG.sub(" ", "\n".join(html))
+    record["MessageBody"] = "\n".join(" ".join(line.split()) for line in body.splitlines() if line.strip())
+    record["Links"] = sorted(
+        {link.rstrip(".,;)'\"=") for link in _LINK.findall("\n".join(plain + html))}
     )
-    ThreadNo += 1
-    mailjsonlist.append(json.dumps(jsondict))
-    jsondict.clear()
+    record["Attachments"] = attachments
+    return record
+
+
+def _extract_batch(
+    batch: List[Tuple[str, int, Optional[int]]], spill_file: str, mailbox: str, attachments_dir: Optional[str]
+) -> int:
+    written = 0
+    with open(spill_file, "w", encoding="utf-8") as spill:
+        for path, start, end in batch:
+            try:
+                for number, message in iter_messages(path, start, end):
+                    record = {"Mailbox": mailbox, "Source": path, "MessageNo": number}
+                    try:
+                        record.update(message_record(message, attachments_dir))
+                    except Exception as error:  # one malformed message must not lose the rest
+                        record["Error"] = "{}: {}".format(type(error).__name__, error)
+                    spill.write(json.dumps(record) + "\n")
+                    written += 1
+            except OSError:
+                continue  # unreadable source; the rest of the mailbox still counts
+    return written
+
+
+def _batches(sources: List[str]) -> List[List[Tuple[str, int, Optional[int]]]]:
+    """Batches of (path, start, end); each range of an mbox file is a batch of its own."""
+    batches, files = [], []
+    for path in sources:
+        if is_mbox(path):
+            try:
+                ranges = mbox_ranges(path)
+            except OSError:
+                ranges = [(0, None)]
+            batches.extend([(path, start, end)] for start, end in ranges)
+        else:
+            files.append((path, 0, None))
+            if len(files) == BATCH_FILES:
+                batches.append(files)
+                files = []
+    if files:
+        batches.append(files)
+    return batches
+
+
+def _copy_spill(spill_file: str, output, number_offset: int):
+    """Append a spill file to output, moving message numbers on by the messages in earlier ranges."""
+    with open(spill_file, encoding="utf-8") as spill:
+        if not number_offset:
+            shutil.copyfileobj(spill, output)
+            return
+        for line in spill:
+            record = json.loads(line)
+            record["MessageNo"] += number_offset
+            output.write(json.dumps(record) + "\n")
+
+
+def extract_mailbox(
+    sources: List[str],
+    output_file: str,
+    mailbox: str,
+    workers: Optional[int] = None,
+    attachments_dir: Optional[str] = None,
+) -> int:
+    """
+    Write one JSON line per message in sources to output_file.
+
+    Args:
+        sources: Mail sources (see iter_mail_sources)
+        output_file: JSONL written (replaced if it exists)
+        mailbox: Mailbox name recorded against every message
+        workers: Worker processes (default: CPU count; 1 parses in-process)
+        attachments_dir: Where to write attachments (default: hash only)
+
+    Returns:
+        The number of messages written
+    """
+    if attachments_dir:
+        os.makedirs(attachments_dir, exist_ok=True)
+    batches = _batches(list(sources))
+    partial_dir = output_file + ".partial"
+    os.makedirs(partial_dir, exist_ok=True)
+    spill_files = [os.path.join(partial_dir, "{:06d}.jsonl".format(index)) for index in range(len(batches))]
+    arguments = (batches, spill_files, [mailbox] * len(batches), [attachments_dir] * len(batches))
+    if (workers or os.cpu_count() or 1) == 1 or len(batches) <= 1:
+        counts = list(map(_extract_batch, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(_extract_batch, *arguments))
+    with open(output_file, "w", encoding="utf-8") as output:
+        number_offset = previous_count = 0
+        for batch, spill_file, count in zip(batches, spill_files, counts):
+            # Ranges of one mbox follow each other, so later ones continue its numbering
+            number_offset = number_offset + previous_count if batch[0][1] else 0
+            _copy_spill(spill_file, output, number_offset)
+            previous_count = count
+    shutil.rmtree(partial_dir)
+    return sum(counts)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3 -tt
+"""
+Strings Extraction for Memory Artefacts
+
+pagefile.sys, swapfile.sys and hiberfil.sys are memory-mapped and scanned
+in fixed-size chunks on a process pool, for printable ASCII runs and
+printable UTF-16LE runs (the form Windows keeps most strings in). Each
+string carries its file offset and encoding. Strings come back in file
+order, so keyword and IOC matching consume them as they are found (see
+rivendell/analysis/memory_strings.py) and no strings listing is written.
+
+A string belongs to the chunk it starts in. A chunk's scan reads just past
+its end, enough to complete a minimum-length string starting at the last
+byte; a string still running at that point is re-matched to its true end.
+A match whose preceding character is part of the same run is a
+continuation of the previous chunk's string and is dropped.
+"""
+
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional, Tuple
+
+MEMORY_ARTEFACTS = ("pagefile.sys", "swapfile.sys", "hiberfil.sys")
+ENCODINGS = ("ascii", "utf-16le")
+MIN_LENGTH = 4
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+_PRINTABLE = rb"[\t\x20-\x7e]"
+_UNIT = {"ascii": 1, "utf-16le": 2}
+
+
+def is_memory_artefact(path: str) -> bool:
+    """True for pagefile.sys, swapfile.sys and hiberfil.sys (in any case)."""
+    return os.path.basename(path).lower() in MEMORY_ARTEFACTS
+
+
+def _patterns(min_length: int, encodings: Tuple[str, ...]):
+    patterns = {}
+    for encoding in encodings:
+        if encoding == "ascii":
+            patterns[encoding] = re.compile(_PRINTABLE + b"{%d,}" % min_length)
+        elif encoding == "utf-16le":
+            patterns[encoding] = re.compile(b"(?:" + _PRINTABLE + b"\x00){%d,}" % min_length)
+        else:
+            raise ValueError("Unsupported strings encoding '{}'".format(encoding))
+    return patterns
+
+
+def _continues_run(data, position: int, encoding: str) -> bool:
+    """True if the character before position belongs to the same run."""
+    if encoding == "ascii":
+        return position > 0 and (data[position - 1] == 9 or 0x20 <= data[position - 1] <= 0x7E)
+    return (
+        position > 1
+        and data[position - 1] == 0
+        and (data[position - 2] == 9 or 0x20 <= data[position - 2] <= 0x7E)
+    )
+
+
+def _scan_chunk(path: str, start: int, end: int, min_length: int, encodings: Tuple[str, ...]):
+    """(offset, encoding, text) for every string starting in [start, end), in offset order."""
+    found = []
+    with open(path, "rb") as source, mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        size = len(data)
+        for encoding, pattern in _patterns(min_length, encodings).items():
+            unit = _UNIT[encoding]
+            limit = min(size, end + min_length * unit + unit)
+            for match in pattern.finditer(data, start, limit):
+                offset = match.start()
+                if offset >= end:
+                    break
+                if offset < start + unit and _continues_run(data, offset, encoding):
+                    continue
+                if match.end() + unit > limit and limit < size:
+                    match = pattern.match(data, offset)
+                found.append((offset, encoding, match.group().decode(encoding)))
+    found.sort(key=lambda each: each[0])
+    return found
+
+
+def iter_strings(
+    path: str,
+    min_length: int = MIN_LENGTH,
+    encodings: Tuple[str, ...] = ENCODINGS,
+    unique: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: Optional[int] = None,
+) -> Iterator[Tuple[int, str, str]]:
+    """
+    Yield (offset, encoding, text) for every printable string in path.
+
+    Args:
+        path: File to scan (typically a memory artefact)
+        min_length: Minimum string length, in characters
+        encodings: Any of "ascii" and "utf-16le"
+        unique: Only yield the first occurrence of each distinct string
+        chunk_size: Bytes scanned per task
+        workers: Worker processes (default: CPU count; 1 scans in-process)
+
+    Strings are yielded in file offset order. At most two chunks per
+    worker are in flight, so memory is bounded by the chunk size rather
+    than the file size.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+    encodings = tuple(encodings)
+    _patterns(min_length, encodings)  # reject unsupported encodings before any work
+    starts = range(0, size, chunk_size)
+    seen = set()
+
+    def emit(found):
+        for offset, encoding, text in found:
+            if unique:
+                if text in seen:
+                    continue
+                seen.add(text)
+            yield offset, encoding, text
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(starts) == 1:
+        for start in starts:
+            yield from emit(_scan_chunk(path, start, min(start + chunk_size, size), min_length, encodings))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        queued = iter(starts)
+        for start in queued:
+            pending.append(
+                pool.submit(_scan_chunk, path, start, min(start + chunk_size, size), min_length, encodings)
+            )
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            found = pending.popleft().result()
+            start = next(queued, None)
+            if start is not None:
+                pending.append(
+                    pool.submit(_scan_chunk, path, start, min(start + chunk_size, size), min_length, encodings)
+                )
+            yield from emit(found)
+
@@ -6,7 +6,9 @@ import subprocess
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.checkpoint import checkpoint_handler
 from rivendell.process.extractions.mitre_tagger import tag_mitre_technique
+from rivendell.profiling import profile_handler
 
 
 def tidy_journalentry(entry):
@@ -116,6 +118,8 @@ def tidy_journalentry(entry):
     return journalentry
 
 
+@checkpoint_handler
+@profile_handler
 def process_journal(
     verbosity, vssimage, output_directory, img, vss_path_insert, stage, artefact
 ):
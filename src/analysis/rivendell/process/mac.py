@@ -6,10 +6,12 @@ import re
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.checkpoint import checkpoint_handler
 from rivendell.process.extractions.plist import (
     format_plist_extractions,
 )
 from rivendell.process.extractions.mitre_tagger import tag_mitre_technique
+from rivendell.profiling import profile_handler
 
 
 def repair_malformed_plist(plist_out):
@@ -69,6 +71,8 @@ def repair_malformed_plist(plist_out):
     return plist_out
 
 
+@checkpoint_handler
+@profile_handler
 def process_plist(
     verbosity, vssimage, output_directory, img, vss_path_insert, stage, artefact
 ):
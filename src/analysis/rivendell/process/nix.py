@@ -5,10 +5,13 @@ import re
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
-from rivendell.process.extractions.mail import (
-    extract_email_artefacts,
-)
+from rivendell.checkpoint import checkpoint_handler
+from rivendell.process.extractions.mail import extract_mailbox, iter_mail_sources
 from rivendell.process.extractions.mitre_tagger import tag_mitre_technique
+from rivendell.profiling import profile_handler
+
+# Mailboxes already extracted; process_email is called once per .emlx
+_processed_mailboxes = set()
 
 
 def repair_malformed_service(service_json):
@@ -119,6 +122,8 @@ def repair_malformed_service(service_json):
     return service_json
 
 
+@checkpoint_handler
+@profile_handler
 def process_bash_history(
     verbosity, vssimage, output_directory, img, vss_path_insert, stage, artefact
 ):
@@ -168,6 +173,8 @@ def process_bash_history(
     tag_mitre_technique(output_directory, img, "bash_history")
 
 
+@checkpoint_handler
+@profile_handler
 def process_email(
     verbosity,
     vssimage,
@@ -179,219 +186,66 @@ def process_email(
     jsondict,
     jsonlist,
 ):
-    mailjsonlist = []
-    if not os.path.exists(
+    # every .emlx is dispatched on its own; the first one of a mailbox processes all of it
+    mailbox = artefact.split("/")[-2]
+    mailbox_key = output_directory + img.split("::")[0] + vss_path_insert + mailbox
+    if mailbox_key in _processed_mailboxes:
+        return
+    _processed_mailboxes.add(mailbox_key)
+    mail_directory = (
         output_directory
         + img.split("::")[0]
         + "/artefacts/cooked"
         + vss_path_insert
         + "mail"
-    ):
-        try:
-            os.makedirs(
-                output_directory
-                + img.split("::")[0]
-                + "/artefacts/cooked"
-                + vss_path_insert
-                + "mail"
-            )
-        except:
-            pass
-    if not os.path.exists(
-        output_directory
-        + img.split("::")[0]
-        + "/artefacts/cooked"
-        + vss_path_insert
-        + "mail/"
-        + artefact.split("/")[-2]
-    ):
-        try:
-            os.makedirs(
-                output_directory
-                + img.split("::")[0]
-                + "/artefacts/cooked"
-                + vss_path_insert
-                + "mail/"
-                + artefact.split("/")[-2]
-            )
-        except:
-            pass
-    entry, prnt = "{},{},{},'{}' ({}) Mail artefact\n".format(
+    )
+    os.makedirs(mail_directory, exist_ok=True)
+    entry, prnt = "{},{},{},'{}' Mail artefacts\n".format(
         datetime.now().isoformat(),
         vssimage.replace("'", ""),
         stage,
-        artefact.split("/")[-1],
-        artefact.split("/")[-2],
-    ), " -> {} -> {} Mail artefact '{}' ({}) from {}".format(
+        mailbox,
+    ), " -> {} -> {} Mail artefacts for '{}' from {}".format(
         datetime.now().isoformat().replace("T", " "),
         stage,
-        artefact.split("/")[-1],
-        artefact.split("/")[-2],
+        mailbox,
         vssimage,
     )
     write_audit_log_entry(verbosity, output_directory, entry, prnt)
-    with open(
-        output_directory
-        + img.split("::")[0]
-        + "/artefacts/cooked"
-        + vss_path_insert
-        + "mail/"
-        + artefact.split("/")[-2]
-        + "/"
-        + artefact.split("/")[-1]
-        + ".json",
-        "a",
-    ) as emlxjson:
-        try:
-            with open(
+    messages = extract_mailbox(
+        list(
+            iter_mail_sources(
                 output_directory
                 + img.split("::")[0]
                 + "/artefacts/raw"
                 + vss_path_insert
                 + "mail/emails/"
-                + artefact.split("/")[-2]
-                + "/"
-                + artefact.split("/")[-1],
-                "r",
-                encoding="utf-8",
-            ) as mailemlx:
-                emlxchain = str(mailemlx.readlines())
-        except:
-            with open(
-                output_directory
-                + img.split("::")[0]
-                + "/artefacts/raw"
-                + vss_path_insert
-                + "mail/emails/"
-                + artefact.split("/")[-2]
-                + "/"
-                + artefact.split("/")[-1],
-                "r",
-                encoding="ISO-8859-1",
-            ) as mailemlx:
-                emlxchain = str(mailemlx.readlines())
-        ThreadNo, allLinks = 1, []
-        try:
-            boundaryPattern = re.compile(r"boundary\=\"([^\"]+)", re.IGNORECASE)
-            boundary = re.findall(boundaryPattern, emlxchain)[0]
-        except:
-            boundary = ""
-        try:
-            ReceivedTime = re.findall(
-                r"(?P<ReceivedTime>[A-Z][a-z]{2}\,\ \d+\ [A-Z][a-z]{2}\ \d+(?:\\n\'\,\ \')?\ \d+\:\d+\:\d+[^\\]+)",
-                emlxchain,
-            )[0]
-            jsondict["ReceivedTime"] = ReceivedTime
-        except:
-            pass
-        try:
-            ReceivedByPattern = re.compile(
-                r"'Received\:\ by\ (?P<ReceivedBy>[A-Fa-f\d\.\:]+)[^\;]+\;(?:\ |\\n(?:[\'\,\ ]+)?)",
-                re.IGNORECASE,
-            )
-            ReceivedBy = re.findall(ReceivedByPattern, emlxchain)[0]
-            jsondict["ReceivedBy"] = ReceivedBy
-        except:
-            pass
-        try:
-            ReturnPathPattern = re.compile(
-                r"'Return\-Path\:\ (?P<ReturnPath>[^\\]+)\\n",
-                re.IGNORECASE,
-            )
-            ReturnPath = re.findall(ReturnPathPattern, emlxchain)[0]
-            jsondict["ReturnPath"] = ReturnPath
-        except:
-            pass
-        try:
-            ReceivedFromPattern = re.compile(
-                r"'Received\:\ from\ (?P<ReceivedFrom>[^\\]+)",
-                re.IGNORECASE,
-            )
-            ReceivedFrom = re.findall(ReceivedFromPattern, emlxchain)[0]
-            jsondict["ReceivedFrom"] = ReceivedFrom
-        except:
-            pass
-        try:
-            ReceivedFromIP = re.findall(
-                r"((?:\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|[A-Fa-f\d]+\:[A-Fa-f\d]+\:[A-Fa-f\d]+\:[A-Fa-f\d]+\:[A-Fa-f\d]+\:[A-Fa-f\d]+\:[A-Fa-f\d]+\:[A-Fa-f\d]+))",
-                ReceivedFrom,
-            )[0]
-            jsondict["ReceivedFromIP"] = ReceivedFromIP
-        except:
-            pass
-        try:
-            FromPattern = re.compile(r"From\:\ ([^\\]+)", re.IGNORECASE)
-            From = re.findall(FromPattern, emlxchain)[0]
-            jsondict["From"] = From
-        except:
-            pass
-        try:
-            ToPattern = re.compile(r"To\:\ ([^\\]+)", re.IGNORECASE)
-            To = re.findall(ToPattern, emlxchain)[0]
-            jsondict["To"] = To
-        except:
-            pass
-        try:
-            SubjectPattern = re.compile(r"Subject\:\ ([^\\]+)", re.IGNORECASE)
-            Subject = re.findall(SubjectPattern, emlxchain)[0]
-            jsondict["Subject"] = Subject
-        except:
-            pass
-        try:
-            LastWriteTimePattern = re.compile(r"Date\:\ ([^\\]+)", re.IGNORECASE)
-            LastWriteTime = re.findall(LastWriteTimePattern, emlxchain)[0]
-            jsondict["LastWriteTime"] = LastWriteTime
-        except:
-            pass
-        try:
-            MessageIDPattern = re.compile(r"Message\-ID\:\ ([^\\]+)", re.IGNORECASE)
-            MessageID = re.findall(MessageIDPattern, emlxchain)[0]
-            jsondict["MessageID"] = MessageID
-        except:
-            pass
-        try:
-            MIMEVersionPattern = re.compile(r"MIME\-Version\:\ ([^\\]+)", re.IGNORECASE)
-            MIMEVersion = re.findall(MIMEVersionPattern, emlxchain)[0]
-            jsondict["MIMEVersion"] = MIMEVersion
-        except:
-            pass
-        jsondict["Mailbox"], jsondict["ThreadNo"] = (
-            artefact.split("/")[-2],
-            ThreadNo,
-        )
-        if boundary != "":
-            for eachmesg in emlxchain.split(boundary)[2:-1]:
-                jsondict["Boundary"] = boundary
-                extract_email_artefacts(
-                    eachmesg[6::],
-                    jsondict,
-                    mailjsonlist,
-                    ThreadNo,
-                    allLinks,
-                )
-        else:
-            extract_email_artefacts(
-                emlxchain,
-                jsondict,
-                mailjsonlist,
-                ThreadNo,
-                allLinks,
-            )
-        if len(mailjsonlist) > 0:
-            emlxjson.write(
-                str(mailjsonlist)
-                .replace('\\\\"', "")
-                .replace("\\\\\\\\n", "\\n")
-                .replace("\"}', '{\"", '"}, {"')
-                .replace("['{", "[{")
-                .replace("}']", "}]")
-                .replace("\\' >", "")
+                + mailbox
             )
-        mailjsonlist.clear()
+        ),
+        mail_directory + "/" + mailbox + ".jsonl",
+        mailbox,
+    )
+    entry, prnt = "{},{},{},'{}' Mail artefacts completed ({} messages)\n".format(
+        datetime.now().isoformat(),
+        vssimage.replace("'", ""),
+        stage,
+        mailbox,
+        messages,
+    ), " -> {} -> {} {} messages in '{}' from {}".format(
+        datetime.now().isoformat().replace("T", " "),
+        stage,
+        messages,
+        mailbox,
+        vssimage,
+    )
+    write_audit_log_entry(verbosity, output_directory, entry, prnt)
     # Tag MITRE technique for email
     tag_mitre_technique(output_directory, img, "email")
 
 
+@checkpoint_handler
+@profile_handler
 def process_group(
     verbosity, vssimage, output_directory, img, vss_path_insert, stage, artefact
 ):
@@ -435,6 +289,8 @@ def process_group(
     tag_mitre_technique(output_directory, img, "group")
 
 
+@checkpoint_handler
+@profile_handler
 def process_logs(
     verbosity,
     vssimage,
@@ -835,6 +691,8 @@ def process_logs(
                 tag_mitre_technique(output_directory, img, "logs")
 
 
+@checkpoint_handler
+@profile_handler
 def process_service(
     verbosity,
     vssimage,
@@ -2,34 +2,37 @@
 import os
 import re
 
-from rivendell.process.browser import process_browser_index
-from rivendell.process.browser import process_browser
-from rivendell.process.mac import process_plist
-from rivendell.process.linux import process_journal
-from rivendell.process.nix import process_bash_history
-from rivendell.process.nix import process_email
-from rivendell.process.nix import process_group
-from rivendell.process.nix import process_logs
-from rivendell.process.nix import process_service
-from rivendell.process.windows import process_clipboard
-from rivendell.process.windows import process_evtx
-from rivendell.process.windows import process_hiberfil
-from rivendell.process.windows import process_jumplists
-from rivendell.process.windows import process_mft
-from rivendell.process.windows import process_outlook
-from rivendell.process.windows import process_pagefile
-from rivendell.process.windows import process_prefetch
-from rivendell.process.windows import (
-    process_registry_system,
-)
-from rivendell.process.windows import process_registry_profile
-from rivendell.process.windows import process_shimcache
-from rivendell.process.windows import process_sru
-from rivendell.process.windows import process_ual
-from rivendell.process.windows import process_usb
-from rivendell.process.windows import process_usn
-from rivendell.process.windows import process_wbem
-from rivendell.process.windows import process_wmi
+from rivendell.lazy import lazy_callable
+from rivendell.progress import artefact_done
+
+# Handlers are imported on first use: a phase only touches the modules for
+# the artefacts it finds, and windows/mac/nix pull in large extraction code.
+process_browser_index = lazy_callable("rivendell.process.browser", "process_browser_index")
+process_browser = lazy_callable("rivendell.process.browser", "process_browser")
+process_plist = lazy_callable("rivendell.process.mac", "process_plist")
+process_journal = lazy_callable("rivendell.process.linux", "process_journal")
+process_bash_history = lazy_callable("rivendell.process.nix", "process_bash_history")
+process_email = lazy_callable("rivendell.process.nix", "process_email")
+process_group = lazy_callable("rivendell.process.nix", "process_group")
+process_logs = lazy_callable("rivendell.process.nix", "process_logs")
+process_service = lazy_callable("rivendell.process.nix", "process_service")
+process_clipboard = lazy_callable("rivendell.process.windows", "process_clipboard")
+process_evtx = lazy_callable("rivendell.process.windows", "process_evtx")
+process_hiberfil = lazy_callable("rivendell.process.windows", "process_hiberfil")
+process_jumplists = lazy_callable("rivendell.process.windows", "process_jumplists")
+process_mft = lazy_callable("rivendell.process.windows", "process_mft")
+process_outlook = lazy_callable("rivendell.process.windows", "process_outlook")
+process_pagefile = lazy_callable("rivendell.process.windows", "process_pagefile")
+process_prefetch = lazy_callable("rivendell.process.windows", "process_prefetch")
+process_registry_system = lazy_callable("rivendell.process.windows", "process_registry_system")
+process_registry_profile = lazy_callable("rivendell.process.windows", "process_registry_profile")
+process_shimcache = lazy_callable("rivendell.process.windows", "process_shimcache")
+process_sru = lazy_callable("rivendell.process.windows", "process_sru")
+process_ual = lazy_callable("rivendell.process.windows", "process_ual")
+process_usb = lazy_callable("rivendell.process.windows", "process_usb")
+process_usn = lazy_callable("rivendell.process.windows", "process_usn")
+process_wbem = lazy_callable("rivendell.process.windows", "process_wbem")
+process_wmi = lazy_callable("rivendell.process.windows", "process_wmi")
 
 
 def process_artefacts(
@@ -348,7 +351,10 @@ def process_artefacts(
             # TODO: Investigate and fix Volatility recursion issue
             # See: docs/DEFERRED_MEMORY_PROCESSING.md for details
             print(f"      [WARNING] Skipping hiberfil.sys Volatility processing due to known recursion issue")
-            print(f"      File collected but not processed: {artefact}")
+            print(f"      File collected; its strings are searched during analysis: {artefact}")
+            process_pagefile(
+                verbosity, vssimage, output_directory, img, vss_path_insert, artefact
+            )
             # if not os.path.exists(
             #     output_directory
             #     + img.split("::")[0]
@@ -453,6 +459,8 @@ def process_artefacts(
                                 )
                         except:
                             pass
+    if img_name in artefact:
+        artefact_done(artefact)
     return vssmem
 
 
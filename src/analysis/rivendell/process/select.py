@@ -7,10 +7,16 @@ from collections import OrderedDict
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.lazy import lazy_callable
 from rivendell.process.process import determine_vss_image
 from rivendell.process.process import process_artefacts
+from rivendell.progress import expect
 from rivendell.utils import safe_listdir, safe_iterdir
 
+# Artemis extractions are queued while an image is processed and run together
+begin_artemis_batch = lazy_callable("rivendell.process.extractions.artemis", "begin_batch")
+end_artemis_batch = lazy_callable("rivendell.process.extractions.artemis", "end_batch")
+
 
 def select_artefacts_to_process(img, process_list, artefacts_list, processed_artefacts):
     for each in process_list:
@@ -83,6 +89,11 @@ def select_artefacts_to_process(img, process_list, artefacts_list, processed_art
     return artefacts_list
 
 
+def _artefact_paths(artefacts_list):
+    """Paths of "<type>: <path>" entries in artefacts_list."""
+    return [each.split(": ", 1)[1] for each in artefacts_list if ": " in each]
+
+
 def select_pre_process_artefacts(
     output_directory,
     verbosity,
@@ -176,6 +187,7 @@ def select_pre_process_artefacts(
                         )
                     )
                 processed_imgs.append(img_basename)
+        expect(_artefact_paths(artefacts_list))
         for _, img in imgs.items():  # processing identified artefacts
             # Extract basename for display and path construction
             img_basename = img.split("::")[0].split("/")[-1]
@@ -198,6 +210,7 @@ def select_pre_process_artefacts(
                 datetime.now().isoformat().replace("T", " "), stage, vssimage
             )
             write_audit_log_entry(verbosity, output_directory, entry, prnt)
+            begin_artemis_batch()
             try:
                 for each in artefacts_list:
                     ia = re.findall(r"(?P<i>[^\:]+)\:\ (?P<a>[^\:]+)", each)
@@ -470,6 +483,7 @@ def select_pre_process_artefacts(
                     artefacts_list = select_artefacts_to_process(
                         img, process_list, artefacts_list, processed_artefacts
                     )
+                    expect(_artefact_paths(artefacts_list))
                     for each in artefacts_list:
                         ia = re.findall(r"(?P<i>[^\:]+)\:\ (?P<a>[^\:]+)", each)
                         artefact = str(ia[0][1])
@@ -495,6 +509,16 @@ def select_pre_process_artefacts(
                             vssimage
                         )
                     )
+            artemis_stats = end_artemis_batch()
+            if artemis_stats.get("jobs"):
+                print(
+                    " -> {} -> ran {} Artemis extractions for {} in {} artemis runs".format(
+                        datetime.now().isoformat().replace("T", " "),
+                        artemis_stats["jobs"],
+                        vssimage,
+                        artemis_stats["launches"],
+                    )
+                )
             entry, prnt = "{},{},{},completed\n".format(
                 datetime.now().isoformat(), vssimage.replace("'", ""), stage
             ), " -> {} -> processing completed for {}".format(
@@ -508,6 +532,8 @@ def select_pre_process_artefacts(
             flags.append("02processing")
         os.chdir(cwd)
     finally:
+        # Drop any extractions still queued for an image that did not finish
+        end_artemis_batch(run=False)
         # Restore original recursion limit (always executed, even if exception occurs)
         sys.setrecursionlimit(original_recursion_limit)
 
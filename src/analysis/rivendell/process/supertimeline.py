@@ -0,0 +1,379 @@
+#!/usr/bin/env python3 -tt
+"""
+Super-timeline built from cooked artefacts.
+
+Rather than re-parsing the whole source image with plaso, this streams
+timestamped records out of the JSON/CSV artefacts elrond has already cooked
+(EVTX, MFT, registry, browser, prefetch, ...), normalises each timestamp into
+a compact event and sorts the events with a bounded-memory external merge
+sort.
+
+Output layout (under <image>/artefacts/timeline/):
+    chunk_<YYYYMMDD>_<NNNN>.jsonl  time-partitioned, sorted event chunks
+    timeline_index.json           sparse index of (timestamp, chunk, offset)
+
+A time-range query bisects the sparse index, seeks straight into the right
+chunk and reads forward until the end of the range.
+"""
+
+import bisect
+import csv
+import heapq
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from rivendell.audit import write_audit_log_entry
+from rivendell.profiling import span
+from rivendell.utils import iter_json_records
+
+# Events held in memory before a sorted run is spilled to disk
+RUN_SIZE = 250000
+# Maximum events per chunk file (chunks are also split at day boundaries)
+CHUNK_SIZE = 500000
+# One sparse index entry is written every INDEX_INTERVAL events
+INDEX_INTERVAL = 1000
+
+INDEX_FILENAME = "timeline_index.json"
+
+# Explicit timestamp fields and the description recorded for them
+TIMESTAMP_FIELDS = {
+    "@timestamp": "Event Time",
+    "timestamp": "Event Time",
+    "LastWriteTime": "Last Written",
+    "LastWrite": "Last Written",
+    "last_write": "Last Written",
+    "SystemTime": "Event Time",
+    "TimeCreated": "Event Time",
+    "EventTime": "Event Time",
+    "created": "Created",
+    "modified": "Modified",
+    "accessed": "Accessed",
+    "changed": "Entry Modified",
+    "filename_created": "Filename Created",
+    "filename_modified": "Filename Modified",
+    "filename_accessed": "Filename Accessed",
+    "filename_changed": "Filename Entry Modified",
+    "last_run_time": "Last Run",
+    "last_run": "Last Run",
+    "run_time": "Run Time",
+    "start_time": "Start Time",
+    "end_time": "End Time",
+    "last_visit_time": "Last Visited",
+    "visit_time": "Visited",
+    "install_date": "Installed",
+    "first_seen": "First Seen",
+    "last_seen": "Last Seen",
+}
+# Suffixes used to pick up artefact-specific timestamp fields not listed above
+TIMESTAMP_SUFFIXES = ("time", "timestamp", "_date", "_at")
+
+# Fields used (in priority order) to describe an event
+MESSAGE_FIELDS = (
+    "message",
+    "Message",
+    "full_path",
+    "path",
+    "Path",
+    "filename",
+    "url",
+    "title",
+    "command",
+    "key",
+    "name",
+    "Name",
+)
+
+_ISO_PATTERN = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:[.,](\d{1,9}))?\s*(Z|UTC|[+-]\d{2}:?\d{2})?$"
+)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def normalise_timestamp(value):
+    """
+    Normalise a timestamp value into a fixed-width, lexically sortable UTC string.
+
+    Accepts ISO 8601 strings (with or without offset) and epoch seconds,
+    milliseconds or microseconds. Returns None for empty, zero or
+    unparseable values so they are left out of the timeline.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        if value <= 0:
+            return None
+        if value > 1e14:  # microseconds
+            value = value / 1e6
+        elif value > 1e11:  # milliseconds
+            value = value / 1e3
+        try:
+            dt = _EPOCH + timedelta(seconds=value)
+        except OverflowError:
+            return None
+    elif isinstance(value, str):
+        match = _ISO_PATTERN.match(value.strip())
+        if not match:
+            return None
+        year, month, day, hour, minute, second, fraction, offset = match.groups()
+        if year in ("0000", "1601", "1970"):
+            return None
+        micro = int((fraction or "0")[:6].ljust(6, "0"))
+        try:
+            dt = datetime(
+                int(year), int(month), int(day), int(hour), int(minute), int(second), micro
+            )
+        except ValueError:
+            return None
+        if offset and offset not in ("Z", "UTC"):
+            sign = -1 if offset[0] == "-" else 1
+            offset = offset[1:].replace(":", "")
+            dt -= sign * timedelta(hours=int(offset[:2]), minutes=int(offset[2:]))
+    else:
+        return None
+    if dt.year <= 1970:
+        return None
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def _describe(record):
+    for field in MESSAGE_FIELDS:
+        value = record.get(field)
+        if value not in (None, ""):
+            return str(value)
+    summary = []
+    for key, value in record.items():
+        if isinstance(value, (str, int, float)) and value != "":
+            summary.append("{}={}".format(key, value))
+        if len(summary) == 4:
+            break
+    return "; ".join(summary)
+
+
+def extract_timeline_events(record, host, artefact):
+    """
+    Yield compact timeline events for every timestamp found in a cooked record.
+
+    A record with several timestamps (e.g. MFT MACB times) produces one event
+    per distinct timestamp field.
+    """
+    message = None
+    for key, value in record.items():
+        if isinstance(value, (dict, list)):
+            continue
+        desc = TIMESTAMP_FIELDS.get(key)
+        if desc is None:
+            lowered = key.lower()
+            if not lowered.endswith(TIMESTAMP_SUFFIXES):
+                continue
+            desc = key
+        ts = normalise_timestamp(value)
+        if ts is None:
+            continue
+        if message is None:
+            message = _describe(record)
+        yield {
+            "LastWriteTime": ts,
+            "timestamp_desc": desc,
+            "host": host,
+            "artefact": artefact,
+            "message": message,
+        }
+
+
+def _iter_csv_records(path):
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        for row in csv.DictReader(f):
+            yield row
+
+
+def iter_cooked_events(cooked_dir, host):
+    """Stream timeline events from every JSON, JSONL and CSV file below cooked_dir."""
+    for root, _, files in os.walk(cooked_dir):
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            artefact = os.path.relpath(path, cooked_dir)
+            if filename.endswith((".json", ".jsonl")):
+                records = iter_json_records(path)
+            elif filename.endswith(".csv"):
+                records = _iter_csv_records(path)
+            else:
+                continue
+            try:
+                for record in records:
+                    yield from extract_timeline_events(record, host, artefact)
+            except (OSError, UnicodeDecodeError, csv.Error):
+                continue
+
+
+def _event_key(event):
+    return event["LastWriteTime"]
+
+
+def _spill_run(events, work_dir, run_number):
+    events.sort(key=_event_key)
+    run_path = os.path.join(work_dir, "run_{:05d}.jsonl".format(run_number))
+    with open(run_path, "w") as run:
+        for event in events:
+            run.write(json.dumps(event, separators=(",", ":")) + "\n")
+    return run_path
+
+
+def _read_run(run_path):
+    with open(run_path, "r") as run:
+        for line in run:
+            yield json.loads(line)
+
+
+def external_sort(events, work_dir, run_size=RUN_SIZE):
+    """
+    Sort an arbitrarily large event stream with bounded memory.
+
+    Events are buffered up to run_size, sorted and spilled to run files in
+    work_dir; the runs are then k-way merged lazily with heapq.merge.
+    """
+    runs = []
+    buffer = []
+    for event in events:
+        buffer.append(event)
+        if len(buffer) >= run_size:
+            runs.append(_spill_run(buffer, work_dir, len(runs)))
+            buffer = []
+    if not runs:
+        buffer.sort(key=_event_key)
+        return iter(buffer)
+    if buffer:
+        runs.append(_spill_run(buffer, work_dir, len(runs)))
+    return heapq.merge(*(_read_run(run) for run in runs), key=_event_key)
+
+
+def write_partitions(sorted_events, timeline_dir, chunk_size=CHUNK_SIZE, index_interval=INDEX_INTERVAL):
+    """
+    Write sorted events into day-partitioned chunk files plus a sparse index.
+
+    Returns the number of events written.
+    """
+    os.makedirs(timeline_dir, exist_ok=True)
+    index = []
+    chunk = None
+    chunk_name = None
+    chunk_day = None
+    chunk_count = 0
+    chunk_number = 0
+    total = 0
+    try:
+        for event in sorted_events:
+            day = event["LastWriteTime"][:10].replace("-", "")
+            if chunk is None or day != chunk_day or chunk_count >= chunk_size:
+                if chunk is not None:
+                    chunk.close()
+                chunk_number = chunk_number + 1 if day == chunk_day else 0
+                chunk_day = day
+                chunk_name = "chunk_{}_{:04d}.jsonl".format(day, chunk_number)
+                chunk = open(os.path.join(timeline_dir, chunk_name), "wb")
+                chunk_count = 0
+            if chunk_count % index_interval == 0:
+                index.append([event["LastWriteTime"], chunk_name, chunk.tell()])
+            chunk.write((json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8"))
+            chunk_count += 1
+            total += 1
+    finally:
+        if chunk is not None:
+            chunk.close()
+    with open(os.path.join(timeline_dir, INDEX_FILENAME), "w") as idx:
+        json.dump({"events": total, "interval": index_interval, "index": index}, idx)
+    return total
+
+
+def load_timeline_index(timeline_dir):
+    with open(os.path.join(timeline_dir, INDEX_FILENAME)) as idx:
+        return json.load(idx)["index"]
+
+
+def query_timeline(timeline_dir, start=None, end=None, index=None):
+    """
+    Yield events with start <= LastWriteTime <= end from a partitioned timeline.
+
+    start and end may be any value accepted by normalise_timestamp (or None
+    for an open-ended range). The sparse index is bisected to find the first
+    chunk offset to read from, so only the requested slice is read.
+    """
+    if index is None:
+        index = load_timeline_index(timeline_dir)
+    if not index:
+        return
+    start_ts = normalise_timestamp(start) if start is not None else None
+    end_ts = normalise_timestamp(end) if end is not None else None
+    if start_ts is None:
+        position = 0
+    else:
+        keys = [entry[0] for entry in index]
+        # Step back one entry: events equal to start may precede the first matching key
+        position = max(bisect.bisect_left(keys, start_ts) - 1, 0)
+    _, chunk_name, offset = index[position]
+    chunk_names = []
+    for entry in index[position:]:
+        if entry[1] not in chunk_names:
+            chunk_names.append(entry[1])
+    for chunk_name in chunk_names:
+        with open(os.path.join(timeline_dir, chunk_name), "rb") as chunk:
+            chunk.seek(offset)
+            offset = 0
+            for line in chunk:
+                event = json.loads(line)
+                ts = event["LastWriteTime"]
+                if start_ts is not None and ts < start_ts:
+                    continue
+                if end_ts is not None and ts > end_ts:
+                    return
+                yield event
+
+
+def build_super_timeline(cooked_dir, timeline_dir, host, run_size=RUN_SIZE, chunk_size=CHUNK_SIZE):
+    """Stream, sort and partition all cooked events for one host. Returns event count."""
+    if os.path.exists(timeline_dir):
+        shutil.rmtree(timeline_dir)
+    os.makedirs(timeline_dir)
+    work_dir = tempfile.mkdtemp(prefix=".sort_", dir=timeline_dir)
+    try:
+        sorted_events = external_sort(iter_cooked_events(cooked_dir, host), work_dir, run_size)
+        return write_partitions(sorted_events, timeline_dir, chunk_size)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def create_cooked_timeline(verbosity, output_directory, stage, img):
+    """
+    Build the super-timeline for an image from its cooked artefacts.
+
+    Returns False when there are no cooked artefacts to build from, so the
+    caller can fall back to a full plaso run.
+    """
+    img_name = img.split("::")[0]
+    cooked_dir = os.path.join(output_directory, img_name, "artefacts", "cooked")
+    if not os.path.isdir(cooked_dir):
+        return False
+    timeline_dir = os.path.join(output_directory, img_name, "artefacts", "timeline")
+    entry, prnt = "{},{},{},commenced (cooked artefacts)\n".format(
+        datetime.now().isoformat(), img_name, stage
+    ), " -> {} -> building super-timeline from cooked artefacts for '{}'".format(
+        datetime.now().isoformat().replace("T", " "), img_name
+    )
+    write_audit_log_entry(verbosity, output_directory, entry, prnt)
+    with span("handler", "build_super_timeline", cooked_dir) as current:
+        total = build_super_timeline(cooked_dir, timeline_dir, img_name)
+        current.add(records=total)
+    if total == 0:
+        shutil.rmtree(timeline_dir, ignore_errors=True)
+        return False
+    print("     Timelined {} events from cooked artefacts".format(total))
+    entry, prnt = "{},{},{},{} events\n".format(
+        datetime.now().isoformat(), img_name, stage, total
+    ), " -> {} -> super-timeline completed for '{}'".format(
+        datetime.now().isoformat().replace("T", " "), img_name
+    )
+    write_audit_log_entry(verbosity, output_directory, entry, prnt)
+    return True
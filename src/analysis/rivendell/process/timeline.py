@@ -6,6 +6,7 @@ import time
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.profiling import tool_span
 
 
 def convert_plaso_timeline(verbosity, output_directory, stage, img):
@@ -183,7 +184,8 @@ def create_plaso_timeline(verbosity, output_directory, stage, img, d, timelineim
     env["PYTHONPATH"] = ""
 
     print(f"     Running: {' '.join(cmd)} (with clean PYTHONPATH)")
-    result = subprocess.Popen(cmd, env=env).communicate()[0]
+    with tool_span("psteal", timelineimagepath):
+        result = subprocess.Popen(cmd, env=env).communicate()[0]
     os.chdir("..")
 
     # Check if timeline was created
@@ -4,17 +4,22 @@ import subprocess
 from datetime import datetime
 
 from rivendell.audit import write_audit_log_entry
+from rivendell.checkpoint import checkpoint_handler
 from rivendell.memory.memory import process_memory
 from rivendell.process.extractions.clipboard import extract_clipboard
+from rivendell.process.extractions.mail import extract_mailbox, iter_mail_sources
 from rivendell.process.extractions.registry.profile import extract_registry_profile
 from rivendell.process.extractions.registry.system import extract_registry_system
 from rivendell.process.extractions.usb import extract_usb
 from rivendell.process.extractions import artemis
+from rivendell.profiling import profile_handler
 
 # Track which prefetch directories have been processed to avoid duplicates
 _processed_prefetch_dirs = set()
 
 
+@checkpoint_handler
+@profile_handler
 def process_mft(
     verbosity, vssimage, output_directory, img, artefact, vss_path_insert, stage
 ):
@@ -52,6 +57,8 @@ def process_mft(
     )
 
 
+@checkpoint_handler
+@profile_handler
 def process_usn(
     verbosity, vssimage, output_directory, img, artefact, vss_path_insert, stage
 ):
@@ -87,6 +94,8 @@ def process_usn(
     )
 
 
+@checkpoint_handler
+@profile_handler
 def process_usb(
     verbosity,
     vssimage,
@@ -119,6 +128,8 @@ def process_usb(
     )
 
 
+@checkpoint_handler
+@profile_handler
 def process_shimcache(
     verbosity, vssimage, output_directory, img, vss_path_insert, stage
 ):
@@ -152,6 +163,8 @@ def process_shimcache(
     )
 
 
+@checkpoint_handler
+@profile_handler
 def process_registry_system(
     verbosity,
     vssimage,
@@ -206,6 +219,8 @@ def process_registry_system(
         )
 
 
+@checkpoint_handler
+@profile_handler
 def process_registry_profile(
     verbosity,
     vssimage,
@@ -267,6 +282,8 @@ def process_registry_profile(
         )
 
 
+@checkpoint_handler
+@profile_handler
 def process_evtx(
     verbosity,
     vssimage,
@@ -321,6 +338,8 @@ def process_evtx(
         )
 
 
+@checkpoint_handler
+@profile_handler
 def process_clipboard(
     verbosity,
     vssimage,
@@ -366,6 +385,8 @@ def process_clipboard(
         )
 
 
+@checkpoint_handler
+@profile_handler
 def process_prefetch(
     verbosity,
     vssimage,
@@ -412,6 +433,8 @@ def process_prefetch(
     )
 
 
+@checkpoint_handler
+@profile_handler
 def process_wmi(
     verbosity,
     vssimage,
@@ -445,6 +468,8 @@ def process_wmi(
     )
 
 
+@checkpoint_handler
+@profile_handler
 def process_wbem(
     verbosity,
     vssimage,
@@ -480,6 +505,8 @@ def process_wbem(
     print(f"    [DEBUG-WBEM] About to return from process_wbem", flush=True)
 
 
+@checkpoint_handler
+@profile_handler
 def process_sru(
     verbosity, vssimage, output_directory, img, vss_path_insert, stage, artefact
 ):
@@ -515,6 +542,8 @@ def process_sru(
     )
 
 
+@checkpoint_handler
+@profile_handler
 def process_ual(
     verbosity, vssimage, output_directory, img, vss_path_insert, stage, artefact
 ):
@@ -601,6 +630,8 @@ def process_ual(
             write_audit_log_entry(verbosity, output_directory, entry, prnt)
 
 
+@checkpoint_handler
+@profile_handler
 def process_jumplists(
     verbosity, vssimage, output_directory, img, vss_path_insert, stage, artefact
 ):
@@ -634,6 +665,8 @@ def process_jumplists(
         )
 
 
+@checkpoint_handler
+@profile_handler
 def process_outlook(
     verbosity, vssimage, output_directory, img, vss_path_insert, stage, artefact
 ):
@@ -669,22 +702,40 @@ def process_outlook(
             vssimage,
         )
         write_audit_log_entry(verbosity, output_directory, entry, prnt)
-        if not os.path.exists(os.path.join(artefact.split(".pst")[0])):
+        # readpst -r writes one mbox per folder, streamed by extract_mailbox
+        pst_directory = artefact[: -len(".pst")]
+        if not os.path.exists(pst_directory):
+            os.makedirs(pst_directory)
             subprocess.Popen(
                 [
                     "sudo",
                     "readpst",
                     artefact,
                     "-D",
-                    "-S",
+                    "-r",
                     "-o",
-                    "/".join(os.path.join(artefact.split(".pst")[0]).split("/")[:-1]),
+                    pst_directory,
                 ],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
             ).communicate()
+        mail_directory = (
+            output_directory
+            + img.split("::")[0]
+            + "/artefacts/cooked"
+            + vss_path_insert
+            + "mail"
+        )
+        os.makedirs(mail_directory, exist_ok=True)
+        extract_mailbox(
+            list(iter_mail_sources(pst_directory)),
+            mail_directory + "/" + artefact.split("/")[-1] + ".jsonl",
+            artefact.split("/")[-1],
+        )
 
 
+@checkpoint_handler
+@profile_handler
 def process_hiberfil(
     d,
     verbosity,
@@ -721,58 +772,23 @@ def process_hiberfil(
     return profile, vssmem
 
 
+@checkpoint_handler
+@profile_handler
 def process_pagefile(
     verbosity, vssimage, output_directory, img, vss_path_insert, artefact
 ):
-    if not os.path.exists(
-        output_directory
-        + img.split("::")[0]
-        + "/artefacts/cooked"
-        + vss_path_insert
-        + "memory"
-    ):
-        os.makedirs(
-            output_directory
-            + img.split("::")[0]
-            + "/artefacts/cooked"
-            + vss_path_insert
-            + "memory"
-        )
-        entry, prnt = "{},{},extracting strings,'{}'\n".format(
-            datetime.now().isoformat(),
-            vssimage,
-            artefact.split("/")[-1],
-        ), " -> {} -> extracting strings from '{}' from {}".format(
-            datetime.now().isoformat().replace("T", " "),
-            artefact.split("/")[-1],
-            vssimage,
-        )
-        write_audit_log_entry(verbosity, output_directory, entry, prnt)
-        subprocess.Popen(
-            [
-                "strings",
-                artefact,
-                ">>",
-                output_directory
-                + img.split("::")[0]
-                + "/artefacts/cooked"
-                + vss_path_insert
-                + "memory/"
-                + artefact.split("/")[-1]
-                + ".strings",
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        ).communicate()[0]
-        (
-            entry,
-            prnt,
-        ) = "{},{},extraction of strings complete,'{}'\n".format(
-            datetime.now().isoformat(),
-            vssimage,
-            artefact.split("/")[-1],
-        ), " -> {} -> extraction of strings from '{}' completed from {}".format(
-            datetime.now().isoformat().replace("T", " "),
-            artefact.split("/")[-1],
-            vssimage,
-        )
+    """
+    Record a pagefile, swapfile or hiberfil for strings analysis. Its strings
+    are not written out: keyword searching and IOC extraction scan the
+    artefact itself, once, in the analysis phase (see analyse_memory_strings).
+    """
+    entry, prnt = "{},{},strings deferred to analysis,'{}'\n".format(
+        datetime.now().isoformat(),
+        vssimage,
+        artefact.split("/")[-1],
+    ), " -> {} -> strings of '{}' from {} will be searched in place during keyword searching and IOC extraction".format(
+        datetime.now().isoformat().replace("T", " "),
+        artefact.split("/")[-1],
+        vssimage,
+    )
+    write_audit_log_entry(verbosity, output_directory, entry, prnt)
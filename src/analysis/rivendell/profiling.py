@@ -0,0 +1,238 @@
+#!/usr/bin/env python3 -tt
+"""
+Phase, Handler and Tool Profiling
+
+Lightweight span timers for elrond's phases, process_* handlers and external
+tool invocations. Spans are always recorded (a perf_counter pair per call);
+cProfile output per phase is only captured when --profile is given.
+Phases run back-to-back, so start_phase() ends the previous phase; it also
+announces the phase on the structured progress channel (rivendell.progress).
+
+The aggregated report (p50/p95 per handler, slowest artefacts) is written to
+rivendell_profile.json next to rivendell_audit.log so it can be used to size
+hardware per case and is served by the job API.
+"""
+
+import cProfile
+import functools
+import heapq
+import inspect
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from rivendell import progress
+
+PROFILE_REPORT = "rivendell_profile.json"
+PROFILE_DIRECTORY = "profiles"
+SLOWEST_ARTEFACTS = 25
+
+
+class Span:
+    """A single timed unit of work; handlers may add bytes read and records emitted while it is open."""
+
+    __slots__ = ("kind", "name", "artefact", "bytes_read", "records", "seconds")
+
+    def __init__(self, kind: str, name: str, artefact: str = "", bytes_read: int = 0):
+        self.kind = kind
+        self.name = name
+        self.artefact = artefact
+        self.bytes_read = bytes_read
+        self.records = 0
+        self.seconds = 0.0
+
+    def add(self, bytes_read: int = 0, records: int = 0):
+        self.bytes_read += bytes_read
+        self.records += records
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Profiler:
+    """Collects span timings and optional per-phase cProfile data for one elrond run."""
+
+    def __init__(self):
+        self.cprofile = False
+        self.started = datetime.now()
+        self._lock = threading.Lock()
+        self._durations: Dict[tuple, List[float]] = {}
+        self._totals: Dict[tuple, Dict[str, int]] = {}
+        self._slowest: List[tuple] = []
+        self._phase_profiles: Dict[str, cProfile.Profile] = {}
+        self._phase = None
+        self._sections: Dict[str, Callable[[], Dict]] = {}
+
+    def add_section(self, name: str, stats: Callable[[], Dict]):
+        """Include another component's stats (e.g. tool workers) in the report under `name`."""
+        self._sections[name] = stats
+
+    def _record(self, span: Span):
+        key = (span.kind, span.name)
+        with self._lock:
+            self._durations.setdefault(key, []).append(span.seconds)
+            totals = self._totals.setdefault(key, {"bytes_read": 0, "records": 0})
+            totals["bytes_read"] += span.bytes_read
+            totals["records"] += span.records
+            if span.artefact:
+                entry = (span.seconds, span.kind, span.name, span.artefact, span.bytes_read)
+                if len(self._slowest) < SLOWEST_ARTEFACTS:
+                    heapq.heappush(self._slowest, entry)
+                elif entry > self._slowest[0]:
+                    heapq.heapreplace(self._slowest, entry)
+
+    @contextmanager
+    def span(self, kind: str, name: str, artefact: str = "", bytes_read: int = 0):
+        current = Span(kind, name, artefact, bytes_read)
+        start = time.perf_counter()
+        try:
+            yield current
+        finally:
+            current.seconds = time.perf_counter() - start
+            self._record(current)
+
+    def start_phase(self, name: str):
+        """End the running phase, if any, and start timing the next one."""
+        self.end_phase()
+        profile = None
+        if self.cprofile:
+            profile = self._phase_profiles.setdefault(name, cProfile.Profile())
+            profile.enable()
+        self._phase = (Span("phase", name), time.perf_counter(), profile)
+
+    def end_phase(self):
+        if self._phase is None:
+            return
+        current, start, profile = self._phase
+        self._phase = None
+        if profile is not None:
+            profile.disable()
+        current.seconds = time.perf_counter() - start
+        self._record(current)
+
+    def summary(self) -> Dict:
+        with self._lock:
+            groups = {}
+            for (kind, name), durations in sorted(self._durations.items()):
+                ordered = sorted(durations)
+                totals = self._totals[(kind, name)]
+                groups.setdefault(kind, {})[name] = {
+                    "count": len(ordered),
+                    "total_seconds": round(sum(ordered), 3),
+                    "p50_seconds": round(_percentile(ordered, 0.5), 3),
+                    "p95_seconds": round(_percentile(ordered, 0.95), 3),
+                    "max_seconds": round(ordered[-1], 3),
+                    "bytes_read": totals["bytes_read"],
+                    "records": totals["records"],
+                }
+            slowest = [
+                {
+                    "artefact": artefact,
+                    "kind": kind,
+                    "name": name,
+                    "seconds": round(seconds, 3),
+                    "bytes_read": bytes_read,
+                }
+                for seconds, kind, name, artefact, bytes_read in sorted(self._slowest, reverse=True)
+            ]
+        summary = {
+            "started": self.started.isoformat(),
+            "finished": datetime.now().isoformat(),
+            "cprofile": self.cprofile,
+            "phases": groups.get("phase", {}),
+            "stages": groups.get("stage", {}),
+            "handlers": groups.get("handler", {}),
+            "tools": groups.get("tool", {}),
+            "slowest_artefacts": slowest,
+        }
+        for name, stats in self._sections.items():
+            summary[name] = stats()
+        return summary
+
+    def write_report(self, output_directory: str) -> str:
+        self.end_phase()
+        case_directory = output_directory.rstrip("/")
+        report_path = os.path.join(case_directory, PROFILE_REPORT)
+        report = self.summary()
+        if self._phase_profiles:
+            profile_directory = os.path.join(case_directory, PROFILE_DIRECTORY)
+            os.makedirs(profile_directory, exist_ok=True)
+            report["profiles"] = {}
+            for name, profile in self._phase_profiles.items():
+                stem = os.path.join(profile_directory, name.lower().replace(" ", "_"))
+                profile.dump_stats(stem + ".prof")
+                text = io.StringIO()
+                pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(40)
+                with open(stem + ".txt", "w") as stats_file:
+                    stats_file.write(text.getvalue())
+                report["profiles"][name] = stem + ".prof"
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+        return report_path
+
+
+_profiler: Optional[Profiler] = None
+
+
+def get_profiler() -> Profiler:
+    """Get or create the process-wide profiler instance."""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
+
+
+def enable_cprofile():
+    get_profiler().cprofile = True
+
+
+def span(kind: str, name: str, artefact: str = "", bytes_read: int = 0):
+    return get_profiler().span(kind, name, artefact, bytes_read)
+
+
+def start_phase(name: str):
+    get_profiler().start_phase(name)
+    progress.phase(name)
+
+
+def tool_span(tool: str, artefact: str = ""):
+    """Time an external tool invocation; bytes read is the size of the input artefact when it is a file."""
+    return get_profiler().span("tool", tool, artefact, _file_size(artefact))
+
+
+def write_profile_report(output_directory: str) -> str:
+    return get_profiler().write_report(output_directory)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path) if path and os.path.isfile(path) else 0
+    except OSError:
+        return 0
+
+
+def profile_handler(func):
+    """Time a process_* handler, keyed by its name, with the size of its `artefact` argument as bytes read."""
+    parameters = list(inspect.signature(func).parameters)
+    position = parameters.index("artefact") if "artefact" in parameters else None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        artefact = kwargs.get("artefact", "")
+        if position is not None and position < len(args):
+            artefact = args[position]
+        artefact = artefact if isinstance(artefact, str) else ""
+        with span("handler", func.__name__, artefact, _file_size(artefact)):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3 -tt
+"""
+Structured Progress Events
+
+A machine-readable progress channel for callers that run elrond as a
+subprocess (the web worker), alongside the human-readable stdout.
+
+When ELROND_PROGRESS_FD names a file descriptor inherited from the caller,
+every event is written to it as one JSON line:
+
+    {"ts": 1760781600.1, "event": "phase", "phase": "processing"}
+    {"ts": ..., "event": "expect", "phase": "processing", "total": 412, "total_bytes": 8123456789}
+    {"ts": ..., "event": "artefact", "phase": "processing", "artefact": "/.../$MFT",
+     "done": 37, "total": 412, "done_bytes": 1073741824, "total_bytes": 8123456789}
+
+Totals are per phase and grow as more artefacts are selected (one expect per
+image and per carved directory), so the caller can derive a percentage and an
+ETA from bytes rather than from lines of output. Without the variable every
+call is a no-op.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Iterable, Optional
+
+PROGRESS_FD_ENV = "ELROND_PROGRESS_FD"
+
+
+class ProgressChannel:
+    """Per-phase artefact counts and byte totals, written as JSON lines to a file descriptor."""
+
+    def __init__(self, fd: Optional[int] = None):
+        self._output = None
+        if fd is not None:
+            try:
+                self._output = os.fdopen(fd, "w", buffering=1, encoding="utf-8", closefd=False)
+            except OSError:
+                self._output = None
+        self._lock = threading.Lock()
+        self._phase = ""
+        self._sizes = {}  # expected artefact -> bytes
+        self._done = set()
+        self._done_bytes = 0
+        self._total_bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._output is not None
+
+    def _emit(self, event: str, **fields):
+        record = {"ts": round(time.time(), 3), "event": event, "phase": self._phase}
+        record.update(fields)
+        try:
+            self._output.write(json.dumps(record) + "\n")
+        except (OSError, ValueError):  # reader went away; stdout still carries the log
+            self._output = None
+
+    def _counts(self) -> dict:
+        return {
+            "done": len(self._done),
+            "total": len(self._sizes),
+            "done_bytes": self._done_bytes,
+            "total_bytes": self._total_bytes,
+        }
+
+    def phase(self, name: str):
+        """Start a phase; counts start again from zero."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._phase = name
+            self._sizes, self._done = {}, set()
+            self._done_bytes = self._total_bytes = 0
+            self._emit("phase")
+
+    def expect(self, artefacts: Iterable[str]):
+        """Add artefacts (paths) the current phase will work through; each is counted once."""
+        if not self.enabled:
+            return
+        with self._lock:
+            for artefact in artefacts:
+                if artefact not in self._sizes and not os.path.basename(artefact).startswith("._"):
+                    self._sizes[artefact] = _size(artefact)
+                    self._total_bytes += self._sizes[artefact]
+            counts = self._counts()
+            self._emit("expect", total=counts["total"], total_bytes=counts["total_bytes"])
+
+    def artefact_done(self, artefact: str):
+        """Record an expected artefact as finished; anything not expected is ignored."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if artefact not in self._sizes or artefact in self._done:
+                return
+            self._done.add(artefact)
+            self._done_bytes += self._sizes[artefact]
+            self._emit("artefact", artefact=artefact, **self._counts())
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+_channel: Optional[ProgressChannel] = None
+
+
+def get_channel() -> ProgressChannel:
+    global _channel
+    if _channel is None:
+        fd = os.environ.get(PROGRESS_FD_ENV, "")
+        _channel = ProgressChannel(int(fd) if fd.isdigit() else None)
+    return _channel
+
+
+def phase(name: str):
+    get_channel().phase(name)
+
+
+def expect(artefacts: Iterable[str]):
+    get_channel().expect(artefacts)
+
+
+def artefact_done(artefact: str):
+    get_channel().artefact_done(artefact)
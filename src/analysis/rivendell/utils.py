@@ -2,11 +2,22 @@
 """
 Utility functions for Elrond
 """
+import gzip
+import json
+import logging
 import os
 import re
 import sys
 from pathlib import Path
-from typing import List, Iterator
+from typing import IO, Any, Dict, List, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_RECORD_CHARS = 64 * 1024 * 1024  # a "record" larger than this is treated as undecodable
+_RECORD_LINE = re.compile(r"\n([ \t]*)\{")  # a line that starts a record
+_RECORD_JOIN = re.compile(r"\}\s*,\s*\{")  # records joined on one line, as in a compact array
+_MEMBER_KEY = re.compile(r'\s*,?\s*("(?:[^"\\]|\\.)*")\s*:\s*')  # an object member up to its value
+_OBJECT_END = re.compile(r"\s*\}")
 
 
 def is_noninteractive():
@@ -182,3 +193,188 @@ class _SimpleDirEntry:
         if follow_symlinks:
             return os.stat(self.path)
         return os.lstat(self.path)
+
+
+def iter_json_records(
+    path: str, chunk_size: int = 1024 * 1024, records_key: str = None, strict: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally decode records from a cooked JSON file.
+
+    Handles JSON arrays (``[{...}, {...}]``), JSON lines and single JSON
+    objects without loading the whole file, and gzip-compressed files.
+    Only one decoded record and one read chunk are held in memory at a
+    time, so multi-GB Artemis/MFT output can be iterated with bounded memory.
+
+    Args:
+        path: Path to the JSON or JSONL file (optionally gzipped)
+        chunk_size: Number of characters read per chunk
+        records_key: If the file is a single object wrapping its records in
+            this key (e.g. CloudTrail's ``{"Records": [...]}``), stream the
+            wrapped records instead of decoding the object whole; the key
+            may be preceded or followed by other members, which are skipped
+        strict: Raise ValueError on an undecodable or truncated record
+            instead of logging a warning and skipping it
+
+    An undecodable record is skipped by resynchronising at the next line
+    starting a record at the same (or lesser) indentation, or failing that
+    the next "},{" boundary, so one corrupt record does not lose the rest
+    of the file.
+
+    Yields:
+        Decoded records (dicts); non-dict array members are skipped
+    """
+    with open(path, "rb") as probe:
+        compressed = probe.read(2) == b"\x1f\x8b"
+    opener = gzip.open if compressed else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        yield from iter_json_stream(f, chunk_size, records_key, strict)
+
+
+def iter_json_stream(
+    f: IO[str], chunk_size: int = 1024 * 1024, records_key: str = None, strict: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally decode records from an open text stream.
+
+    The stream counterpart of iter_json_records, for JSON that is not a
+    plain file on disk (e.g. a member read straight out of a zip or tar
+    archive). Accepts the same formats, records_key and strict.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    skipped = 0
+    wrapped = False
+    # Start of the line pos is on, relative to buffer; negative once the buffer has moved past it
+    line_start = 0
+    if records_key:
+        buffer = f.read(chunk_size)
+        eof = len(buffer) < chunk_size
+        buffer, eof, start = _wrapped_records_start(f, buffer, eof, records_key, chunk_size)
+        if start is not None:
+            # Decode the wrapped array's members; whatever follows the array is ignored
+            pos, wrapped = start, True
+    while True:
+        # Skip separators between records: whitespace, commas and array brackets
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,[]":
+            if wrapped and buffer[pos] == "]":
+                break
+            pos += 1
+        if wrapped and pos < len(buffer) and buffer[pos] == "]":
+            break  # the end of the wrapped array
+        if pos >= len(buffer):
+            if eof:
+                break
+            line_start = _rebased_line_start(buffer, len(buffer), line_start)
+            buffer = f.read(chunk_size)
+            pos = 0
+            eof = len(buffer) < chunk_size
+            continue
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as error:
+            # A chunk boundary can fall anywhere in a valid record (inside a
+            # string, literal, number or escape), so only a record that still
+            # fails with the rest of the input, or MAX_RECORD_CHARS of it, is corrupt
+            if not eof and len(buffer) - pos <= MAX_RECORD_CHARS:
+                more = f.read(chunk_size)
+                eof = len(more) < chunk_size
+                line_start = _rebased_line_start(buffer, pos, line_start)
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            if strict:
+                raise ValueError("Undecodable JSON at character {} of chunk: {}".format(pos, error.msg))
+            skipped += 1
+            newline = buffer.rfind("\n", 0, pos)
+            indent = pos - (newline + 1 if newline >= 0 else line_start)
+            search_from = pos + 1
+            while True:
+                start = _next_record_start(buffer, search_from, indent)
+                if start is not None or eof:
+                    break
+                # Drop what cannot hold a boundary; keep the partial last line and tail
+                newline = buffer.rfind("\n", search_from)
+                cut = max(search_from, min(newline if newline >= 0 else len(buffer), len(buffer) - 64))
+                more = f.read(chunk_size)
+                eof = len(more) < chunk_size
+                line_start = _rebased_line_start(buffer, cut, line_start)
+                buffer = buffer[cut:] + more
+                search_from = 0
+            if start is None:
+                break
+            pos = start
+            continue
+        pos = end
+        if isinstance(record, dict):
+            yield record
+        elif isinstance(record, list):
+            # A whole array fitted in the buffer as one value
+            for item in record:
+                if isinstance(item, dict):
+                    yield item
+    if skipped:
+        logger.warning(
+            "Skipped %d undecodable JSON record(s) in %s", skipped, getattr(f, "name", "stream")
+        )
+
+
+def _rebased_line_start(buffer: str, cut: int, line_start: int) -> int:
+    """Where the line at buffer[cut] starts once the buffer is cut to buffer[cut:]."""
+    newline = buffer.rfind("\n", 0, cut)
+    return (newline + 1 if newline >= 0 else line_start) - cut
+
+
+def _wrapped_records_start(
+    f: IO[str], buffer: str, eof: bool, records_key: str, chunk_size: int
+) -> Tuple[str, bool, Optional[int]]:
+    """
+    Find the records_key array of a top-level object, skipping the members before it.
+
+    Reads more of f into buffer as needed (without discarding any of it, so
+    the caller can decode from the start if this is not such an object).
+
+    Returns:
+        (buffer, eof, position just inside the array or None)
+    """
+    decoder = json.JSONDecoder()
+    opening = re.match(r"\s*\{", buffer)
+    if not opening:
+        return buffer, eof, None
+    pos = opening.end()
+    while len(buffer) <= MAX_RECORD_CHARS:
+        if _OBJECT_END.match(buffer, pos):
+            return buffer, eof, None
+        member = _MEMBER_KEY.match(buffer, pos)
+        if member and member.end() < len(buffer):
+            if json.loads(member.group(1)) == records_key:
+                if buffer[member.end()] != "[":
+                    return buffer, eof, None
+                return buffer, eof, member.end() + 1
+            try:
+                _, end = decoder.raw_decode(buffer, member.end())
+            except json.JSONDecodeError:
+                end = None
+            if end is not None and (end < len(buffer) or eof):
+                pos = end
+                continue
+        if eof:
+            return buffer, eof, None
+        more = f.read(chunk_size)
+        eof = len(more) < chunk_size
+        buffer += more
+    return buffer, eof, None
+
+
+def _next_record_start(buffer: str, search_from: int, indent: int) -> Optional[int]:
+    """Where the next record after an undecodable one starts in buffer, if it can be found."""
+    if "\n" in buffer[search_from:]:
+        for match in _RECORD_LINE.finditer(buffer, search_from):
+            if len(match.group(1)) <= indent:
+                return match.end() - 1
+        return None
+    # One-line (compact) content: records are only separated by "},{"
+    join = _RECORD_JOIN.search(buffer, search_from)
+    return join.end() - 1 if join else None
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3 -tt
+"""
+Persistent Tool Workers
+
+Long-lived workers for tools that elrond otherwise runs once per file:
+
+- exiftool: one `exiftool -stay_open True -@ -` process per worker, fed a
+  filename per request and read back up to its {ready} marker.
+- entropy: a Python-native replacement for spawning densityscout per file.
+
+Each tool has a bounded set of idle workers; a request takes one (starting
+a new worker only while under the tool's limit), otherwise waits for one to
+be returned. submit() queues a request on the pool's own threads so callers
+can keep every worker busy. Per-tool latency is recorded and added to the
+timing report. YARA scans are batched per directory (see post/yara.py).
+"""
+
+import atexit
+import os
+import queue
+import select
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from rivendell.profiling import _percentile, get_profiler, tool_span
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_TIMEOUT = 300
+ENTROPY_BLOCK = 1024 * 1024
+
+
+class ToolWorker:
+    """A single long-lived tool instance; subclasses implement run()."""
+
+    tool = ""
+
+    def run(self, *args, timeout: int = DEFAULT_TIMEOUT):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ExiftoolWorker(ToolWorker):
+    """exiftool in -stay_open mode; run(path) returns the same stdout as `exiftool path`."""
+
+    tool = "exiftool"
+    READY = b"{ready}\n"
+
+    def __init__(self, executable: str = "exiftool"):
+        self.executable = executable
+        self.process = None
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            [self.executable, "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def run(self, path: str, timeout: int = DEFAULT_TIMEOUT) -> bytes:
+        if "\n" in path:
+            # -@ reads one argument per line, so fall back to a one-off process
+            return subprocess.run(
+                [self.executable, path], capture_output=True, timeout=timeout
+            ).stdout
+        if self.process is None or self.process.poll() is not None:
+            self._start()
+        try:
+            self.process.stdin.write(os.fsencode(path) + b"\n-execute\n")
+            self.process.stdin.flush()
+            return self._read_until_ready(timeout)
+        except (BrokenPipeError, subprocess.TimeoutExpired):
+            self.close()
+            raise
+
+    def _read_until_ready(self, timeout: int) -> bytes:
+        output = bytearray()
+        deadline = time.monotonic() + timeout
+        descriptor = self.process.stdout.fileno()
+        while not output.endswith(self.READY):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([descriptor], [], [], remaining)[0]:
+                raise subprocess.TimeoutExpired(self.executable, timeout)
+            chunk = os.read(descriptor, 65536)
+            if not chunk:
+                raise BrokenPipeError("exiftool exited")
+            output.extend(chunk)
+        return bytes(output[: -len(self.READY)])
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            if self.process.poll() is None:
+                self.process.stdin.write(b"-stay_open\nFalse\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+        self.process = None
+
+
+def file_density(path: str) -> float:
+    """
+    densityscout's density for a file: the sum over all byte values of
+    |count - size/256|, divided by the size. Packed or encrypted data is
+    close to uniform, so lower values are more suspicious.
+    """
+    counts = [0] * 256
+    size = 0
+    with open(path, "rb") as target:
+        block = target.read(ENTROPY_BLOCK)
+        while block:
+            size += len(block)
+            for value in range(256):
+                counts[value] += block.count(value)
+            block = target.read(ENTROPY_BLOCK)
+    if size == 0:
+        return 0.0
+    expected = size / 256
+    return sum(abs(count - expected) for count in counts) / size
+
+
+class EntropyWorker(ToolWorker):
+    """In-process density calculation; run(path) returns the density as a string."""
+
+    tool = "entropy"
+
+    def run(self, path: str, timeout: int = DEFAULT_TIMEOUT) -> str:
+        return "{:.5f}".format(file_density(path))
+
+
+WORKER_TYPES = {
+    "exiftool": ExiftoolWorker,
+    "entropy": EntropyWorker,
+}
+
+
+class ToolWorkerPool:
+    """Bounded pools of persistent workers, one per tool, with per-tool latency stats."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self.limits = limits or {}
+        self._lock = threading.Lock()
+        self._idle: Dict[str, queue.LifoQueue] = {}
+        self._started: Dict[str, List[ToolWorker]] = {}
+        self._latencies: Dict[str, List[float]] = {}
+        self._errors: Dict[str, int] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _acquire(self, tool: str) -> ToolWorker:
+        with self._lock:
+            idle = self._idle.setdefault(tool, queue.LifoQueue())
+            started = self._started.setdefault(tool, [])
+            try:
+                return idle.get_nowait()
+            except queue.Empty:
+                if len(started) < self.limits.get(tool, DEFAULT_WORKERS):
+                    worker = WORKER_TYPES[tool]()
+                    started.append(worker)
+                    return worker
+        return idle.get()
+
+    def request(self, tool: str, *args, timeout: int = DEFAULT_TIMEOUT):
+        """Run one request on an idle worker for `tool`, waiting if all are busy."""
+        worker = self._acquire(tool)
+        start = time.perf_counter()
+        try:
+            return worker.run(*args, timeout=timeout)
+        except Exception:
+            with self._lock:
+                self._errors[tool] = self._errors.get(tool, 0) + 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._latencies.setdefault(tool, []).append(elapsed)
+            self._idle[tool].put(worker)
+
+    def submit(self, tool: str, *args, timeout: int = DEFAULT_TIMEOUT) -> Future:
+        """Queue request(tool, *args) on the pool's threads, timed as a tool span; the future holds its result or exception."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max([DEFAULT_WORKERS] + list(self.limits.values())) * len(WORKER_TYPES),
+                    thread_name_prefix="tool-worker",
+                )
+            executor = self._executor
+        return executor.submit(self._spanned_request, tool, *args, timeout=timeout)
+
+    def _spanned_request(self, tool: str, *args, timeout: int = DEFAULT_TIMEOUT):
+        with tool_span(tool, str(args[-1]) if args else ""):
+            return self.request(tool, *args, timeout=timeout)
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            stats = {}
+            for tool, latencies in sorted(self._latencies.items()):
+                ordered = sorted(latencies)
+                stats[tool] = {
+                    "requests": len(ordered),
+                    "errors": self._errors.get(tool, 0),
+                    "workers": len(self._started.get(tool, [])),
+                    "total_seconds": round(sum(ordered), 3),
+                    "p50_ms": round(_percentile(ordered, 0.5) * 1000, 2),
+                    "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2),
+                    "max_ms": round(ordered[-1] * 1000, 2),
+                }
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._lock:
+            for workers in self._started.values():
+                for worker in workers:
+                    worker.close()
+            self._started.clear()
+            self._idle.clear()
+
+
+_pool: Optional[ToolWorkerPool] = None
+
+
+def get_worker_pool() -> ToolWorkerPool:
+    """Get or create the process-wide worker pool."""
+    global _pool
+    if _pool is None:
+        _pool = ToolWorkerPool()
+        get_profiler().add_section("workers", _pool.stats)
+        atexit.register(_pool.shutdown)
+    return _pool
+
+
+def shutdown_workers():
+    if _pool is not None:
+        _pool.shutdown()
@@ -0,0 +1,114 @@
+"""
+Unit Tests for the AI Query Engine Pool
+
+Tests per-case engines are opened once, shared by concurrent callers,
+evicted least recently used first and reopened when their vector store is
+re-indexed, and that query embeddings are cached by normalised question.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from rivendell.ai import engine_pool
+from rivendell.ai.engine_pool import QueryEnginePool
+from rivendell.ai.query_engine import CachedQueryEmbeddings, normalise_question
+
+
+class FakeEngine:
+    opened = []
+
+    def __init__(self, case_id, vector_store_dir, config):
+        time.sleep(0.05)  # long enough for concurrent callers to overlap
+        self.case_id = case_id
+        FakeEngine.opened.append(case_id)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    FakeEngine.opened = []
+    monkeypatch.setattr(engine_pool, "ForensicQueryEngine", FakeEngine)
+    return QueryEnginePool(max_engines=2)
+
+
+def _store(temp_dir, case_id):
+    store = temp_dir / case_id / "vector_db"
+    store.mkdir(parents=True)
+    (store / "chroma.sqlite3").write_bytes(b"")
+    return str(store)
+
+
+@pytest.mark.unit
+class TestQueryEnginePool:
+    """Test QueryEnginePool."""
+
+    def test_engines_are_reused_and_evicted_lru(self, temp_dir, pool):
+        """Test an open engine is reused and the least recently used is dropped when the pool is full."""
+        stores = {case_id: _store(temp_dir, case_id) for case_id in ("CASE1", "CASE2", "CASE3")}
+
+        first = pool.get("CASE1", stores["CASE1"])
+        pool.get("CASE2", stores["CASE2"])
+        assert pool.get("CASE1", stores["CASE1"]) is first
+        pool.get("CASE3", stores["CASE3"])
+
+        assert FakeEngine.opened == ["CASE1", "CASE2", "CASE3"]
+        assert pool.cases() == ["CASE1", "CASE3"]
+        assert pool.discard("CASE1") and not pool.discard("CASE2")
+
+    def test_concurrent_callers_share_one_load(self, temp_dir, pool):
+        """Test callers arriving during a load wait for it rather than opening the store again."""
+        store = _store(temp_dir, "CASE1")
+        engines = []
+        threads = [threading.Thread(target=lambda: engines.append(pool.get("CASE1", store))) for _ in range(4)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert FakeEngine.opened == ["CASE1"]
+        assert len({id(engine) for engine in engines}) == 1
+
+    def test_warm_and_reload_after_reindex(self, temp_dir, pool):
+        """Test warming opens the engine in the background and a rewritten store is reopened."""
+        store = _store(temp_dir, "CASE1")
+
+        warmed = pool.warm("CASE1", store).result(timeout=5)
+        assert pool.get("CASE1", store) is warmed
+        later = time.time() + 10
+        os.utime(os.path.join(store, "chroma.sqlite3"), (later, later))
+
+        assert pool.get("CASE1", store) is not warmed
+        assert FakeEngine.opened == ["CASE1", "CASE1"]
+
+
+@pytest.mark.unit
+class TestCachedQueryEmbeddings:
+    """Test CachedQueryEmbeddings and normalise_question."""
+
+    def test_query_embeddings_cached_by_normalised_question(self):
+        """Test questions differing only in case, spacing or punctuation are embedded once."""
+
+        class Embeddings:
+            calls = []
+
+            def embed_query(self, text):
+                self.calls.append(text)
+                return [float(len(text))]
+
+            def embed_documents(self, texts):
+                return [[0.0] for _ in texts]
+
+        embeddings = Embeddings()
+        cached = CachedQueryEmbeddings(embeddings, size=2)
+
+        assert cached.embed_query("What ran at boot?") == cached.embed_query("what  ran at BOOT")
+        cached.embed_query("second")
+        cached.embed_query("third")
+        cached.embed_query("what ran at boot")
+
+        assert normalise_question("  Who logged  on?? ") == "who logged on"
+        assert embeddings.calls == ["What ran at boot?", "second", "third", "what ran at boot"]
+        assert cached.embed_documents(["a", "b"]) == [[0.0], [0.0]]
@@ -0,0 +1,149 @@
+"""
+Unit Tests for the Artefact Store
+
+Tests incremental loading of cooked artefacts and filtered, searched and
+aggregated queries against the store.
+"""
+
+import json
+import os
+import sqlite3
+
+import pytest
+
+from rivendell.artefact_store import ArtefactStore, build_artefact_store, parse_timestamp
+
+
+@pytest.fixture
+def case(temp_dir):
+    output_directory = str(temp_dir / "case") + "/"
+    cooked = temp_dir / "case" / "host1.E01" / "artefacts" / "cooked"
+    (cooked / "evt").mkdir(parents=True)
+    (cooked / "vss1" / "evt").mkdir(parents=True)
+    (cooked / "evt" / "Security.json").write_text(
+        json.dumps(
+            [
+                {"SystemTime": "2024-03-01T10:00:00Z", "EventID": "4624", "Message": "logon by alice"},
+                {"SystemTime": "2024-03-01T11:30:00Z", "EventID": "4625", "Message": "failed logon by mallory"},
+                {
+                    "SystemTime": "2024-03-02T09:15:00Z",
+                    "EventID": "4720",
+                    "Message": "account created by mallory",
+                    "mitre_technique_id": "T1136",
+                },
+            ]
+        )
+    )
+    (cooked / "vss1" / "evt" / "Security.json").write_text(
+        json.dumps({"SystemTime": "2024-02-28T08:00:00Z", "EventID": "4624", "Message": "logon by bob"}) + "\n"
+    )
+    (cooked / "services.csv").write_text("Name,LastWriteTime\nPSEXESVC,2024-03-02 09:20:00\n")
+    return output_directory, {"/mnt/elrond_mount00": "host1.E01::ntfs::windows"}
+
+
+@pytest.mark.unit
+class TestArtefactStore:
+    """Test ArtefactStore loading and querying."""
+
+    def test_filter_search_and_aggregate(self, case):
+        """Test cooked JSON, JSON lines and CSV are queryable by host, time, technique, field and text."""
+        output_directory, imgs = case
+        build_artefact_store("", output_directory, imgs)
+        store = ArtefactStore.for_case(output_directory)
+
+        artefacts = {artefact["artefact"]: artefact for artefact in store.list_artefacts()}
+        page = store.query("evt/Security", limit=2, start="2024-03-01T00:00:00")
+        searched = store.query("evt/Security", search="mallory", fields={"EventID": "4720"})
+        by_day = store.aggregate("evt/Security", "day")
+        by_technique = store.aggregate("evt/Security", "technique", technique="T1136")
+
+        assert artefacts["evt/Security"]["rows"] == 4
+        assert artefacts["evt/Security"]["hosts"] == ["host1.E01"]
+        assert artefacts["services"]["first_seen"] == "2024-03-02T09:20:00+00:00"
+        assert [record["data"]["EventID"] for record in page["records"]] == ["4624", "4625"]
+        assert page["has_more"] and page["next_offset"] == 2
+        assert [record["technique"] for record in searched["records"]] == ["T1136"]
+        assert by_day == [
+            {"value": "2024-02-28", "count": 1},
+            {"value": "2024-03-01", "count": 2},
+            {"value": "2024-03-02", "count": 1},
+        ]
+        assert by_technique == [{"value": "T1136", "count": 1}]
+        store.close()
+
+    def test_loading_is_incremental(self, case):
+        """Test unchanged files are skipped and a rewritten file replaces its earlier rows."""
+        output_directory, imgs = case
+        build_artefact_store("", output_directory, imgs)
+        cooked = os.path.join(output_directory, "host1.E01", "artefacts", "cooked")
+        store = ArtefactStore.for_case(output_directory)
+
+        assert store.load_cooked(cooked, "host1.E01") == (0, 0)
+
+        services = os.path.join(cooked, "services.csv")
+        with open(services, "a") as services_file:
+            services_file.write("evil,2024-03-03 00:00:00\n")
+        os.utime(services, (1, 1))
+
+        assert store.load_cooked(cooked, "host1.E01") == (1, 2)
+        assert store.count("services") == 2
+        assert store.count("services", search="evil") == 1
+        store.close()
+
+    def test_reloading_a_file_keeps_other_files_searchable(self, case):
+        """Test a reloaded file's old text leaves the full-text index while other files' text stays."""
+        output_directory, imgs = case
+        build_artefact_store("", output_directory, imgs)
+        cooked = os.path.join(output_directory, "host1.E01", "artefacts", "cooked")
+        shadow = os.path.join(cooked, "vss1", "evt", "Security.json")
+        with open(shadow, "w") as shadow_file:
+            shadow_file.write(
+                json.dumps({"SystemTime": "2024-02-27T08:00:00Z", "EventID": "4624", "Message": "logon by carol"})
+                + "\n"
+            )
+        os.utime(shadow, (1, 1))
+        store = ArtefactStore.for_case(output_directory)
+
+        assert store.load_cooked(cooked, "host1.E01") == (1, 1)
+        artefacts = {artefact["artefact"]: artefact for artefact in store.list_artefacts()}
+        assert store.count("evt/Security", search="bob") == 0
+        assert store.count("evt/Security", search="carol") == 1
+        assert store.count("evt/Security", search="mallory") == 2
+        assert artefacts["evt/Security"]["rows"] == 4
+        assert artefacts["evt/Security"]["first_seen"] == "2024-02-27T08:00:00+00:00"
+        assert artefacts["evt/Security"]["last_seen"] == "2024-03-02T09:15:00+00:00"
+        store.close()
+
+    def test_only_epoch_length_digit_strings_are_epochs(self):
+        """Test digit strings are read as epoch seconds or milliseconds only at plausible lengths."""
+        assert parse_timestamp("1709287200") == ("2024-03-01T10:00:00+00:00", 1709287200.0)
+        assert parse_timestamp("1709287200000") == ("2024-03-01T10:00:00+00:00", 1709287200.0)
+        assert parse_timestamp("20240101")[0] != "1970-08-23T03:28:20+00:00"
+        assert parse_timestamp("4624") == (None, None)
+
+    def test_field_filter_matches_numbers_and_booleans(self, case):
+        """Test a field filter value matches records storing the field as a number or boolean."""
+        output_directory, imgs = case
+        cooked = os.path.join(output_directory, "host1.E01", "artefacts", "cooked")
+        with open(os.path.join(cooked, "logons.json"), "w") as logons:
+            json.dump([{"EventID": 4624, "Elevated": True}, {"EventID": 4625, "Elevated": False}], logons)
+        build_artefact_store("", output_directory, imgs)
+        store = ArtefactStore.for_case(output_directory)
+
+        assert store.count("logons", fields={"EventID": "4624"}) == 1
+        assert store.count("logons", fields={"Elevated": "false"}) == 1
+        assert store.count("evt/Security", fields={"EventID": "4624"}) == 2
+        store.close()
+
+    def test_read_only_store(self, case):
+        """Test a read-only store answers queries and refuses writes."""
+        output_directory, imgs = case
+        build_artefact_store("", output_directory, imgs)
+        cooked = os.path.join(output_directory, "host1.E01", "artefacts", "cooked")
+        store = ArtefactStore.for_case(output_directory, read_only=True)
+
+        assert store.count("services") == 1
+        os.utime(os.path.join(cooked, "services.csv"), (1, 1))
+        with pytest.raises(sqlite3.OperationalError):
+            store.load_file(os.path.join(cooked, "services.csv"), "services", "host1.E01")
+        store.close()
@@ -0,0 +1,127 @@
+"""
+Unit Tests for Batched Artemis Extraction
+
+Tests extractions queued during an image's processing run as one TOML
+collection plus concurrent separate runs, with each artefact's output
+placed where its own run would have put it.
+"""
+
+import json
+import sys
+
+import pytest
+
+from rivendell.checkpoint import checkpoint_handler, get_manifest
+from rivendell.process.extractions import artemis
+
+FAKE_ARTEMIS = """#!{python}
+import json, os, sys, tomllib, uuid
+
+with open({log!r}, "a") as log:
+    log.write(" ".join(sys.argv[1:]) + "\\n")
+if sys.argv[1] == "-t":
+    with open(sys.argv[2], "rb") as toml_file:
+        config = tomllib.load(toml_file)
+    out = os.path.join(config["output"]["directory"], config["output"]["name"])
+    os.makedirs(out)
+    with open(os.path.join(out, "status.log"), "w") as status:
+        for entry in config["artifacts"]:
+            name = entry["artifact_name"]
+            if name == "srum":
+                continue  # nothing written for this artefact
+            filename = str(uuid.uuid4()) + ".json"
+            source = next(iter(entry.get(name, {{}}).values()), "")
+            with open(os.path.join(out, filename), "w") as output:
+                json.dump([{{"artifact": name, "source": source}}], output)
+            status.write(name + ":" + filename + "\\n")
+else:
+    out = os.path.join(sys.argv[5], "local_collector")
+    os.makedirs(out)
+    with open(os.path.join(out, sys.argv[6] + ".json"), "w") as output:
+        json.dump([{{"artifact": sys.argv[6], "source": sys.argv[8]}}], output)
+"""
+
+
+@pytest.fixture
+def fake_artemis(temp_dir, monkeypatch):
+    script = temp_dir / "artemis"
+    script.write_text(FAKE_ARTEMIS.format(python=sys.executable, log=str(temp_dir / "launches.log")))
+    script.chmod(0o755)
+    monkeypatch.setattr(artemis, "ARTEMIS_PATH", str(script))
+    return temp_dir / "launches.log"
+
+
+@pytest.mark.unit
+class TestArtemisBatch:
+    """Test begin_batch/end_batch and build_collection."""
+
+    def test_batch_runs_one_collection_and_concurrent_extras(self, temp_dir, fake_artemis):
+        """Test one collection covers each artefact type, duplicates run separately and outputs land per job."""
+        raw = temp_dir / "HOST01" / "artefacts" / "raw"
+        (raw / "prefetch").mkdir(parents=True)
+        (raw / "prefetch" / "CMD.EXE-1234.pf").write_bytes(b"")
+        (raw / "prefetch" / "RUNDLL32.EXE-5678.pf").write_bytes(b"")
+        args = ("", "'HOST01'", str(temp_dir) + "/", "HOST01::/mnt/elrond_mount", "/", "processing")
+
+        artemis.begin_batch(max_workers=2)
+        try:
+            assert artemis.extract_mft(*args, mft_file=str(raw / "$MFT"))
+            artemis.extract_shimcache(*args, system_hive=str(raw / "SYSTEM"))
+            artemis.extract_srum(*args, srum_file=str(raw / "SRUDB.dat"))
+            artemis.extract_eventlogs(*args, evtx_file=str(raw / "Security.evtx"))
+            artemis.extract_eventlogs(*args, evtx_file=str(raw / "System.evtx"))
+            artemis.extract_prefetch(*args, prefetch_dir=str(raw / "prefetch"))
+            assert not fake_artemis.exists()
+        finally:
+            stats = artemis.end_batch()
+
+        launches = fake_artemis.read_text().splitlines()
+        cooked = temp_dir / "HOST01" / "artefacts" / "cooked"
+        assert stats == {"jobs": 6, "launches": 3, "failed": 0}
+        assert sum(launch.startswith("-t ") for launch in launches) == 1
+        assert sorted(launch.split()[5] for launch in launches if launch.startswith("acquire")) == [
+            "eventlogs", "srum"
+        ]
+        placed = {
+            "journal_mft.json": str(raw / "$MFT"),
+            "shimcache.json": str(raw / "SYSTEM"),
+            "srum/SRUDB.json": str(raw / "SRUDB.dat"),
+            "evt/Security.json": str(raw / "Security.evtx"),
+            "evt/System.json": str(raw / "System.evtx"),
+            "prefetch/prefetch.json": str(raw / "prefetch"),
+        }
+        for name, source in placed.items():
+            assert json.loads((cooked / name).read_text())[0]["source"] == source
+        assert not list(cooked.rglob(".artemis-*"))
+        assert artemis.end_batch() == {}
+
+    def test_queued_job_completes_its_checkpoint(self, temp_dir, fake_artemis):
+        """Test a handler's checkpoint is completed by its queued job's outputs, not when it queues it."""
+        output_directory = str(temp_dir) + "/"
+        mft = temp_dir / "$MFT"
+        mft.write_bytes(b"FILE0" * 100)
+
+        @checkpoint_handler
+        def process_mft(verbosity, vssimage, output_directory, img, vss_path_insert, stage, artefact):
+            artemis.extract_mft(verbosity, vssimage, output_directory, img, vss_path_insert, stage, mft_file=artefact)
+
+        args = ("", "'HOST01'", output_directory, "HOST01::/mnt/elrond_mount", "/", "processing", str(mft))
+        artemis.begin_batch()
+        try:
+            process_mft(*args)
+            assert "complete" not in get_manifest(output_directory).summary()
+        finally:
+            artemis.end_batch()
+
+        assert get_manifest(output_directory).summary()["complete"] == 1
+        process_mft(*args)
+        assert len(fake_artemis.read_text().splitlines()) == 1
+
+    def test_build_collection(self, temp_dir):
+        """Test each job becomes an [[artifacts]] entry with its artemis option name."""
+        job = artemis.ArtemisJob("", "'HOST01'", "", "processing", "usnjrnl", str(temp_dir), "/raw/$UsnJrnl", None, "journal_usn")
+
+        toml = artemis.build_collection([job], "/out")
+
+        assert '[[artifacts]]\nartifact_name = "usnjrnl"\n[artifacts.usnjrnl]\nalt_path = "/raw/$UsnJrnl"' in toml
+        assert 'directory = "/out"' in toml
@@ -0,0 +1,62 @@
+"""
+Unit Tests for Artemis Output Merging
+
+Tests multiple Artemis outputs are merged into one JSON lines file, with
+JSON lines outputs copied as they are and arrays decoded record by record.
+"""
+
+import json
+
+import pytest
+
+from rivendell.process.extractions import artemis
+from rivendell.process.extractions.artemis import merge_json_outputs, run_artemis
+from rivendell.utils import iter_json_records
+
+RECORDS = [{"filename": "file{}.txt".format(i), "is_file": True, "ads_info": []} for i in range(6)]
+
+
+def _outputs(directory):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "mft_0.json").write_text(json.dumps(RECORDS[:2], indent=2))
+    (directory / "mft_1.json").write_text("\n".join(json.dumps(record) for record in RECORDS[2:4]))
+    (directory / "mft_2.json").write_text(json.dumps(RECORDS[4], indent=2) + "\n" + json.dumps(RECORDS[5]))
+    return sorted(str(path) for path in directory.glob("*.json"))
+
+
+@pytest.mark.unit
+class TestArtemisMerge:
+    """Test merge_json_outputs and the MFT merge in run_artemis."""
+
+    def test_merge_json_outputs(self, temp_dir):
+        """Test every record is written once, one per line, in output order, and the outputs are removed."""
+        json_files = _outputs(temp_dir / "local_collector")
+        merged = temp_dir / "journal_mft.json"
+
+        merge_json_outputs(json_files, str(merged))
+
+        lines = merged.read_text().splitlines()
+        assert [json.loads(line) for line in lines] == RECORDS
+        assert lines[2] == json.dumps(RECORDS[2])  # JSON lines copied byte for byte
+        assert list(iter_json_records(str(merged))) == RECORDS
+        assert not list((temp_dir / "local_collector").glob("*.json"))
+        assert not (temp_dir / "journal_mft.json.partial").exists()
+
+    def test_run_artemis_merges_mft(self, temp_dir, monkeypatch):
+        """Test run_artemis leaves a single JSON lines journal_mft.json for multi-file MFT output."""
+        _outputs(temp_dir / "fixture")
+        script = temp_dir / "artemis"
+        script.write_text(
+            '#!/bin/sh\nmkdir -p "$5/local_collector"\ncp {}/*.json "$5/local_collector/"\n'.format(
+                temp_dir / "fixture"
+            )
+        )
+        script.chmod(0o755)
+        monkeypatch.setattr(artemis, "ARTEMIS_PATH", str(script))
+        cooked = temp_dir / "cooked"
+        cooked.mkdir()
+
+        assert run_artemis("mft", str(cooked), alt_file="/mnt/$MFT") == (True, "")
+
+        assert [path.name for path in cooked.iterdir()] == ["journal_mft.json"]
+        assert list(iter_json_records(str(cooked / "journal_mft.json"))) == RECORDS
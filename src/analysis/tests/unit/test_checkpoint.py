@@ -0,0 +1,188 @@
+"""
+Unit Tests for Checkpoint Manifest
+
+Tests skipping completed artefacts and re-running invalid, unverifiable
+or deferred ones.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from rivendell.checkpoint import (
+    checkpoint_handler,
+    complete_phase,
+    defer_completion,
+    get_manifest,
+    phase_complete,
+)
+
+
+def _make_handler(calls):
+    @checkpoint_handler
+    def process_sample(verbosity, output_directory, img, artefact):
+        calls.append(artefact)
+        cooked = output_directory + img.split("::")[0] + "/artefacts/cooked/"
+        with open(cooked + artefact.split("/")[-1] + ".json", "w") as out:
+            out.write('[{"ok": true}]')
+
+    return process_sample
+
+
+@pytest.fixture
+def case(temp_dir):
+    output_directory = str(temp_dir) + "/case/"
+    (temp_dir / "case" / "host.E01" / "artefacts" / "cooked").mkdir(parents=True)
+    artefact = temp_dir / "Security.evtx"
+    artefact.write_bytes(b"ElfFile" * 100)
+    return output_directory, "host.E01::windows", str(artefact)
+
+
+@pytest.mark.unit
+class TestCheckpointHandler:
+    """Test artefact checkpoints."""
+
+    def test_completed_artefact_is_skipped(self, case):
+        """Test a second call with the same input and intact output is skipped."""
+        output_directory, img, artefact = case
+        calls = []
+        handler = _make_handler(calls)
+
+        handler("", output_directory, img, artefact)
+        handler("", output_directory, img, artefact)
+
+        assert calls == [artefact]
+        assert get_manifest(output_directory).summary()["complete"] == 1
+
+    def test_modified_output_is_rerun(self, case):
+        """Test a truncated output invalidates the checkpoint."""
+        output_directory, img, artefact = case
+        calls = []
+        handler = _make_handler(calls)
+        handler("", output_directory, img, artefact)
+
+        with open(output_directory + "host.E01/artefacts/cooked/Security.evtx.json", "w") as out:
+            out.write('[{"ok"')
+        handler("", output_directory, img, artefact)
+
+        assert len(calls) == 2
+
+    def test_changed_input_is_rerun(self, case):
+        """Test a different input artefact invalidates the checkpoint."""
+        output_directory, img, artefact = case
+        calls = []
+        handler = _make_handler(calls)
+        handler("", output_directory, img, artefact)
+
+        with open(artefact, "ab") as evtx:
+            evtx.write(b"more")
+        handler("", output_directory, img, artefact)
+
+        assert len(calls) == 2
+
+    def test_handler_without_outputs_is_rerun(self, case):
+        """Test a handler that wrote nothing it owns (e.g. only on a worker thread) is not marked complete."""
+        output_directory, img, artefact = case
+        calls = []
+
+        @checkpoint_handler
+        def process_sample(verbosity, output_directory, img, artefact):
+            calls.append(artefact)
+
+        process_sample("", output_directory, img, artefact)
+        process_sample("", output_directory, img, artefact)
+
+        assert len(calls) == 2
+        assert "complete" not in get_manifest(output_directory).summary()
+
+    def test_subprocess_outputs_are_recorded(self, case):
+        """Test files a subprocess creates are verified on resume and pre-existing arguments are not owned."""
+        output_directory, img, artefact = case
+        artefacts = output_directory + "host.E01/artefacts/"
+        staged = artefacts + "raw/Security.evtx"
+        output = artefacts + "cooked/Security.csv"
+        os.makedirs(artefacts + "raw")
+        with open(staged, "w") as raw:
+            raw.write("ElfFile")
+        calls = []
+
+        @checkpoint_handler
+        def process_sample(verbosity, output_directory, img, artefact):
+            calls.append(artefact)
+            write = "import sys; open(sys.argv[2][6:], 'w').write(open(sys.argv[1]).read())"
+            subprocess.run([sys.executable, "-c", write, staged, "--csv=" + output], check=True)
+
+        process_sample("", output_directory, img, artefact)
+        process_sample("", output_directory, img, artefact)
+        assert len(calls) == 1
+
+        with open(output, "a") as out:
+            out.write(",truncated")
+        process_sample("", output_directory, img, artefact)
+
+        assert len(calls) == 2
+        assert os.path.exists(staged)
+
+    def test_subprocess_without_visible_outputs_completes(self, case):
+        """Test a handler whose subprocess writes nowhere it can see is complete once it returns cleanly."""
+        output_directory, img, artefact = case
+        calls = []
+
+        @checkpoint_handler
+        def process_sample(verbosity, output_directory, img, artefact):
+            calls.append(artefact)
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+
+        process_sample("", output_directory, img, artefact)
+        process_sample("", output_directory, img, artefact)
+
+        assert len(calls) == 1
+
+    def test_handler_with_result_is_rerun(self, case):
+        """Test a handler returning a value is never skipped, since a skip returns None."""
+        output_directory, img, artefact = case
+        calls = []
+        handler = _make_handler(calls)
+
+        @checkpoint_handler
+        def process_memory(verbosity, output_directory, img, artefact):
+            handler.__wrapped__(verbosity, output_directory, img, artefact)
+            return "profile", "vssmem"
+
+        assert process_memory("", output_directory, img, artefact) == ("profile", "vssmem")
+        assert process_memory("", output_directory, img, artefact) == ("profile", "vssmem")
+        assert len(calls) == 2
+
+    def test_deferred_completion(self, case):
+        """Test a handler with queued work is only complete once the work reports its outputs."""
+        output_directory, img, artefact = case
+        calls, queued = [], []
+        output = output_directory + "host.E01/artefacts/cooked/Security.json"
+
+        @checkpoint_handler
+        def process_sample(verbosity, output_directory, img, artefact):
+            calls.append(artefact)
+            queued.append(defer_completion())
+
+        process_sample("", output_directory, img, artefact)
+        assert get_manifest(output_directory).summary() == {"running": 1, "phases": 0}
+        process_sample("", output_directory, img, artefact)  # queued work never ran
+        assert len(calls) == 2
+
+        with open(output, "w") as out:  # written later, e.g. on a batch worker thread
+            out.write('[{"ok": true}]')
+        queued[-1](True, [output])
+        process_sample("", output_directory, img, artefact)
+
+        assert len(calls) == 2
+        assert defer_completion() is None
+
+    def test_phase_checkpoints(self, case):
+        """Test phase completion is recorded per source."""
+        output_directory, _, _ = case
+
+        assert not phase_complete(output_directory, "collection", "/images/host.E01")
+        complete_phase(output_directory, "collection", "/images/host.E01")
+        assert phase_complete(output_directory, "collection", "/images/host.E01")
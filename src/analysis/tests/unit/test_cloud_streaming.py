@@ -0,0 +1,99 @@
+"""
+Unit Tests for Streaming Cloud Log Analysis
+
+Tests gzipped CloudTrail exports streamed across worker processes, single
+exports whose records key is not the first member, and the HyperLogLog
+unique-value sketch.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from rivendell.cloud.aws.cloudtrail import CloudTrailAnalyzer
+from rivendell.cloud.streaming import HyperLogLog, analyze_log_directory
+from rivendell.utils import iter_json_records
+
+
+def _record(event_name, user, ip, error_code=None):
+    record = {
+        "eventTime": "2024-01-01T00:00:00Z",
+        "eventName": event_name,
+        "eventSource": "iam.amazonaws.com",
+        "userIdentity": {"userName": user},
+        "sourceIPAddress": ip,
+        "requestParameters": {},
+    }
+    if error_code:
+        record["errorCode"] = error_code
+    return record
+
+
+@pytest.fixture
+def cloudtrail_exports(temp_dir):
+    exports = temp_dir / "AWSLogs" / "123456789012" / "CloudTrail"
+    exports.mkdir(parents=True)
+    for index in range(3):
+        records = [
+            _record("ConsoleLogin", "user{}".format(n % 5), "10.0.0.{}".format(n)) for n in range(20)
+        ]
+        records.append(_record("StopLogging", "mallory", "203.0.113.7"))
+        records.append(_record("CreateAccessKey", "mallory", "203.0.113.7", "AccessDenied"))
+        with gzip.open(exports / "export_{}.json.gz".format(index), "wt") as export:
+            json.dump({"Records": records}, export)
+    return str(temp_dir / "AWSLogs")
+
+
+@pytest.mark.unit
+class TestStreamingCloudLogs:
+    """Test analyze_log_directory and its aggregates."""
+
+    def test_directory_of_gzipped_exports(self, cloudtrail_exports, temp_dir):
+        """Test every record is analyzed and findings are spilled to JSONL."""
+        output_dir = str(temp_dir / "out")
+
+        summary = analyze_log_directory(CloudTrailAnalyzer, cloudtrail_exports, output_dir, workers=2)
+
+        assert summary["files_analyzed"] == 3
+        assert summary["statistics"]["total_events"] == 66
+        assert summary["statistics"]["unique_users"] == 6
+        assert summary["statistics"]["event_counts"]["StopLogging"] == 3
+        assert summary["finding_counts"]["suspicious_events"] == 6
+        assert summary["finding_counts"]["failed_attempts"] == 3
+        assert summary["mitre_mapping"]["T1070.003"] == 3
+        with open(summary["findings_file"]) as findings_file:
+            findings = [json.loads(line) for line in findings_file]
+        assert len(findings) == sum(summary["finding_counts"].values())
+        assert {finding["category"] for finding in findings} >= {"suspicious_events", "failed_attempts"}
+        assert findings[0]["finding"]["event"]["username"] == "mallory"
+
+    def test_single_export_with_records_key_after_other_members(self, temp_dir):
+        """Test a plain .json export is streamed when "Records" follows and precedes other members."""
+        records = [_record("ConsoleLogin", "user{}".format(n), "10.0.0.{}".format(n)) for n in range(10)]
+        records.append(_record("StopLogging", "mallory", "203.0.113.7"))
+        export = temp_dir / "cloudtrail.json"
+        export.write_text(
+            json.dumps(
+                {"meta": {"Records": 0, "pages": [1, 2]}, "Records": records, "nextToken": "abc"}, indent=2
+            )
+        )
+
+        summary = analyze_log_directory(CloudTrailAnalyzer, str(export), str(temp_dir / "out"), workers=1)
+
+        assert list(iter_json_records(str(export), chunk_size=7, records_key="Records")) == records
+        assert summary["files_analyzed"] == 1
+        assert summary["statistics"]["total_events"] == 11
+        assert summary["finding_counts"]["suspicious_events"] == 1
+
+    def test_hyperloglog_merge_is_approximate_union(self):
+        """Test merged sketches estimate the union cardinality within a few percent."""
+        first, second = HyperLogLog(), HyperLogLog()
+        for value in range(60000):
+            first.add(value)
+        for value in range(40000, 100000):
+            second.add(value)
+
+        first.merge(HyperLogLog(registers=bytes(second.registers)))
+
+        assert abs(first.count() - 100000) < 100000 * 0.03
@@ -0,0 +1,157 @@
+"""
+Unit Tests for Evidence Archive Encryption
+
+Tests the segmented AES-GCM stream format, one-pass encrypted archive
+creation and streaming decryption/extraction.
+"""
+
+import io
+import os
+import shutil
+import sys
+import tarfile
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from cryptography.exceptions import InvalidTag  # noqa: E402
+from cryptography.fernet import Fernet  # noqa: E402
+
+from common.archiving import create_evidence_archive, extract_archive  # noqa: E402
+from common.crypto import STREAM_HEADER, STREAM_MAGIC, STREAM_VERSION, TAG_SIZE, CryptoManager  # noqa: E402
+
+
+@pytest.fixture
+def crypto():
+    manager = CryptoManager(segment_size=1024, workers=3)
+    manager.generate_key()
+    return manager
+
+
+@pytest.mark.unit
+class TestSegmentedEncryption:
+    """Test CryptoManager file encryption in the segmented stream format."""
+
+    @pytest.mark.parametrize("size", [0, 1, 1024, 1025, 10 * 1024 + 7])
+    def test_round_trip(self, crypto, temp_dir, size):
+        """Test files of every segment alignment decrypt to the original bytes."""
+        plaintext = os.urandom(size)
+        (temp_dir / "evidence.bin").write_bytes(plaintext)
+
+        encrypted = crypto.encrypt_file(str(temp_dir / "evidence.bin"))
+        decrypted = crypto.decrypt_file(encrypted, str(temp_dir / "out.bin"))
+
+        segments = max(1, -(-size // 1024))
+        assert Path(encrypted).stat().st_size == STREAM_HEADER.size + size + segments * TAG_SIZE
+        assert Path(decrypted).read_bytes() == plaintext
+
+    def test_tampering_and_legacy_tokens(self, crypto, temp_dir):
+        """Test truncated or modified streams are rejected and legacy Fernet files still decrypt."""
+        (temp_dir / "evidence.bin").write_bytes(os.urandom(4096))
+        encrypted = Path(crypto.encrypt_file(str(temp_dir / "evidence.bin")))
+        stream = encrypted.read_bytes()
+
+        for damaged in (stream[: STREAM_HEADER.size + 1024 + TAG_SIZE], stream[:-1] + bytes([stream[-1] ^ 1])):
+            (temp_dir / "damaged.enc").write_bytes(damaged)
+            with pytest.raises(InvalidTag):
+                crypto.decrypt_file(str(temp_dir / "damaged.enc"))
+            assert not (temp_dir / "damaged").exists()
+
+        (temp_dir / "legacy.zip.enc").write_bytes(Fernet(crypto.key).encrypt(b"legacy archive"))
+        assert Path(crypto.decrypt_file(str(temp_dir / "legacy.zip.enc"))).read_bytes() == b"legacy archive"
+
+    def test_failed_encryption_leaves_no_complete_stream(self, crypto, temp_dir, monkeypatch):
+        """Test an error mid-copy removes the output and a writer left on an error omits the final segment."""
+        (temp_dir / "evidence.bin").write_bytes(os.urandom(4096))
+
+        def failing_copy(source, destination, length):
+            destination.write(source.read(2048))
+            raise OSError("read error")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(shutil, "copyfileobj", failing_copy)
+            with pytest.raises(OSError, match="read error"):
+                crypto.encrypt_file(str(temp_dir / "evidence.bin"))
+        assert not (temp_dir / "evidence.bin.enc").exists()
+
+        with open(temp_dir / "partial.enc", "wb") as out:
+            with pytest.raises(RuntimeError):
+                with crypto.open_encrypted_writer(out) as writer:
+                    writer.write(os.urandom(3000))
+                    raise RuntimeError("interrupted")
+        with pytest.raises(InvalidTag):
+            crypto.decrypt_file(str(temp_dir / "partial.enc"))
+
+    def test_oversized_segment_header_is_rejected(self, crypto, temp_dir):
+        """Test a header claiming an oversized segment is refused before anything is read."""
+        header = STREAM_HEADER.pack(STREAM_MAGIC, STREAM_VERSION, 0xFFFFFFFF, os.urandom(16))
+        (temp_dir / "huge.enc").write_bytes(header + os.urandom(64))
+
+        with pytest.raises(ValueError, match="segment size"):
+            crypto.decrypt_file(str(temp_dir / "huge.enc"))
+
+
+@pytest.mark.unit
+class TestEncryptedEvidenceArchive:
+    """Test one-pass encrypted evidence archives."""
+
+    @pytest.mark.parametrize("archive_format", ["tar.gz", "zip"])
+    def test_archive_and_extract(self, temp_dir, archive_format):
+        """Test the archive is encrypted without a plaintext intermediate and extracts back."""
+        source = temp_dir / "acquisitions" / "HOST01"
+        (source / "artefacts").mkdir(parents=True)
+        payload = os.urandom(200 * 1024)
+        (source / "artefacts" / "host.info").write_text("HOST01\n")
+        (source / "artefacts" / "memory.raw").write_bytes(payload)
+
+        result = create_evidence_archive(
+            str(source), "HOST01", str(temp_dir / "out"), format=archive_format, encryption="password", password="mellon"
+        )
+        extracted = extract_archive(result["archive_path"], str(temp_dir / "extracted"), password="mellon")
+
+        assert result["archive_path"].endswith(".{}.enc".format(archive_format))
+        assert sorted(os.listdir(temp_dir / "out")) == ["HOST01.{}.enc".format(archive_format)]
+        assert (Path(extracted) / "HOST01" / "artefacts" / "memory.raw").read_bytes() == payload
+        assert not list(temp_dir.glob("extracted.*"))
+        with pytest.raises(InvalidTag):
+            extract_archive(result["archive_path"], str(temp_dir / "wrong"), key=Fernet.generate_key())
+        assert not (temp_dir / "wrong").exists()
+        assert not list(temp_dir.glob(".wrong.*"))
+
+    def test_tampered_tar_leaves_nothing_behind(self, crypto, temp_dir):
+        """Test members decrypted before a later segment fails to authenticate are removed."""
+        source = temp_dir / "HOST01"
+        source.mkdir()
+        (source / "memory.raw").write_bytes(os.urandom(8 * 1024))
+        (source / "z.log").write_bytes(os.urandom(8 * 1024))
+        with open(temp_dir / "HOST01.tar.enc", "wb") as f, crypto.open_encrypted_writer(f) as writer:
+            with tarfile.open(fileobj=writer, mode="w|") as tar:
+                tar.add(source, arcname="HOST01")
+        stream = (temp_dir / "HOST01.tar.enc").read_bytes()
+        (temp_dir / "HOST01.tar.enc").write_bytes(stream[:-1] + bytes([stream[-1] ^ 1]))
+        (temp_dir / "extracted").mkdir()
+        (temp_dir / "extracted" / "notes.txt").write_text("kept\n")
+
+        with pytest.raises(InvalidTag):
+            extract_archive(str(temp_dir / "HOST01.tar.enc"), str(temp_dir / "extracted"), key=crypto.key)
+
+        assert os.listdir(temp_dir / "extracted") == ["notes.txt"]
+        assert not list(temp_dir.glob(".extracted.*"))
+
+    def test_members_outside_output_are_refused(self, crypto, temp_dir):
+        """Test an encrypted tar member escaping the output directory is not written."""
+        member = tarfile.TarInfo("../escaped.txt")
+        member.size = 4
+        with open(temp_dir / "evil.tar.enc", "wb") as f, crypto.open_encrypted_writer(f) as writer:
+            with tarfile.open(fileobj=writer, mode="w|") as tar:
+                tar.addfile(member, io.BytesIO(b"evil"))
+
+        with pytest.raises(tarfile.TarError):
+            extract_archive(str(temp_dir / "evil.tar.enc"), str(temp_dir / "out" / "evil"), key=crypto.key)
+
+        assert not (temp_dir / "out" / "escaped.txt").exists()
+        assert not (temp_dir / "out" / "evil").exists()
@@ -0,0 +1,94 @@
+"""
+Unit Tests for the Gandalf Acquisition Orchestrator
+
+Tests hosts are acquired concurrently within the pool bound, failures are
+isolated per host, progress is reported per host and a remote archive is
+received while its progress is drained.
+"""
+
+import io
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "acquisition" / "python"))
+
+from gandalf_orchestrator import HostProgress, receive_archive, run_acquisitions  # noqa: E402
+
+
+@pytest.mark.unit
+class TestGandalfOrchestrator:
+    """Test run_acquisitions and HostProgress."""
+
+    def test_bounded_concurrency_and_isolated_failures(self):
+        """Test no more than max_workers hosts run at once and one failure does not stop the rest."""
+        hosts = ["host{:02d}".format(i) for i in range(10)]
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def acquire(host, report):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                report("acquiring")
+                time.sleep(0.05)
+                if host == "host03":
+                    raise ConnectionError("no route to host")
+                report("collecting", "1.0MB / 1.0MB")
+                return host + ".zip.enc"
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        stream = io.StringIO()
+        progress = HostProgress(hosts, stream=stream, interactive=False)
+
+        results = run_acquisitions(hosts, acquire, max_workers=4, progress=progress)
+
+        assert 1 < peak[0] <= 4
+        assert results["host03"] == {
+            "status": "failed",
+            "detail": "ConnectionError: no route to host",
+            "seconds": results["host03"]["seconds"],
+        }
+        assert all(results[h]["status"] == "done" for h in hosts if h != "host03")
+        assert results["host07"]["detail"] == "host07.zip.enc"
+        assert progress.summary() == {"done": [h for h in hosts if h != "host03"], "failed": ["host03"]}
+        assert "host03  failed" in stream.getvalue()
+
+    def test_interactive_table_redraws_in_place(self):
+        """Test the terminal table is redrawn over itself rather than appended."""
+        stream = io.StringIO()
+        progress = HostProgress(["alpha", "beta"], stream=stream, interactive=True)
+
+        run_acquisitions(["alpha", "beta"], lambda host, report: report("acquiring"), progress=progress)
+
+        assert "\033[4F" in stream.getvalue()
+        assert stream.getvalue().rstrip().endswith("2/2 hosts finished")
+
+    def test_receive_archive_drains_progress(self, temp_dir):
+        """Test the archive is copied in chunks and the remote progress is logged alongside it."""
+        archive = bytes(range(256)) * 40
+        log, reports = io.BytesIO(), []
+
+        received = receive_archive(
+            io.BytesIO(archive),
+            io.StringIO("collecting /etc/passwd\n\nWARNING: timestamp before 1980\n"),
+            str(temp_dir / "host01.zip.part"),
+            log,
+            lambda stage, detail="": reports.append((stage, detail)),
+            chunk_size=4096,
+        )
+
+        assert received == len(archive)
+        assert (temp_dir / "host01.zip.part").read_bytes() == archive
+        assert log.getvalue() == b"collecting /etc/passwd\n\nWARNING: timestamp before 1980\n"
+        assert ("acquiring", "WARNING: timestamp before 1980") in reports
+        assert [r for r in reports if r[0] == "collecting"] == [
+            ("collecting", "4.0KB"),
+            ("collecting", "8.0KB"),
+            ("collecting", "10.0KB"),
+        ]
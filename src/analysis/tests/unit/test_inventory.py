@@ -0,0 +1,62 @@
+"""
+Unit Tests for File Inventory
+
+Tests the single-walk inventory against os.walk and its size/type filters.
+"""
+
+import os
+
+import pytest
+
+from rivendell.inventory import get_inventory
+
+
+@pytest.fixture
+def mount(temp_dir):
+    root = temp_dir / "mnt"
+    (root / "Windows" / "System32").mkdir(parents=True)
+    (root / "Users" / "alice" / "Desktop").mkdir(parents=True)
+    (root / "Windows" / "System32" / "cmd.exe").write_bytes(b"MZ" + b"\x00" * 2046)
+    (root / "Users" / "alice" / "Desktop" / "notes.txt").write_text("password=hunter2\n")
+    (root / "Users" / "alice" / "Desktop" / "empty.txt").write_text("")
+    (root / "Users" / "alice" / "Desktop" / "cmd.lnk").symlink_to(
+        root / "Windows" / "System32" / "cmd.exe"
+    )
+    (root / "Users" / "alice" / "Windows").symlink_to(root / "Windows")
+    return str(root)
+
+
+@pytest.mark.unit
+class TestFileInventory:
+    """Test FileInventory walking and querying."""
+
+    def test_walk_matches_os_walk(self, mount):
+        """Test the inventory lists the same files per directory as os.walk."""
+        expected = {
+            (root, name) for root, _, files in os.walk(mount) for name in files
+        }
+        listed = {
+            (root, name) for root, _, files in get_inventory(mount).walk() for name in files
+        }
+
+        assert listed == expected
+
+    def test_files_filters_size_and_type(self, mount):
+        """Test size bounds are exclusive and links are only returned when asked for."""
+        inventory = get_inventory(mount)
+
+        regular = {os.path.basename(path) for path, _ in inventory.files(larger_than=0)}
+        links = {os.path.basename(path) for path, _ in inventory.files(types=("link", "dirlink"))}
+
+        assert regular == {"cmd.exe", "notes.txt"}
+        assert links == {"cmd.lnk", "Windows"}
+
+    def test_inventory_is_walked_once(self, mount):
+        """Test later callers reuse the first walk unless a refresh is requested."""
+        first = get_inventory(mount)
+        with open(os.path.join(mount, "new.txt"), "w") as new_file:
+            new_file.write("added after the walk")
+
+        assert get_inventory(mount) is first
+        assert first.count() == 5
+        assert get_inventory(mount, refresh=True).count() == 6
@@ -0,0 +1,55 @@
+"""
+Unit Tests for Job Progress
+
+Tests elrond progress events become a job percentage and that the reader
+thread keeps reading when a callback fails.
+"""
+
+import importlib.util
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+# Loaded by path: `web.backend` here resolves to the copy under src/analysis/web
+PROGRESS_PATH = Path(__file__).resolve().parents[3] / "web" / "backend" / "progress.py"
+_spec = importlib.util.spec_from_file_location("web_backend_progress", PROGRESS_PATH)
+progress = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(progress)
+
+
+@pytest.mark.unit
+class TestJobProgress:
+    """Test ProgressTracker and start_progress_reader."""
+
+    def test_percent_moves_within_phase_band(self):
+        """Test artefact events move the job through the phase's band by bytes done."""
+        tracker = progress.ProgressTracker()
+
+        tracker.update({"event": "phase", "phase": "processing", "ts": 0.0})
+        event = tracker.update(
+            {"event": "artefact", "phase": "processing", "done_bytes": 50, "total_bytes": 100, "ts": 10.0}
+        )
+
+        assert event["percent"] == 60
+        assert event["eta_seconds"] == 10
+
+    def test_reader_survives_failed_callback(self):
+        """Test an exception from on_event is logged and later events are still delivered."""
+        read_fd, write_fd = os.pipe()
+        seen = []
+
+        def on_event(event):
+            seen.append(event["done"])
+            if event["done"] == 1:
+                raise RuntimeError("database is locked")
+
+        reader = progress.start_progress_reader(read_fd, progress.ProgressTracker(), on_event)
+        with os.fdopen(write_fd, "w") as stream:
+            for done in (1, 2, 3):
+                stream.write(json.dumps({"event": "artefact", "phase": "processing", "done": done, "total": 3}) + "\n")
+        reader.join(timeout=10)
+
+        assert seen == [1, 2, 3]
+        assert not reader.is_alive()
@@ -0,0 +1,153 @@
+"""
+Unit Tests for Mailbox Extraction
+
+Tests messages are streamed out of .emlx, mbox and readpst output with
+their headers, bodies, links and attachment hashes, in and out of process.
+"""
+
+import hashlib
+import json
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import pytest
+
+from rivendell.process.extractions import mail
+from rivendell.process.extractions.mail import extract_mailbox, iter_mail_sources, iter_messages
+
+ATTACHMENT = b"MZ\x90\x00" + bytes(range(256)) * 40
+
+
+def _multipart():
+    message = MIMEMultipart()
+    message["From"] = "Frodo Baggins <frodo@shire.example>"
+    message["To"] = "sam@shire.example"
+    message["Subject"] = "=?utf-8?b?T25lIHJpbmcg4oCT?= to rule them all"
+    message["Date"] = "Mon, 25 Mar 3019 09:00:00 +0000"
+    message["Message-ID"] = "<ring@shire.example>"
+    message["Received"] = "from mail.mordor.example (mail.mordor.example [203.0.113.7])\n\tby mx.shire.example; Mon, 25 Mar 3019 09:00:01 +0000"
+    message.attach(MIMEText("Meet at http://prancing-pony.example/room?no=5.\nBring the ring.", "plain"))
+    attachment = MIMEApplication(ATTACHMENT, Name="map.exe")
+    attachment["Content-Disposition"] = 'attachment; filename="map.exe"'
+    message.attach(attachment)
+    return message.as_bytes()
+
+
+def _mailbox(temp_dir):
+    mailbox = temp_dir / "Inbox"
+    mailbox.mkdir()
+    first = _multipart()
+    (mailbox / "1.emlx").write_bytes(
+        str(len(first)).encode() + b"\n" + first + b'<?xml version="1.0"?><plist><dict/></plist>\n'
+    )
+    plain = MIMEText("<p>See <a href=\"https://isengard.example/\">this</a></p>", "html")
+    plain["From"] = "saruman@isengard.example"
+    plain["Subject"] = "Palantir"
+    (mailbox / "mbox").write_bytes(
+        b"From saruman@isengard.example Mon Mar 25 09:00:00 3019\n"
+        + plain.as_bytes()
+        + b"\n\nFrom gandalf@valinor.example Mon Mar 25 10:00:00 3019\nSubject: Fly\n\nFrom the bridge, fly you fools\n"
+    )
+    (mailbox / "Sent").mkdir()
+    (mailbox / "Sent" / "2").write_bytes(b"Subject: readpst -S message\n\nseparate\n")
+    (mailbox / "Sent" / "2-map.exe").write_bytes(b"attachment written by readpst")
+    return mailbox
+
+
+@pytest.mark.unit
+class TestMailExtraction:
+    """Test iter_messages and extract_mailbox."""
+
+    def test_sources_and_messages(self, temp_dir):
+        """Test sources are found in order and mbox files are split on From lines only."""
+        mailbox = _mailbox(temp_dir)
+
+        sources = list(iter_mail_sources(str(mailbox)))
+        subjects = [message["Subject"] for _, message in iter_messages(str(mailbox / "mbox"))]
+
+        assert sources == [str(mailbox / "1.emlx"), str(mailbox / "mbox"), str(mailbox / "Sent" / "2")]
+        assert subjects == ["Palantir", "Fly"]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_extract_mailbox(self, temp_dir, monkeypatch, workers):
+        """Test one JSON line per message with decoded headers, body, links and attachment hashes."""
+        monkeypatch.setattr(mail, "BATCH_FILES", 1)
+        mailbox = _mailbox(temp_dir)
+        output = temp_dir / "Inbox.jsonl"
+
+        written = extract_mailbox(
+            list(iter_mail_sources(str(mailbox))),
+            str(output),
+            "Inbox",
+            workers=workers,
+            attachments_dir=str(temp_dir / "attachments"),
+        )
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        first = records[0]
+        assert written == len(records) == 4
+        assert [record["MessageNo"] for record in records] == [1, 1, 2, 1]
+        assert first["Subject"] == "One ring – to rule them all"
+        assert first["ReceivedFromIP"] == "203.0.113.7"
+        assert first["ReceivedTime"] == "Mon, 25 Mar 3019 09:00:01 +0000"
+        assert first["MessageBody"] == "Meet at http://prancing-pony.example/room?no=5.\nBring the ring."
+        assert first["Links"] == ["http://prancing-pony.example/room?no=5"]
+        sha256 = hashlib.sha256(ATTACHMENT).hexdigest()
+        assert first["Attachments"] == [
+            {
+                "Filename": "map.exe",
+                "ContentType": "application/octet-stream",
+                "Size": len(ATTACHMENT),
+                "SHA256": sha256,
+                "Path": str(temp_dir / "attachments" / (sha256 + "_map.exe")),
+            }
+        ]
+        assert (temp_dir / "attachments" / (sha256 + "_map.exe")).read_bytes() == ATTACHMENT
+        assert records[1]["MessageBody"] == "See this"
+        assert records[1]["Links"] == ["https://isengard.example/"]
+        assert records[2]["MessageBody"] == "From the bridge, fly you fools"
+        assert records[3]["Subject"] == "readpst -S message"
+        assert not (temp_dir / "Inbox.jsonl.partial").exists()
+
+    def test_large_mbox_is_split_into_ranges(self, temp_dir, monkeypatch):
+        """Test an mbox split into byte ranges yields every message once, numbered through, with >From unquoted."""
+        monkeypatch.setattr(mail, "MBOX_RANGE_BYTES", 150)
+        mbox = temp_dir / "Archive.mbox"
+        mbox.write_bytes(
+            b"".join(
+                b"From frodo@shire.example Mon Mar 25 09:00:00 3019\nSubject: Day %d\n\n>From Bree to Rivendell\n\n" % day
+                for day in range(1, 9)
+            )
+        )
+
+        ranges = mail.mbox_ranges(str(mbox), 150)
+        written = extract_mailbox([str(mbox)], str(temp_dir / "Archive.jsonl"), "Archive", workers=2)
+
+        records = [json.loads(line) for line in (temp_dir / "Archive.jsonl").read_text().splitlines()]
+        assert len(ranges) > 2 and ranges[-1][1] is None
+        assert written == 8
+        assert [record["MessageNo"] for record in records] == list(range(1, 9))
+        assert [record["Subject"] for record in records] == ["Day {}".format(day) for day in range(1, 9)]
+        assert records[0]["MessageBody"] == "From Bree to Rivendell"
+
+    def test_unreadable_message_is_recorded(self, temp_dir, monkeypatch):
+        """Test a message that fails to extract is recorded with its error and the rest still written."""
+        mailbox = _mailbox(temp_dir)
+        extract = mail.message_record
+
+        def message_record(message, attachments_dir=None):
+            if message["Subject"] == "Palantir":
+                raise ValueError("corrupt part")
+            return extract(message, attachments_dir)
+
+        monkeypatch.setattr(mail, "message_record", message_record)
+        written = extract_mailbox(list(iter_mail_sources(str(mailbox))), str(temp_dir / "Inbox.jsonl"), "Inbox", workers=1)
+
+        records = [json.loads(line) for line in (temp_dir / "Inbox.jsonl").read_text().splitlines()]
+        assert written == 4
+        failed = [record for record in records if "Error" in record]
+        assert [(record["Source"], record["MessageNo"], record["Error"]) for record in failed] == [
+            (str(mailbox / "mbox"), 1, "ValueError: corrupt part")
+        ]
+        assert "Fly" in [record.get("Subject") for record in records]
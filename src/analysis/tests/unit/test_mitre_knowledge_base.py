@@ -0,0 +1,96 @@
+"""
+Unit Tests for the MITRE ATT&CK Knowledge Base
+
+Tests relationship indexes, the version-keyed cache and the
+process-wide shared instance.
+"""
+
+import json
+
+import pytest
+
+from rivendell.post.mitre import knowledge_base
+from rivendell.post.mitre.attack_data import get_techniques_for_tactic
+from rivendell.post.mitre.knowledge_base import get_knowledge_base, load_knowledge_base
+
+
+def _parsed(version):
+    return {
+        "version": version,
+        "techniques": {
+            "T1059": {"id": "T1059", "name": "Command and Scripting Interpreter", "tactics": ["Execution"], "stix_id": "attack-pattern--1"},
+            "T1003": {"id": "T1003", "name": "OS Credential Dumping", "tactics": ["Credential Access"], "stix_id": "attack-pattern--2"},
+        },
+        "tactics": {},
+        "mitigations": {"M1026": {"id": "M1026", "name": "Privileged Account Management", "stix_id": "course-of-action--1"}},
+        "groups": {"G0007": {"id": "G0007", "name": "APT28", "stix_id": "intrusion-set--1"}},
+        "software": {"S0002": {"id": "S0002", "name": "Mimikatz", "stix_id": "tool--1"}},
+        "relationships": [
+            {"source": "intrusion-set--1", "target": "attack-pattern--1", "type": "uses"},
+            {"source": "intrusion-set--1", "target": "attack-pattern--2", "type": "uses"},
+            {"source": "tool--1", "target": "attack-pattern--2", "type": "uses"},
+            {"source": "course-of-action--1", "target": "attack-pattern--2", "type": "mitigates"},
+        ],
+    }
+
+
+@pytest.fixture
+def cache_dir(temp_dir):
+    def write(version):
+        (temp_dir / "enterprise-attack-parsed.json").write_text(json.dumps(_parsed(version)))
+        (temp_dir / "version.json").write_text(json.dumps({"version": version}))
+
+    write("15.1")
+    knowledge_base._instances.clear()
+    yield str(temp_dir), write
+    knowledge_base._instances.clear()
+
+
+@pytest.mark.unit
+class TestAttackKnowledgeBase:
+    """Test AttackKnowledgeBase indexes and caching."""
+
+    def test_indexes(self, cache_dir):
+        """Test tactic, group, software and mitigation lookups come from prebuilt indexes."""
+        kb = load_knowledge_base(cache_dir[0])
+
+        assert [t["id"] for t in kb.techniques_for_tactic("credential access")] == ["T1003"]
+        assert kb.groups_for_technique("T1003") == ["APT28"]
+        assert kb.software_for_technique("T1003") == ["Mimikatz"]
+        assert kb.techniques_by_group["G0007"] == ["T1059", "T1003"]
+        assert kb.mitigations_by_technique == {"T1003": ["M1026"]}
+        assert [t["technique_id"] for t in get_techniques_for_tactic("impact")][:2] == ["T1485", "T1486"]
+
+    def test_cache_and_shared_instance(self, cache_dir, temp_dir, monkeypatch):
+        """Test the cache is reused until the bundle changes and one instance is shared per process."""
+        path, write = cache_dir
+
+        first = get_knowledge_base(path)
+        assert (temp_dir / "enterprise-attack-kb.marshal").stat().st_mode & 0o777 == 0o600
+        assert get_knowledge_base(path) is first
+
+        # A fresh process (empty singleton) is served from the cache without re-indexing
+        knowledge_base._instances.clear()
+        with monkeypatch.context() as m:
+            m.setattr(knowledge_base.AttackKnowledgeBase, "_build_indexes", lambda self: pytest.fail("re-indexed"))
+            reloaded = get_knowledge_base(path)
+        assert reloaded is not first and reloaded.groups_by_technique == first.groups_by_technique
+
+        write("16.0")
+        updated = get_knowledge_base(path)
+        assert updated is not first and updated.data["version"] == "16.0"
+        assert get_knowledge_base(str(temp_dir / "missing")) is None
+
+    def test_cache_writable_by_others_is_ignored(self, cache_dir, temp_dir, monkeypatch):
+        """Test a cache file others could have replaced is not loaded."""
+        path, _ = cache_dir
+        load_knowledge_base(path)
+        cache_file = temp_dir / "enterprise-attack-kb.marshal"
+        cache_file.chmod(0o666)
+
+        with monkeypatch.context() as m:
+            m.setattr(knowledge_base.AttackKnowledgeBase, "from_cache", lambda cached: pytest.fail("loaded"))
+            kb = load_knowledge_base(path)
+
+        assert kb.groups_for_technique("T1003") == ["APT28"]
+        assert cache_file.stat().st_mode & 0o777 == 0o600
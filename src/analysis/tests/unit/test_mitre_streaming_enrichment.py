@@ -0,0 +1,136 @@
+"""
+Unit Tests for Streaming MITRE ATT&CK Enrichment
+
+Tests JSON arrays, JSON lines and single objects are enriched record by
+record in one pass, that files which do not decode are left untouched, and
+that techniques are recorded once per techniques file.
+"""
+
+import functools
+import json
+
+import pytest
+
+from rivendell.post.mitre import enrichment as enrichment_module
+from rivendell.post.mitre.enrichment import (
+    TECHNIQUES_FILE,
+    MitreEnrichment,
+    enrich_artefacts_directory,
+)
+
+MFT_RECORDS = [
+    {"filename": "mimikatz.exe", "full_path": "C:\\Temp\\mimikatz.exe", "size": 1024},
+    {"filename": "notes.txt", "full_path": "C:\\Users\\frodo\\notes.txt", "size": "psexec"},
+]
+
+
+@pytest.fixture
+def enrichment():
+    return MitreEnrichment()
+
+
+@pytest.mark.unit
+class TestStreamingEnrichment:
+    """Test MitreEnrichment.enrich_json_file and enrich_json_file_streaming."""
+
+    def test_array_is_enriched_in_place(self, temp_dir, enrichment):
+        """Test every record is enriched, only relevant fields are scanned and the array layout is kept."""
+        path = temp_dir / "mft.json"
+        path.write_text(json.dumps(MFT_RECORDS, indent=2))
+
+        techniques = enrichment.enrich_json_file(str(path))
+
+        records = json.loads(path.read_text())
+        assert techniques == {"T1003.002", "T1070.006", "T1564.004"}
+        assert path.read_text().splitlines()[0] == "["
+        assert [record["filename"] for record in records] == ["mimikatz.exe", "notes.txt"]
+        assert [t["mitre_technique_id"] for t in records[0]["mitre_techniques"]] == [
+            "T1003.002", "T1070.006", "T1564.004"
+        ]
+        assert records[1]["mitre_technique_id"] == "T1070.006"
+        assert "T1569.002" not in techniques  # the size field is not scanned for MFT records
+        assert not (temp_dir / "mft.json.enriching").exists()
+
+    def test_lines_and_single_objects_keep_their_layout(self, temp_dir, enrichment):
+        """Test JSON lines stay one record per line and a single object stays an object."""
+        lines = temp_dir / "prefetch.json"
+        lines.write_text("".join(json.dumps(record) + "\n" for record in MFT_RECORDS))
+        single = temp_dir / "registry.json"
+        single.write_text(json.dumps({"key": "Software\\Microsoft\\Windows\\CurrentVersion\\Run"}))
+
+        enrichment.enrich_json_file(str(lines))
+        enrichment.enrich_json_file(str(single))
+
+        assert [json.loads(line)["mitre_technique_id"] for line in lines.read_text().splitlines()] == [
+            "T1003.002", "T1059"
+        ]
+        assert json.loads(single.read_text())["mitre_technique_id"] == "T1112"
+
+    def test_undecodable_file_is_scanned_not_rewritten(self, temp_dir, enrichment):
+        """Test a truncated file keeps its content and is scanned as text."""
+        path = temp_dir / "mft.json"
+        content = json.dumps(MFT_RECORDS)[:-30]
+        path.write_text(content)
+        text = temp_dir / "notes.json"
+        text.write_text("ran psexec against the DC")
+
+        assert "T1003.002" in enrichment.enrich_json_file(str(path))
+        assert "T1569.002" in enrichment.enrich_json_file(str(text))
+        assert path.read_text() == content
+        assert not (temp_dir / "mft.json.enriching").exists()
+
+    def test_corrupt_record_after_first_chunk_still_scans_the_rest(self, temp_dir, enrichment, monkeypatch):
+        """Test records after a corrupt line past the first read chunk are still scanned as text."""
+        monkeypatch.setattr(
+            enrichment_module, "iter_json_records", functools.partial(enrichment_module.iter_json_records, chunk_size=64)
+        )
+        path = temp_dir / "mft.json"
+        content = "".join(json.dumps(record) + "\n" for record in MFT_RECORDS[:1] * 8)
+        content += '{"filename": "broken.txt",,}\n'
+        content += json.dumps({"filename": "notes.txt", "full_path": "C:\\Temp\\psexec.exe"}) + "\n"
+        path.write_text(content)
+
+        techniques = enrichment.enrich_json_file(str(path))
+
+        assert "T1569.002" in techniques
+        assert path.read_text() == content
+        assert not (temp_dir / "mft.json.enriching").exists()
+
+    def test_techniques_file_is_deduplicated(self, temp_dir, enrichment):
+        """Test techniques already in the techniques file are not appended again."""
+        (temp_dir / "mft.json").write_text(json.dumps(MFT_RECORDS))
+        (temp_dir / "usnjrnl.json").write_text(json.dumps(MFT_RECORDS))
+        techniques_path = temp_dir / TECHNIQUES_FILE
+        techniques_path.write_text("T1070.006\n")
+
+        with open(techniques_path, "a") as techniques_file:
+            assert enrichment.enrich_json_file_streaming(str(temp_dir / "mft.json"), techniques_file)
+        with open(techniques_path, "a") as techniques_file:
+            assert enrichment.enrich_json_file_streaming(str(temp_dir / "mft.json"), techniques_file)
+            assert enrichment.enrich_json_file_streaming(str(temp_dir / "usnjrnl.json"), techniques_file)
+
+        recorded = techniques_path.read_text().splitlines()
+        assert sorted(recorded) == ["T1003.002", "T1070.004", "T1070.006", "T1083", "T1564.004"]
+
+
+@pytest.mark.unit
+class TestEnrichArtefactsDirectory:
+    """Test enrich_artefacts_directory."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_directory_pool(self, temp_dir, workers):
+        """Test files are enriched across the pool and techniques are written once, sorted."""
+        cooked = temp_dir / "artefacts" / "cooked"
+        (cooked / "mft").mkdir(parents=True)
+        (cooked / "mft" / "mft.json").write_text(json.dumps(MFT_RECORDS))
+        (cooked / "prefetch.json").write_text(json.dumps(MFT_RECORDS))
+        (cooked / "empty.json").write_text("")
+
+        stats = enrich_artefacts_directory(str(cooked), workers=workers)
+
+        recorded = (temp_dir / "artefacts" / TECHNIQUES_FILE).read_text().splitlines()
+        assert stats["total_files"] == stats["enriched_files"] == 3
+        assert recorded == sorted(stats["techniques_found"])
+        assert {"T1003.002", "T1059", "T1070.006", "T1106"} <= set(recorded)
+        assert json.loads((cooked / "prefetch.json").read_text())[0]["mitre_technique_id"] == "T1003.002"
+        assert MitreEnrichment().collect_techniques_from_directory(str(cooked)) >= {"T1003.002", "T1070.006"}
@@ -0,0 +1,203 @@
+"""
+Unit Tests for the Mordor Catalog
+
+Tests incremental catalog refresh against a local stand-in for the GitHub
+tree and raw endpoints, and indexed filtering of the loaded catalog.
+"""
+
+import hashlib
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("yaml")
+pytest.importorskip("pydantic")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from mordor.catalog import MordorCatalog  # noqa: E402
+
+
+METADATA = """id: {id}
+title: {title}
+description: {description}
+platform: {platform}
+type: atomic
+attack_mappings:
+  - technique: {technique}
+    tactics: [{tactic}]
+tags: [{tag}]
+files:
+  - type: Host
+    link: https://example.invalid/{id}.zip
+"""
+
+
+class _Repository:
+    """Metadata files served by the stand-in, plus a log of raw file requests."""
+
+    def __init__(self):
+        self.files = {}
+        self.raw_requests = []
+        self.rate_limited = False
+        self.send_etags = True
+
+    def put(self, name, dataset_type="atomic", **fields):
+        self.files["datasets/{}/_metadata/{}".format(dataset_type, name)] = METADATA.format(**fields)
+
+    def tree(self, dataset_type):
+        prefix = "datasets/{}/_metadata/".format(dataset_type)
+        entries = [
+            {"path": path[len(prefix):], "type": "blob", "sha": hashlib.sha1(text.encode()).hexdigest()}
+            for path, text in sorted(self.files.items())
+            if path.startswith(prefix)
+        ]
+        return {"sha": hashlib.sha1(json.dumps(entries).encode()).hexdigest(), "tree": entries}
+
+
+@pytest.fixture
+def github(temp_dir):
+    repository = _Repository()
+    repository.put(
+        "SDWIN-1.yaml", id="SDWIN-1", title="Remote service creation", description="PsExec lateral movement",
+        platform="Windows", technique="T1021", tactic="TA0008", tag="lateral",
+    )
+    repository.put(
+        "SDWIN-2.yaml", id="SDWIN-2", title="LSASS memory dump", description="Credential access via procdump",
+        platform="Windows", technique="T1003", tactic="TA0006", tag="credentials",
+    )
+    repository.put(
+        "SDLIN-1.yaml", id="SDLIN-1", title="Cron persistence", description="Scheduled cron job",
+        platform="Linux", technique="T1053", tactic="TA0003", tag="persistence",
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body, etag):
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            if repository.send_etags:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.startswith("/api/") and repository.rate_limited:
+                self.send_response(403)
+                self.end_headers()
+            elif self.path.startswith("/api/git/trees/master:datasets/"):
+                tree = repository.tree(self.path.split("/")[-2])
+                self._send(json.dumps(tree).encode(), '"{}"'.format(tree["sha"]))
+            elif self.path[len("/raw/"):] in repository.files:
+                path = self.path[len("/raw/"):]
+                repository.raw_requests.append(path)
+                body = repository.files[path].encode()
+                self._send(body, '"{}"'.format(hashlib.md5(body).hexdigest()))
+            else:
+                self.send_response(404)
+                self.end_headers()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = "http://127.0.0.1:{}".format(server.server_port)
+    catalog = lambda: MordorCatalog(  # noqa: E731
+        cache_dir=str(temp_dir / "cache"), api_url=base + "/api", raw_url=base + "/raw"
+    )
+    yield repository, catalog
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+class TestMordorCatalog:
+    """Test MordorCatalog refresh and filtering."""
+
+    def test_refresh_fetches_only_changed_metadata(self, github):
+        """Test a forced refresh downloads only new or changed YAML files and drops removed ones."""
+        repository, catalog = github
+
+        assert catalog().refresh() == 3
+        assert len(repository.raw_requests) == 3
+
+        repository.raw_requests.clear()
+        assert catalog().refresh(force=True) == 3
+        assert repository.raw_requests == []
+
+        repository.put(
+            "SDWIN-2.yaml", id="SDWIN-2", title="LSASS minidump", description="Credential access via comsvcs",
+            platform="Windows", technique="T1003.001", tactic="TA0006", tag="credentials",
+        )
+        del repository.files["datasets/atomic/_metadata/SDLIN-1.yaml"]
+        refreshed = catalog()
+
+        assert refreshed.refresh(force=True) == 2
+        assert repository.raw_requests == ["datasets/atomic/_metadata/SDWIN-2.yaml"]
+        assert refreshed.get_dataset("SDWIN-2").title == "LSASS minidump"
+        assert refreshed.get_dataset("SDWIN-1").title == "Remote service creation"
+        assert refreshed.get_dataset("SDLIN-1") is None
+
+    def test_rate_limit_keeps_every_directory_and_timestamp(self, github):
+        """Test a 403 listing keeps the cached datasets of all directories and the previous timestamp."""
+        repository, catalog = github
+        repository.put(
+            "SDWIN-3.yaml", dataset_type="compound", id="SDWIN-3", title="APT3 emulation",
+            description="Compound scenario", platform="Windows", technique="T1059", tactic="TA0002", tag="apt",
+        )
+        assert catalog().refresh() == 4
+        fetched_at = catalog()._load_cache().last_updated
+
+        repository.rate_limited = True
+        limited = catalog()
+
+        assert limited.refresh(force=True) == 4
+        assert limited.get_dataset("SDWIN-3").title == "APT3 emulation"
+        assert catalog()._load_cache().last_updated == fetched_at
+
+        repository.rate_limited = False
+        repository.raw_requests.clear()
+        assert catalog().refresh(force=True) == 4
+        assert repository.raw_requests == []
+        assert catalog()._load_cache().last_updated > fetched_at
+
+    def test_missing_etags_are_stored_as_empty(self, github):
+        """Test responses without an ETag header still produce a cache that validates and reloads."""
+        repository, catalog = github
+        repository.send_etags = False
+
+        assert catalog().refresh() == 3
+        cached = catalog()._load_cache()
+
+        assert cached.total_count == 3
+        assert {source["etag"] for source in cached.sources.values()} == {""}
+        assert {tree["etag"] for tree in cached.trees.values()} == {""}
+
+    def test_indexed_filters(self, github):
+        """Test platform, tactic, technique, tag and word-prefix search filters intersect."""
+        _, catalog = github
+        mordor = catalog()
+        mordor.refresh()
+
+        def ids(**filters):
+            return [dataset.dataset_id for dataset in mordor.list_datasets(**filters)]
+
+        assert ids() == ["SDLIN-1", "SDWIN-1", "SDWIN-2"]
+        assert ids(platform="windows") == ["SDWIN-1", "SDWIN-2"]
+        assert ids(platform="windows", tactic="ta0006") == ["SDWIN-2"]
+        assert ids(technique="t1053") == ["SDLIN-1"]
+        assert ids(tags=["lateral", "persistence"]) == ["SDLIN-1", "SDWIN-1"]
+        assert ids(search="lsa dump") == ["SDWIN-2"]
+        assert ids(search="sdwin") == ["SDWIN-1", "SDWIN-2"]
+        assert ids(search="cron", platform="windows") == []
+        assert ids(platform="windows", limit=1, offset=1) == ["SDWIN-2"]
@@ -0,0 +1,154 @@
+"""
+Unit Tests for the Mordor Downloader
+
+Tests concurrent, segmented and resumable dataset downloads against a local
+HTTP server that supports byte ranges.
+"""
+
+import hashlib
+import os
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("yaml")
+pytest.importorskip("pydantic")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from mordor.downloader import MordorDownloader  # noqa: E402
+from mordor.models import DatasetFile, MordorDataset  # noqa: E402
+
+
+class _Catalog:
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def get_dataset(self, dataset_id):
+        return self.dataset if dataset_id == self.dataset.dataset_id else None
+
+
+@pytest.fixture
+def server():
+    files = {
+        "/large.zip": os.urandom(300 * 1024 + 17),
+        "/small.zip": os.urandom(5000),
+    }
+    log = {"ranges": [], "fail_range_from": None}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _headers(self, body):
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", '"{}"'.format(hashlib.md5(body).hexdigest()))
+
+        def do_HEAD(self):
+            body = files[self.path]
+            self.send_response(200)
+            self._headers(body)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+
+        def do_GET(self):
+            body = files[self.path]
+            match = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+            if not match:
+                self.send_response(200)
+                self._headers(body)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            start, end = int(match.group(1)), int(match.group(2))
+            log["ranges"].append((self.path, start, end))
+            if log["fail_range_from"] is not None and start >= log["fail_range_from"]:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self._headers(body)
+            self.send_header("Content-Range", "bytes {}-{}/{}".format(start, end, len(body)))
+            self.send_header("Content-Length", str(end - start + 1))
+            self.end_headers()
+            self.wfile.write(body[start : end + 1])
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(httpd.server_port), files, log
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _dataset(base, files, checksum=None):
+    return MordorDataset(
+        id="SDWIN-TEST",
+        title="Test dataset",
+        files=[
+            DatasetFile(type="Host", link=base + path, checksum=checksum if path == "/large.zip" else None)
+            for path in files
+        ],
+    )
+
+
+@pytest.mark.unit
+class TestMordorDownloader:
+    """Test MordorDownloader against a local range-capable server."""
+
+    def test_parallel_segmented_download(self, server, temp_dir):
+        """Test files download concurrently, large files by range segment, with aggregate progress."""
+        base, files, log = server
+        downloader = MordorDownloader(
+            _Catalog(_dataset(base, files)), max_workers=4, segment_size=64 * 1024, segment_threshold=128 * 1024
+        )
+        progress = []
+
+        result = downloader.download(
+            "SDWIN-TEST", output_dir=str(temp_dir / "out"), progress_callback=lambda d, t: progress.append((d, t))
+        )
+
+        assert result.success, result.error
+        assert [f["filename"] for f in result.files] == ["large.zip", "small.zip"]
+        for entry in result.files:
+            body = files["/" + entry["filename"]]
+            assert Path(entry["path"]).read_bytes() == body
+            assert entry["checksum"] == hashlib.sha256(body).hexdigest()
+        assert len([r for r in log["ranges"] if r[0] == "/large.zip"]) == 5
+        assert progress[-1] == (sum(len(body) for body in files.values()),) * 2
+        assert not list((temp_dir / "out").rglob("*.part*"))
+        assert downloader.verify("SDWIN-TEST", str(temp_dir / "out")).valid
+
+    def test_interrupted_download_resumes(self, server, temp_dir):
+        """Test a failed download resumes from the .part sidecar and checksums are enforced."""
+        base, files, log = server
+        large = {"/large.zip": files["/large.zip"]}
+        checksum = hashlib.sha256(large["/large.zip"]).hexdigest()
+        downloader = MordorDownloader(
+            _Catalog(_dataset(base, large, checksum)), max_workers=1, segment_size=64 * 1024
+        )
+
+        log["fail_range_from"] = 128 * 1024
+        first = downloader.download("SDWIN-TEST", output_dir=str(temp_dir / "out"))
+        assert not first.success
+        assert (temp_dir / "out" / "Host" / "large.zip.part.json").exists()
+
+        log["fail_range_from"] = None
+        log["ranges"].clear()
+        second = downloader.download("SDWIN-TEST", output_dir=str(temp_dir / "out"))
+
+        assert second.success, second.error
+        assert min(start for _, start, _ in log["ranges"]) == 128 * 1024
+        assert (temp_dir / "out" / "Host" / "large.zip").read_bytes() == large["/large.zip"]
+
+        wrong = MordorDownloader(_Catalog(_dataset(base, large, "0" * 64)))
+        failed = wrong.download("SDWIN-TEST", output_dir=str(temp_dir / "bad"))
+        assert not failed.success and "Checksum mismatch" in failed.error
+        assert not (temp_dir / "bad" / "Host" / "large.zip").exists()
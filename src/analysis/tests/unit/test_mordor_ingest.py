@@ -0,0 +1,108 @@
+"""
+Unit Tests for Mordor Dataset Ingestion
+
+Tests events are streamed out of zipped and tarred OTRF datasets, mapped to
+the cooked event schema and fed to sinks without extracting the archives.
+"""
+
+import io
+import json
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from rivendell.core.mordor import (
+    find_mordor_datasets,
+    ingest_mordor_datasets,
+    iter_mordor_events,
+    stream_mordor_dataset,
+    to_cooked_event,
+)
+
+NXLOG_EVENT = {
+    "@timestamp": "2020-09-21T19:03:46.720Z",
+    "EventID": 4688,
+    "Channel": "Security",
+    "SourceName": "Microsoft-Windows-Security-Auditing",
+    "Hostname": "WORKSTATION5",
+    "Message": "A new process has been created.",
+    "NewProcessName": "C:\\Windows\\System32\\cmd.exe",
+}
+WINLOGBEAT_EVENT = {
+    "@timestamp": "2020-09-21T19:03:47.000Z",
+    "message": "Process Create",
+    "winlog": {
+        "channel": "Microsoft-Windows-Sysmon/Operational",
+        "event_id": 1,
+        "provider_name": "Microsoft-Windows-Sysmon",
+        "computer_name": "WORKSTATION5",
+        "event_data": {"Image": "C:\\Windows\\System32\\rundll32.exe", "CommandLine": "rundll32 comsvcs.dll"},
+    },
+}
+
+
+@pytest.fixture
+def datasets(temp_dir):
+    source = temp_dir / "datasets"
+    source.mkdir()
+    lines = "\n".join(json.dumps(event) for event in (NXLOG_EVENT, WINLOGBEAT_EVENT)) + "\n"
+    with zipfile.ZipFile(source / "empire_psexec.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("empire_psexec_2020-09-21.json", lines * 3)
+        archive.writestr("README.md", "not events")
+    payload = lines.encode()
+    (source / "compound").mkdir()
+    with tarfile.open(source / "compound" / "apt29_day1.tar.gz", "w:gz") as archive:
+        info = tarfile.TarInfo("apt29/day1.json")
+        info.size = len(payload)
+        archive.addfile(info, io.BytesIO(payload))
+    return str(source)
+
+
+@pytest.mark.unit
+class TestMordorIngest:
+    """Test streaming Mordor archives into cooked events."""
+
+    def test_events_stream_from_zip_and_tar(self, datasets):
+        """Test every JSON member of both archive types is decoded and non-JSON members are skipped."""
+        archives = find_mordor_datasets(datasets)
+
+        counts = {os.path.basename(a): sum(1 for _ in iter_mordor_events(a)) for a in archives}
+
+        assert counts == {"apt29_day1.tar.gz": 2, "empire_psexec.zip": 6}
+        assert not any(name.endswith(".json") for name in os.listdir(datasets))
+
+    def test_cooked_schema_and_sinks(self, datasets, temp_dir):
+        """Test NXLog and Winlogbeat events map to the cooked schema and reach every sink."""
+        cooked = to_cooked_event(WINLOGBEAT_EVENT, "empire_psexec", "day1.json")
+        received = []
+        archive = os.path.join(datasets, "empire_psexec.zip")
+
+        stats = stream_mordor_dataset(archive, [received.append])
+        summary = ingest_mordor_datasets("", str(temp_dir / "case") + "/", "mordor", datasets, enrich=False)
+
+        assert cooked["EventID"] == "1"
+        assert cooked["Channel"] == "Microsoft-Windows-Sysmon/Operational"
+        assert cooked["Provider"] == "Microsoft-Windows-Sysmon"
+        assert cooked["Computer"] == "WORKSTATION5"
+        assert cooked["CommandLine"] == "rundll32 comsvcs.dll"
+        assert cooked["SystemTime"] == "2020-09-21T19:03:47.000Z"
+        assert stats["events"] == len(received) == 6
+        assert received[0]["EventID"] == "4688" and received[0]["Provider"] == NXLOG_EVENT["SourceName"]
+        assert [s["events"] for s in summary] == [2, 6]
+        written = temp_dir / "case" / "empire_psexec" / "artefacts" / "cooked" / "evt" / "empire_psexec.json"
+        assert [json.loads(line)["mordor_dataset"] for line in written.read_text().splitlines()] == ["empire_psexec"] * 6
+
+    def test_techniques_from_fallback_enrichment_are_counted(self, datasets):
+        """Test secondary techniques are counted whether listed as mitre_technique_id or technique_id."""
+
+        class FallbackEnrichment:
+            def enrich_json_record(self, record, artefact_type):
+                record["mitre_technique_id"] = "T1059"
+                record["mitre_techniques"] = [{"technique_id": "T1059"}, {"technique_id": "T1569.002"}]
+                return record
+
+        stats = stream_mordor_dataset(os.path.join(datasets, "empire_psexec.zip"), [], FallbackEnrichment())
+
+        assert stats["techniques"] == {"T1059": 6, "T1569.002": 6}
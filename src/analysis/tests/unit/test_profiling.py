@@ -0,0 +1,59 @@
+"""
+Unit Tests for Profiling
+
+Tests span timing, handler instrumentation and the timing report.
+"""
+
+import json
+
+import pytest
+
+from rivendell.profiling import Profiler, profile_handler, get_profiler
+
+
+@pytest.mark.unit
+class TestProfiler:
+    """Test span aggregation and report output."""
+
+    def test_span_percentiles_and_slowest(self):
+        """Test per-name aggregation keeps counts, totals and slowest artefacts."""
+        profiler = Profiler()
+        for index in range(10):
+            with profiler.span("handler", "process_evtx", "Security{}.evtx".format(index)) as current:
+                current.add(records=5)
+
+        summary = profiler.summary()
+        stats = summary["handlers"]["process_evtx"]
+
+        assert stats["count"] == 10
+        assert stats["records"] == 50
+        assert stats["p50_seconds"] <= stats["p95_seconds"] <= stats["max_seconds"]
+        assert len(summary["slowest_artefacts"]) == 10
+
+    def test_phases_are_sequential(self, temp_dir):
+        """Test starting a phase ends the previous one and cProfile output is written."""
+        profiler = Profiler()
+        profiler.cprofile = True
+        profiler.start_phase("collection")
+        profiler.start_phase("processing")
+
+        report_path = profiler.write_report(str(temp_dir) + "/")
+        with open(report_path) as report_file:
+            report = json.load(report_file)
+
+        assert set(report["phases"]) == {"collection", "processing"}
+        assert (temp_dir / "profiles" / "processing.prof").exists()
+        assert (temp_dir / "profiles" / "processing.txt").exists()
+
+    def test_profile_handler_records_artefact_size(self, temp_dir):
+        """Test decorated handlers are keyed by name with artefact size as bytes read."""
+        artefact = temp_dir / "host+NTUSER.DAT"
+        artefact.write_bytes(b"x" * 128)
+
+        @profile_handler
+        def process_sample(verbosity, vssimage, artefact):
+            return "done"
+
+        assert process_sample("", "'img'", str(artefact)) == "done"
+        stats = get_profiler().summary()["handlers"]["process_sample"]
+        assert stats["bytes_read"] >= 128
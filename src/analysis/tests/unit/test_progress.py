@@ -0,0 +1,65 @@
+"""
+Unit Tests for Structured Progress Events
+
+Tests elrond writes phase and artefact events with counts and byte totals
+to the progress file descriptor.
+"""
+
+import json
+import os
+
+import pytest
+
+from rivendell.progress import ProgressChannel
+
+
+@pytest.fixture
+def channel():
+    read_fd, write_fd = os.pipe()
+    yield ProgressChannel(write_fd), read_fd
+    os.close(write_fd)
+    os.close(read_fd)
+
+
+def _events(read_fd):
+    return [json.loads(line) for line in os.read(read_fd, 65536).decode().splitlines()]
+
+
+@pytest.mark.unit
+class TestProgressChannel:
+    """Test ProgressChannel."""
+
+    def test_events_carry_counts_and_bytes(self, temp_dir, channel):
+        """Test each expected artefact is counted once, by size, and unexpected ones are ignored."""
+        progress, read_fd = channel
+        (temp_dir / "$MFT").write_bytes(b"x" * 300)
+        (temp_dir / "SYSTEM").write_bytes(b"x" * 100)
+        (temp_dir / "._SYSTEM").write_bytes(b"x" * 50)
+        mft, system = str(temp_dir / "$MFT"), str(temp_dir / "SYSTEM")
+
+        progress.phase("processing")
+        progress.expect([mft, system, str(temp_dir / "._SYSTEM")])
+        progress.expect([mft])
+        progress.artefact_done(mft)
+        progress.artefact_done(mft)
+        progress.artefact_done(str(temp_dir / "carved.bin"))
+        progress.artefact_done(system)
+
+        events = _events(read_fd)
+        assert [event["event"] for event in events] == ["phase", "expect", "expect", "artefact", "artefact"]
+        assert all(event["phase"] == "processing" for event in events)
+        assert events[1]["total"] == events[2]["total"] == 2
+        assert events[2]["total_bytes"] == 400
+        assert (events[3]["done"], events[3]["done_bytes"], events[3]["artefact"]) == (1, 300, mft)
+        assert (events[4]["done"], events[4]["done_bytes"]) == (2, 400)
+
+    def test_disabled_without_descriptor(self):
+        """Test every call is a no-op without a file descriptor."""
+        progress = ProgressChannel()
+
+        progress.phase("processing")
+        progress.expect(["/nonexistent"])
+        progress.artefact_done("/nonexistent")
+
+        assert not progress.enabled
+
@@ -0,0 +1,103 @@
+"""
+Unit Tests for the Job Scheduler
+
+Tests resource estimation and admission planning for web analysis jobs.
+"""
+
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Loaded by path: `web.backend` here resolves to the copy under src/analysis/web
+SCHEDULER_PATH = Path(__file__).resolve().parents[3] / "web" / "backend" / "scheduler.py"
+_spec = importlib.util.spec_from_file_location("web_backend_scheduler", SCHEDULER_PATH)
+scheduler = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(scheduler)
+
+GB = 1024 * scheduler.MB
+CAPACITY = scheduler.HostCapacity(cpus=8, memory_mb=16 * 1024, disk_mb=500 * 1024)
+
+
+def _options(**flags):
+    return SimpleNamespace(**flags)
+
+
+def _request(cpus=1, memory_gb=2, images=None, priority=0):
+    return scheduler.ResourceRequest(
+        cpus=cpus, memory_mb=memory_gb * 1024, disk_mb=1024, images=images or {}, priority=priority
+    )
+
+
+@pytest.mark.unit
+class TestEstimateResources:
+    """Test estimate_resources."""
+
+    def test_memory_image_is_shared_and_held_in_ram(self):
+        """Test a memory image adds its size to RAM and may be shared."""
+        request = scheduler.estimate_resources([("/cases/HOST.mem", 4 * GB)], _options(memory=True), CAPACITY)
+
+        assert request.images == {"/cases/host.mem": scheduler.SHARED}
+        assert request.memory_mb == scheduler.BASE_MEMORY_MB + 4096
+        assert request.cpus == 2
+
+    def test_disk_image_is_exclusive(self):
+        """Test a disk image is mounted by one job at a time and .raw is only memory with --memory."""
+        request = scheduler.estimate_resources([("/cases/host.raw", 10 * GB)], _options(), CAPACITY)
+
+        assert request.images == {"/cases/host.raw": scheduler.EXCLUSIVE}
+        assert request.disk_mb == scheduler.BASE_DISK_MB + 2048
+
+    def test_request_is_clamped_to_host(self):
+        """Test a request larger than the host is clamped so it can still run alone."""
+        request = scheduler.estimate_resources([("/cases/huge.mem", 64 * GB)], _options(exhaustive=True), CAPACITY)
+
+        assert request.memory_mb == CAPACITY.memory_mb
+        assert request.disk_mb <= CAPACITY.disk_mb
+
+
+@pytest.mark.unit
+class TestPlanAdmission:
+    """Test plan_admission and stale_entries."""
+
+    def test_smaller_job_backfills(self):
+        """Test a job that fits starts ahead of a larger job that does not."""
+        queue = [("big", _request(cpus=8), 10.0), ("small", _request(cpus=2), 5.0)]
+        running = [_request(cpus=4)]
+
+        assert scheduler.plan_admission("small", queue, running, CAPACITY) == (True, "admitted with " + queue[1][1].describe())
+        assert not scheduler.plan_admission("big", queue, running, CAPACITY)[0]
+
+    def test_long_waiting_job_reserves_resources(self):
+        """Test a job waiting longer than reserve_after stops smaller jobs overtaking it."""
+        queue = [("big", _request(cpus=6), 1000.0), ("small", _request(cpus=2), 5.0)]
+        running = [_request(cpus=4)]
+
+        admit, reason = scheduler.plan_admission("small", queue, running, CAPACITY, reserve_after=900)
+
+        assert not admit
+        assert reason.startswith("waiting for 2 CPU")
+
+    def test_exclusive_image_waits(self):
+        """Test a disk image in use by a running job blocks the job, while shared images do not."""
+        held = {"/cases/host.e01": scheduler.EXCLUSIVE, "/cases/host.mem": scheduler.SHARED}
+        queue = [
+            ("disk", _request(images={"/cases/host.e01": scheduler.EXCLUSIVE}), 0.0),
+            ("mem", _request(images={"/cases/host.mem": scheduler.SHARED}), 0.0),
+        ]
+
+        assert scheduler.plan_admission("disk", queue, [_request(images=held)], CAPACITY) == (
+            False, "waiting for host.e01 (in use by another job)"
+        )
+        assert scheduler.plan_admission("mem", queue, [_request(images=held)], CAPACITY)[0]
+
+    def test_unknown_job_is_not_admitted(self):
+        """Test a job missing from the queue is not admitted."""
+        assert scheduler.plan_admission("gone", [], [], CAPACITY) == (False, "not queued")
+
+    def test_stale_entries(self):
+        """Test only entries whose heartbeat is older than the ttl are stale."""
+        seen = {"alive": 1000.0, "dead": 100.0, "edge": 700.0}
+
+        assert scheduler.stale_entries(seen, now=1000.0, ttl=300) == ["dead"]
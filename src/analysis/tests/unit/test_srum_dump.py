@@ -0,0 +1,131 @@
+"""
+Unit Tests for srum_dump
+
+Tests ESE column decoding, template value formatting and the streamed
+table writers the spreadsheet is built from.
+"""
+
+import hashlib
+import importlib.util
+import json
+import struct
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# pyesedb is only needed to open an ESE database, which none of these tests do
+openpyxl = pytest.importorskip("openpyxl")
+pytest.importorskip("Registry")
+
+# Loaded by path: tools/srum_dump is a script directory, not a package
+SRUM_DUMP_PATH = Path(__file__).resolve().parents[2] / "tools" / "srum_dump" / "srum_dump.py"
+_spec = importlib.util.spec_from_file_location("srum_dump", SRUM_DUMP_PATH)
+srum_dump = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(srum_dump)
+
+TYPES = srum_dump.column_types
+
+
+def _columns(*names_and_types):
+    return [
+        (name, srum_dump.column_converter(col_type), False, None, None, col_type) for name, col_type in names_and_types
+    ]
+
+
+@pytest.mark.unit
+class TestColumnConverter:
+    """Test column_converter."""
+
+    def test_values_are_decoded_by_column_type(self):
+        """Test integers, floats, GUIDs and UTF-16 text decode, and empty values get the type's default."""
+        guid = uuid.uuid4()
+
+        assert srum_dump.column_converter(TYPES.INTEGER_32BIT_SIGNED)(struct.pack("i", -42)) == -42
+        assert srum_dump.column_converter(TYPES.INTEGER_64BIT_SIGNED)(b"") == 0
+        assert srum_dump.column_converter(TYPES.DOUBLE_64BIT)(struct.pack("d", 1.5)) == 1.5
+        assert srum_dump.column_converter(TYPES.BOOLEAN)(b"\x01") is True
+        assert srum_dump.column_converter(TYPES.GUID)(guid.bytes) == str(guid)
+        assert srum_dump.column_converter(TYPES.BINARY_DATA)(b"\xde\xad") == "dead"
+        assert srum_dump.column_converter(TYPES.TEXT)("svchost.exe\x00".encode("utf-16-le")) == "svchost.exe"
+        assert srum_dump.column_converter(TYPES.NULL)(None) == "Empty"
+
+    def test_converter_is_looked_up_once_per_type(self):
+        """Test the converter for a column type is built once and reused."""
+        assert srum_dump.column_converter(TYPES.INTEGER_32BIT_UNSIGNED) is srum_dump.column_converter(
+            TYPES.INTEGER_32BIT_UNSIGNED
+        )
+
+
+@pytest.mark.unit
+class TestFormatValue:
+    """Test format_value."""
+
+    def test_template_formats(self, monkeypatch):
+        """Test timestamp, lookup, hash and base formats from the template."""
+        monkeypatch.setattr(srum_dump, "template_lookups", {"Known SIDS": {"S-1-5-18": "SYSTEM"}})
+        monkeypatch.setattr(srum_dump, "id_table", {7: "svchost.exe"})
+
+        assert srum_dump.format_value(None, "OLE") == "None"
+        assert srum_dump.format_value(datetime(2024, 3, 1, 10, 30), "OLE:%Y-%m-%d") == "2024-03-01"
+        assert srum_dump.format_value(116444736000000000, "FILE") == datetime(1970, 1, 1)
+        assert srum_dump.format_value(116444736000000000, "FILE:%Y") == "1970"
+        assert srum_dump.format_value("S-1-5-18", "lookup-Known SIDS") == "SYSTEM"
+        assert srum_dump.format_value("S-1-5-21", "lookup-Known SIDS") == "S-1-5-21"
+        assert srum_dump.format_value(7, "lookup_id") == "svchost.exe"
+        assert srum_dump.format_value(8, "lookup_id") == "No match in srum lookup table for 8"
+        assert srum_dump.format_value(1234, "sha256") == hashlib.sha256(b"1234").hexdigest()
+        assert srum_dump.format_value(255, "base16") == "0xff"
+        assert srum_dump.format_value("101", "base2") == 5
+
+
+@pytest.mark.unit
+class TestTableWriters:
+    """Test the JSONL and Parquet table writers and write_xlsx."""
+
+    def test_jsonl_round_trip(self, temp_dir):
+        """Test rows written in batches read back in order, with timestamps as ISO strings."""
+        columns = _columns(("AppId", TYPES.INTEGER_32BIT_SIGNED), ("TimeStamp", TYPES.DATE_TIME))
+        table_file = str(temp_dir / "Application.jsonl")
+        writer = srum_dump.JsonlTableWriter(table_file, columns)
+        writer.write_batch([[1, datetime(2024, 3, 1, 10, 0)], [2, "Empty"]])
+        writer.write_batch([[3, None]])
+        writer.close()
+
+        assert json.loads(Path(table_file).read_text().splitlines()[0]) == {
+            "AppId": 1,
+            "TimeStamp": "2024-03-01T10:00:00",
+        }
+        assert list(srum_dump.iter_output_rows(table_file, columns)) == [
+            [1, "2024-03-01T10:00:00"],
+            [2, "Empty"],
+            [3, None],
+        ]
+
+    def test_parquet_round_trip(self, temp_dir):
+        """Test untemplated integer columns keep their type and other values are written as text."""
+        pytest.importorskip("pyarrow")
+        columns = _columns(("AppId", TYPES.INTEGER_32BIT_SIGNED), ("TimeStamp", TYPES.DATE_TIME))
+        table_file = str(temp_dir / "Application.parquet")
+        writer = srum_dump.ParquetTableWriter(table_file, columns)
+        writer.write_batch([[1, datetime(2024, 3, 1, 10, 0)], [2, "Empty"]])
+        writer.close()
+
+        assert list(srum_dump.iter_output_rows(table_file, columns)) == [[1, "2024-03-01T10:00:00"], [2, "Empty"]]
+
+    def test_write_xlsx(self, temp_dir):
+        """Test the spreadsheet is built from the streamed tables with timestamps restored."""
+        columns = _columns(("AppId", TYPES.INTEGER_32BIT_SIGNED), ("TimeStamp", TYPES.DATE_TIME))
+        table_file = str(temp_dir / "Application.jsonl")
+        writer = srum_dump.JsonlTableWriter(table_file, columns)
+        writer.write_batch([[1, datetime(2024, 3, 1, 10, 0)]])
+        writer.close()
+
+        srum_dump.write_xlsx([("Application Resource Usage", table_file, columns)], str(temp_dir / "srum.xlsx"))
+
+        sheet = openpyxl.load_workbook(temp_dir / "srum.xlsx")["Application Resource Usage"]
+        assert [[cell.value for cell in row] for row in sheet.iter_rows()] == [
+            ["AppId", "TimeStamp"],
+            [1, datetime(2024, 3, 1, 10, 0)],
+        ]
@@ -0,0 +1,77 @@
+"""
+Unit Tests for elrond Startup
+
+Tests that starting elrond.py does not import the processing, post and
+MITRE modules until a phase calls into them.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from rivendell.lazy import lazy_callable, lazy_module
+
+ELROND_ROOT = Path(__file__).resolve().parents[2]
+
+# Runs `elrond.py --help` and reports its exit status and sys.modules on the last line of stdout
+START_ELROND = """
+import json, runpy, sys
+sys.argv = ["elrond.py", "--help"]
+try:
+    runpy.run_path("elrond.py", run_name="__main__")
+    status = 0
+except SystemExit as exit:
+    status = exit.code
+print()
+print(json.dumps({"status": status, "modules": sorted(sys.modules)}))
+"""
+
+DEFERRED_MODULES = (
+    "rivendell.core.core",
+    "rivendell.process.windows",
+    "rivendell.process.mac",
+    "rivendell.process.nix",
+    "rivendell.post.splunk.app.views.cyberchef",
+    "rivendell.post.mitre.attack_data",
+    "rivendell.post.elastic.ingest",
+    "rivendell.ai",
+    "pandas",
+    "langchain",
+)
+
+
+def _start_elrond():
+    result = subprocess.run(
+        [sys.executable, "-c", START_ELROND],
+        cwd=ELROND_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.mark.unit
+class TestStartup:
+    """Test deferred imports keep elrond.py startup cheap."""
+
+    def test_heavy_modules_are_deferred(self):
+        """Test elrond.py starts without importing handler, post, MITRE or AI modules."""
+        started = _start_elrond()
+
+        assert started["status"] == 0
+        assert "rivendell.main" in started["modules"]
+        assert [m for m in started["modules"] if m.startswith(DEFERRED_MODULES)] == []
+
+    def test_lazy_callable_and_module(self):
+        """Test deferred callables and modules resolve to the real objects on first use."""
+        dataset_name = lazy_callable("rivendell.core.mordor", "dataset_name")
+        colorsys = lazy_module("colorsys")
+
+        assert dataset_name.__name__ == "dataset_name"
+        assert dataset_name("/data/apt29_day1.tar.gz") == "apt29_day1"
+        assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
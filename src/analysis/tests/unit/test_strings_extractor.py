@@ -0,0 +1,125 @@
+"""
+Unit Tests for Memory Artefact Strings Extraction
+
+Tests ASCII and UTF-16LE strings are found with their offsets across chunk
+boundaries, in and out of process, and that keyword and IOC matching read
+them straight from the memory artefact in one pass.
+"""
+
+import os
+
+import pytest
+
+from rivendell.analysis.keywords import search_memory_keywords
+from rivendell.analysis.memory_strings import search_memory_strings
+from rivendell.process.extractions import strings
+from rivendell.process.extractions.strings import is_memory_artefact, iter_strings
+
+
+def _pagefile(temp_dir):
+    """Noise with strings placed on and around every 64-byte chunk boundary."""
+    placed = [
+        (3, "ascii", "cmd.exe /c whoami"),
+        (60, "ascii", "crosses-the-boundary"),
+        (127, "utf-16le", "C:\\Users\\frodo\\ring.txt"),
+        (200, "ascii", "93.184.216.34"),
+        (254, "utf-16le", "mordor"),
+        (400, "ascii", "cmd.exe /c whoami"),
+        (700, "ascii", "x" * 300),
+    ]
+    data = bytearray(os.urandom(1100))
+    for index, byte in enumerate(data):  # no accidental printable runs
+        if byte == 9 or 0x20 <= byte <= 0x7E:
+            data[index] = 0x01
+    for offset, encoding, text in placed:
+        encoded = text.encode(encoding)
+        data[offset : offset + len(encoded)] = encoded
+    data[50:52] = b"ab"  # shorter than the minimum length
+    path = temp_dir / "pagefile.sys"
+    path.write_bytes(bytes(data))
+    return path, placed
+
+
+@pytest.mark.unit
+class TestStringsExtraction:
+    """Test iter_strings and the memory artefact helpers."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_strings_across_chunks(self, temp_dir, workers):
+        """Test every string is found once, whole and in offset order, whatever the chunking."""
+        path, placed = _pagefile(temp_dir)
+
+        found = list(iter_strings(str(path), chunk_size=64, workers=workers))
+
+        assert found == placed
+        assert list(iter_strings(str(path), chunk_size=64, workers=workers, unique=True)) == [
+            each for each in placed if each[0] != 400
+        ]
+        assert [each[2] for each in iter_strings(str(path), encodings=("utf-16le",), min_length=7)] == [
+            "C:\\Users\\frodo\\ring.txt"
+        ]
+
+    def test_names_and_encodings(self, temp_dir):
+        """Test memory artefact name checks and unsupported encodings."""
+        path, _ = _pagefile(temp_dir)
+
+        assert is_memory_artefact("/mnt/elrond_mount/HIBERFIL.SYS")
+        assert not is_memory_artefact("/mnt/elrond_mount/pagefile.sys.strings")
+        with pytest.raises(ValueError):
+            list(iter_strings(str(path), encodings=("utf-32",)))
+
+
+@pytest.mark.unit
+class TestMemoryMatching:
+    """Test keyword and IOC matching against memory artefacts."""
+
+    def test_keywords_and_iocs_use_offsets(self, temp_dir):
+        """Test matches are reported at the byte offset of the string they were found in."""
+        path, _ = _pagefile(temp_dir)
+        (temp_dir / "keywords.txt").write_text("WHOAMI\nmordor\n\n")
+        (temp_dir / "HOST01" / "analysis").mkdir(parents=True)
+
+        search_memory_keywords(
+            "", str(temp_dir) + "/", "HOST01::Windows10", [str(temp_dir / "keywords.txt")], [str(path)], "HOST01", ""
+        )
+
+        rows = (temp_dir / "HOST01" / "analysis" / "keyword_matches.csv").read_text().splitlines()
+        assert [row.split(",")[3:] for row in rows[1:]] == [
+            ["WHOAMI", str(path), "3", "cmd.exe /c whoami"],
+            ["mordor", str(path), "254", "mordor"],
+            ["WHOAMI", str(path), "400", "cmd.exe /c whoami"],
+        ]
+
+    def test_keywords_and_iocs_share_one_scan(self, temp_dir, monkeypatch):
+        """Test keywords and IOCs are matched from a single scan and IOCs are written as they are found."""
+        path, _ = _pagefile(temp_dir)
+        (temp_dir / "keywords.txt").write_text("whoami\n")
+        scans = []
+
+        def counting_iter_strings(memory_file, *args, **kwargs):
+            scans.append(memory_file)
+            return iter_strings(memory_file, *args, **kwargs)
+
+        def no_lookup(*args, **kwargs):
+            raise OSError("no resolver")
+
+        monkeypatch.setattr("rivendell.analysis.memory_strings.iter_strings", counting_iter_strings)
+        monkeypatch.setattr("rivendell.analysis.iocs.subprocess.Popen", no_lookup)
+        search_memory_strings(
+            "",
+            str(temp_dir) + "/",
+            "HOST01::Windows10",
+            [str(path)],
+            "HOST01",
+            "",
+            keywords=[str(temp_dir / "keywords.txt")],
+            extract_iocs=True,
+        )
+
+        analysis = temp_dir / "HOST01" / "analysis"
+        iocs = [row.split(",") for row in (analysis / "iocs.csv").read_text().splitlines()]
+        assert scans == [str(path)]
+        assert len((analysis / "keyword_matches.csv").read_text().splitlines()) == 3
+        assert iocs[0][3:5] == ["Filename", "ioc"]
+        assert [row[3:7] for row in iocs[1:]] == [[str(path), "93.184.216.34", "IPv4 address", "200"]]
+        assert not hasattr(strings, "write_strings")
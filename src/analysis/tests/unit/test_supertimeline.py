@@ -0,0 +1,157 @@
+"""
+Unit Tests for Super-Timeline
+
+Tests building the partitioned super-timeline from cooked artefacts.
+"""
+
+import json
+
+import pytest
+
+from rivendell.process.supertimeline import (
+    build_super_timeline,
+    external_sort,
+    extract_timeline_events,
+    normalise_timestamp,
+    query_timeline,
+)
+from rivendell.utils import iter_json_records
+
+
+@pytest.mark.unit
+class TestNormaliseTimestamp:
+    """Test timestamp normalisation."""
+
+    def test_iso_with_offset(self):
+        """Test offsets are converted to UTC."""
+        assert normalise_timestamp("2024-03-01T10:00:00+02:00") == "2024-03-01T08:00:00.000000"
+
+    def test_space_separated_with_fraction(self):
+        """Test space-separated timestamps with fractional seconds."""
+        assert normalise_timestamp("2024-03-01 10:00:00.5Z") == "2024-03-01T10:00:00.500000"
+
+    def test_epoch_milliseconds(self):
+        """Test epoch milliseconds."""
+        assert normalise_timestamp(1709287200000) == "2024-03-01T10:00:00.000000"
+
+    def test_rejects_empty_and_zero(self):
+        """Test empty, zero and placeholder timestamps are dropped."""
+        assert normalise_timestamp("") is None
+        assert normalise_timestamp(0) is None
+        assert normalise_timestamp("1601-01-01T00:00:00Z") is None
+        assert normalise_timestamp("not a time") is None
+
+
+@pytest.mark.unit
+class TestSuperTimeline:
+    """Test event extraction, sorting and range queries."""
+
+    def test_extract_macb_events(self):
+        """Test one event per timestamp field."""
+        record = {
+            "full_path": "C:/Windows/evil.exe",
+            "created": "2024-01-01T00:00:00Z",
+            "modified": "2024-01-02T00:00:00Z",
+            "size": 10,
+        }
+        events = list(extract_timeline_events(record, "host", "journal_mft.json"))
+
+        assert [e["timestamp_desc"] for e in events] == ["Created", "Modified"]
+        assert all(e["message"] == "C:/Windows/evil.exe" for e in events)
+
+    def test_external_sort_spills_runs(self, temp_dir):
+        """Test sorting across several spilled runs."""
+        events = [{"LastWriteTime": "2024-01-01T00:00:{:02d}.000000".format(s)} for s in (5, 3, 9, 1, 7, 2)]
+
+        result = [e["LastWriteTime"] for e in external_sort(iter(events), str(temp_dir), run_size=2)]
+
+        assert result == sorted(result)
+        assert len(list(temp_dir.glob("run_*.jsonl"))) == 3
+
+    def test_build_and_query(self, temp_dir):
+        """Test building from JSON array and JSONL artefacts and querying a range."""
+        cooked = temp_dir / "cooked"
+        (cooked / "evt").mkdir(parents=True)
+        (cooked / "evt" / "Security.json").write_text(
+            "\n".join(
+                json.dumps({"timestamp": "2024-01-0{}T12:00:00Z".format(day), "message": "logon"})
+                for day in (3, 1, 2)
+            )
+        )
+        (cooked / "prefetch.json").write_text(
+            json.dumps([{"filename": "CMD.EXE", "last_run_time": "2024-01-02T06:00:00Z"}])
+        )
+        timeline = temp_dir / "timeline"
+
+        total = build_super_timeline(str(cooked), str(timeline), "host", run_size=2, chunk_size=1)
+        events = list(query_timeline(str(timeline), "2024-01-02T00:00:00Z", "2024-01-02T23:59:59Z"))
+
+        assert total == 4
+        assert [e["message"] for e in events] == ["CMD.EXE", "logon"]
+        assert len(list(timeline.glob("chunk_20240102_*.jsonl"))) == 2
+
+
+@pytest.mark.unit
+class TestIterJsonRecords:
+    """Test incremental JSON record decoding."""
+
+    def test_array_across_chunks(self, temp_dir):
+        """Test decoding an array when records straddle read chunks."""
+        path = temp_dir / "records.json"
+        records = [{"id": i, "text": "x" * 50} for i in range(20)]
+        path.write_text(json.dumps(records, indent=2))
+
+        assert list(iter_json_records(str(path), chunk_size=16)) == records
+
+    @pytest.mark.parametrize("indent", [None, 2])
+    @pytest.mark.parametrize("layout", ["array", "lines"])
+    def test_values_split_at_every_chunk_boundary(self, temp_dir, caplog, indent, layout):
+        """Test literals, numbers and \\u escapes cut by a chunk boundary are read whole, not skipped."""
+        path = temp_dir / "records.json"
+        records = [
+            {"id": i, "ok": True, "gone": None, "off": False, "ratio": 1.25e3 + i, "name": "caf\u00e9 \U0001f600"}
+            for i in range(12)
+        ]
+        if layout == "array":
+            text = json.dumps(records, indent=indent)
+        else:
+            text = "\n".join(json.dumps(record) for record in records)
+        path.write_text(text, encoding="utf-8")
+
+        for chunk_size in range(1, 40):
+            assert list(iter_json_records(str(path), chunk_size=chunk_size, strict=True)) == records
+        assert "Skipped" not in caplog.text
+
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_corrupt_record_is_skipped(self, temp_dir, caplog, indent):
+        """Test decoding resumes at the next record after a corrupt one and the skip is logged."""
+        path = temp_dir / "records.json"
+        records = [{"id": i, "nested": [{"a": i}], "text": "x" * 40} for i in range(6)]
+        text = json.dumps(records, indent=indent)
+        path.write_text(text.replace('"id": 2', '"id": 2,,', 1))
+
+        decoded = list(iter_json_records(str(path), chunk_size=32))
+
+        assert decoded == records[:2] + records[3:]
+        assert "Skipped 1 undecodable JSON record" in caplog.text
+        with pytest.raises(ValueError):
+            list(iter_json_records(str(path), chunk_size=32, strict=True))
+
+    def test_corrupt_json_lines(self, temp_dir):
+        """Test a truncated JSON line does not lose the lines after it."""
+        path = temp_dir / "records.jsonl"
+        path.write_text('{"id": 0}\n{"id": 1, "text": "cut\n{"id": 2}\n{"id": 3')
+
+        assert list(iter_json_records(str(path), chunk_size=8)) == [{"id": 0}, {"id": 2}]
+
+    @pytest.mark.parametrize("chunk_size", [8, 16, 32, 64])
+    def test_resync_keeps_indented_records(self, temp_dir, chunk_size):
+        """Test the records after a corrupt indented one survive however the buffer has been rebased."""
+        path = temp_dir / "records.json"
+        records = [{"id": i, "nested": {"a": [i, i]}, "text": "y" * 30} for i in range(200)]
+        text = json.dumps(records, indent=2)
+        path.write_text(text.replace('"id": 5,', '"id": 5,,', 1))
+
+        decoded = list(iter_json_records(str(path), chunk_size=chunk_size))
+
+        assert decoded == records[:5] + records[6:]
@@ -0,0 +1,95 @@
+"""
+Unit Tests for Persistent Tool Workers
+
+Tests the exiftool stay_open protocol, entropy worker, pool limits and
+queued requests.
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+from rivendell.workers import ExiftoolWorker, ToolWorkerPool, file_density
+
+# Minimal stand-in speaking exiftool's -stay_open protocol on stdin/stdout
+FAKE_EXIFTOOL = """#!{python}
+import sys
+for line in sys.stdin.buffer:
+    line = line.rstrip(b"\\n")
+    if line == b"-execute":
+        sys.stdout.buffer.write(b"{{ready}}\\n")
+        sys.stdout.flush()
+    elif line == b"False":
+        break
+    elif not line.startswith(b"-"):
+        sys.stdout.buffer.write(b"File Name                       : " + line + b"\\n")
+"""
+
+
+@pytest.mark.unit
+class TestToolWorkers:
+    """Test persistent workers and the worker pool."""
+
+    def test_exiftool_worker_reuses_process(self, temp_dir):
+        """Test several requests are answered by one stay_open process."""
+        executable = temp_dir / "exiftool"
+        executable.write_text(FAKE_EXIFTOOL.format(python=sys.executable))
+        executable.chmod(0o755)
+        worker = ExiftoolWorker(str(executable))
+
+        first = worker.run("/evidence/a.docx", timeout=10)
+        pid = worker.process.pid
+        second = worker.run("/evidence/b.pdf", timeout=10)
+        undecodable = worker.run(os.fsdecode(b"/evidence/caf\xe9.doc"), timeout=10)
+        worker.close()
+
+        assert first == b"File Name                       : /evidence/a.docx\n"
+        assert second.endswith(b"/evidence/b.pdf\n")
+        assert undecodable.endswith(b"/evidence/caf\xe9.doc\n")
+        assert pid is not None and worker.process is None
+
+    def test_density_separates_random_from_text(self, temp_dir):
+        """Test uniformly distributed bytes score lower than plain text."""
+        uniform = temp_dir / "packed.bin"
+        uniform.write_bytes(bytes(range(256)) * 64)
+        text = temp_dir / "notes.txt"
+        text.write_text("the quick brown fox\n" * 500)
+
+        assert file_density(str(uniform)) == 0.0
+        assert file_density(str(text)) > 1.5
+
+    def test_pool_limits_workers_and_records_latency(self, temp_dir):
+        """Test concurrent requests never start more workers than the tool's limit."""
+        sample = temp_dir / "sample.bin"
+        sample.write_bytes(b"\x00\x01" * 1024)
+        pool = ToolWorkerPool(limits={"entropy": 2})
+
+        threads = [
+            threading.Thread(target=pool.request, args=("entropy", str(sample))) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = pool.stats()["entropy"]
+        assert stats["requests"] == 8
+        assert stats["workers"] <= 2
+        assert stats["errors"] == 0
+
+    def test_submitted_requests_run_on_pool_threads(self, temp_dir):
+        """Test queued requests return futures with their results and errors, and shutdown stops the threads."""
+        sample = temp_dir / "sample.bin"
+        sample.write_bytes(bytes(range(256)) * 16)
+        pool = ToolWorkerPool(limits={"entropy": 2})
+
+        futures = [pool.submit("entropy", str(sample)) for _ in range(6)]
+        missing = pool.submit("entropy", str(temp_dir / "missing.bin"))
+
+        assert [future.result(timeout=10) for future in futures] == ["0.00000"] * 6
+        assert isinstance(missing.exception(timeout=10), FileNotFoundError)
+        assert pool.stats()["entropy"]["errors"] == 1
+        pool.shutdown()
+        assert pool._executor is None
@@ -0,0 +1,91 @@
+"""
+Unit Tests for YARA Scanning
+
+Tests the combined ruleset, compiled-rule cache and content-hash deduplication.
+"""
+
+import os
+
+import pytest
+
+yara = pytest.importorskip("yara")
+
+from rivendell.post import yara as yara_scan
+
+
+@pytest.fixture
+def rules(temp_dir, monkeypatch):
+    monkeypatch.setattr(yara_scan, "YARA_CACHE_DIR", str(temp_dir / "cache"))
+    monkeypatch.setattr(yara_scan, "_rulesets", {})
+    monkeypatch.setattr(yara_scan, "_scanned", {})
+    monkeypatch.setattr(yara_scan, "_run_cache_dir", None)
+    rule_dir = temp_dir / "rules"
+    rule_dir.mkdir()
+    (rule_dir / "mimikatz.yar").write_text(
+        'rule mimikatz { strings: $a = "sekurlsa::logonpasswords" condition: $a }'
+    )
+    (rule_dir / "webshell.yar").write_text(
+        'rule webshell { strings: $b = "eval($_POST" condition: $b }'
+    )
+    (rule_dir / "broken.yar").write_text("rule broken { condition: }")
+    return sorted(str(path) for path in rule_dir.iterdir())
+
+
+@pytest.fixture
+def target(temp_dir):
+    target = temp_dir / "mnt"
+    (target / "tools").mkdir(parents=True)
+    (target / "tools" / "m.exe").write_bytes(b"MZ\x00sekurlsa::logonpasswords\x00")
+    (target / "tools" / "copy_of_m.exe").write_bytes(b"MZ\x00sekurlsa::logonpasswords\x00")
+    (target / "tools" / "clean.txt").write_text("nothing to see")
+    return str(target)
+
+
+@pytest.mark.unit
+class TestYaraScan:
+    """Test the compiled-once YARA engine."""
+
+    def test_scan_writes_matches_once_per_file(self, rules, target, temp_dir):
+        """Test each file is matched against all rule files and invalid rule files are skipped."""
+        output_directory = str(temp_dir / "case") + "/"
+
+        found = yara_scan.scan_with_ruleset("", output_directory, "host.E01::windows", rules, target)
+
+        with open(output_directory + "host.E01/analysis/yara.csv") as csv_file:
+            rows = csv_file.read().splitlines()[1:]
+        assert found == 2
+        assert sorted(row.split(",")[2] for row in rows) == ["copy_of_m.exe", "m.exe"]
+        assert all(row.startswith("mimikatz,") and row.endswith("sekurlsa::logonpasswords") for row in rows)
+        # duplicate content is only matched once
+        assert len(yara_scan._scanned) == 2
+
+    def test_compiled_ruleset_is_cached(self, rules, temp_dir, monkeypatch):
+        """Test a second run loads the compiled ruleset instead of recompiling."""
+        digest, _, namespaces = yara_scan.compile_ruleset(rules)
+        monkeypatch.setattr(yara_scan, "_rulesets", {})
+        monkeypatch.setattr(yara_scan, "validate_yara", lambda _: pytest.fail("recompiled"))
+
+        cached_digest, cached_rules, cached_namespaces = yara_scan.compile_ruleset(rules)
+
+        assert cached_digest == digest
+        assert cached_namespaces == namespaces
+        assert sorted(namespaces.values()) == [rules[1], rules[2]]
+        assert (temp_dir / "cache" / (digest + ".yarc")).exists()
+
+    def test_cache_not_private_to_this_user_is_not_loaded(self, rules, temp_dir, monkeypatch):
+        """Test a group/world-writable compiled ruleset or cache directory is never passed to yara.load."""
+        digest, _, _ = yara_scan.compile_ruleset(rules)
+        compiled = temp_dir / "cache" / (digest + ".yarc")
+        os.chmod(str(compiled), 0o666)
+        monkeypatch.setattr(yara_scan, "_rulesets", {})
+        monkeypatch.setattr(yara_scan.yara, "load", lambda *_: pytest.fail("loaded untrusted ruleset"))
+
+        assert yara_scan.compile_ruleset(rules)[1] is not None
+        assert oct(compiled.stat().st_mode & 0o777) == oct(0o600)
+
+        os.chmod(str(temp_dir / "cache"), 0o777)
+        monkeypatch.setattr(yara_scan, "_rulesets", {})
+
+        assert yara_scan.compile_ruleset(rules)[1] is not None
+        assert yara_scan._run_cache_dir is not None
+        assert os.path.exists(os.path.join(yara_scan._run_cache_dir, digest + ".yarc"))
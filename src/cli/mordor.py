@@ -108,7 +108,7 @@ def cmd_list(args):
 def cmd_download(args):
     """Download a specific dataset."""
     catalog = MordorCatalog()
-    downloader = MordorDownloader(catalog)
+    downloader = MordorDownloader(catalog, max_workers=args.workers)
     storage = MordorStorage(args.output)
 
     # Check if already downloaded
@@ -419,6 +419,13 @@ For more information, visit: https://github.com/OTRF/Security-Datasets
         action="store_true",
         help="Force re-download if already exists",
     )
+    dl_parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=4,
+        help="Concurrent connections for files and range segments (default: 4)",
+    )
 
     # info command
     info_parser = subparsers.add_parser("info", help="Show dataset details")
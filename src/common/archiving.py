@@ -10,13 +10,15 @@ Replaces:
 """
 
 import os
+import shutil
 import tarfile
+import tempfile
 import zipfile
 from pathlib import Path
-from typing import Optional, Literal
+from typing import BinaryIO, Optional, Literal, Union
 from datetime import datetime
 
-from .crypto import encrypt_archive_with_key, encrypt_archive_with_password
+from .crypto import CryptoManager, DEFAULT_SALT, is_segmented_stream
 from .file_ops import calculate_directory_size, format_size
 
 
@@ -77,9 +79,12 @@ def create_archive(
 
 
 def _create_zip(
-    source_path: Path, output_file: Path, compression_level: int, handle_old_timestamps: bool
+    source_path: Path,
+    output_file: Union[Path, BinaryIO],
+    compression_level: int,
+    handle_old_timestamps: bool,
 ):
-    """Create ZIP archive."""
+    """Create ZIP archive (output_file may be an unseekable stream)."""
     compression = zipfile.ZIP_DEFLATED
 
     with zipfile.ZipFile(
@@ -98,30 +103,54 @@ def _create_zip(
                         handle_old_timestamps
                         and "ZIP does not support timestamps before 1980" in str(e)
                     ):
-                        # Read file and write with current timestamp
-                        with open(file_path, "rb") as f:
-                            data = f.read()
-                        zipf.writestr(str(arc_name), data)
+                        # Re-add with the current timestamp, streaming the file contents
+                        info = zipfile.ZipInfo(str(arc_name))
+                        info.compress_type = compression
+                        with open(file_path, "rb") as f, zipf.open(info, "w") as member:
+                            while True:
+                                chunk = f.read(1024 * 1024)
+                                if not chunk:
+                                    break
+                                member.write(chunk)
                     else:
                         raise
 
 
-def _create_tar(source_path: Path, output_file: Path, format: str, compression_level: int):
-    """Create TAR archive."""
+def _create_tar(
+    source_path: Path, output_file: Union[Path, BinaryIO], format: str, compression_level: int
+):
+    """Create TAR archive (output_file may be an unseekable stream)."""
     # Determine compression mode
     if format == "tar":
-        mode = "w"
+        compression = ""
     elif format == "tar.gz":
-        mode = "w:gz"
+        compression = "gz"
     elif format == "tar.bz2":
-        mode = "w:bz2"
+        compression = "bz2"
     elif format == "tar.xz":
-        mode = "w:xz"
+        compression = "xz"
     else:
         raise ValueError(f"Unsupported tar format: {format}")
 
-    with tarfile.open(output_file, mode) as tar:
-        tar.add(source_path, arcname=source_path.name)
+    if isinstance(output_file, Path):
+        with tarfile.open(output_file, f"w:{compression}") as tar:
+            tar.add(source_path, arcname=source_path.name)
+    else:
+        # Stream mode: compressed blocks are written straight through to the stream
+        with tarfile.open(fileobj=output_file, mode=f"w|{compression}") as tar:
+            tar.add(source_path, arcname=source_path.name)
+
+
+def _write_archive(
+    source_path: Path, output: BinaryIO, format: ArchiveFormat, compression_level: int = 6
+):
+    """Write an archive of source_path to a (possibly unseekable) binary stream."""
+    if format == "zip":
+        _create_zip(source_path, output, compression_level, handle_old_timestamps=True)
+    elif format.startswith("tar"):
+        _create_tar(source_path, output, format, compression_level)
+    else:
+        raise ValueError(f"Unsupported archive format: {format}")
 
 
 def create_evidence_archive(
@@ -136,7 +165,10 @@ def create_evidence_archive(
     """
     Create forensic evidence archive with optional encryption.
 
-    High-level function that combines archiving and encryption.
+    High-level function that combines archiving and encryption. Encrypted
+    archives are built in one pass (archive -> compress -> encrypt) straight
+    into the .enc file, so no plaintext archive touches the disk and memory
+    use is independent of the evidence size.
 
     Args:
         source_dir: Directory containing evidence
@@ -169,6 +201,9 @@ def create_evidence_archive(
     """
     source_path = Path(source_dir)
 
+    if not source_path.exists():
+        raise FileNotFoundError(f"Source directory not found: {source_dir}")
+
     # Determine output directory
     if output_dir is None:
         output_dir = str(source_path.parent)
@@ -177,60 +212,94 @@ def create_evidence_archive(
     archive_name = f"{hostname}.{format}"
     archive_path = str(Path(output_dir) / archive_name)
 
-    # Create archive
-    archive_path = create_archive(source_dir, archive_path, format)
-
-    result = {
-        "archive_path": archive_path,
-        "encrypted": False,
-        "size": Path(archive_path).stat().st_size,
-    }
+    if encryption == "none":
+        archive_path = create_archive(source_dir, archive_path, format)
+        size = Path(archive_path).stat().st_size
+        return {
+            "archive_path": archive_path,
+            "encrypted": False,
+            "size": size,
+            "size_formatted": format_size(size),
+        }
 
-    # Apply encryption if requested
+    crypto = CryptoManager()
+    result = {"encrypted": True, "encryption_method": encryption}
     if encryption == "key":
         if key_path is None:
             key_path = str(Path(output_dir) / "shadowfax.key")
-
-        encrypted_path, key_file = encrypt_archive_with_key(archive_path, key_path)
-
-        # Remove unencrypted archive
-        Path(archive_path).unlink()
-
-        result["archive_path"] = encrypted_path
-        result["encrypted"] = True
-        result["encryption_method"] = "key"
-        result["key_path"] = key_file
-
+        crypto.generate_key()
+        crypto.save_key(key_path)
+        result["key_path"] = key_path
     elif encryption == "password":
         if password is None:
             raise ValueError("Password required for password encryption")
+        crypto.derive_key_from_password(password, DEFAULT_SALT)
+    else:
+        raise ValueError(f"Unsupported encryption method: {encryption}")
 
-        encrypted_path = encrypt_archive_with_password(archive_path, password)
+    # tar/zip -> compress -> encrypt in one pass; no plaintext archive is written
+    encrypted_path = archive_path + ".enc"
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    try:
+        with open(encrypted_path, "wb") as f:
+            with crypto.open_encrypted_writer(f) as writer:
+                _write_archive(source_path, writer, format)
+    except BaseException:
+        Path(encrypted_path).unlink(missing_ok=True)
+        raise
+
+    result["archive_path"] = encrypted_path
+    result["size"] = Path(encrypted_path).stat().st_size
+    result["size_formatted"] = format_size(result["size"])
 
-        # Remove unencrypted archive
-        Path(archive_path).unlink()
+    return result
 
-        result["archive_path"] = encrypted_path
-        result["encrypted"] = True
-        result["encryption_method"] = "password"
 
-    # Add formatted size
-    result["size"] = Path(result["archive_path"]).stat().st_size
-    result["size_formatted"] = format_size(result["size"])
+def _extract_tar(tar: tarfile.TarFile, output_path: Path):
+    """Extract every member, refusing absolute paths, links out of output_path and special files."""
+    if hasattr(tarfile, "data_filter"):
+        tar.extractall(output_path, filter="data")
+    else:  # Python without extraction filters (before 3.8.17/3.11.4)
+        tar.extractall(output_path)
 
-    return result
+
+def _move_into(source: Path, destination: Path):
+    """Move the contents of source into destination (merging directories), then remove source."""
+    if not destination.exists():
+        os.replace(source, destination)
+        return
+    for entry in os.listdir(source):
+        target = destination / entry
+        if target.is_dir() and not target.is_symlink() and (source / entry).is_dir():
+            _move_into(source / entry, target)
+        else:
+            os.replace(source / entry, target)
+    os.rmdir(source)
 
 
 def extract_archive(
-    archive_path: str, output_dir: Optional[str] = None, format: Optional[ArchiveFormat] = None
+    archive_path: str,
+    output_dir: Optional[str] = None,
+    format: Optional[ArchiveFormat] = None,
+    key: Optional[bytes] = None,
+    password: Optional[str] = None,
 ) -> str:
     """
     Extract archive to directory.
 
+    Encrypted archives (.enc) are decrypted with key or password. Encrypted
+    tar archives are decrypted and extracted in one streaming pass into a
+    staging directory that is moved into place only once the whole stream
+    has authenticated; zip archives need random access, so they are first
+    decrypted to disk (still in constant memory) and the plaintext removed
+    after extraction.
+
     Args:
         archive_path: Path to archive file
         output_dir: Output directory (auto-generated if None)
         format: Archive format (auto-detected if None)
+        key: Decryption key (for .enc archives encrypted with a key file)
+        password: Decryption password (for .enc archives encrypted with a password)
 
     Returns:
         Path to extraction directory
@@ -245,17 +314,20 @@ def extract_archive(
     if not archive_file.exists():
         raise FileNotFoundError(f"Archive not found: {archive_path}")
 
+    encrypted = archive_path.endswith(".enc")
+    archive_name = archive_path[:-4] if encrypted else archive_path
+
     # Auto-detect format if not specified
     if format is None:
-        if archive_path.endswith(".tar.gz") or archive_path.endswith(".tgz"):
+        if archive_name.endswith(".tar.gz") or archive_name.endswith(".tgz"):
             format = "tar.gz"
-        elif archive_path.endswith(".tar.bz2"):
+        elif archive_name.endswith(".tar.bz2"):
             format = "tar.bz2"
-        elif archive_path.endswith(".tar.xz"):
+        elif archive_name.endswith(".tar.xz"):
             format = "tar.xz"
-        elif archive_path.endswith(".tar"):
+        elif archive_name.endswith(".tar"):
             format = "tar"
-        elif archive_path.endswith(".zip"):
+        elif archive_name.endswith(".zip"):
             format = "zip"
         else:
             raise ValueError(f"Cannot detect archive format: {archive_path}")
@@ -263,14 +335,45 @@ def extract_archive(
     # Auto-generate output directory
     if output_dir is None:
         # Remove all archive extensions
-        output_dir = str(archive_file)
+        output_dir = archive_name
         for ext in [".tar.gz", ".tar.bz2", ".tar.xz", ".tar", ".zip", ".tgz"]:
             if output_dir.endswith(ext):
                 output_dir = output_dir[: -len(ext)]
                 break
 
     output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if encrypted:
+        crypto = CryptoManager()
+        if key is not None:
+            crypto.set_key(key)
+        elif password is not None:
+            crypto.derive_key_from_password(password, DEFAULT_SALT)
+        else:
+            raise ValueError("Key or password required to extract an encrypted archive")
+
+        if format.startswith("tar") and is_segmented_stream(archive_path):
+            # Members are written before later segments are authenticated, so nothing
+            # reaches output_path unless the stream verifies to the end
+            staging = Path(tempfile.mkdtemp(prefix=f".{output_path.name}.", dir=output_path.parent))
+            try:
+                with open(archive_file, "rb") as f:
+                    with tarfile.open(fileobj=crypto.open_decrypted_reader(f), mode="r|*") as tar:
+                        _extract_tar(tar, staging)
+                _move_into(staging, output_path)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            return str(output_path)
+
+        decrypted_path = crypto.decrypt_file(archive_path, str(output_path) + "." + format)
+        try:
+            return extract_archive(decrypted_path, str(output_path), format)
+        finally:
+            Path(decrypted_path).unlink(missing_ok=True)
+
+    output_path.mkdir(exist_ok=True)
 
     # Extract based on format
     if format == "zip":
@@ -279,7 +382,7 @@ def extract_archive(
     elif format.startswith("tar"):
         mode = "r" if format == "tar" else f'r:{format.split(".")[-1]}'
         with tarfile.open(archive_file, mode) as tar:
-            tar.extractall(output_path)
+            _extract_tar(tar, output_path)
     else:
         raise ValueError(f"Unsupported archive format: {format}")
 
@@ -8,15 +8,36 @@ Replaces:
 - acquisition/python/gandalf.py: generate_filekey(), generate_cipher()
 - acquisition/python/collect_artefacts-py: encrypt_archive()
 - acquisition/bash/gandalf.sh: encrypt_archive() (OpenSSL-based)
+
+Files are encrypted in a segmented AES-256-GCM stream format so archives of
+any size are encrypted and decrypted in constant memory:
+
+    header:   b"RVSEG" | version (1) | segment size (4, big-endian) | salt (16)
+    segments: AES-GCM(plaintext segment) + 16-byte tag, one after another
+
+Every segment except the last holds exactly `segment size` bytes of
+plaintext. The segment key is derived from the Fernet key (or password-
+derived key) with HKDF-SHA256 over the per-file salt. Nonces are the
+segment index plus a final-segment flag and the header is authenticated
+with every segment, so reordering, truncation and header tampering all
+fail to decrypt. Whole-file Fernet tokens written by earlier versions are
+still decrypted by decrypt_file().
 """
 
+import io
 import os
 import base64
+import shutil
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import BinaryIO, Callable, Iterable, Iterator, Tuple, Optional
 
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 
@@ -24,18 +45,220 @@ from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 DEFAULT_SALT = b"isengard.pork"  # Default salt for password-based encryption
 DEFAULT_ITERATIONS = 480000  # PBKDF2 iterations (OWASP recommended 2023)
 
+# Segmented stream format
+STREAM_MAGIC = b"RVSEG"
+STREAM_VERSION = 1
+STREAM_HEADER = struct.Struct(">5sBI16s")
+DEFAULT_SEGMENT_SIZE = 4 * 1024 * 1024  # 4MB plaintext per segment
+MAX_SEGMENT_SIZE = 64 * 1024 * 1024  # largest segment size a reader will allocate for
+TAG_SIZE = 16
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _stream_key(key: bytes, salt: bytes) -> AESGCM:
+    """AES-256-GCM cipher for one file, derived from a Fernet key and the file's salt."""
+    try:
+        key_material = base64.urlsafe_b64decode(key)
+    except (TypeError, ValueError):
+        raise ValueError("Encryption key must be a 32-byte URL-safe base64-encoded key")
+    if len(key_material) != 32:
+        raise ValueError("Encryption key must be a 32-byte URL-safe base64-encoded key")
+    derived = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        info=b"rivendell segmented archive",
+    ).derive(key_material)
+    return AESGCM(derived)
+
+
+def _nonce(index: int, final: bool) -> bytes:
+    return index.to_bytes(11, "big") + (b"\x01" if final else b"\x00")
+
+
+def _ordered_map(func: Callable, items: Iterable, workers: int) -> Iterator:
+    """
+    Apply func to items, yielding results in order.
+
+    With more than one worker, up to 2 x workers items are in flight on a
+    thread pool, so memory stays bounded while segments are processed in
+    parallel.
+    """
+    if workers <= 1:
+        for item in items:
+            yield func(*item)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, *item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def default_workers() -> int:
+    """Segment workers to use by default: one per core, up to 4."""
+    return min(4, os.cpu_count() or 1)
+
+
+def is_segmented_stream(path: str) -> bool:
+    """True if the file at path is in the segmented stream format (rather than a Fernet token)."""
+    with open(path, "rb") as f:
+        return f.read(len(STREAM_MAGIC)) == STREAM_MAGIC
+
+
+class SegmentedEncryptionWriter(io.RawIOBase):
+    """
+    Writable stream that encrypts everything written to it into fileobj.
+
+    Plaintext is buffered up to one segment; full segments are encrypted
+    (on a thread pool when workers > 1) and written in order. close()
+    writes the final segment; it does not close fileobj. Leaving a with
+    block on an exception closes without the final segment, so a stream cut
+    short by an error fails authentication rather than reading as complete.
+
+    Example:
+        >>> with open("/tmp/evidence.tar.gz.enc", "wb") as out:
+        ...     with SegmentedEncryptionWriter(out, key) as writer:
+        ...         with tarfile.open(fileobj=writer, mode="w|gz") as tar:
+        ...             tar.add("/tmp/evidence")
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        key: bytes,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        workers: int = 1,
+    ):
+        super().__init__()
+        self._fileobj = fileobj
+        self._segment_size = segment_size
+        self._workers = max(1, workers)
+        salt = os.urandom(16)
+        self._header = STREAM_HEADER.pack(STREAM_MAGIC, STREAM_VERSION, segment_size, salt)
+        self._cipher = _stream_key(key, salt)
+        self._buffer = bytearray()
+        self._index = 0
+        self._batch = []
+        self._fileobj.write(self._header)
+
+    def writable(self) -> bool:
+        return True
+
+    def _encrypt(self, index: int, plaintext: bytes, final: bool) -> bytes:
+        return self._cipher.encrypt(_nonce(index, final), plaintext, self._header)
+
+    def _queue(self, plaintext: bytes, final: bool):
+        self._batch.append((self._index, plaintext, final))
+        self._index += 1
+        if final or len(self._batch) >= self._workers * 2:
+            for ciphertext in _ordered_map(self._encrypt, self._batch, self._workers):
+                self._fileobj.write(ciphertext)
+            self._batch = []
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed file")
+        self._buffer += data
+        # Keep at least one byte back so the final segment is never empty unless the input is
+        while len(self._buffer) > self._segment_size:
+            self._queue(bytes(self._buffer[: self._segment_size]), False)
+            del self._buffer[: self._segment_size]
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._queue(bytes(self._buffer), True)
+            self._buffer = bytearray()
+            self._fileobj.flush()
+        super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and not self.closed:
+            self._buffer = bytearray()
+            self._batch = []
+            super().close()
+            return None
+        return super().__exit__(exc_type, exc_value, traceback)
+
+
+class SegmentedDecryptionReader(io.RawIOBase):
+    """
+    Readable stream of the plaintext of a segmented stream read from fileobj.
+
+    Segments are authenticated as they are read; a tampered, reordered or
+    truncated stream raises cryptography.exceptions.InvalidTag. Wrap in
+    io.BufferedReader (CryptoManager.open_decrypted_reader does) for
+    efficient small reads.
+    """
+
+    def __init__(self, fileobj: BinaryIO, key: bytes, workers: int = 1):
+        super().__init__()
+        self._fileobj = fileobj
+        self._header = fileobj.read(STREAM_HEADER.size)
+        if len(self._header) != STREAM_HEADER.size:
+            raise ValueError("Not a segmented encrypted stream (header too short)")
+        magic, version, segment_size, salt = STREAM_HEADER.unpack(self._header)
+        if magic != STREAM_MAGIC:
+            raise ValueError("Not a segmented encrypted stream")
+        if version != STREAM_VERSION:
+            raise ValueError(f"Unsupported segmented stream version: {version}")
+        # The header is only authenticated once a segment has been read, so bound it before allocating one
+        if not 0 < segment_size <= MAX_SEGMENT_SIZE:
+            raise ValueError(f"Invalid segment size in segmented stream header: {segment_size}")
+        self._segment_size = segment_size
+        self._cipher = _stream_key(key, salt)
+        self._segments = _ordered_map(self._decrypt, self._read_segments(), max(1, workers))
+        self._current = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def _read_segments(self) -> Iterator[Tuple[int, bytes, bool]]:
+        size = self._segment_size + TAG_SIZE
+        index = 0
+        segment = self._fileobj.read(size)
+        while True:
+            following = self._fileobj.read(size) if len(segment) == size else b""
+            final = not following
+            yield index, segment, final
+            if final:
+                return
+            segment = following
+            index += 1
+
+    def _decrypt(self, index: int, segment: bytes, final: bool) -> bytes:
+        return self._cipher.decrypt(_nonce(index, final), segment, self._header)
+
+    def readinto(self, buffer) -> int:
+        while not self._current:
+            plaintext = next(self._segments, None)
+            if plaintext is None:
+                return 0
+            self._current = memoryview(plaintext)
+        count = min(len(buffer), len(self._current))
+        buffer[:count] = self._current[:count]
+        self._current = self._current[count:]
+        return count
+
 
 class CryptoManager:
     """
     Unified cryptography manager for forensic evidence encryption.
 
-    Supports both key-based and password-based encryption using Fernet
-    (symmetric encryption with AES-128-CBC and HMAC-SHA256).
+    Supports both key-based and password-based encryption. Keys are Fernet
+    keys; files are encrypted in the segmented AES-256-GCM stream format,
+    in-memory data with Fernet (AES-128-CBC and HMAC-SHA256).
     """
 
-    def __init__(self):
+    def __init__(self, segment_size: int = DEFAULT_SEGMENT_SIZE, workers: Optional[int] = None):
         self.key: Optional[bytes] = None
         self.cipher: Optional[Fernet] = None
+        self.segment_size = segment_size
+        self.workers = workers or default_workers()
 
     def generate_key(self) -> bytes:
         """
@@ -147,11 +370,46 @@ class CryptoManager:
         self.cipher = Fernet(key)
         return self.cipher
 
+    def _require_key(self, key: Optional[bytes]) -> bytes:
+        key = key or self.key
+        if not key:
+            raise ValueError("No key available. Generate, load, or derive a key first.")
+        return key
+
+    def open_encrypted_writer(self, fileobj: BinaryIO, key: Optional[bytes] = None) -> SegmentedEncryptionWriter:
+        """
+        Writable stream encrypting into fileobj (e.g. the fileobj of a tarfile/zipfile).
+
+        Args:
+            fileobj: Binary file object receiving the encrypted stream
+            key: Encryption key (uses instance key if not provided)
+
+        Returns:
+            SegmentedEncryptionWriter; close it to write the final segment
+        """
+        return SegmentedEncryptionWriter(
+            fileobj, self._require_key(key), segment_size=self.segment_size, workers=self.workers
+        )
+
+    def open_decrypted_reader(self, fileobj: BinaryIO, key: Optional[bytes] = None) -> io.BufferedReader:
+        """
+        Readable plaintext stream of an encrypted stream read from fileobj.
+
+        Args:
+            fileobj: Binary file object positioned at the start of the encrypted stream
+            key: Decryption key (uses instance key if not provided)
+
+        Returns:
+            Buffered reader over the authenticated plaintext
+        """
+        reader = SegmentedDecryptionReader(fileobj, self._require_key(key), workers=self.workers)
+        return io.BufferedReader(reader, buffer_size=COPY_CHUNK_SIZE)
+
     def encrypt_file(
         self, input_path: str, output_path: Optional[str] = None, key: Optional[bytes] = None
     ) -> str:
         """
-        Encrypt a file.
+        Encrypt a file, streaming it through in segments.
 
         Args:
             input_path: Path to file to encrypt
@@ -171,15 +429,16 @@ class CryptoManager:
         if output_path is None:
             output_path = input_path + ".enc"
 
-        cipher = self.get_cipher(key)
-
-        with open(input_path, "rb") as f:
-            plaintext = f.read()
+        key = self._require_key(key)
 
-        ciphertext = cipher.encrypt(plaintext)
-
-        with open(output_path, "wb") as f:
-            f.write(ciphertext)
+        try:
+            with open(input_path, "rb") as source, open(output_path, "wb") as destination:
+                with self.open_encrypted_writer(destination, key) as writer:
+                    shutil.copyfileobj(source, writer, COPY_CHUNK_SIZE)
+        except BaseException:
+            # Never leave a truncated stream behind
+            Path(output_path).unlink(missing_ok=True)
+            raise
 
         return output_path
 
@@ -187,7 +446,7 @@ class CryptoManager:
         self, input_path: str, output_path: Optional[str] = None, key: Optional[bytes] = None
     ) -> str:
         """
-        Decrypt a file.
+        Decrypt a file, streaming segmented files and falling back to Fernet for legacy tokens.
 
         Args:
             input_path: Path to encrypted file
@@ -198,7 +457,8 @@ class CryptoManager:
             Path to decrypted file
 
         Raises:
-            cryptography.fernet.InvalidToken: If key is incorrect
+            cryptography.exceptions.InvalidTag: If key is incorrect or the file was modified
+            cryptography.fernet.InvalidToken: If key is incorrect (legacy Fernet files)
 
         Example:
             >>> crypto = CryptoManager()
@@ -211,15 +471,23 @@ class CryptoManager:
             else:
                 output_path = input_path + ".dec"
 
-        cipher = self.get_cipher(key)
-
-        with open(input_path, "rb") as f:
-            ciphertext = f.read()
-
-        plaintext = cipher.decrypt(ciphertext)
-
-        with open(output_path, "wb") as f:
-            f.write(plaintext)
+        key = self._require_key(key)
+
+        if not is_segmented_stream(input_path):
+            # Whole-file Fernet token from an earlier version
+            with open(input_path, "rb") as f:
+                plaintext = self.get_cipher(key).decrypt(f.read())
+            with open(output_path, "wb") as f:
+                f.write(plaintext)
+            return output_path
+
+        try:
+            with open(input_path, "rb") as source, open(output_path, "wb") as destination:
+                shutil.copyfileobj(self.open_decrypted_reader(source, key), destination, COPY_CHUNK_SIZE)
+        except Exception:
+            # Never leave partially decrypted (unauthenticated) plaintext behind
+            Path(output_path).unlink(missing_ok=True)
+            raise
 
         return output_path
 
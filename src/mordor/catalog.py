@@ -1,12 +1,14 @@
 """OTRF Security Datasets catalog management."""
 
+import bisect
 import json
 import os
+import re
 import yaml
 import requests
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .models import (
@@ -24,24 +26,53 @@ GITHUB_API = "https://api.github.com/repos/OTRF/Security-Datasets"
 RAW_GITHUB = "https://raw.githubusercontent.com/OTRF/Security-Datasets/master"
 CACHE_TTL_HOURS = 24
 DEFAULT_CACHE_DIR = "/tmp/rivendell/mordor/cache"
+METADATA_DIRS = ("atomic", "compound")
+DEFAULT_BRANCH = "master"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: Optional[str]) -> Set[str]:
+    return set(_TOKEN.findall(text.lower())) if text else set()
 
 
 class MordorCatalog:
     """Manages the OTRF Security Datasets catalog."""
 
-    def __init__(self, cache_dir: Optional[str] = None, github_token: Optional[str] = None):
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        github_token: Optional[str] = None,
+        api_url: str = GITHUB_API,
+        raw_url: str = RAW_GITHUB,
+    ):
         """
         Initialize the Mordor catalog.
 
         Args:
             cache_dir: Directory for caching catalog data
             github_token: GitHub API token for higher rate limits (optional)
+            api_url: GitHub repository API base URL (overridable for mirrors and tests)
+            raw_url: Raw file base URL matching api_url
         """
         self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.cache_file = self.cache_dir / "catalog_index.json"
         self._index: Optional[CatalogIndex] = None
         self.github_token = github_token or os.environ.get("MORDOR_GITHUB_TOKEN")
+        self.api_url = api_url.rstrip("/")
+        self.raw_url = raw_url.rstrip("/")
+        self._session = requests.Session()
+
+        # Inverted indexes over the loaded catalog (see _build_indexes)
+        self._by_id: Dict[str, MordorDataset] = {}
+        self._position: Dict[str, int] = {}
+        self._by_platform: Dict[str, Set[str]] = {}
+        self._by_tactic: Dict[str, Set[str]] = {}
+        self._by_technique: Dict[str, Set[str]] = {}
+        self._by_tag: Dict[str, Set[str]] = {}
+        self._by_token: Dict[str, Set[str]] = {}
+        self._vocabulary: List[str] = []
 
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for GitHub API requests."""
@@ -50,8 +81,8 @@ class MordorCatalog:
             headers["Authorization"] = f"token {self.github_token}"
         return headers
 
-    def _load_cache(self) -> Optional[CatalogIndex]:
-        """Load catalog from cache if fresh."""
+    def _load_cache(self, allow_stale: bool = False) -> Optional[CatalogIndex]:
+        """Load catalog from cache if fresh (or at all, with allow_stale)."""
         if not self.cache_file.exists():
             return None
 
@@ -63,7 +94,7 @@ class MordorCatalog:
 
             # Check if cache is still fresh
             age = datetime.now() - index.last_updated
-            if age < timedelta(hours=CACHE_TTL_HOURS):
+            if allow_stale or age < timedelta(hours=CACHE_TTL_HOURS):
                 return index
         except Exception as e:
             print(f"Warning: Failed to load cache: {e}")
@@ -78,35 +109,56 @@ class MordorCatalog:
         except Exception as e:
             print(f"Warning: Failed to save cache: {e}")
 
-    def _fetch_metadata_files(self) -> List[str]:
-        """Fetch list of metadata YAML files from GitHub."""
-        metadata_urls = []
-
-        for dataset_type in ["atomic", "compound"]:
-            url = f"{GITHUB_API}/contents/datasets/{dataset_type}/_metadata"
-            try:
-                response = requests.get(url, headers=self._get_headers(), timeout=30)
-
-                if response.status_code == 200:
-                    files = response.json()
-                    for f in files:
-                        if f["name"].endswith(".yaml") or f["name"].endswith(".yml"):
-                            metadata_urls.append(f["download_url"])
-                elif response.status_code == 403:
-                    print(f"Warning: Rate limited by GitHub API. Consider using MORDOR_GITHUB_TOKEN.")
-                    break
-            except Exception as e:
-                print(f"Warning: Failed to fetch metadata list for {dataset_type}: {e}")
-
-        return metadata_urls
-
-    def _parse_metadata_file(self, url: str) -> Optional[MordorDataset]:
+    def _fetch_metadata_tree(
+        self, dataset_type: str, etag: Optional[str] = None
+    ) -> Tuple[int, Optional[Dict]]:
+        """
+        Fetch the git tree of a metadata directory.
+
+        Returns (status, tree): 304 with no tree when the ETag still matches,
+        200 with {"sha", "etag", "files": {path: blob sha}}, or another status
+        (or 0 on a connection error) with no tree.
+        """
+        url = f"{self.api_url}/git/trees/{DEFAULT_BRANCH}:datasets/{dataset_type}/_metadata"
+        headers = self._get_headers()
+        if etag:
+            headers["If-None-Match"] = etag
+        try:
+            response = self._session.get(url, headers=headers, timeout=30)
+        except requests.RequestException as e:
+            print(f"Warning: Failed to fetch metadata list for {dataset_type}: {e}")
+            return 0, None
+
+        if response.status_code == 304:
+            return 304, None
+        if response.status_code == 403:
+            print(f"Warning: Rate limited by GitHub API. Consider using MORDOR_GITHUB_TOKEN.")
+            return 403, None
+        if response.status_code != 200:
+            print(f"Warning: Failed to fetch metadata list for {dataset_type}: HTTP {response.status_code}")
+            return response.status_code, None
+
+        tree = response.json()
+        files = {
+            f"datasets/{dataset_type}/_metadata/{entry['path']}": entry["sha"]
+            for entry in tree.get("tree", [])
+            if entry.get("type") == "blob" and entry["path"].endswith((".yaml", ".yml"))
+        }
+        return 200, {"sha": tree.get("sha"), "etag": response.headers.get("ETag"), "files": files}
+
+    def _fetch_metadata_file(self, path: str, etag: Optional[str] = None) -> Tuple[int, Optional[str], Optional[str]]:
+        """Download one metadata YAML; returns (status, text, etag), with status 304 if unchanged."""
+        headers = {"If-None-Match": etag} if etag else {}
+        response = self._session.get(f"{self.raw_url}/{path}", headers=headers, timeout=30)
+        if response.status_code == 304:
+            return 304, None, etag
+        response.raise_for_status()
+        return response.status_code, response.text, response.headers.get("ETag")
+
+    def _parse_metadata(self, text: str, url: str) -> Optional[MordorDataset]:
         """Parse a single metadata YAML file."""
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
-            data = yaml.safe_load(response.text)
+            data = yaml.safe_load(text)
 
             if not data or not isinstance(data, dict):
                 return None
@@ -210,6 +262,11 @@ class MordorCatalog:
         """
         Refresh catalog from OTRF GitHub repository.
 
+        Only metadata files whose git blob SHA changed since the cached
+        catalog are downloaded. Each directory listing is a conditional
+        request on its ETag, and an unchanged tree SHA skips the directory
+        entirely, so a refresh with no upstream changes downloads no YAML.
+
         Args:
             force: Force refresh even if cache is fresh
 
@@ -219,51 +276,162 @@ class MordorCatalog:
         if not force:
             cached = self._load_cache()
             if cached:
-                self._index = cached
+                self._set_index(cached)
                 return cached.total_count
 
-        print("Fetching metadata file list from OTRF...")
-        metadata_urls = self._fetch_metadata_files()
+        previous = self._load_cache(allow_stale=True)
+        previous_datasets = {ds.dataset_id: ds for ds in previous.datasets} if previous else {}
+        previous_sources = previous.sources if previous else {}
+        previous_trees = previous.trees if previous else {}
 
-        if not metadata_urls:
-            print("Warning: No metadata files found. Using cached data if available.")
-            cached = self._load_cache()
-            if cached:
-                self._index = cached
-                return cached.total_count
+        print("Fetching metadata file list from OTRF...")
+        trees: Dict[str, Dict[str, str]] = {}
+        sources: Dict[str, Dict[str, str]] = {}
+        changed: List[str] = []
+        listed_any = False
+        rate_limited = False
+        # Set when anything could not be fetched: the cache is saved but not marked fresh
+        incomplete = False
+        for dataset_type in METADATA_DIRS:
+            prefix = f"datasets/{dataset_type}/_metadata/"
+            kept = {path: source for path, source in previous_sources.items() if path.startswith(prefix)}
+            previous_tree = previous_trees.get(dataset_type, {})
+            if rate_limited:
+                status, tree = 403, None
+            else:
+                status, tree = self._fetch_metadata_tree(dataset_type, previous_tree.get("etag"))
+
+            if status == 304 or (tree and tree["sha"] and tree["sha"] == previous_tree.get("sha")):
+                # Directory unchanged since the cached catalog
+                listed_any = True
+                trees[dataset_type] = dict(previous_tree, etag=(tree or {}).get("etag") or previous_tree.get("etag") or "")
+                sources.update(kept)
+                continue
+            if tree is None:
+                # Listing failed: keep what we had for this directory, and once
+                # rate limited, for every remaining directory without asking
+                if previous_tree:
+                    trees[dataset_type] = previous_tree
+                sources.update(kept)
+                rate_limited = rate_limited or status == 403
+                incomplete = True
+                continue
+
+            listed_any = True
+            trees[dataset_type] = {"sha": tree["sha"] or "", "etag": tree["etag"] or ""}
+            for path, blob_sha in tree["files"].items():
+                source = kept.get(path)
+                if source and source.get("sha") == blob_sha and source.get("dataset_id") in previous_datasets:
+                    sources[path] = source
+                else:
+                    sources[path] = {"sha": blob_sha, "etag": (source or {}).get("etag") or ""}
+                    changed.append(path)
+
+        if not listed_any and not previous:
+            print("Warning: No metadata files found.")
             return 0
 
-        print(f"Parsing {len(metadata_urls)} metadata files...")
-        datasets = []
-
-        # Parallel fetching with progress
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {
-                executor.submit(self._parse_metadata_file, url): url
-                for url in metadata_urls
-            }
-
-            completed = 0
-            for future in as_completed(futures):
-                completed += 1
-                if completed % 50 == 0:
-                    print(f"  Processed {completed}/{len(metadata_urls)} files...")
-
-                result = future.result()
-                if result:
-                    datasets.append(result)
-
-        self._index = CatalogIndex(
-            last_updated=datetime.now(),
-            datasets=datasets,
+        datasets = {
+            source["dataset_id"]: previous_datasets[source["dataset_id"]]
+            for path, source in sources.items()
+            if path not in changed and source.get("dataset_id") in previous_datasets
+        }
+
+        if changed:
+            print(f"Parsing {len(changed)} new or changed metadata files...")
+
+            def fetch(path: str):
+                status, text, etag = self._fetch_metadata_file(path, sources[path].get("etag"))
+                if status == 304:
+                    return path, None, etag
+                return path, self._parse_metadata(text, f"{self.raw_url}/{path}"), etag
+
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                futures = {executor.submit(fetch, path): path for path in changed}
+                completed = 0
+                for future in as_completed(futures):
+                    path = futures[future]
+                    completed += 1
+                    if completed % 50 == 0:
+                        print(f"  Processed {completed}/{len(changed)} files...")
+                    try:
+                        _, dataset, etag = future.result()
+                    except requests.RequestException as e:
+                        print(f"Warning: Failed to fetch {path}: {e}")
+                        # Retry on the next refresh
+                        sources[path]["sha"] = ""
+                        incomplete = True
+                        old_id = previous_sources.get(path, {}).get("dataset_id")
+                        if old_id in previous_datasets:
+                            sources[path]["dataset_id"] = old_id
+                            datasets[old_id] = previous_datasets[old_id]
+                        continue
+                    sources[path]["etag"] = etag or ""
+                    if dataset is None:
+                        # 304: content unchanged, keep the cached dataset
+                        old_id = previous_sources.get(path, {}).get("dataset_id")
+                        if old_id in previous_datasets:
+                            sources[path]["dataset_id"] = old_id
+                            datasets[old_id] = previous_datasets[old_id]
+                        continue
+                    if dataset.dataset_id:
+                        sources[path]["dataset_id"] = dataset.dataset_id
+                        datasets[dataset.dataset_id] = dataset
+
+        # A partial refresh keeps the previous timestamp so the next call retries
+        if incomplete:
+            last_updated = previous.last_updated if previous else datetime.min
+        else:
+            last_updated = datetime.now()
+        index = CatalogIndex(
+            last_updated=last_updated,
+            datasets=sorted(datasets.values(), key=lambda ds: ds.dataset_id),
             total_count=len(datasets),
+            trees=trees,
+            sources=sources,
         )
-        self._index.compute_statistics()
+        index.compute_statistics()
 
-        self._save_cache(self._index)
-        print(f"Catalog refreshed: {len(datasets)} datasets indexed")
+        self._save_cache(index)
+        self._set_index(index)
+        print(f"Catalog refreshed: {len(datasets)} datasets indexed ({len(changed)} fetched)")
         return len(datasets)
 
+    def _set_index(self, index: CatalogIndex):
+        self._index = index
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """Build inverted indexes (platform/tactic/technique/tag/token -> dataset ids) over the loaded catalog."""
+        self._by_id, self._position = {}, {}
+        self._by_platform, self._by_tactic, self._by_technique = {}, {}, {}
+        self._by_tag, self._by_token = {}, {}
+        for position, ds in enumerate(self._index.datasets if self._index else []):
+            dataset_id = ds.dataset_id
+            self._by_id[dataset_id] = ds
+            self._position[dataset_id] = position
+            self._by_platform.setdefault(str(ds.platform).lower(), set()).add(dataset_id)
+            for tactic in ds.tactics:
+                self._by_tactic.setdefault(tactic.lower(), set()).add(dataset_id)
+            for technique in ds.techniques:
+                self._by_technique.setdefault(technique.upper(), set()).add(dataset_id)
+            for tag in ds.tags:
+                self._by_tag.setdefault(str(tag).lower(), set()).add(dataset_id)
+            for token in _tokens(ds.title) | _tokens(ds.description) | _tokens(dataset_id) | {dataset_id.lower()}:
+                self._by_token.setdefault(token, set()).add(dataset_id)
+        # Sorted vocabulary for prefix lookups
+        self._vocabulary = sorted(self._by_token)
+
+    def _prefix_ids(self, prefix: str) -> Set[str]:
+        """Datasets with any indexed token starting with prefix."""
+        ids: Set[str] = set()
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            ids |= self._by_token[token]
+        return ids
+
     def list_datasets(
         self,
         platform: Optional[str] = None,
@@ -281,7 +449,7 @@ class MordorCatalog:
             platform: Filter by platform (windows, linux, aws)
             tactic: Filter by MITRE tactic
             technique: Filter by MITRE technique ID
-            search: Search in title/description
+            search: Search in title/description (word prefixes)
             tags: Filter by tags
             limit: Maximum number of results
             offset: Starting offset
@@ -295,43 +463,29 @@ class MordorCatalog:
         if not self._index:
             return []
 
-        datasets = self._index.datasets
-
-        # Apply filters
+        # Each filter is a set lookup; the result is their intersection
+        candidates: List[Set[str]] = []
         if platform:
-            datasets = [d for d in datasets if d.platform.lower() == platform.lower()]
-
+            candidates.append(self._by_platform.get(platform.lower(), set()))
         if tactic:
-            datasets = [
-                d for d in datasets if tactic.lower() in [t.lower() for t in d.tactics]
-            ]
-
+            candidates.append(self._by_tactic.get(tactic.lower(), set()))
         if technique:
-            datasets = [
-                d
-                for d in datasets
-                if technique.upper() in [t.upper() for t in d.techniques]
-            ]
-
+            candidates.append(self._by_technique.get(technique.upper(), set()))
         if search:
-            search_lower = search.lower()
-            datasets = [
-                d
-                for d in datasets
-                if search_lower in d.title.lower()
-                or (d.description and search_lower in d.description.lower())
-                or d.dataset_id.lower().startswith(search_lower)
-            ]
-
+            # Every search word must prefix a word of the title, description or dataset id
+            terms = _tokens(search)
+            candidates.extend(self._prefix_ids(term) for term in terms)
+            if not terms:
+                candidates.append(set())
         if tags:
-            tags_lower = [t.lower() for t in tags]
-            datasets = [
-                d
-                for d in datasets
-                if any(t.lower() in tags_lower for t in d.tags)
-            ]
+            candidates.append(set().union(*(self._by_tag.get(tag.lower(), set()) for tag in tags)))
 
-        return datasets[offset : offset + limit]
+        if not candidates:
+            return self._index.datasets[offset : offset + limit]
+
+        matches = set.intersection(*sorted(candidates, key=len))
+        ordered = sorted(matches, key=self._position.__getitem__)
+        return [self._by_id[dataset_id] for dataset_id in ordered[offset : offset + limit]]
 
     def get_dataset(self, dataset_id: str) -> Optional[MordorDataset]:
         """
@@ -349,11 +503,7 @@ class MordorCatalog:
         if not self._index:
             return None
 
-        for ds in self._index.datasets:
-            if ds.dataset_id == dataset_id:
-                return ds
-
-        return None
+        return self._by_id.get(dataset_id)
 
     def get_statistics(self) -> Dict[str, any]:
         """Get catalog statistics."""
@@ -382,7 +532,7 @@ class MordorCatalog:
         if not self._index:
             cached = self._load_cache()
             if cached:
-                self._index = cached
+                self._set_index(cached)
 
         if self._index:
             age = datetime.now() - self._index.last_updated
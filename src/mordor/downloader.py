@@ -3,69 +3,253 @@
 import hashlib
 import json
 import os
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
-from typing import Optional, Callable, Dict, Any, List
+from typing import Optional, Callable, Dict, Any, List, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .models import MordorDataset, DatasetDownloadResult, DatasetVerifyResult
 from .catalog import MordorCatalog
 
 DEFAULT_OUTPUT_DIR = "/tmp/rivendell/mordor"
+CHUNK_SIZE = 1024 * 1024
+SEGMENT_SIZE = 8 * 1024 * 1024  # Range segment size for large files
+SEGMENT_THRESHOLD = 2 * SEGMENT_SIZE  # Files at least this large are fetched in parallel segments
+MAX_WORKERS = 4
+
+
+class _RangeDownload:
+    """
+    State of one file being fetched into a .part file by byte ranges.
+
+    Progress per segment is persisted to a .part.json sidecar so an
+    interrupted download resumes where each segment stopped. The SHA-256
+    is computed incrementally over the contiguous completed prefix, so it
+    is ready as soon as the last byte lands.
+    """
+
+    def __init__(self, part_path: Path, url: str, size: int, etag: Optional[str], segment_size: int):
+        self.part_path = part_path
+        self.state_path = Path(str(part_path) + ".json")
+        self.url = url
+        self.size = size
+        self.etag = etag
+        self.lock = threading.Lock()
+        self.hasher = hashlib.sha256()
+        self.hashed = 0
+
+        self.segments = self._load_state()
+        if self.segments is None:
+            self.segments = [[start, min(start + segment_size, size), 0] for start in range(0, size, segment_size)]
+            with open(part_path, "wb") as f:
+                f.truncate(size)
+            self._save_state()
+
+    def _load_state(self) -> Optional[List[List[int]]]:
+        """Resume state, if the sidecar describes the same remote file."""
+        if not (self.part_path.exists() and self.state_path.exists()):
+            return None
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("url") != self.url or state.get("size") != self.size or state.get("etag") != self.etag:
+            return None
+        if self.part_path.stat().st_size != self.size:
+            return None
+        return state["segments"]
+
+    def _save_state(self):
+        with open(self.state_path, "w") as f:
+            json.dump({"url": self.url, "size": self.size, "etag": self.etag, "segments": self.segments}, f)
+
+    @property
+    def downloaded(self) -> int:
+        return sum(segment[2] for segment in self.segments)
+
+    def pending(self) -> List[int]:
+        return [index for index, (start, end, done) in enumerate(self.segments) if start + done < end]
+
+    def advance(self, index: int, length: int):
+        """Record length more bytes written to segment index and hash any newly contiguous prefix."""
+        with self.lock:
+            self.segments[index][2] += length
+            self._save_state()
+            frontier = 0
+            for start, end, done in self.segments:
+                frontier = start + done
+                if start + done < end:
+                    break
+            if frontier > self.hashed:
+                with open(self.part_path, "rb") as f:
+                    f.seek(self.hashed)
+                    remaining = frontier - self.hashed
+                    while remaining:
+                        chunk = f.read(min(CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        self.hasher.update(chunk)
+                        remaining -= len(chunk)
+                self.hashed = frontier
+
+    def discard(self):
+        for path in (self.part_path, self.state_path):
+            if path.exists():
+                path.unlink()
 
 
 class MordorDownloader:
     """Downloads Mordor datasets from OTRF repository."""
 
-    def __init__(self, catalog: Optional[MordorCatalog] = None):
+    def __init__(
+        self,
+        catalog: Optional[MordorCatalog] = None,
+        max_workers: int = MAX_WORKERS,
+        segment_size: int = SEGMENT_SIZE,
+        segment_threshold: int = SEGMENT_THRESHOLD,
+    ):
         """
         Initialize the downloader.
 
         Args:
             catalog: MordorCatalog instance (creates new one if not provided)
+            max_workers: Concurrent connections per download (files or range segments)
+            segment_size: Byte range fetched per request for segmented downloads
+            segment_threshold: Minimum file size for segmented (parallel range) downloads
         """
         self.catalog = catalog or MordorCatalog()
+        self.max_workers = max(1, max_workers)
+        self.segment_size = segment_size
+        self.segment_threshold = segment_threshold
+
+        # One pooled session shared by every file and segment
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers * self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _probe(self, url: str) -> Tuple[str, int, bool, Optional[str]]:
+        """HEAD a file for its final URL, size, range support and ETag."""
+        try:
+            response = self.session.head(url, allow_redirects=True, timeout=30)
+            response.raise_for_status()
+        except requests.RequestException:
+            return url, 0, False, None
+        size = int(response.headers.get("content-length", 0))
+        ranges = response.headers.get("accept-ranges", "").lower() == "bytes"
+        return response.url, size, ranges, response.headers.get("etag")
+
+    def _fetch_segment(self, state: _RangeDownload, index: int, progress: Callable[[int], None]):
+        """Fetch the remainder of one segment with a Range request, writing in place."""
+        start, end, done = state.segments[index]
+        response = self.session.get(
+            state.url, headers={"Range": f"bytes={start + done}-{end - 1}"}, stream=True, timeout=120
+        )
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise IOError(f"Server ignored range request for {state.url}")
+        with open(state.part_path, "r+b") as f:
+            f.seek(start + done)
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if not chunk:
+                    continue
+                chunk = chunk[: end - f.tell()]
+                f.write(chunk)
+                f.flush()
+                state.advance(index, len(chunk))
+                progress(len(chunk))
+                if f.tell() >= end:
+                    break
 
     def _download_file(
         self,
         url: str,
         output_path: Path,
         progress_callback: Optional[Callable] = None,
+        expected_checksum: Optional[str] = None,
+        probe: Optional[Tuple[str, int, bool, Optional[str]]] = None,
     ) -> Dict[str, Any]:
         """
         Download a single file with progress tracking.
 
+        Files the server can serve by range are written to a .part file and
+        resume from its .part.json sidecar after an interruption; files of
+        segment_threshold bytes or more are fetched as parallel segments.
+        Other files stream in a single request.
+
         Args:
             url: URL to download
             output_path: Local path to save file
             progress_callback: Callback for progress updates (downloaded_bytes, total_bytes)
+            expected_checksum: SHA-256 the finished file must match (optional)
+            probe: Result of _probe(url), if already known
 
         Returns:
             Dictionary with download results
         """
-        response = requests.get(url, stream=True, timeout=120)
-        response.raise_for_status()
-
-        total_size = int(response.headers.get("content-length", 0))
-        downloaded = 0
-        hasher = hashlib.sha256()
-
+        final_url, total_size, ranges, etag = probe or self._probe(url)
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = output_path.with_name(output_path.name + ".part")
+        lock = threading.Lock()
+        downloaded = [0]
+
+        def progress(length: int):
+            with lock:
+                downloaded[0] += length
+                if progress_callback and total_size:
+                    progress_callback(downloaded[0], total_size)
+
+        if ranges and total_size:
+            state = _RangeDownload(part_path, final_url, total_size, etag, self.segment_size)
+            progress(state.downloaded)
+            state.advance(0, 0)  # hash whatever a previous attempt already completed
+            pending = state.pending()
+            workers = self.max_workers if total_size >= self.segment_threshold else 1
+            if workers > 1 and len(pending) > 1:
+                with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                    for future in as_completed(
+                        [executor.submit(self._fetch_segment, state, index, progress) for index in pending]
+                    ):
+                        future.result()
+            else:
+                for index in pending:
+                    self._fetch_segment(state, index, progress)
+            size, checksum = state.hashed, state.hasher.hexdigest()
+            if size != total_size:
+                raise IOError(f"Incomplete download of {url}: {size} of {total_size} bytes")
+            cleanup = state.discard
+        else:
+            response = self.session.get(final_url, stream=True, timeout=120)
+            response.raise_for_status()
+            total_size = total_size or int(response.headers.get("content-length", 0))
+            hasher = hashlib.sha256()
+            size = 0
+            with open(part_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if chunk:
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        size += len(chunk)
+                        progress(len(chunk))
+            checksum = hasher.hexdigest()
+            cleanup = part_path.unlink
 
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    hasher.update(chunk)
-                    downloaded += len(chunk)
+        if expected_checksum and checksum != expected_checksum.lower():
+            cleanup()
+            raise IOError(f"Checksum mismatch for {output_path.name}")
 
-                    if progress_callback and total_size:
-                        progress_callback(downloaded, total_size)
+        os.replace(part_path, output_path)
+        state_path = Path(str(part_path) + ".json")
+        if state_path.exists():
+            state_path.unlink()
 
         return {
             "path": str(output_path),
-            "size": downloaded,
-            "checksum": hasher.hexdigest(),
+            "size": size,
+            "checksum": checksum,
             "filename": output_path.name,
         }
 
@@ -74,16 +258,18 @@ class MordorDownloader:
         dataset_id: str,
         output_dir: Optional[str] = None,
         progress_callback: Optional[Callable] = None,
-        parallel: bool = False,
+        parallel: bool = True,
     ) -> DatasetDownloadResult:
         """
         Download a complete dataset.
 
+        Interrupted downloads resume from their .part files when called again.
+
         Args:
             dataset_id: OTRF dataset ID
             output_dir: Target directory for downloaded files
-            progress_callback: Callback for progress updates
-            parallel: Download files in parallel (faster but uses more connections)
+            progress_callback: Callback for aggregate progress (downloaded_bytes, total_bytes)
+            parallel: Download files concurrently (up to max_workers connections)
 
         Returns:
             DatasetDownloadResult with download status and file info
@@ -103,71 +289,40 @@ class MordorDownloader:
         total_size = 0
         errors: List[str] = []
 
-        # Track overall progress
-        total_files = len(dataset.files)
-        files_completed = 0
+        files = [file_info for file_info in dataset.files if file_info.link]
+        workers = min(self.max_workers, len(files)) if parallel else 1
 
-        def file_progress(file_idx: int, downloaded: int, total: int):
-            """Progress callback for individual file."""
-            if progress_callback:
-                # Calculate overall progress
-                file_progress_pct = (downloaded / total) if total > 0 else 0
-                overall_pct = ((files_completed + file_progress_pct) / total_files) * 100
-                progress_callback(int(overall_pct), 100)
-
-        if parallel and len(dataset.files) > 1:
-            # Parallel download
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                futures = {}
-                for idx, file_info in enumerate(dataset.files):
-                    if not file_info.link:
-                        continue
-                    filename = file_info.link.split("/")[-1]
-                    file_path = output_path / file_info.type / filename
-
-                    futures[
-                        executor.submit(
-                            self._download_file,
-                            file_info.link,
-                            file_path,
-                            lambda d, t, i=idx: file_progress(i, d, t),
-                        )
-                    ] = file_info
-
-                for future in as_completed(futures):
-                    file_info = futures[future]
-                    try:
-                        result = future.result()
-                        downloaded_files.append(
-                            {
-                                "type": file_info.type,
-                                "filename": result["filename"],
-                                "path": result["path"],
-                                "size": result["size"],
-                                "checksum": result["checksum"],
-                                "url": file_info.link,
-                            }
-                        )
-                        total_size += result["size"]
-                        files_completed += 1
-                    except Exception as e:
-                        errors.append(f"Failed to download {file_info.link}: {e}")
-        else:
-            # Sequential download
-            for idx, file_info in enumerate(dataset.files):
-                if not file_info.link:
-                    continue
+        # Size every file up front so progress is reported against the dataset total
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            probes = list(executor.map(lambda file_info: self._probe(file_info.link), files))
+        expected_total = sum(probe[1] for probe in probes)
+        progress_lock = threading.Lock()
+        file_bytes = [0] * len(files)
 
-                filename = file_info.link.split("/")[-1]
-                file_path = output_path / file_info.type / filename
+        def file_progress(file_idx: int, downloaded: int, total: int):
+            """Aggregate per-file progress into dataset progress."""
+            with progress_lock:
+                file_bytes[file_idx] = downloaded
+                if progress_callback and expected_total:
+                    progress_callback(sum(file_bytes), expected_total)
+
+        def fetch(idx: int) -> Dict[str, Any]:
+            file_info = files[idx]
+            filename = file_info.link.split("/")[-1]
+            return self._download_file(
+                file_info.link,
+                output_path / file_info.type / filename,
+                lambda d, t: file_progress(idx, d, t),
+                expected_checksum=file_info.checksum,
+                probe=probes[idx],
+            )
 
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(fetch, idx): file_info for idx, file_info in enumerate(files)}
+            for future in as_completed(futures):
+                file_info = futures[future]
                 try:
-                    result = self._download_file(
-                        file_info.link,
-                        file_path,
-                        lambda d, t: file_progress(idx, d, t),
-                    )
-
+                    result = future.result()
                     downloaded_files.append(
                         {
                             "type": file_info.type,
@@ -179,11 +334,13 @@ class MordorDownloader:
                         }
                     )
                     total_size += result["size"]
-                    files_completed += 1
-
                 except Exception as e:
                     errors.append(f"Failed to download {file_info.link}: {e}")
 
+        # Keep the catalog's file order regardless of completion order
+        order = {file_info.link: idx for idx, file_info in enumerate(files)}
+        downloaded_files.sort(key=lambda f: order[f["url"]])
+
         # Save metadata alongside downloaded files
         metadata_path = output_path / "metadata.json"
         metadata = {
@@ -310,9 +467,7 @@ class MordorDownloader:
 
             try:
                 # HEAD request to get content-length
-                response = requests.head(file_info.link, timeout=10)
-                size = int(response.headers.get("content-length", 0))
-                total_size += size
+                total_size += self._probe(file_info.link)[1]
             except Exception:
                 pass
 
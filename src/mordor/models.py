@@ -130,6 +130,10 @@ class CatalogIndex(BaseModel):
     tactics: Dict[str, int] = {}
     techniques: Dict[str, int] = {}
 
+    # Incremental refresh state
+    trees: Dict[str, Dict[str, str]] = {}  # metadata directory -> {"sha", "etag"} of its git tree
+    sources: Dict[str, Dict[str, str]] = {}  # metadata file path -> {"sha", "etag", "dataset_id"}
+
     def compute_statistics(self):
         """Compute platform, tactic, and technique statistics."""
         self.platforms = {}
@@ -4,6 +4,7 @@ AI Assistant API Routes
 FastAPI routes for Eru AI assistant functionality.
 """
 
+import itertools
 import os
 import json
 import logging
@@ -25,6 +26,18 @@ RIVENDELL_DATA_DIR = os.getenv("RIVENDELL_DATA_DIR", "/opt/rivendell/data")
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://host.docker.internal:11434")
 DEFAULT_MODEL = os.getenv("RIVENDELL_MODEL_NAME", "llama3.2:3b")
 
+# Query engines for recently queried cases, created on first RAG query
+_engine_pool = None
+
+
+def _get_engine_pool():
+    global _engine_pool
+    if _engine_pool is None:
+        from rivendell.ai.engine_pool import QueryEnginePool
+
+        _engine_pool = QueryEnginePool()
+    return _engine_pool
+
 
 # Request/Response Models
 class ChatRequest(BaseModel):
@@ -337,10 +350,8 @@ async def query_case(case_id: str, request: QueryRequest):
     # If vector DB exists, use RAG query
     if os.path.exists(vector_db_path):
         try:
-            # Try to use the forensic query engine
-            from rivendell.ai.query_engine import ForensicQueryEngine
-
-            engine = ForensicQueryEngine.load(case_id, case_path)
+            # Try to use the forensic query engine (kept open between questions)
+            engine = _get_engine_pool().get(case_id, vector_db_path)
             result = engine.query(request.question)
 
             return {
@@ -498,9 +509,26 @@ async def _gather_case_context(case_path: str, query_hint: str) -> str:
     """Gather relevant context from case artifacts."""
     context_parts = []
 
+    # Sample cooked artifacts from the artefact store when processing wrote one
+    store = None
+    if os.path.exists(os.path.join(case_path, "rivendell_artefacts.db")):
+        try:
+            from rivendell.artefact_store import ArtefactStore
+
+            store = ArtefactStore.for_case(case_path, read_only=True)
+        except ImportError:
+            store = None
+    if store is not None:
+        try:
+            for artefact in store.list_artefacts()[:20]:
+                sample = [record["data"] for record in store.query(artefact["artefact"], limit=10)["records"]]
+                context_parts.append(f"## {artefact['artefact']}\n{json.dumps(sample, indent=2, default=str)[:2000]}")
+        finally:
+            store.close()
+
     # Look for cooked artifacts
     cooked_path = os.path.join(case_path, "cooked")
-    if os.path.exists(cooked_path):
+    if store is None and os.path.exists(cooked_path):
         # Get relevant JSON files (limit to prevent token overflow)
         json_files = list(Path(cooked_path).rglob("*.json"))[:20]
 
@@ -520,17 +548,20 @@ async def _gather_case_context(case_path: str, query_hint: str) -> str:
                 logger.debug(f"Error reading {json_file}: {e}")
                 continue
 
-    # Look for timeline
+    # Look for timeline: super-timeline chunks, or a plaso CSV
+    timeline_files = sorted(Path(case_path).glob("artefacts/timeline/chunk_*.jsonl")) + sorted(
+        Path(case_path).glob("*/artefacts/timeline/chunk_*.jsonl")
+    )
     timeline_path = os.path.join(case_path, "timeline")
     if os.path.exists(timeline_path):
-        csv_files = list(Path(timeline_path).glob("*.csv"))
-        for csv_file in csv_files[:2]:
-            try:
-                with open(csv_file, 'r') as f:
-                    lines = f.readlines()[:50]  # First 50 lines
-                context_parts.append(f"## Timeline - {csv_file.stem}\n{''.join(lines)}")
-            except Exception:
-                pass
+        timeline_files += list(Path(timeline_path).glob("*.csv"))
+    for timeline_file in timeline_files[:2]:
+        try:
+            with open(timeline_file, 'r') as f:
+                lines = list(itertools.islice(f, 50))  # First 50 lines
+            context_parts.append(f"## Timeline - {timeline_file.stem}\n{''.join(lines)}")
+        except Exception:
+            pass
 
     # Look for IOC files
     analysis_path = os.path.join(case_path, "analysis")
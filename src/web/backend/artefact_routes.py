@@ -0,0 +1,158 @@
+"""
+Artefact Query API Routes
+
+Paginated filter, search and aggregate queries over a job's artefact
+store (rivendell_artefacts.db), the SQLite copy of its cooked artefacts
+written at the end of processing.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+try:
+    from .storage import JobStorage
+except ImportError:
+    # Fallback for standalone module execution
+    from storage import JobStorage
+
+router = APIRouter(prefix="/api/jobs", tags=["artefacts"])
+
+job_storage = JobStorage()
+
+# job_id -> artefact store path, so the case directory is only searched once per job
+_store_paths: Dict[str, Path] = {}
+
+
+def _open_store(job_id: str):
+    """Open the job's artefact store, or raise the matching HTTP error."""
+    try:
+        from rivendell.artefact_store import ARTEFACT_DB, ArtefactStore
+    except ImportError:
+        raise HTTPException(status_code=503, detail="Artefact store support is not available")
+
+    db_path = _store_paths.get(job_id)
+    if db_path is None or not db_path.exists():
+        db_path = _store_paths[job_id] = _find_store(job_id, ARTEFACT_DB)
+    # Opened read-only: queries never take a write lock or recreate the schema under a running job
+    return ArtefactStore(str(db_path), read_only=True)
+
+
+def _find_store(job_id: str, db_name: str) -> Path:
+    """Locate the job's artefact store, or raise the matching HTTP error."""
+    job = job_storage.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.result and "output_directory" in job.result:
+        output_dir = Path(job.result["output_directory"])
+    elif job.destination_path:
+        output_dir = Path(job.destination_path)
+    else:
+        raise HTTPException(status_code=404, detail="Job output directory not found")
+
+    # rivendell_artefacts.db is written next to rivendell_audit.log in the case directory
+    if (output_dir / db_name).exists():
+        return output_dir / db_name
+    db_files = list(output_dir.rglob(db_name))
+    if not db_files:
+        raise HTTPException(status_code=404, detail="Artefact store not found")
+    return db_files[0]
+
+
+def _field_filters(filters: Optional[List[str]]) -> dict:
+    """Parse repeated ?field=name:value parameters."""
+    fields = {}
+    for item in filters or []:
+        name, separator, value = item.partition(":")
+        if not separator:
+            raise HTTPException(status_code=400, detail=f"Invalid field filter '{item}', expected name:value")
+        fields[name] = value
+    return fields
+
+
+@router.get("/{job_id}/artefacts")
+def list_artefacts(job_id: str):
+    """
+    List the artefact types in a job's artefact store with row counts, hosts and time range.
+    """
+    store = _open_store(job_id)
+    try:
+        return {"artefacts": store.list_artefacts()}
+    finally:
+        store.close()
+
+
+@router.get("/{job_id}/artefacts/{artefact:path}/aggregate")
+def aggregate_artefact(
+    job_id: str,
+    artefact: str,
+    group_by: str = Query(..., description="host, technique, source, day, hour, month or a record field"),
+    host: Optional[str] = None,
+    technique: Optional[str] = None,
+    start: Optional[str] = Query(None, description="ISO 8601 lower bound on the record timestamp"),
+    end: Optional[str] = Query(None, description="ISO 8601 upper bound on the record timestamp"),
+    q: Optional[str] = Query(None, description="Full-text search terms"),
+    field: Optional[List[str]] = Query(None, description="Record field filter as name:value (repeatable)"),
+    limit: int = Query(100, ge=1, le=10000),
+):
+    """
+    Count an artefact's records grouped by host, technique, time bucket or field.
+    """
+    store = _open_store(job_id)
+    try:
+        buckets = store.aggregate(
+            artefact,
+            group_by,
+            limit=limit,
+            host=host,
+            technique=technique,
+            start=start,
+            end=end,
+            search=q,
+            fields=_field_filters(field),
+        )
+        return {"artefact": artefact, "group_by": group_by, "buckets": buckets}
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Artefact '{artefact}' not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        store.close()
+
+
+@router.get("/{job_id}/artefacts/{artefact:path}")
+def query_artefact(
+    job_id: str,
+    artefact: str,
+    host: Optional[str] = None,
+    technique: Optional[str] = None,
+    start: Optional[str] = Query(None, description="ISO 8601 lower bound on the record timestamp"),
+    end: Optional[str] = Query(None, description="ISO 8601 upper bound on the record timestamp"),
+    q: Optional[str] = Query(None, description="Full-text search terms"),
+    field: Optional[List[str]] = Query(None, description="Record field filter as name:value (repeatable)"),
+    order: str = Query("time", pattern="^(time|-time|id)$"),
+    limit: int = Query(100, ge=1, le=10000),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page (order=id)"),
+    count: bool = Query(False, description="Also return the total number of matching records"),
+):
+    """
+    Page through an artefact's records, filtered by host, technique, time range, field values and search terms.
+    """
+    store = _open_store(job_id)
+    try:
+        filters = dict(
+            host=host, technique=technique, start=start, end=end, search=q, fields=_field_filters(field)
+        )
+        page = store.query(artefact, limit=limit, cursor=cursor, offset=offset, order=order, **filters)
+        if count:
+            page["total"] = store.count(artefact, **filters)
+        return page
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Artefact '{artefact}' not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        store.close()
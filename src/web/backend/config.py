@@ -83,6 +83,14 @@ class Settings(BaseSettings):
     max_concurrent_analyses: int = 3
     analysis_timeout: int = 86400  # 24 hours
 
+    # Scheduler capacity (0 = detect from the host)
+    scheduler_cpus: int = 0
+    scheduler_memory_mb: int = 0
+    scheduler_disk_mb: int = 0
+    scheduler_reserve_after: int = 900  # seconds before a waiting job reserves resources against backfill
+    scheduler_queue_timeout: int = 0  # seconds a job may wait for resources before it is cancelled (0 = no limit)
+    scheduler_lease_seconds: int = 300  # admissions and queue entries not renewed for this long are dropped
+
     @property
     def allowed_paths(self) -> list:
         """Get OS-specific allowed directories for file browsing."""
@@ -13,7 +13,7 @@ from typing import Optional, List
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 try:
@@ -21,6 +21,7 @@ try:
     from .auth.routes_simple import router as auth_router  # Simple file-based auth
     from .ai_routes import router as ai_router  # AI assistant routes
     from .mordor_routes import router as mordor_router  # Mordor dataset management
+    from .artefact_routes import router as artefact_router  # Artefact store queries
     from .models.job import (
         Job,
         JobCreate,
@@ -30,6 +31,7 @@ try:
         FileSystemItem,
     )
     from .storage import JobStorage
+    from .progress import PROGRESS_CHANNEL
     from .tasks import start_analysis
 except ImportError:
     # Fallback for standalone execution
@@ -37,6 +39,7 @@ except ImportError:
     from auth.routes_simple import router as auth_router  # Simple file-based auth
     from ai_routes import router as ai_router  # AI assistant routes
     from mordor_routes import router as mordor_router  # Mordor dataset management
+    from artefact_routes import router as artefact_router  # Artefact store queries
     from models.job import (
         Job,
         JobCreate,
@@ -47,6 +50,7 @@ except ImportError:
         FileSystemBrowseResponse,
     )
     from storage import JobStorage
+    from progress import PROGRESS_CHANNEL
     from tasks_docker import start_analysis
 
 # Temporary replacements for security_utils
@@ -122,6 +126,9 @@ app.include_router(ai_router)
 # Include Mordor dataset management routes
 app.include_router(mordor_router)
 
+# Include artefact store query routes
+app.include_router(artefact_router)
+
 
 @app.get("/")
 async def root():
@@ -585,12 +592,12 @@ async def bulk_cancel_jobs(job_ids: list[str]):
             if job.celery_task_id:
                 current_app.control.revoke(job.celery_task_id, terminate=True, signal='SIGKILL')
 
-            # Release image locks for this job
+            # Release scheduler resources for this job
             try:
-                from tasks_docker import release_image_locks_for_job
-                release_image_locks_for_job(job_id, job.source_paths)
+                from tasks_docker import release_job_resources
+                release_job_resources(job_id)
             except Exception as e:
-                logger.warning(f"Failed to release image locks for job {job_id}: {e}")
+                logger.warning(f"Failed to release scheduler resources for job {job_id}: {e}")
 
             # Update job status
             job.status = JobStatus.CANCELLED
@@ -759,12 +766,12 @@ async def cancel_job(job_id: str):
             from celery import current_app
             current_app.control.revoke(job.celery_task_id, terminate=True, signal='SIGKILL')
 
-        # Release image locks for this job
+        # Release scheduler resources for this job
         try:
-            from tasks_docker import release_image_locks_for_job
-            release_image_locks_for_job(job_id, job.source_paths)
+            from tasks_docker import release_job_resources
+            release_job_resources(job_id)
         except Exception as e:
-            logger.warning(f"Failed to release image locks for job {job_id}: {e}")
+            logger.warning(f"Failed to release scheduler resources for job {job_id}: {e}")
 
         # Update job status
         job.status = JobStatus.CANCELLED
@@ -782,12 +789,16 @@ async def cancel_job(job_id: str):
 
 
 @app.post("/api/jobs/{job_id}/restart")
-async def restart_job(job_id: str):
+async def restart_job(
+    job_id: str,
+    resume: bool = Query(True, description="Resume from the case checkpoint manifest instead of starting over"),
+):
     """
     Restart a failed or cancelled job.
 
     Args:
         job_id: Job ID
+        resume: Skip artefacts and phases already completed by the previous run
 
     Returns:
         Updated job
@@ -804,13 +815,20 @@ async def restart_job(job_id: str):
                 detail="Can only restart failed, cancelled, or completed jobs",
             )
 
+        # A completed job has nothing left to resume, so it is always rerun from scratch
+        resume = resume and job.status != JobStatus.COMPLETED
+
         # Reset job state
         job.status = JobStatus.PENDING
         job.progress = 0
         job.error = None
         job.started_at = None
         job.completed_at = None
-        job.log.append(f"[{datetime.now().isoformat()}] Job restarted by user")
+        job.options.resume = resume
+        if resume:
+            job.log.append(f"[{datetime.now().isoformat()}] Job restarted by user, resuming from checkpoint manifest")
+        else:
+            job.log.append(f"[{datetime.now().isoformat()}] Job restarted by user")
 
         job_storage.save_job(job)
 
@@ -1106,6 +1124,99 @@ async def get_navigator_json(job_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/jobs/{job_id}/profile")
+async def get_job_profile(job_id: str):
+    """
+    Get the phase, handler and tool timing report for a job.
+    """
+    import json
+
+    try:
+        job = job_storage.get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        if job.result and "output_directory" in job.result:
+            output_dir = Path(job.result["output_directory"])
+        elif job.destination_path:
+            output_dir = Path(job.destination_path)
+        else:
+            raise HTTPException(status_code=404, detail="Job output directory not found")
+
+        # rivendell_profile.json is written next to rivendell_audit.log in the case directory
+        profile_files = list(output_dir.rglob("rivendell_profile.json"))
+        if not profile_files:
+            raise HTTPException(status_code=404, detail="Profile report not found")
+
+        with open(profile_files[0]) as profile_file:
+            return JSONResponse(content=json.load(profile_file))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Seconds between keep-alive comments on a quiet progress stream
+EVENT_KEEPALIVE = 15
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.ARCHIVED)
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream a job's progress events as server-sent events.
+
+    Relays the phase, artefact counts, percentage and ETA the worker publishes
+    for the job, after an initial status event with the job's current progress.
+    The stream ends with the job's final status event.
+    """
+    import json
+    import redis.asyncio as aioredis
+
+    if not job_storage.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    def status_event(job) -> str:
+        return "data: {}\n\n".format(
+            json.dumps({"event": "status", "status": job.status.value, "percent": job.progress})
+        )
+
+    async def events():
+        client = aioredis.Redis.from_url(settings.redis_url)
+        pubsub = client.pubsub()
+        try:
+            # Subscribe before reading the job so no event between the two is missed
+            await pubsub.subscribe(PROGRESS_CHANNEL.format(job_id))
+            job = job_storage.get_job(job_id)
+            yield status_event(job)
+            if job.status in FINISHED_STATUSES:
+                return
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=EVENT_KEEPALIVE)
+                if message is None:
+                    job = job_storage.get_job(job_id)
+                    if not job or job.status in FINISHED_STATUSES:
+                        if job:
+                            yield status_event(job)
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                data = message["data"].decode()
+                yield f"data: {data}\n\n"
+                if json.loads(data).get("event") == "status":
+                    return
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # File requirements for advanced processing options
 FILE_REQUIREMENTS = {
     'keywords': 'keywords.txt',
@@ -84,9 +84,12 @@ class AnalysisOptions(BaseModel):
 
     # Internal options
     force_overwrite: bool = False
+    resume: bool = False  # Skip artefacts and phases already recorded in the checkpoint manifest
+    priority: int = 0  # Scheduler priority; higher-priority jobs are admitted first
 
     # Logging options
     debug: bool = False  # Enable verbose debug messages in job log
+    profile: bool = False  # Capture per-phase cProfile output alongside the timing report
 
 
 class JobCreate(BaseModel):
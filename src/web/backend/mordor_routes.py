@@ -1,14 +1,16 @@
 """FastAPI routes for Mordor dataset management."""
 
+import bisect
 import hashlib
 import json
 import os
+import re
 import shutil
 import yaml
 import httpx
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
 from pydantic import BaseModel, Field
@@ -21,6 +23,13 @@ RAW_GITHUB = "https://raw.githubusercontent.com/OTRF/Security-Datasets/master"
 CACHE_TTL_HOURS = 24
 CACHE_DIR = Path("/tmp/elrond/output/mordor/cache")
 STORAGE_DIR = Path("/tmp/elrond/output/mordor")
+METADATA_DIRS = ("atomic", "compound")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: Optional[str]) -> Set[str]:
+    return set(_TOKEN.findall(text.lower())) if text else set()
 
 
 # ============================================
@@ -105,6 +114,13 @@ class MordorCatalog:
         self.cache_file = CACHE_DIR / "catalog_index.json"
         self._index: Optional[Dict] = None
         self.github_token = os.environ.get("MORDOR_GITHUB_TOKEN")
+        self._client = httpx.Client(timeout=30.0)
+        # Inverted indexes over the loaded catalog (see _build_indexes)
+        self._by_id: Dict[str, Dict] = {}
+        self._position: Dict[str, int] = {}
+        self._by_field: Dict[str, Dict[str, Set[str]]] = {}
+        self._by_token: Dict[str, Set[str]] = {}
+        self._vocabulary: List[str] = []
 
     def _get_headers(self) -> Dict[str, str]:
         headers = {"Accept": "application/vnd.github.v3+json"}
@@ -112,14 +128,14 @@ class MordorCatalog:
             headers["Authorization"] = f"token {self.github_token}"
         return headers
 
-    def _load_cache(self) -> Optional[Dict]:
+    def _load_cache(self, allow_stale: bool = False) -> Optional[Dict]:
         if not self.cache_file.exists():
             return None
         try:
             with open(self.cache_file, "r") as f:
                 data = json.load(f)
             last_updated = datetime.fromisoformat(data.get("last_updated", "2000-01-01"))
-            if datetime.now() - last_updated < timedelta(hours=CACHE_TTL_HOURS):
+            if allow_stale or datetime.now() - last_updated < timedelta(hours=CACHE_TTL_HOURS):
                 return data
         except Exception as e:
             print(f"Warning: Failed to load cache: {e}")
@@ -132,29 +148,41 @@ class MordorCatalog:
         except Exception as e:
             print(f"Warning: Failed to save cache: {e}")
 
-    def _fetch_metadata_files(self) -> List[str]:
-        metadata_urls = []
-        for dataset_type in ["atomic", "compound"]:
-            url = f"{GITHUB_API}/contents/datasets/{dataset_type}/_metadata"
-            try:
-                response = httpx.get(url, headers=self._get_headers(), timeout=30.0)
-                if response.status_code == 200:
-                    files = response.json()
-                    for f in files:
-                        if f["name"].endswith(".yaml") or f["name"].endswith(".yml"):
-                            metadata_urls.append(f["download_url"])
-                elif response.status_code == 403:
-                    print("Warning: Rate limited by GitHub API")
-                    break
-            except Exception as e:
-                print(f"Warning: Failed to fetch metadata list: {e}")
-        return metadata_urls
-
-    def _parse_metadata_file(self, url: str) -> Optional[Dict]:
+    def _fetch_metadata_tree(self, dataset_type: str, etag: Optional[str] = None) -> Tuple[int, Optional[Dict]]:
+        """Conditionally fetch a metadata directory's git tree; 304 means unchanged."""
+        url = f"{GITHUB_API}/git/trees/master:datasets/{dataset_type}/_metadata"
+        headers = self._get_headers()
+        if etag:
+            headers["If-None-Match"] = etag
+        try:
+            response = self._client.get(url, headers=headers)
+        except Exception as e:
+            print(f"Warning: Failed to fetch metadata list: {e}")
+            return 0, None
+        if response.status_code == 403:
+            print("Warning: Rate limited by GitHub API")
+        if response.status_code != 200:
+            return response.status_code, None
+        tree = response.json()
+        files = {
+            f"datasets/{dataset_type}/_metadata/{entry['path']}": entry["sha"]
+            for entry in tree.get("tree", [])
+            if entry.get("type") == "blob" and entry["path"].endswith((".yaml", ".yml"))
+        }
+        return 200, {"sha": tree.get("sha"), "etag": response.headers.get("ETag"), "files": files}
+
+    def _fetch_metadata_file(self, path: str, etag: Optional[str] = None) -> Tuple[int, Optional[Dict], Optional[str]]:
+        """Conditionally download and parse one metadata YAML; returns (status, dataset, etag)."""
+        headers = {"If-None-Match": etag} if etag else {}
+        response = self._client.get(f"{RAW_GITHUB}/{path}", headers=headers)
+        if response.status_code == 304:
+            return 304, None, etag
+        response.raise_for_status()
+        return response.status_code, self._parse_metadata(response.text, f"{RAW_GITHUB}/{path}"), response.headers.get("ETag")
+
+    def _parse_metadata(self, text: str, url: str) -> Optional[Dict]:
         try:
-            response = httpx.get(url, timeout=30.0)
-            response.raise_for_status()
-            data = yaml.safe_load(response.text)
+            data = yaml.safe_load(text)
             if not data or not isinstance(data, dict):
                 return None
 
@@ -200,31 +228,88 @@ class MordorCatalog:
             return None
 
     def refresh(self, force: bool = False) -> int:
+        """Refresh the catalog, downloading only metadata files whose blob SHA changed."""
         if not force:
             cached = self._load_cache()
             if cached:
-                self._index = cached
+                self._set_index(cached)
                 return cached.get("total_count", 0)
 
-        print("Fetching metadata from OTRF...")
-        metadata_urls = self._fetch_metadata_files()
+        previous = self._load_cache(allow_stale=True) or {}
+        previous_datasets = {ds["dataset_id"]: ds for ds in previous.get("datasets", [])}
+        previous_sources = previous.get("sources", {})
+        previous_trees = previous.get("trees", {})
 
-        if not metadata_urls:
-            cached = self._load_cache()
-            if cached:
-                self._index = cached
-                return cached.get("total_count", 0)
+        print("Fetching metadata from OTRF...")
+        trees, sources, changed = {}, {}, []
+        rate_limited = False
+        # Set when anything could not be fetched: the cache is saved but not marked fresh
+        incomplete = False
+        for dataset_type in METADATA_DIRS:
+            prefix = f"datasets/{dataset_type}/_metadata/"
+            kept = {path: source for path, source in previous_sources.items() if path.startswith(prefix)}
+            previous_tree = previous_trees.get(dataset_type, {})
+            if rate_limited:
+                status, tree = 403, None
+            else:
+                status, tree = self._fetch_metadata_tree(dataset_type, previous_tree.get("etag"))
+            if tree is None or tree["sha"] == previous_tree.get("sha"):
+                # Unchanged (304 or same tree SHA) or unreachable: keep this directory as cached;
+                # once rate limited, every remaining directory is kept without asking
+                if previous_tree:
+                    trees[dataset_type] = previous_tree
+                sources.update(kept)
+                if status != 304 and tree is None:
+                    rate_limited = rate_limited or status == 403
+                    incomplete = True
+                continue
+            trees[dataset_type] = {"sha": tree["sha"] or "", "etag": tree["etag"] or ""}
+            for path, blob_sha in tree["files"].items():
+                source = kept.get(path)
+                if source and source.get("sha") == blob_sha and source.get("dataset_id") in previous_datasets:
+                    sources[path] = source
+                else:
+                    sources[path] = {"sha": blob_sha, "etag": (source or {}).get("etag") or ""}
+                    changed.append(path)
+
+        if not sources:
+            if previous:
+                self._set_index(previous)
+                return previous.get("total_count", 0)
             return 0
 
-        print(f"Parsing {len(metadata_urls)} metadata files...")
-        datasets = []
+        datasets = {
+            source["dataset_id"]: previous_datasets[source["dataset_id"]]
+            for path, source in sources.items()
+            if path not in changed and source.get("dataset_id") in previous_datasets
+        }
 
+        print(f"Parsing {len(changed)} new or changed metadata files...")
         with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {executor.submit(self._parse_metadata_file, url): url for url in metadata_urls}
+            futures = {
+                executor.submit(self._fetch_metadata_file, path, sources[path].get("etag")): path for path in changed
+            }
             for future in as_completed(futures):
-                result = future.result()
+                path = futures[future]
+                old_id = previous_sources.get(path, {}).get("dataset_id")
+                try:
+                    status, result, etag = future.result()
+                except Exception as e:
+                    print(f"Warning: Failed to fetch {path}: {e}")
+                    # Retry on the next refresh
+                    status, result, etag = 0, None, None
+                    sources[path]["sha"] = ""
+                    incomplete = True
+                sources[path]["etag"] = etag or ""
                 if result and result.get("dataset_id"):
-                    datasets.append(result)
+                    sources[path]["dataset_id"] = result["dataset_id"]
+                    datasets[result["dataset_id"]] = result
+                elif status != 200 and old_id in previous_datasets:
+                    # Not modified or failed: keep the cached dataset
+                    sources[path]["dataset_id"] = old_id
+                    datasets[old_id] = previous_datasets[old_id]
+
+        datasets = sorted(datasets.values(), key=lambda ds: ds["dataset_id"])
 
         # Compute statistics
         platforms = {}
@@ -234,48 +319,80 @@ class MordorCatalog:
             for tactic in ds.get("tactics", []):
                 tactics[tactic] = tactics.get(tactic, 0) + 1
 
-        self._index = {
-            "last_updated": datetime.now().isoformat(),
+        # A partial refresh keeps the previous timestamp so the next call retries
+        if incomplete:
+            last_updated = previous.get("last_updated", "2000-01-01")
+        else:
+            last_updated = datetime.now().isoformat()
+        self._set_index({
+            "last_updated": last_updated,
             "datasets": datasets,
             "total_count": len(datasets),
             "platforms": platforms,
             "tactics": tactics,
-        }
+            "trees": trees,
+            "sources": sources,
+        })
 
         self._save_cache(self._index)
         return len(datasets)
 
+    def _set_index(self, index: Dict):
+        """Install a catalog and rebuild its platform/tactic/technique/token -> dataset id indexes."""
+        self._index = index
+        self._by_id, self._position, self._by_token = {}, {}, {}
+        self._by_field = {"platform": {}, "tactics": {}, "techniques": {}}
+        for position, ds in enumerate(index.get("datasets", [])):
+            dataset_id = ds.get("dataset_id", "")
+            self._by_id[dataset_id] = ds
+            self._position[dataset_id] = position
+            self._by_field["platform"].setdefault(str(ds.get("platform", "")).lower(), set()).add(dataset_id)
+            for tactic in ds.get("tactics", []):
+                self._by_field["tactics"].setdefault(tactic.lower(), set()).add(dataset_id)
+            for technique in ds.get("techniques", []):
+                self._by_field["techniques"].setdefault(technique.lower(), set()).add(dataset_id)
+            words = _tokens(ds.get("title")) | _tokens(ds.get("description")) | _tokens(dataset_id)
+            for token in words | {dataset_id.lower()}:
+                self._by_token.setdefault(token, set()).add(dataset_id)
+        self._vocabulary = sorted(self._by_token)
+
+    def _prefix_ids(self, prefix: str) -> Set[str]:
+        ids = set()
+        for token in self._vocabulary[bisect.bisect_left(self._vocabulary, prefix):]:
+            if not token.startswith(prefix):
+                break
+            ids |= self._by_token[token]
+        return ids
+
     def list_datasets(self, platform=None, tactic=None, technique=None, search=None, limit=50, offset=0) -> List[Dict]:
         if not self._index:
             self.refresh()
         if not self._index:
             return []
 
-        datasets = self._index.get("datasets", [])
-
-        if platform:
-            datasets = [d for d in datasets if d.get("platform", "").lower() == platform.lower()]
-        if tactic:
-            datasets = [d for d in datasets if tactic.lower() in [t.lower() for t in d.get("tactics", [])]]
-        if technique:
-            datasets = [d for d in datasets if technique.upper() in [t.upper() for t in d.get("techniques", [])]]
+        candidates = [
+            self._by_field[field].get(value.lower(), set())
+            for field, value in (("platform", platform), ("tactics", tactic), ("techniques", technique))
+            if value
+        ]
         if search:
-            search_lower = search.lower()
-            datasets = [d for d in datasets if search_lower in d.get("title", "").lower()
-                       or search_lower in (d.get("description") or "").lower()
-                       or d.get("dataset_id", "").lower().startswith(search_lower)]
+            # Every search word must prefix a word of the title, description or dataset id
+            terms = _tokens(search)
+            candidates.extend(self._prefix_ids(term) for term in terms)
+            if not terms:
+                candidates.append(set())
 
-        return datasets[offset:offset + limit]
+        if not candidates:
+            return self._index.get("datasets", [])[offset:offset + limit]
+        matches = sorted(set.intersection(*sorted(candidates, key=len)), key=self._position.__getitem__)
+        return [self._by_id[dataset_id] for dataset_id in matches[offset:offset + limit]]
 
     def get_dataset(self, dataset_id: str) -> Optional[Dict]:
         if not self._index:
             self.refresh()
         if not self._index:
             return None
-        for ds in self._index.get("datasets", []):
-            if ds.get("dataset_id") == dataset_id:
-                return ds
-        return None
+        return self._by_id.get(dataset_id)
 
     def get_statistics(self) -> Dict:
         if not self._index:
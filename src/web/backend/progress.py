@@ -0,0 +1,119 @@
+"""
+Job Progress
+
+Turns the structured progress events elrond writes to ELROND_PROGRESS_FD
+(see rivendell/progress.py) into a job percentage and ETA, and publishes each
+event to Redis pub/sub so the API can relay it to the UI as server-sent events.
+
+Each elrond phase covers a band of the job's percentage. Within a band the
+job moves by bytes of artefacts done out of bytes expected (by artefact count
+when sizes are unknown), and the ETA is the bytes remaining at the phase's
+byte rate so far.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FD_ENV = "ELROND_PROGRESS_FD"
+PROGRESS_CHANNEL = "elrond:job:{}:progress"
+
+# Percentage band each elrond phase covers; the worker's own SIEM export
+# and finalizing steps follow at 90 and 95
+PHASE_BANDS = {
+    "identification": (5, 10),
+    "collection": (10, 40),
+    "processing": (45, 75),
+    "analysis": (75, 85),
+    "indexing": (85, 90),
+    "archive": (85, 90),
+}
+
+
+class ProgressTracker:
+    """Job percentage and ETA from a stream of elrond progress events."""
+
+    def __init__(self, percent: int = 0):
+        self.percent = percent
+        self.phase: Optional[str] = None
+        self.eta_seconds: Optional[int] = None
+        self.active = False  # set once elrond has sent an event
+        self._phase_started = 0.0
+
+    def update(self, event: dict) -> dict:
+        """Apply an event; returns it with the job's percent and eta_seconds added."""
+        self.active = True
+        low, high = PHASE_BANDS.get(event.get("phase"), (self.percent, self.percent))
+        if event.get("event") == "phase":
+            self.phase = event.get("phase")
+            self._phase_started = event.get("ts", 0.0)
+            self.eta_seconds = None
+            fraction = 0.0
+        else:
+            done_bytes, total_bytes = event.get("done_bytes", 0), event.get("total_bytes", 0)
+            done, total = event.get("done", 0), event.get("total", 0)
+            if total_bytes:
+                fraction = done_bytes / total_bytes
+            else:
+                fraction = done / total if total else 0.0
+            elapsed = event.get("ts", 0.0) - self._phase_started
+            if done_bytes and elapsed > 0:
+                self.eta_seconds = int((total_bytes - done_bytes) / (done_bytes / elapsed))
+        self.percent = max(self.percent, int(low + (high - low) * min(fraction, 1.0)))
+        return dict(event, percent=self.percent, eta_seconds=self.eta_seconds)
+
+
+def iter_progress_events(stream) -> Iterator[dict]:
+    """Events from a text stream of JSON lines; lines that do not decode are skipped."""
+    for line in stream:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(event, dict) and "event" in event:
+            yield event
+
+
+def redis_publisher(redis_url: str, job_id: str) -> Callable[[dict], None]:
+    """Publish events to the job's progress channel; a no-op if Redis is unavailable."""
+    try:
+        import redis
+
+        client = redis.Redis.from_url(redis_url)
+    except Exception as e:
+        logger.warning(f"Progress events will not be published: {e}")
+        return lambda event: None
+    channel = PROGRESS_CHANNEL.format(job_id)
+
+    def publish(event: dict):
+        try:
+            client.publish(channel, json.dumps(event))
+        except Exception as e:  # the job carries on; the UI falls back to polling
+            logger.debug(f"Could not publish progress event: {e}")
+
+    return publish
+
+
+def start_progress_reader(read_fd: int, tracker: ProgressTracker, on_event: Callable[[dict], None]) -> threading.Thread:
+    """
+    Read events from read_fd on a daemon thread until elrond closes its end of the pipe.
+
+    on_event runs on that thread; an exception from it is logged and the
+    thread carries on reading, so one failed callback never stops progress.
+    """
+
+    def read():
+        with os.fdopen(read_fd, encoding="utf-8", errors="replace") as stream:
+            for event in iter_progress_events(stream):
+                try:
+                    on_event(tracker.update(event))
+                except Exception as e:
+                    logger.warning(f"Progress event not handled: {e}")
+
+    thread = threading.Thread(target=read, name="elrond-progress", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,424 @@
+"""
+Job Scheduler
+
+Resource-aware admission control for analysis jobs on the Celery worker.
+
+Each job's CPU, RAM and scratch-disk needs are estimated from its image
+sizes and options. Jobs are admitted against the host's capacity in
+priority order (FIFO within a priority). Memory images and pre-collected
+artefact directories are only read, so several jobs may share them. Disk
+images are mounted at fixed mount points, so they stay exclusive to one
+job at a time.
+
+Scheduler state lives in Redis so every worker process shares it.
+Waiting jobs block on a per-job wake list (BLPOP) and retry admission
+when another job releases its resources, rather than polling.
+
+Entries are kept alive by their worker: a waiting job refreshes its queue
+heartbeat on every admission check, and a running job's lease is renewed
+by a heartbeat thread. Entries of workers that died are dropped once they
+are lease_seconds old, so they cannot hold or reserve resources forever.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+MEMORY_IMAGE_EXTENSIONS = (".mem", ".dmp", ".lime", ".vmem")
+
+MB = 1024 * 1024
+BASE_MEMORY_MB = 2048  # interpreter, parsers and tool workers for one job
+BASE_DISK_MB = 1024
+
+QUEUE_KEY = "rivendell:scheduler:queue"  # sorted set of waiting job ids, ordered by priority then arrival
+REQUESTS_KEY = "rivendell:scheduler:requests"  # job id -> resource request and queue time (JSON)
+RUNNING_KEY = "rivendell:scheduler:running"  # job id -> admitted request plus lease expiry (JSON)
+SEEN_KEY = "rivendell:scheduler:seen"  # job id -> last admission check of a waiting job
+LOCK_KEY = "rivendell:scheduler:lock"
+WAKE_KEY = "rivendell:scheduler:wake:{}"
+
+SHARED = "shared"
+EXCLUSIVE = "exclusive"
+
+
+@dataclass
+class ResourceRequest:
+    """Estimated needs of one job."""
+
+    cpus: int
+    memory_mb: int
+    disk_mb: int
+    images: Dict[str, str] = field(default_factory=dict)  # normalized image path -> SHARED/EXCLUSIVE
+    priority: int = 0
+
+    def describe(self) -> str:
+        return "{} CPU, {:.1f} GB RAM, {:.1f} GB scratch".format(
+            self.cpus, self.memory_mb / 1024, self.disk_mb / 1024
+        )
+
+
+@dataclass
+class HostCapacity:
+    """Resources the scheduler may hand out on this host."""
+
+    cpus: int
+    memory_mb: int
+    disk_mb: int
+
+    @classmethod
+    def detect(cls, output_dir: str, cpus: int = 0, memory_mb: int = 0, disk_mb: int = 0) -> "HostCapacity":
+        """Use the configured limits, falling back to what the host reports (0 = detect)."""
+        if not cpus:
+            cpus = os.cpu_count() or 1
+        if not memory_mb:
+            memory_mb = 8192
+            try:
+                with open("/proc/meminfo") as meminfo:
+                    for line in meminfo:
+                        if line.startswith("MemTotal:"):
+                            # leave headroom for the OS, Redis and the API
+                            memory_mb = int(int(line.split()[1]) / 1024 * 0.8)
+                            break
+            except OSError:
+                pass
+        if not disk_mb:
+            try:
+                disk_mb = int(shutil.disk_usage(output_dir).free / MB)
+            except OSError:
+                disk_mb = 100 * 1024
+        return cls(cpus=cpus, memory_mb=memory_mb, disk_mb=disk_mb)
+
+
+def image_key(image_path: str) -> str:
+    return os.path.normpath(image_path).lower()
+
+
+def _is_memory_image(path: str, memory: bool) -> bool:
+    lowered = path.lower()
+    if lowered.endswith(".raw"):
+        # .raw is used for both; only treat it as memory when memory analysis was asked for
+        return memory
+    return lowered.endswith(MEMORY_IMAGE_EXTENSIONS)
+
+
+def estimate_resources(
+    images: List[Tuple[str, int]], options, capacity: HostCapacity, priority: int = 0
+) -> ResourceRequest:
+    """
+    Estimate a job's needs from (path, size in bytes) of its sources and its options.
+
+    Memory analysis holds a large part of the memory image in RAM, and
+    collection writes artefacts (and for unallocated-space carving or
+    "collect all", a large fraction of the image) to the output volume.
+    Requests larger than the host are clamped so they can still run alone.
+    """
+    cpus = 1
+    memory_mb = BASE_MEMORY_MB
+    disk_mb = BASE_DISK_MB
+    modes = {}
+
+    # exhaustive mode (elrond -X) turns on memory, timeline and every analysis stage
+    exhaustive = getattr(options, "exhaustive", False)
+    memory = exhaustive or getattr(options, "memory", False)
+    timeline = exhaustive or getattr(options, "timeline", False) or getattr(options, "memory_timeline", False)
+    heavy_collection = any(
+        getattr(options, name, False)
+        for name in ("collect_files_all", "collect_files_unalloc", "collect_files_virtual", "vss")
+    )
+    for path, size in images:
+        size_mb = size / MB
+        if os.path.isdir(path) or getattr(options, "gandalf", False) or getattr(options, "mordor", False):
+            # pre-collected artefacts are only read
+            modes[image_key(path)] = SHARED
+            memory_mb += 512
+            disk_mb += size_mb * 0.5
+        elif _is_memory_image(path, memory):
+            modes[image_key(path)] = SHARED
+            memory_mb += size_mb
+            disk_mb += size_mb * 0.25
+            cpus += 1
+        else:
+            # disk images are mounted at fixed mount points
+            modes[image_key(path)] = EXCLUSIVE
+            if memory:
+                # hiberfil/pagefile extraction and analysis
+                memory_mb += 4096
+            disk_mb += size_mb * (1.0 if heavy_collection else 0.2)
+
+    if exhaustive:
+        cpus += 2
+        disk_mb *= 1.5
+    elif getattr(options, "brisk", False) or any(
+        getattr(options, name, False) for name in ("analysis", "extract_iocs", "keywords", "yara", "hash_all")
+    ):
+        cpus += 1
+    if timeline:
+        memory_mb += 2048
+        disk_mb += BASE_DISK_MB
+
+    return ResourceRequest(
+        cpus=min(cpus, capacity.cpus),
+        memory_mb=int(min(memory_mb, capacity.memory_mb)),
+        disk_mb=int(min(disk_mb, capacity.disk_mb)),
+        images=modes,
+        priority=priority,
+    )
+
+
+def _conflicts(images: Dict[str, str], held: Dict[str, str]) -> List[str]:
+    """Images that cannot be opened alongside `held` (anything but shared + shared)."""
+    return [
+        key for key, mode in images.items()
+        if key in held and (mode == EXCLUSIVE or held[key] == EXCLUSIVE)
+    ]
+
+
+def _hold(held: Dict[str, str], images: Dict[str, str]):
+    for key, mode in images.items():
+        held[key] = EXCLUSIVE if mode == EXCLUSIVE or held.get(key) == EXCLUSIVE else mode
+
+
+def stale_entries(seen: Dict[str, float], now: float, ttl: int) -> List[str]:
+    """Jobs whose last heartbeat is more than ttl seconds old."""
+    return [job_id for job_id, last in seen.items() if now - last > ttl]
+
+
+def plan_admission(
+    job_id: str,
+    queue: List[Tuple[str, ResourceRequest, float]],
+    running: List[ResourceRequest],
+    capacity: HostCapacity,
+    reserve_after: int = 900,
+) -> Tuple[bool, str]:
+    """
+    Decide whether job_id may start now.
+
+    queue holds (job id, request, seconds waited) in priority order. Jobs
+    ahead of job_id that fit are admitted first. Jobs that do not fit are
+    skipped, so smaller jobs can backfill. Once a job has waited
+    reserve_after seconds, its resources are reserved so it is not
+    starved. Returns (admit, reason).
+    """
+    free_cpus = capacity.cpus - sum(request.cpus for request in running)
+    free_memory = capacity.memory_mb - sum(request.memory_mb for request in running)
+    free_disk = capacity.disk_mb - sum(request.disk_mb for request in running)
+    held: Dict[str, str] = {}
+    for request in running:
+        _hold(held, request.images)
+
+    for queued_id, request, waited in queue:
+        busy = _conflicts(request.images, held)
+        fits = (
+            request.cpus <= free_cpus
+            and request.memory_mb <= free_memory
+            and request.disk_mb <= free_disk
+        )
+        if queued_id == job_id:
+            if busy:
+                return False, "waiting for {} (in use by another job)".format(
+                    ", ".join(os.path.basename(key) for key in busy)
+                )
+            if not fits:
+                return False, "waiting for {} ({} CPU, {:.1f} GB RAM, {:.1f} GB scratch free)".format(
+                    request.describe(), max(free_cpus, 0), max(free_memory, 0) / 1024, max(free_disk, 0) / 1024
+                )
+            return True, "admitted with {}".format(request.describe())
+        if busy or not (fits or waited >= reserve_after):
+            continue
+        free_cpus -= request.cpus
+        free_memory -= request.memory_mb
+        free_disk -= request.disk_mb
+        _hold(held, request.images)
+    return False, "not queued"
+
+
+class JobScheduler:
+    """Redis-backed admission control shared by all Celery worker processes."""
+
+    def __init__(
+        self, redis_client, capacity: HostCapacity, lease_seconds: int = 300, reserve_after: int = 900
+    ):
+        self.redis = redis_client
+        self.capacity = capacity
+        self.lease_seconds = lease_seconds
+        self.reserve_after = reserve_after
+        self._heartbeats: Dict[str, threading.Event] = {}
+
+    def _load(self, mapping: Dict) -> Dict[str, dict]:
+        return {
+            (key.decode() if isinstance(key, bytes) else key): json.loads(value)
+            for key, value in mapping.items()
+        }
+
+    def _expire_leases(self, running: Dict[str, dict]) -> Dict[str, dict]:
+        """Drop admissions of workers that died without releasing them."""
+        now = time.time()
+        expired = [job_id for job_id, entry in running.items() if entry.get("expires", now + 1) < now]
+        if expired:
+            self.redis.hdel(RUNNING_KEY, *expired)
+        return {job_id: entry for job_id, entry in running.items() if job_id not in expired}
+
+    def _expire_waiters(self, requests: Dict[str, dict], job_id: str) -> Dict[str, dict]:
+        """Drop queue entries of workers that stopped checking admission (job_id has just checked)."""
+        now = time.time()
+        heartbeats = self._load(self.redis.hgetall(SEEN_KEY))
+        seen = {queued: heartbeats.get(queued, entry["queued_at"]) for queued, entry in requests.items()}
+        seen[job_id] = now
+        stale = stale_entries(seen, now, self.lease_seconds)
+        if stale:
+            pipe = self.redis.pipeline()
+            pipe.zrem(QUEUE_KEY, *stale)
+            pipe.hdel(REQUESTS_KEY, *stale)
+            pipe.hdel(SEEN_KEY, *stale)
+            pipe.execute()
+        self.redis.hset(SEEN_KEY, job_id, now)
+        return {queued: entry for queued, entry in requests.items() if queued not in stale}
+
+    def try_admit(self, job_id: str) -> Tuple[bool, str]:
+        """Admit job_id if the plan allows it; returns (admitted, reason)."""
+        with self.redis.lock(LOCK_KEY, timeout=30, blocking_timeout=30):
+            running = self._expire_leases(self._load(self.redis.hgetall(RUNNING_KEY)))
+            if job_id in running:
+                return True, "already admitted"
+            requests = self._expire_waiters(self._load(self.redis.hgetall(REQUESTS_KEY)), job_id)
+            queue = [
+                (queued.decode() if isinstance(queued, bytes) else queued)
+                for queued in self.redis.zrange(QUEUE_KEY, 0, -1)
+            ]
+            now = time.time()
+            queue = [
+                (queued, ResourceRequest(**requests[queued]["request"]), now - requests[queued]["queued_at"])
+                for queued in queue
+                if queued in requests
+            ]
+            admit, reason = plan_admission(
+                job_id,
+                queue,
+                [ResourceRequest(**entry["request"]) for entry in running.values()],
+                self.capacity,
+                self.reserve_after,
+            )
+            if admit:
+                entry = {"request": requests[job_id]["request"], "expires": now + self.lease_seconds}
+                pipe = self.redis.pipeline()
+                pipe.hset(RUNNING_KEY, job_id, json.dumps(entry))
+                pipe.zrem(QUEUE_KEY, job_id)
+                pipe.hdel(REQUESTS_KEY, job_id)
+                pipe.hdel(SEEN_KEY, job_id)
+                pipe.execute()
+            return admit, reason
+
+    def renew(self, job_id: str) -> bool:
+        """Extend a running job's lease; returns False once it is no longer admitted."""
+        with self.redis.lock(LOCK_KEY, timeout=30, blocking_timeout=30):
+            entry = self.redis.hget(RUNNING_KEY, job_id)
+            if entry is None:
+                return False
+            entry = json.loads(entry)
+            entry["expires"] = time.time() + self.lease_seconds
+            self.redis.hset(RUNNING_KEY, job_id, json.dumps(entry))
+            return True
+
+    def start_heartbeat(self, job_id: str) -> threading.Thread:
+        """Renew job_id's lease from a daemon thread until release() (or the worker dies)."""
+        stopped = self._heartbeats[job_id] = threading.Event()
+
+        def beat():
+            while not stopped.wait(self.lease_seconds / 3):
+                try:
+                    if not self.renew(job_id):
+                        return
+                except Exception:  # Redis briefly unavailable; the lease has slack for a retry
+                    continue
+
+        thread = threading.Thread(target=beat, name="scheduler-heartbeat", daemon=True)
+        thread.start()
+        return thread
+
+    def acquire(
+        self,
+        job_id: str,
+        request: ResourceRequest,
+        timeout: Optional[int] = None,
+        is_cancelled: Callable[[], bool] = lambda: False,
+        on_wait: Optional[Callable[[str], None]] = None,
+        check_interval: int = 30,
+    ) -> bool:
+        """
+        Queue the job and block until it is admitted.
+
+        Returns False if it was cancelled, or waited longer than timeout
+        seconds (no limit when None or 0), while queued; its queue entry is
+        removed. on_wait is called whenever the reason for waiting changes.
+        """
+        # higher priority first; FIFO within a priority
+        queued_at = time.time()
+        score = -request.priority * 1e12 + queued_at
+        pipe = self.redis.pipeline()
+        pipe.hset(REQUESTS_KEY, job_id, json.dumps({"request": asdict(request), "queued_at": queued_at}))
+        pipe.zadd(QUEUE_KEY, {job_id: score}, nx=True)
+        pipe.execute()
+
+        deadline = time.time() + timeout if timeout else None
+        last_reason = None
+        try:
+            while True:
+                admitted, reason = self.try_admit(job_id)
+                if admitted:
+                    return True
+                if reason != last_reason and on_wait:
+                    on_wait(reason)
+                last_reason = reason
+                remaining = deadline - time.time() if deadline else check_interval
+                if remaining <= 0 or is_cancelled():
+                    self._dequeue(job_id)
+                    return False
+                # woken by release() or cancel(); the timeout bounds cancellation and heartbeat checks
+                self.redis.blpop(WAKE_KEY.format(job_id), timeout=int(max(1, min(check_interval, remaining))))
+                if is_cancelled():
+                    self._dequeue(job_id)
+                    return False
+        except BaseException:
+            self._dequeue(job_id)
+            raise
+
+    def _dequeue(self, job_id: str):
+        pipe = self.redis.pipeline()
+        pipe.zrem(QUEUE_KEY, job_id)
+        pipe.hdel(REQUESTS_KEY, job_id)
+        pipe.hdel(SEEN_KEY, job_id)
+        pipe.delete(WAKE_KEY.format(job_id))
+        pipe.execute()
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        """Nudge every queued job to re-check admission."""
+        pipe = self.redis.pipeline()
+        for queued in self.redis.zrange(QUEUE_KEY, 0, -1):
+            queued = queued.decode() if isinstance(queued, bytes) else queued
+            key = WAKE_KEY.format(queued)
+            # one pending token is enough
+            pipe.delete(key)
+            pipe.rpush(key, 1)
+            pipe.expire(key, 3600)
+        pipe.execute()
+
+    def release(self, job_id: str):
+        """Return a job's resources (finished, failed or cancelled) and wake the waiters."""
+        heartbeat = self._heartbeats.pop(job_id, None)
+        if heartbeat:
+            heartbeat.set()
+        pipe = self.redis.pipeline()
+        pipe.hdel(RUNNING_KEY, job_id)
+        pipe.zrem(QUEUE_KEY, job_id)
+        pipe.hdel(REQUESTS_KEY, job_id)
+        pipe.hdel(SEEN_KEY, job_id)
+        # a cancelled job blocked in acquire() wakes up and notices
+        pipe.rpush(WAKE_KEY.format(job_id), 1)
+        pipe.expire(WAKE_KEY.format(job_id), 60)
+        pipe.execute()
+        self._wake_waiters()
@@ -9,6 +9,7 @@ import subprocess
 import sys
 import os
 import re
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
@@ -21,11 +22,13 @@ try:
     from .config import settings
     from .storage import JobStorage
     from .models.job import JobStatus
+    from .progress import PROGRESS_FD_ENV, ProgressTracker, redis_publisher, start_progress_reader
 except ImportError:
     # Fallback for when running as standalone module (Celery worker)
     from config import settings
     from storage import JobStorage
     from models.job import JobStatus
+    from progress import PROGRESS_FD_ENV, ProgressTracker, redis_publisher, start_progress_reader
 
 # Initialize Celery
 celery_app = Celery(
@@ -37,6 +40,47 @@ celery_app = Celery(
 logger = get_task_logger(__name__)
 job_storage = JobStorage()
 
+# Seconds between saves of progress reported on elrond's progress channel
+PROGRESS_SAVE_INTERVAL = 5
+# Checkpoint manifest elrond writes in the case directory (rivendell/checkpoint.py)
+CHECKPOINT_DB = "rivendell_checkpoints.db"
+
+_ANSI_CODE = re.compile(r'\x1b\[[0-9;]*m')  # ANSI codes like [1;36m, [1;m, etc.
+_DUPLICATE_TIMESTAMP = re.compile(r'-> \d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+ -> ')
+_COMMENCING_PHASE = re.compile(r'^(-> )?Commencing (.*?) Phase\.\.\.', re.IGNORECASE)
+
+# Noisy internal processing messages left out of the job log even though they contain arrows
+SKIP_PATTERNS = [
+    r'^mode:\s',  # "Mode: Collect", "Mode: Process", etc.
+    r'completed (collection|processing|analysis) phase',  # Skip standard phases but NOT SIEM phases
+    r"collecting .* for .*\.\.\.",  # "Collecting '$MFT' for 'image.E01'..."
+    r"^mounted .* successfully at .*$",  # "Mounted 'image.E01' successfully at '/mnt/elrond_mount00'"
+    r'^-+$',  # Lines with only dashes (e.g., "----------------------------------------")
+    r"^-> processing '.*' .*\.evtx.* event log for .*$",  # "-> processing 'X.evtx' event log for 'image.E01'"
+    r"^-> processing '.*' (ntuser\.dat|usrclass\.dat) registry hive (from|for) .*$",  # "-> processing 'X' NTUSER.DAT registry hive from 'image.E01'"
+    r"^-> processing registry hive '.*' from .*$",  # "-> processing registry hive 'SOFTWARE' from 'image.E01'"
+    r"^-> processing wmi .* for .*$",  # "-> processing WMI '#1Terminal-Services-Core.etl' for 'image.E01'"
+    r"^-> extracting metadata for .* for .*$",  # "-> extracting metadata for 'X' for 'image.E01'"
+    r"^initializing.*analysis\.\.\.$",  # "Initializing Elrond DFIR Analysis..."
+    r"^case:\s",  # "Case: 111111111"
+    r"^attempting to mount .*\.\.\.$",  # "Attempting to mount 'win7-64-nfury-c-drive.E01'..."
+    r"^-> processing completed for .*$",  # "-> processing completed for 'image.E01'"
+    r"^-> (analysis completed|elrond completed) for .*$",  # "-> analysis completed for 'image.E01'" - we add our own completion message
+    r"^\[.*\] -> elrond completed for .*$",  # "[timestamp] -> elrond completed for 'xxx'" - redundant when phased orchestration used
+    r"-> indexing artefacts for '/.*/$",  # Skip indexing messages that contain output directory paths
+    r"-> splunk configured successfully for case .* for '/.*/$",  # Skip splunk messages that contain output directory paths
+    r"-> cleaning up small files and empty directories",  # Internal cleanup message
+    r"^=+ Commencing Index(ing)? Phase =+$",  # "========== Commencing Indexing Phase ==========" - only skip Indexing, keep others
+]
+_SKIP_LINE = re.compile("|".join(f"(?:{pattern})" for pattern in SKIP_PATTERNS), re.IGNORECASE)
+
+
+def _uppercase_phase(match):
+    """Transform "Commencing X Phase..." to uppercase with asterisks for emphasis."""
+    prefix = match.group(1) or ''
+    phase_name = match.group(2).upper()
+    return f'{prefix}******** COMMENCING {phase_name} PHASE ********'
+
 
 def _resolve_destination(job) -> Path:
     """
@@ -310,6 +354,12 @@ def run_siem_export(job, output_dir: Path, logger):
         job_storage.save_job(job)
 
 
+def _has_checkpoints(job) -> bool:
+    """Whether elrond has written a checkpoint manifest in the job's output directory."""
+    output_dir = translate_path_for_worker(str(_resolve_destination(job)))
+    return os.path.exists(os.path.join(output_dir, CHECKPOINT_DB))
+
+
 @celery_app.task(bind=True)
 def start_analysis(self, job_id: str):
     """
@@ -333,6 +383,14 @@ def start_analysis(self, job_id: str):
         job.log.append(f"[{datetime.now().isoformat()}] -> starting forensic analysis")
         job_storage.save_job(job)
 
+        # A run that stopped before elrond wrote its checkpoint manifest has
+        # nothing to resume from, so its partial output is overwritten instead
+        if getattr(job.options, "resume", False) and not _has_checkpoints(job):
+            job.options.resume = False
+            job.options.force_overwrite = True
+            job.log.append(f"[{datetime.now().isoformat()}] -> No checkpoint manifest to resume from, starting over")
+            job_storage.save_job(job)
+
         # Build elrond command
         cmd = build_elrond_command(job)
 
@@ -345,7 +403,8 @@ def start_analysis(self, job_id: str):
         dest_dir_str = str(dest_dir)
 
         # Check if force_overwrite is set and directory exists
-        if getattr(job.options, 'force_overwrite', False):
+        # A resumed job keeps its output so completed artefacts can be skipped
+        if getattr(job.options, 'force_overwrite', False) and not getattr(job.options, 'resume', False):
             if dest_dir.exists():
                 logger.info(f"Force overwrite enabled, removing existing directory: {dest_dir_str}")
 
@@ -453,16 +512,38 @@ def start_analysis(self, job_id: str):
         # SIEM credentials are now set in docker-compose.yml environment
         # and will be automatically available via os.environ in the analysis scripts
 
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True,
-            cwd=str(dest_dir),
-            env=env,
-        )
+        # Structured progress events (phase, artefact counts and byte totals) arrive on
+        # their own pipe; stdout is only read for the job log
+        progress_read, progress_write = os.pipe()
+        env[PROGRESS_FD_ENV] = str(progress_write)
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+                cwd=str(dest_dir),
+                env=env,
+                pass_fds=(progress_write,),
+            )
+        except Exception:
+            os.close(progress_read)
+            raise
+        finally:
+            os.close(progress_write)
 
-        # Monitor progress with phase tracking
+        tracker = ProgressTracker(job.progress)
+        publish = redis_publisher(settings.redis_url, job.id)
+        last_progress_save = time.monotonic()
+
+        def on_progress(event):
+            # Runs on the reader thread; the job is only saved from the loop below
+            job.progress = max(job.progress, event["percent"])
+            publish(event)
+
+        progress_reader = start_progress_reader(progress_read, tracker, on_progress)
+
+        # Fall back to phase tracking from the log when elrond sends no progress events
         current_phase = "initializing"
         phase_progress = {
             "initializing": 0,
@@ -482,10 +563,13 @@ def start_analysis(self, job_id: str):
 
         line_count = 0
         for line in iter(process.stdout.readline, ""):
+            if tracker.active and time.monotonic() - last_progress_save >= PROGRESS_SAVE_INTERVAL:
+                last_progress_save = time.monotonic()
+                job_storage.save_job(job)
             line = line.strip()
             if line:
                 # Clean line: remove ANSI color codes
-                line = re.sub(r'\x1b\[[0-9;]*m', '', line)  # Remove ANSI codes like [1;36m, [1;m, etc.
+                line = _ANSI_CODE.sub('', line)
 
                 # STRICT filtering: Only show lines containing ' -> '
                 # This ensures only properly formatted audit log entries are shown
@@ -493,40 +577,9 @@ def start_analysis(self, job_id: str):
                     continue
 
                 # Skip noisy internal processing messages even if they contain arrows
-                line_lower = line.lower()
-                skip_patterns = [
-                    r'^mode:\s',  # "Mode: Collect", "Mode: Process", etc.
-                    r'completed (collection|processing|analysis) phase',  # Skip standard phases but NOT SIEM phases
-                    r"collecting .* for .*\.\.\.",  # "Collecting '$MFT' for 'image.E01'..."
-                    r"^mounted .* successfully at .*$",  # "Mounted 'image.E01' successfully at '/mnt/elrond_mount00'"
-                    r'^-+$',  # Lines with only dashes (e.g., "----------------------------------------")
-                    r"^-> processing '.*' .*\.evtx.* event log for .*$",  # "-> processing 'X.evtx' event log for 'image.E01'"
-                    r"^-> processing '.*' (ntuser\.dat|usrclass\.dat) registry hive (from|for) .*$",  # "-> processing 'X' NTUSER.DAT registry hive from 'image.E01'"
-                    r"^-> processing registry hive '.*' from .*$",  # "-> processing registry hive 'SOFTWARE' from 'image.E01'"
-                    r"^-> processing wmi .* for .*$",  # "-> processing WMI '#1Terminal-Services-Core.etl' for 'image.E01'"
-                    r"^-> extracting metadata for .* for .*$",  # "-> extracting metadata for 'X' for 'image.E01'"
-                    r"^initializing.*analysis\.\.\.$",  # "Initializing Elrond DFIR Analysis..."
-                    r"^case:\s",  # "Case: 111111111"
-                    r"^attempting to mount .*\.\.\.$",  # "Attempting to mount 'win7-64-nfury-c-drive.E01'..."
-                    r"^-> processing completed for .*$",  # "-> processing completed for 'image.E01'"
-                    r"^-> (analysis completed|elrond completed) for .*$",  # "-> analysis completed for 'image.E01'" - we add our own completion message
-                    r"^\[.*\] -> elrond completed for .*$",  # "[timestamp] -> elrond completed for 'xxx'" - redundant when phased orchestration used
-                    r"-> indexing artefacts for '/.*/$",  # Skip indexing messages that contain output directory paths
-                    r"-> splunk configured successfully for case .* for '/.*/$",  # Skip splunk messages that contain output directory paths
-                    r"-> cleaning up small files and empty directories",  # Internal cleanup message
-                    r"^=+ Commencing Index(ing)? Phase =+$",  # "========== Commencing Indexing Phase ==========" - only skip Indexing, keep others
-                ]
-
-                # Check if this line should be skipped
-                should_skip = False
-                for pattern in skip_patterns:
-                    if re.search(pattern, line, re.IGNORECASE):
-                        should_skip = True
-                        break
-
-                if should_skip:
+                if _SKIP_LINE.search(line):
                     # Even if skipped from log, still count for progress tracking during processing
-                    if current_phase == "processing":
+                    if current_phase == "processing" and not tracker.active:
                         processing_artefact_count += 1
                         # Increment progress gradually during processing (45% to 75%)
                         # Assume ~100 artefacts per image on average, cap at 75%
@@ -542,15 +595,8 @@ def start_analysis(self, job_id: str):
                     continue
 
                 # Remove duplicate timestamp if present (e.g., "-> 2025-11-23 20:51:49.011749 -> ")
-                line = re.sub(r'-> \d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+ -> ', '-> ', line)
-
-                # Transform "Commencing X Phase..." to uppercase with asterisks for emphasis
-                def uppercase_phase(match):
-                    prefix = match.group(1) or ''
-                    phase_name = match.group(2).upper()
-                    return f'{prefix}******** COMMENCING {phase_name} PHASE ********'
-
-                line = re.sub(r'^(-> )?Commencing (.*?) Phase\.\.\.', uppercase_phase, line, flags=re.IGNORECASE)
+                line = _DUPLICATE_TIMESTAMP.sub('-> ', line)
+                line = _COMMENCING_PHASE.sub(_uppercase_phase, line)
 
                 # Update log
                 log_entry = f"[{datetime.now().isoformat()}] {line}"
@@ -597,7 +643,7 @@ def start_analysis(self, job_id: str):
 
                 # Set progress based on current phase (don't let it go backwards)
                 new_progress = phase_progress.get(current_phase, job.progress)
-                if new_progress > job.progress:
+                if new_progress > job.progress and not tracker.active:
                     job.progress = new_progress
 
                 # Save periodically (every 10 lines)
@@ -608,6 +654,7 @@ def start_analysis(self, job_id: str):
 
         # Wait for completion
         return_code = process.wait()
+        progress_reader.join(timeout=10)
 
         if return_code == 0:
             # Success
@@ -692,6 +739,10 @@ def start_analysis(self, job_id: str):
     finally:
         job.completed_at = datetime.now()
         job_storage.save_job(job)
+        # Final event so progress streams know the job has ended
+        redis_publisher(settings.redis_url, job.id)(
+            {"event": "status", "status": job.status.value, "percent": job.progress}
+        )
 
 
 def translate_path_for_worker(path_str: str) -> str:
@@ -841,4 +892,10 @@ def build_elrond_command(job):
     if opts.archive:
         cmd.append("--Ziparchive")
 
+    # Diagnostics
+    if getattr(opts, "profile", False):
+        cmd.append("--profile")
+    if getattr(opts, "resume", False):
+        cmd.append("--resume")
+
     return cmd
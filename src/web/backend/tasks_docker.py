@@ -14,6 +14,7 @@ import time
 import hashlib
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 from celery import Celery
 from celery.utils.log import get_task_logger
@@ -22,6 +23,7 @@ import redis
 from config import settings
 from storage import JobStorage
 from models.job import JobStatus, PendingAction
+from scheduler import HostCapacity, JobScheduler, estimate_resources
 
 # Initialize Celery
 celery_app = Celery(
@@ -33,132 +35,106 @@ celery_app = Celery(
 logger = get_task_logger(__name__)
 job_storage = JobStorage()
 
-# Redis client for image locking
+# Checkpoint manifest elrond writes in the case directory (rivendell/checkpoint.py)
+CHECKPOINT_DB = "rivendell_checkpoints.db"
+
+# Redis client for the job scheduler
 _redis_client = None
+_scheduler = None
 
 
 def get_redis_client():
-    """Get or create Redis client for image locking."""
+    """Get or create Redis client for the job scheduler."""
     global _redis_client
     if _redis_client is None:
         redis_host = os.environ.get("REDIS_HOST", "redis")
         redis_port = int(os.environ.get("REDIS_PORT", 6379))
-        _redis_client = redis.Redis(host=redis_host, port=redis_port, db=1)  # Use db=1 for locks
+        _redis_client = redis.Redis(host=redis_host, port=redis_port, db=1)  # Use db=1 for scheduling
     return _redis_client
 
 
-def _get_image_lock_key(image_path: str) -> str:
-    """Generate a Redis key for an image lock."""
-    # Normalize the path and create a hash for consistent key naming
-    normalized = os.path.normpath(image_path).lower()
-    path_hash = hashlib.md5(normalized.encode()).hexdigest()[:16]
-    return f"rivendell:image_lock:{path_hash}"
+def get_scheduler() -> JobScheduler:
+    """Get the resource-aware scheduler shared (through Redis) by all worker processes."""
+    global _scheduler
+    if _scheduler is None:
+        capacity = HostCapacity.detect(
+            str(settings.output_dir),
+            cpus=settings.scheduler_cpus,
+            memory_mb=settings.scheduler_memory_mb,
+            disk_mb=settings.scheduler_disk_mb,
+        )
+        logger.info(
+            f"Scheduler capacity: {capacity.cpus} CPU, {capacity.memory_mb} MB RAM, {capacity.disk_mb} MB scratch"
+        )
+        _scheduler = JobScheduler(
+            get_redis_client(),
+            capacity,
+            lease_seconds=settings.scheduler_lease_seconds,
+            reserve_after=settings.scheduler_reserve_after,
+        )
+    return _scheduler
 
 
-def acquire_image_locks(job_id: str, image_paths: list, timeout: int = 3600, retry_interval: int = 10) -> bool:
-    """
-    Acquire locks on all image paths. Waits if any image is in use.
+def _source_sizes(source_paths: list) -> list:
+    """(worker path, size in bytes) for each source; directories count their immediate files only."""
+    sizes = []
+    for source_path in source_paths:
+        path = translate_path_for_worker(source_path)
+        try:
+            if os.path.isdir(path):
+                with os.scandir(path) as entries:
+                    size = sum(entry.stat().st_size for entry in entries if entry.is_file())
+            else:
+                size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        sizes.append((path, size))
+    return sizes
 
-    Args:
-        job_id: Job ID (used as lock value for identification)
-        image_paths: List of image paths to lock
-        timeout: Lock timeout in seconds (default 1 hour)
-        retry_interval: Seconds between retry attempts
 
-    Returns:
-        True if all locks acquired, False if failed
+def acquire_job_resources(job, timeout: Optional[int] = None) -> bool:
     """
-    redis_client = get_redis_client()
-    acquired_locks = []
-
-    try:
-        for image_path in image_paths:
-            lock_key = _get_image_lock_key(image_path)
-            image_name = os.path.basename(image_path)
-
-            while True:
-                # Try to acquire the lock using SETNX (set if not exists)
-                # The lock value contains job_id for debugging
-                lock_acquired = redis_client.set(
-                    lock_key,
-                    f"{job_id}:{datetime.now().isoformat()}",
-                    nx=True,  # Only set if not exists
-                    ex=timeout  # Expire after timeout
-                )
-
-                if lock_acquired:
-                    acquired_locks.append(lock_key)
-                    logger.info(f"Job {job_id}: Acquired lock on '{image_name}'")
-                    break
-                else:
-                    # Lock exists - another job is using this image
-                    existing_lock = redis_client.get(lock_key)
-                    if existing_lock:
-                        existing_job = existing_lock.decode().split(":")[0]
-                        logger.info(f"Job {job_id}: Waiting for '{image_name}' (in use by job {existing_job})")
-
-                        # Update job status to show waiting
-                        job = job_storage.get_job(job_id)
-                        if job:
-                            job.log.append(
-                                f"[{datetime.now().isoformat().replace('T', ' ')}] -> Waiting for '{image_name}' (in use by another job)"
-                            )
-                            job_storage.save_job(job)
+    Queue the job with the scheduler and block until it may start.
 
-                    # Wait and retry
-                    time.sleep(retry_interval)
+    timeout defaults to settings.scheduler_queue_timeout (0 waits as long
+    as it takes). Returns False if the job was cancelled (or timed out)
+    while waiting. Once admitted, the job's lease is renewed until
+    release_job_resources().
+    """
+    if timeout is None:
+        timeout = settings.scheduler_queue_timeout
+    scheduler = get_scheduler()
+    request = estimate_resources(
+        _source_sizes(job.source_paths or []),
+        job.options,
+        scheduler.capacity,
+        priority=getattr(job.options, "priority", 0),
+    )
 
-                    # Check if our job was cancelled while waiting
-                    job = job_storage.get_job(job_id)
-                    if job and job.status == JobStatus.CANCELLED:
-                        logger.info(f"Job {job_id}: Cancelled while waiting for image lock")
-                        release_image_locks(acquired_locks)
-                        return False
+    def is_cancelled():
+        current = job_storage.get_job(job.id)
+        return current is None or current.status == JobStatus.CANCELLED
 
-        return True
+    def on_wait(reason):
+        logger.info(f"Job {job.id}: {reason}")
+        current = job_storage.get_job(job.id)
+        if current:
+            current.log.append(f"[{datetime.now().isoformat().replace('T', ' ')}] -> Queued: {reason}")
+            job_storage.save_job(current)
 
-    except Exception as e:
-        logger.error(f"Job {job_id}: Error acquiring image locks: {e}")
-        # Release any locks we acquired
-        release_image_locks(acquired_locks)
+    if not scheduler.acquire(job.id, request, timeout=timeout, is_cancelled=is_cancelled, on_wait=on_wait):
         return False
+    scheduler.start_heartbeat(job.id)
+    logger.info(f"Job {job.id}: Admitted with {request.describe()}")
+    return True
 
 
-def release_image_locks(lock_keys: list):
-    """Release image locks."""
-    if not lock_keys:
-        return
-
-    redis_client = get_redis_client()
-    for lock_key in lock_keys:
-        try:
-            redis_client.delete(lock_key)
-            logger.debug(f"Released lock: {lock_key}")
-        except Exception as e:
-            logger.warning(f"Error releasing lock {lock_key}: {e}")
-
-
-def release_image_locks_for_job(job_id: str, source_paths: list):
-    """
-    Release image locks held by a specific job.
-    Only releases locks if they are actually held by this job.
-    """
-    if not source_paths:
-        return
-
-    redis_client = get_redis_client()
-    for image_path in source_paths:
-        lock_key = _get_image_lock_key(image_path)
-        try:
-            # Check if this job holds the lock
-            lock_value = redis_client.get(lock_key)
-            if lock_value:
-                lock_str = lock_value.decode() if isinstance(lock_value, bytes) else str(lock_value)
-                if lock_str.startswith(f"{job_id}:"):
-                    redis_client.delete(lock_key)
-                    logger.info(f"Released image lock for job {job_id}: {os.path.basename(image_path)}")
-        except Exception as e:
-            logger.warning(f"Error releasing lock for {image_path}: {e}")
+def release_job_resources(job_id: str):
+    """Return a job's scheduler admission (or queue slot) and wake waiting jobs."""
+    try:
+        get_scheduler().release(job_id)
+    except Exception as e:
+        logger.warning(f"Error releasing scheduler resources for job {job_id}: {e}")
 
 
 def _request_sudo_confirmation(job, target_path: str, reason: str):
@@ -311,13 +287,20 @@ def _resolve_destination(job) -> Path:
     return Path(settings.output_dir) / job.case_number
 
 
+def _has_checkpoints(job) -> bool:
+    """Whether elrond has written a checkpoint manifest in the job's output directory."""
+    output_dir = translate_path_for_worker(str(_resolve_destination(job)))
+    return os.path.exists(os.path.join(output_dir, CHECKPOINT_DB))
+
+
 @celery_app.task(bind=True)
 def start_analysis(self, job_id: str):
     """
     Start Elrond analysis task in dockerized environment.
 
     Runs the full forensics engine directly in the container.
-    Uses Redis-based locking to ensure only one job can process a given image at a time.
+    Jobs are admitted by the resource-aware scheduler, which also keeps
+    disk images exclusive to one job at a time.
 
     Args:
         job_id: Job ID
@@ -328,28 +311,22 @@ def start_analysis(self, job_id: str):
         logger.error(f"Job {job_id} not found")
         return
 
-    # Track acquired locks for cleanup
-    acquired_lock_keys = []
-
     try:
-        # Acquire locks on all source images before starting
-        # This ensures jobs using the same image wait for each other
-        if job.source_paths:
-            job.log.append(f"[{datetime.now().isoformat().replace('T', ' ')}] -> Checking image availability...")
-            job_storage.save_job(job)
+        # Wait for CPU, RAM, scratch disk and the source images to be available
+        job.log.append(f"[{datetime.now().isoformat().replace('T', ' ')}] -> Checking resource availability...")
+        job_storage.save_job(job)
 
-            # Build list of lock keys we need to acquire
-            for image_path in job.source_paths:
-                acquired_lock_keys.append(_get_image_lock_key(image_path))
+        if not acquire_job_resources(job):
+            # Cancelled (or timed out) while queued
+            job = job_storage.get_job(job_id) or job
+            job.status = JobStatus.CANCELLED
+            job.log.append(f"[{datetime.now().isoformat().replace('T', ' ')}] -> Job cancelled while waiting for resources")
+            job.completed_at = datetime.now()
+            job_storage.save_job(job)
+            return
 
-            # Try to acquire all locks (will wait if images are in use)
-            if not acquire_image_locks(job_id, job.source_paths, timeout=7200, retry_interval=10):
-                # Failed to acquire locks (job was cancelled while waiting)
-                job.status = JobStatus.CANCELLED
-                job.log.append(f"[{datetime.now().isoformat().replace('T', ' ')}] -> Job cancelled while waiting for images")
-                job.completed_at = datetime.now()
-                job_storage.save_job(job)
-                return
+        # Pick up queue messages logged while waiting
+        job = job_storage.get_job(job_id) or job
 
         # Update job status
         job.status = JobStatus.RUNNING
@@ -357,6 +334,14 @@ def start_analysis(self, job_id: str):
         job.log.append(f"[{datetime.now().isoformat().replace('T', ' ')}] -> Starting rivendell...")
         job_storage.save_job(job)
 
+        # A run that stopped before elrond wrote its checkpoint manifest has
+        # nothing to resume from, so its partial output is overwritten instead
+        if getattr(job.options, "resume", False) and not _has_checkpoints(job):
+            job.options.resume = False
+            job.options.force_overwrite = True
+            job.log.append(f"[{datetime.now().isoformat().replace('T', ' ')}] -> No checkpoint manifest to resume from, starting over")
+            job_storage.save_job(job)
+
         # Build elrond command
         cmd = build_elrond_command(job)
 
@@ -368,7 +353,8 @@ def start_analysis(self, job_id: str):
         dest_dir = Path(dest_dir_str)
 
         # Check if force_overwrite is set and directory exists
-        if getattr(job.options, "force_overwrite", False):
+        # A resumed job keeps its output so completed artefacts can be skipped
+        if getattr(job.options, "force_overwrite", False) and not getattr(job.options, "resume", False):
             if dest_dir.exists():
                 import shutil
 
@@ -912,10 +898,8 @@ def start_analysis(self, job_id: str):
         job.log.append(f"[{datetime.now().isoformat().replace('T', ' ')}] -> Error: {str(e)}")
 
     finally:
-        # Release image locks
-        if acquired_lock_keys:
-            release_image_locks(acquired_lock_keys)
-            logger.info(f"Job {job_id}: Released {len(acquired_lock_keys)} image lock(s)")
+        # Return CPU, RAM, scratch disk and images to the scheduler
+        release_job_resources(job_id)
 
         job.completed_at = datetime.now()
         job_storage.save_job(job)
@@ -1061,4 +1045,10 @@ def build_elrond_command(job):
     if opts.archive:
         cmd.append("--Ziparchive")
 
+    # Diagnostics
+    if getattr(opts, "profile", False):
+        cmd.append("--profile")
+    if getattr(opts, "resume", False):
+        cmd.append("--resume")
+
     return cmd
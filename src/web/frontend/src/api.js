@@ -59,6 +59,11 @@ export const getJob = async (jobId) => {
   return response.data;
 };
 
+// Server-sent progress events (phase, artefact counts, percent, ETA) for a job
+export const openJobEvents = (jobId) => {
+  return new EventSource(`${API_BASE_URL}/api/jobs/${jobId}/events`, { withCredentials: true });
+};
+
 export const updateJob = async (jobId, updateData) => {
   const response = await api.patch(`/api/jobs/${jobId}`, updateData);
   return response.data;
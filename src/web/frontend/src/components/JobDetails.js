@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
-import { getJob, cancelJob, deleteJob, restartJob, exportSiem, confirmSudo, cancelSudo } from '../api';
+import { getJob, openJobEvents, cancelJob, deleteJob, restartJob, exportSiem, confirmSudo, cancelSudo } from '../api';
 
 const heroImage = `${process.env.PUBLIC_URL}/images/rivendell.png`;
 
@@ -15,6 +15,7 @@ function JobDetails() {
   const [showCancelModal, setShowCancelModal] = useState(false);
   const [showDeleteModal, setShowDeleteModal] = useState(false);
   const [showSudoModal, setShowSudoModal] = useState(false);
+  const [liveProgress, setLiveProgress] = useState(null);
 
   // Auto-show sudo modal when job is awaiting confirmation
   useEffect(() => {
@@ -32,6 +33,21 @@ function JobDetails() {
     return () => clearInterval(interval);
   }, [jobId]);
 
+  // Live progress from the job's event stream; polling still carries the log
+  useEffect(() => {
+    if (job?.status !== 'running') return undefined;
+    const events = openJobEvents(jobId);
+    events.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      setLiveProgress(event);
+      if (event.event === 'status' && event.status !== 'running') {
+        events.close();
+      }
+    };
+    events.onerror = () => events.close();
+    return () => events.close();
+  }, [jobId, job?.status]);
+
   // Auto-scroll to bottom of log when it updates
   useEffect(() => {
     if (logEndRef.current) {
@@ -160,6 +176,13 @@ function JobDetails() {
     return `${hours}h ${minutes}m`;
   };
 
+  const formatEta = (seconds) => {
+    if (seconds === null || seconds === undefined) return null;
+    if (seconds < 60) return 'less than a minute left';
+    if (seconds < 3600) return `about ${Math.round(seconds / 60)}m left`;
+    return `about ${Math.floor(seconds / 3600)}h ${Math.round((seconds % 3600) / 60)}m left`;
+  };
+
   const downloadLog = () => {
     if (!job || !job.log || job.log.length === 0) return;
 
@@ -341,6 +364,8 @@ function JobDetails() {
     );
   }
 
+  const progress = Math.max(job.progress, liveProgress?.percent || 0);
+
   return (
     <div className="job-details journey-detail">
       {/* Cancel Job Modal */}
@@ -755,10 +780,15 @@ function JobDetails() {
           <div className="progress-bar" style={{ width: '100%' }}>
             <div
               className="progress-fill"
-              style={{ width: `${job.progress}%` }}
+              style={{ width: `${progress}%` }}
             >
             </div>
-            {job.progress > 0 && <span className="progress-text">{job.progress}%</span>}
+            {progress > 0 && (
+              <span className="progress-text">
+                {progress}%
+                {job.status === 'running' && formatEta(liveProgress?.eta_seconds) && ` (${formatEta(liveProgress.eta_seconds)})`}
+              </span>
+            )}
           </div>
         </div>
 